@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: bulk ingestion into the scholarship cache at 1k / 10k / 100k rows
+
+Compares the old row-at-a-time loop (one execute per row inside one
+transaction, fed from a list) with the chunked executemany path fed from a
+generator, then re-ingests the same rows to time the all-unchanged case.
+With --memory each run is repeated under tracemalloc to report peak Python
+memory (kept separate because tracing slows the timed runs down).
+
+Usage: python benchmarks/bench_bulk_ingest.py [--sizes 1000 10000 100000] [--chunk-size 500]
+                                              [--skip-legacy] [--memory]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.scholarship_cache import ScholarshipCache, UPSERT_SCHOLARSHIP_SQL
+
+
+def synthetic_rows(count):
+    goals = ['student', 'entrepreneur', 'researcher', 'nonprofit', 'artist']
+    countries = ['Uganda', 'Kenya', 'Nigeria', 'Africa', 'International']
+    for i in range(count):
+        yield {
+            'title': f"Bulk Scholarship {i:06d}",  # Zero-padded so no number reads as a year
+            'description': f"Funding for engineering and science students, intake {i % 97}",
+            'amount': f"${(i % 20 + 1) * 1000}",
+            'deadline': "March 15, 2026",
+            'category': "Synthetic",
+            'source': f"https://example{i % 50}.org/scholarships/{i}",
+            'country': countries[i % len(countries)],
+            'keywords': "engineering,science,undergraduate",
+            'goal_type': goals[i % len(goals)],
+            'priority': i % 4 + 1,
+        }
+
+
+def row_at_a_time(cache, scholarships):
+    """The pre-batching add_scholarships loop"""
+    conn = cache.pool.connection()
+    with conn:
+        cursor = conn.cursor()
+        for scholarship in scholarships:
+            params = cache._upsert_rows(cursor, [scholarship])[0]
+            cursor.execute(UPSERT_SCHOLARSHIP_SQL, params)
+            row_id, title, description, cluster_id = cursor.execute(
+                "SELECT id, title, description, cluster_id FROM scholarships WHERE content_key = ?",
+                (params[0],)
+            ).fetchone()
+            if cluster_id is None:
+                cache._assign_cluster(cursor, row_id, title, description)
+
+
+def measure(action, trace_memory=False):
+    """(seconds, result) of action(), or (peak traced MB, result) with trace_memory"""
+    if not trace_memory:
+        start = time.perf_counter()
+        result = action()
+        return time.perf_counter() - start, result
+    tracemalloc.start()
+    result = action()
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return peak, result
+
+
+def fresh_cache():
+    return ScholarshipCache(db_file=os.path.join(tempfile.mkdtemp(), "cache", "bench.db"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--skip-legacy', action='store_true', help="Only run the chunked path")
+    parser.add_argument('--memory', action='store_true', help="Also report peak traced memory")
+    args = parser.parse_args()
+
+    def legacy(cache, size):
+        return row_at_a_time(cache, list(synthetic_rows(size)))
+
+    def chunked_ingest(cache, size):
+        return cache.add_scholarships(synthetic_rows(size), chunk_size=args.chunk_size)
+
+    header = f"{'rows':>8} {'mode':<22} {'seconds':>9} {'rows/s':>10}"
+    print(header + (f" {'peak MB':>8}" if args.memory else "") + "  counts")
+    for size in args.sizes:
+        modes = [] if args.skip_legacy else [('row-at-a-time (list)', legacy, False)]
+        modes += [('chunked (generator)', chunked_ingest, False), ('chunked re-ingest', chunked_ingest, True)]
+        for label, ingest, reuse in modes:
+            cache = cache if reuse else fresh_cache()
+            elapsed, counts = measure(lambda: ingest(cache, size))
+            line = f"{size:>8} {label:<22} {elapsed:>9.2f} {size / elapsed:>10.0f}"
+            if args.memory:
+                traced = cache if reuse else fresh_cache()
+                peak, _ = measure(lambda: ingest(traced, size), trace_memory=True)
+                line += f" {peak:>8.1f}"
+            print(line + (f"  {counts}" if counts else ""), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent cache readers against one background writer
+
+Compares the pooled WAL connections used by ScholarshipCache with the old
+connect-per-call / rollback-journal behaviour.
+
+Usage: python benchmarks/bench_cache_concurrency.py [--rows 5000] [--readers 4] [--seconds 3]
+"""
+
+import argparse
+import contextlib
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.scholarship_cache import ScholarshipCache
+from core.write_queue import DirectWrites
+
+
+class ConnectPerCallPool:
+    """Mimics the pre-pool behaviour: connect at the start of a cache call, close at its end
+
+    Wrap each cache method call in ``with pool.call_scope():``; every connection
+    handed out inside the scope is closed when it exits, like the old
+    connect()/close() pair in each method.
+    """
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self._local = threading.local()
+
+    def connection(self):
+        conn = sqlite3.connect(self.db_file)
+        self._local.opened.append(conn)
+        return conn
+
+    @contextlib.contextmanager
+    def call_scope(self):
+        self._local.opened = []
+        try:
+            yield
+        finally:
+            for conn in self._local.opened:
+                conn.close()
+            self._local.opened = []
+
+
+def synthetic_rows(count, offset=0):
+    goals = ['student', 'entrepreneur', 'researcher', 'nonprofit', 'artist']
+    countries = ['Uganda', 'Kenya', 'Nigeria', 'Africa', 'International']
+    for i in range(offset, offset + count):
+        yield {
+            'title': f"Synthetic Scholarship {i}",
+            'description': f"Funding for engineering and science students, batch {i % 97}",
+            'amount': f"${(i % 20 + 1) * 1000}",
+            'deadline': "March 15, 2026",
+            'category': "Synthetic",
+            'source': f"https://example{i % 50}.org/scholarships/{i}",
+            'country': countries[i % len(countries)],
+            'keywords': "engineering,science,undergraduate",
+            'goal_type': goals[i % len(goals)],
+            'priority': i % 4 + 1,
+        }
+
+
+def run(mode, rows, readers, seconds):
+    workdir = tempfile.mkdtemp()
+    cache = ScholarshipCache(db_file=os.path.join(workdir, "cache", "bench.db"))
+    cache.add_scholarships(list(synthetic_rows(rows)))
+    if mode == 'legacy':
+        cache.pool.close_all()
+        conn = sqlite3.connect(cache.db_file)
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.close()
+        cache.pool = ConnectPerCallPool(cache.db_file)
+        cache.writes = DirectWrites(lambda: cache.pool.connection(), cache._on_commit)  # Writes on the caller
+
+    stop = threading.Event()
+    latencies, errors, writes = [], [], [0]
+    lock = threading.Lock()
+
+    def call_scope():
+        if mode == 'legacy':
+            return cache.pool.call_scope()
+        return contextlib.nullcontext()
+
+    def reader():
+        local = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                with call_scope():
+                    cache.search_scholarships(goal='student', keywords=['engineering'], country='Uganda')
+                with call_scope():
+                    cache.get_scholarship_count()
+            except sqlite3.OperationalError as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+
+    def writer():
+        offset = rows
+        while not stop.is_set():
+            try:
+                with call_scope():
+                    cache.add_scholarships(list(synthetic_rows(50, offset)))
+                writes[0] += 50
+            except sqlite3.OperationalError as e:
+                with lock:
+                    errors.append(str(e))
+            offset += 50
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+    print(f"{mode:>7}: {len(latencies):6d} searches | "
+          f"p50 {statistics.median(latencies) * 1000 if latencies else 0:7.2f} ms | "
+          f"p95 {p95 * 1000:7.2f} ms | rows written {writes[0]:6d} | "
+          f"lock errors {sum('locked' in e for e in errors)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    print(f"📊 {args.readers} readers vs 1 writer, {args.rows} seed rows, {args.seconds}s per mode")
+    for mode in ('legacy', 'pooled'):
+        run(mode, args.rows, args.readers, args.seconds)
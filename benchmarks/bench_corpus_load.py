@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark: starting a new database from a corpus snapshot
+
+Writes a synthetic snapshot in JSONL and Parquet, then times loading it into
+an empty cache through add_scholarships (indexes maintained per row) and
+through bulk_load (indexes and full-text built after the load).
+
+Usage: python benchmarks/bench_corpus_load.py [--size 30000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.bench_bulk_ingest import fresh_cache, synthetic_rows
+from core.corpus import read_corpus, write_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=30000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    for name in ("snapshot.jsonl", "snapshot.parquet"):
+        path = os.path.join(workdir, name)
+        start = time.perf_counter()
+        write_corpus(synthetic_rows(args.size), path)
+        written = time.perf_counter() - start
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"\n{name}: {args.size} records, {size_mb:.1f} MB, written in {written:.2f}s")
+
+        for label, load in (("add_scholarships", lambda cache: cache.add_scholarships(read_corpus(path))),
+                            ("bulk_load", lambda cache: cache.bulk_load(read_corpus(path)))):
+            cache = fresh_cache()
+            start = time.perf_counter()
+            counts = load(cache)
+            elapsed = time.perf_counter() - start
+            print(f"  {label:<17} {elapsed:6.2f}s  {args.size / elapsed:8.0f} rows/s  ({counts['inserted']} inserted)")
+
+
+if __name__ == "__main__":
+    main()
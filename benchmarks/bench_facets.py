@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: facet counts over a large corpus
+
+Loads N synthetic scholarships, then times search_facets (one query for the
+matching rows' facet columns, one NumPy pass to label and count them),
+uncached, against one grouped query per facet over the same match, and times
+counting and drilling into a loaded page of results as the UI does.
+
+Usage: python benchmarks/bench_facets.py [--rows 100000] [--repeat 10]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.facets import AMOUNT_BANDS, count_facets, drill_down, result_labels
+from core.scholarship_cache import ScholarshipCache
+
+FIELDS = ['engineering', 'medicine', 'nursing', 'computer science', 'agriculture', 'economics', 'journalism',
+          'architecture', 'environmental science', 'mathematics', 'pharmacy', 'renewable energy']
+CATEGORIES = ['Academic', 'Research', 'Leadership', 'Government', 'Foundation', 'Regional']
+PLACES = ['Uganda', 'Kenya', 'Tanzania', 'Rwanda', 'Nigeria', 'Ghana', 'East Africa', 'Africa', 'International']
+QUERIES = [["engineering"], ["nursing", "pharmacy"], ["scholarship"]]
+
+_BAND = ' '.join(f"WHEN s.amount_max_usd < {bound} THEN '{label}'" for bound, label in AMOUNT_BANDS[:-1])
+# Facet -> SQL expression, for the one-query-per-facet baseline
+PER_FACET = {
+    'category': "s.category", 'goal': "s.goal_type", 'geography': "g.name",
+    'deadline_month': "substr(s.deadline_date, 1, 7)",
+    'amount_band': f"CASE WHEN s.full_funding THEN 'Full funding' {_BAND} ELSE '{AMOUNT_BANDS[-1][1]}' END",
+    'source': "s.source",
+}
+
+
+def synthetic_scholarships(count, seed=11):
+    rng = random.Random(seed)
+    for i in range(count):
+        field = rng.choice(FIELDS)
+        full = rng.random() < 0.2
+        yield {
+            'title': f"{field.title()} Scholarship {i}",
+            'description': f"Support for students of {field}.",
+            'keywords': field,
+            'category': rng.choice(CATEGORIES),
+            'amount': "Full scholarship" if full else f"${rng.randrange(200, 80000):,}",
+            'source': f"https://funder{i % 700}.example.org/{i}",
+            'country': rng.choice(PLACES),
+            'goal_type': rng.choice(['student', 'researcher', 'entrepreneur']),
+            'deadline': f"2027-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        }
+
+
+def per_facet_counts(cache, keywords):
+    """One GROUP BY query per facet over the same keyword match (no cluster folding)"""
+    conn = cache.pool.connection()
+    counts = {}
+    for facet, expression in PER_FACET.items():
+        counts[facet] = conn.execute(f'''
+            SELECT {expression}, COUNT(*) FROM scholarships s LEFT JOIN geography g ON g.id = s.geography_id
+            WHERE s.is_active = 1 AND s.id IN (SELECT rowid FROM scholarships_fts WHERE scholarships_fts MATCH ?)
+            GROUP BY 1 ORDER BY 2 DESC
+        ''', (' OR '.join(keywords),)).fetchall()
+    return counts
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    cache = ScholarshipCache(db_file=os.path.join(tempfile.mkdtemp(), "cache", "bench-facets.db"))
+    start = time.perf_counter()
+    cache.bulk_load(synthetic_scholarships(args.rows))
+    print(f"📊 {args.rows} scholarships loaded in {time.perf_counter() - start:.1f}s")
+
+    def uncached(function):
+        cache.query_cache.bump_generation()
+        return function()
+
+    for keywords in QUERIES:
+        facets_ms, facets = timed(lambda: uncached(lambda: cache.search_facets(keywords=keywords)), args.repeat)
+        per_facet_ms, _ = timed(lambda: per_facet_counts(cache, keywords), args.repeat)
+        cached_ms, _ = timed(lambda: cache.search_facets(keywords=keywords), args.repeat * 10)
+        matched = sum(total for _, total in facets['category'])
+        print(f"{', '.join(keywords):22} {matched:6} matches | search_facets {facets_ms:6.1f} ms "
+              f"(cached {cached_ms:.3f} ms) | one query per facet {per_facet_ms:6.1f} ms")
+
+    page, _ = cache.search_ranked_page(keywords=["engineering"], page_size=200)
+    # Shaped as EnhancedScholarshipScraper._format_cached rows (core.scraping needs requests)
+    results = [dict(row, amount_usd=row['amount_max_usd']) for row in page]
+    count_ms, counts = timed(lambda: count_facets(result_labels(results)), args.repeat * 10)
+    selected = {'category': [counts['category'][0][0]], 'amount_band': ['Full funding']}
+    labels = result_labels(results)
+    drill_ms, shown = timed(lambda: drill_down(labels, selected), args.repeat * 10)
+    print(f"loaded page of {len(results)}: label + count {count_ms:.2f} ms | drill-down {drill_ms:.3f} ms "
+          f"({int(shown.sum())} rows shown)")
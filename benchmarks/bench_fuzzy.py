@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: typo-tolerant search over a large corpus
+
+Loads N synthetic scholarships (titles name one of several thousand made-up
+funders, so the vocabulary is realistically large), then times
+suggest_keywords and the fuzzy ranked search for misspelled queries,
+uncached, against the plain search (which finds nothing) and the search
+spelled right, and reports how many misspellings were corrected to the
+intended word.
+
+Usage: python benchmarks/bench_fuzzy.py [--rows 100000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.scholarship_cache import ScholarshipCache
+
+FIELDS = ['engineering', 'medicine', 'nursing', 'computer science', 'agriculture', 'economics', 'journalism',
+          'architecture', 'environmental science', 'mathematics', 'pharmacy', 'renewable energy']
+LEVELS = ['undergraduate', 'graduate', 'masters', 'doctoral', 'postdoctoral', 'diploma']
+PLACES = ['Uganda', 'Kenya', 'Tanzania', 'Rwanda', 'Nigeria', 'Ghana', 'International']
+
+
+def funder_names(count, rng):
+    syllables = ['ka', 'ma', 're', 'ro', 'ni', 'to', 'ba', 'lu', 'se', 'vi', 'do', 'ne', 'zu', 'ha', 'ri']
+    return sorted({''.join(rng.choice(syllables) for _ in range(rng.randint(3, 5))).title() for _ in range(count)})
+
+
+def synthetic_scholarships(count, funders, seed=9):
+    rng = random.Random(seed)
+    for i in range(count):
+        field, level = rng.choice(FIELDS), rng.choice(LEVELS)
+        yield {
+            'title': f"{rng.choice(funders)} {field.title()} {level.title()} Scholarship {i}",
+            'description': f"Support for {level} students of {field}.",
+            'keywords': f"{field},{level}",
+            'source': f"https://funder{i % 500}.example.org/{i}",
+            'country': rng.choice(PLACES),
+            'goal_type': 'student',
+            'deadline': 'Rolling',
+        }
+
+
+def misspell(word, rng):
+    """One dropped, doubled or substituted letter past the first"""
+    position = rng.randrange(1, len(word))
+    edit = rng.choice(('drop', 'double', 'substitute'))
+    if edit == 'drop':
+        return word[:position] + word[position + 1:]
+    if edit == 'double':
+        return word[:position] + word[position] + word[position:]
+    return word[:position] + rng.choice(string.ascii_lowercase) + word[position + 1:]
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(4)
+    funders = funder_names(5000, rng)
+    cache = ScholarshipCache(db_file=os.path.join(tempfile.mkdtemp(), "cache", "bench-fuzzy.db"))
+    start = time.perf_counter()
+    cache.bulk_load(synthetic_scholarships(args.rows, funders))
+    words = cache.pool.connection().execute("SELECT COUNT(*) FROM search_terms").fetchone()[0]
+    print(f"📊 {args.rows} scholarships loaded in {time.perf_counter() - start:.1f}s ({words} vocabulary words)")
+
+    intended = [word.lower() for word in rng.sample(funders, 10)] + ['scholarship', 'engineering', 'pharmacy',
+                                                                      'postdoctoral', 'environmental']
+    corrected = 0
+    for word in intended:
+        typo = misspell(word, rng)
+        keywords = [typo]
+
+        def uncached(function):
+            cache.query_cache.bump_generation()
+            return function()
+
+        suggest_ms, suggestion = timed(lambda: uncached(lambda: cache.suggest_keywords(keywords)), args.repeat)
+        plain_ms, (plain, _) = timed(lambda: uncached(lambda: cache.search_ranked_page(keywords=keywords)),
+                                     args.repeat)
+        fuzzy_ms, (fuzzy, _) = timed(lambda: uncached(lambda: cache.search_ranked_page(keywords=keywords, fuzzy=True)),
+                                     args.repeat)
+        right_ms, _ = timed(lambda: uncached(lambda: cache.search_ranked_page(keywords=[word])), args.repeat)
+        corrected += suggestion == [word]
+        print(f"{typo!r:16} -> {', '.join(suggestion or ['(none)']):16} suggest {suggest_ms:5.2f} ms | "
+              f"plain {plain_ms:5.1f} ms, {len(plain):2} rows | fuzzy {fuzzy_ms:6.1f} ms, {len(fuzzy):2} rows | "
+              f"spelled right {right_ms:6.1f} ms")
+    print(f"corrected to the intended word: {corrected}/{len(intended)}")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark: multi-signal ranking of a candidate set
+
+Times building the signal matrix of N candidates (once per candidate set,
+cached with it), re-scoring it (every page and weight change), and a
+per-row Python scoring loop doing the same arithmetic for comparison.
+
+Usage: python benchmarks/bench_ranking.py [--candidates 500 2000 5000] [--repeat 50]
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.ranking import (
+    AMOUNT_CEILING_USD, DEADLINE_HORIZON_DAYS, DEFAULT_RELIABILITY, FRESHNESS_HALF_LIFE_DAYS, MAX_PRIORITY,
+    OPEN_DEADLINE_SCORE, RANK_SIGNALS, host_of, score, signal_matrix, weight_vector
+)
+
+
+def synthetic_candidates(count, seed=7):
+    rng = random.Random(seed)
+    today = date.today()
+    rows = []
+    for i in range(count):
+        rows.append({
+            'relevance': rng.uniform(0, 20),
+            'priority': rng.randint(1, 4),
+            'geography_id': rng.choice([None, rng.randint(1, 60)]),
+            'deadline_date': rng.choice([None, (today + timedelta(days=rng.randint(-30, 120))).isoformat()]),
+            'amount_max_usd': rng.choice([None, float(rng.randint(500, 80_000))]),
+            'full_funding': rng.randint(0, 1),
+            'source': f"https://www.source{i % 200}.example.org/listing/{i}",
+            'last_verified': f"{today - timedelta(days=rng.randint(0, 60))} 12:00:00",
+        })
+    return rows
+
+
+def python_scores(rows, area_scores, reliability, weights):
+    """The same signals and blend, one row at a time"""
+    today = date.today()
+    top = max((row.get('relevance') or 0) for row in rows) or 1
+    scores = []
+    for row in rows:
+        deadline = row['deadline_date']
+        if deadline is None:
+            deadline_score = OPEN_DEADLINE_SCORE
+        else:
+            days = (date.fromisoformat(deadline) - today).days
+            deadline_score = 0.0 if days < 0 else math.exp(-days / DEADLINE_HORIZON_DAYS)
+        amount = row['amount_max_usd'] or 0
+        age = max((today - date.fromisoformat(row['last_verified'][:10])).days, 0)
+        signals = (
+            (row.get('relevance') or 0) / top,
+            min(row['priority'] / MAX_PRIORITY, 1),
+            area_scores.get(row['geography_id'], 0.0),
+            deadline_score,
+            1.0 if row['full_funding'] else min(math.log1p(amount) / math.log1p(AMOUNT_CEILING_USD), 1),
+            reliability.get(host_of(row['source']), DEFAULT_RELIABILITY),
+            0.5 ** min(age / FRESHNESS_HALF_LIFE_DAYS, 64),
+        )
+        scores.append(sum(w * s for w, s in zip(weights, signals)))
+    return sorted(range(len(rows)), key=lambda index: -scores[index])
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--candidates', type=int, nargs='+', default=[500, 2000, 5000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    area_scores = {1: 1.0, 5: 0.75, 12: 0.5, 30: 0.25}
+    reliability = {f"source{i}.example.org": random.random() for i in range(0, 200, 3)}
+    weights = weight_vector().tolist()
+    print(f"📊 {len(RANK_SIGNALS)} signals, mean of {args.repeat} runs")
+    for count in args.candidates:
+        rows = synthetic_candidates(count)
+        build_ms, signals = timed(lambda: signal_matrix(rows, area_scores, reliability), args.repeat)
+        score_ms, _ = timed(lambda: score(signals), args.repeat)
+        loop_ms, _ = timed(lambda: python_scores(rows, area_scores, reliability, weights), args.repeat)
+        print(f"{count:>6} candidates: signal matrix {build_ms:7.2f} ms | re-score {score_ms:6.3f} ms | "
+              f"per-row Python {loop_ms:7.2f} ms")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: semantic search over a large corpus
+
+Loads N synthetic scholarships into a cache (embedding their vectors at
+ingest), then times building the nearest-neighbour index, semantic_search
+with the index built, the blended keyword + semantic ranked search, and an
+exact scan of the same memory-mapped vectors, and reports the index's
+recall of the exact top results.
+
+Usage: python benchmarks/bench_semantic.py [--rows 100000] [--repeat 50]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.scholarship_cache import ScholarshipCache
+from core.semantic import MIN_SIMILARITY, SemanticIndex
+
+FIELDS = ['engineering', 'medicine', 'nursing', 'computer science', 'agriculture', 'economics', 'law',
+          'education', 'public health', 'mathematics', 'physics', 'journalism', 'music', 'film', 'architecture',
+          'environmental science', 'business', 'finance', 'chemistry', 'biology', 'software development',
+          'data analysis', 'renewable energy', 'climate policy', 'creative writing', 'pharmacy']
+LEVELS = ['undergraduate', 'graduate', 'masters', 'doctoral', 'postdoctoral', 'diploma']
+FUNDERS = ['Foundation', 'Trust', 'University', 'Council', 'Institute', 'Society']
+QUERIES = ["computer science masters", "women in engineering", "phd research in climate",
+           "undergraduate nursing bursary", "music and film residency", "startup funding for entrepreneurs"]
+
+
+def synthetic_scholarships(count, seed=5):
+    rng = random.Random(seed)
+    for i in range(count):
+        fields = rng.sample(FIELDS, 2)
+        level = rng.choice(LEVELS)
+        yield {
+            'title': f"{rng.choice(FUNDERS)} {fields[0].title()} {level.title()} Award {i}",
+            'description': f"Support for {level} students of {fields[0]} and {fields[1]}.",
+            'keywords': ','.join(fields + [level]),
+            'category': rng.choice(['Academic', 'Research', 'Leadership']),
+            'source': f"https://funder{i % 500}.example.org/{i}",
+            'country': rng.choice(['Uganda', 'Kenya', 'East Africa', 'Africa', 'International']),
+            'goal_type': 'student',
+            'deadline': 'Rolling',
+        }
+
+
+def timed(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    cache = ScholarshipCache(db_file=os.path.join(tempfile.mkdtemp(), "cache", "bench-semantic.db"))
+    start = time.perf_counter()
+    cache.bulk_load(synthetic_scholarships(args.rows))
+    print(f"📊 {args.rows} scholarships loaded and embedded in {time.perf_counter() - start:.1f}s")
+
+    cache.semantic = SemanticIndex()  # Timed from empty
+    build_ms, index = timed(cache._semantic_index, 1)
+    print(f"index build (model change only) {build_ms:8.1f} ms "
+          f"({len(index)} vectors, {len(index.centroids) if index.centroids is not None else 0} lists)")
+
+    for query in QUERIES:
+        cache.query_cache.bump_generation()  # Uncached searches; the index is already current
+        search_ms, _ = timed(lambda: cache._semantic_matches(query, None, None, 20), args.repeat)
+        vector = index.model.embed_query(query)
+        exact_ms, scores = timed(lambda: np.sort(index.vectors[:index.count] @ vector)[::-1], args.repeat)
+        found = index.search(query, 20)
+        # Tie-aware recall: found rows scoring at least the exact 20th best (many synthetic rows tie)
+        floor = max(scores[min(19, len(scores) - 1)], MIN_SIMILARITY)
+        expected = min(20, int((scores >= floor).sum()))
+        recall = sum(similarity >= floor - 1e-4 for _, similarity in found) / expected if expected else 1.0
+        ranked_ms, _ = timed(lambda: cache._rank_candidates(None, [query], None, True, open_only=False,
+                                                            min_amount_usd=None), max(1, args.repeat // 10))
+        print(f"{query!r:38} semantic_search {search_ms:6.2f} ms | exact scan {exact_ms:6.2f} ms | "
+              f"recall@20 {recall:.2f} | blended ranked candidates {ranked_ms:6.1f} ms")
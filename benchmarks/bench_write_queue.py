@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent small writes, each on its caller vs through the write queue
+
+Several scraper-like threads each write small batches of scholarships.
+'direct' runs every write on its caller's connection, one transaction
+and publish per write; 'queued' hands them to the single writer,
+which coalesces what has queued up into shared transactions and one
+publish. Also reports how long a foreground queue_scholarships call takes.
+
+Usage: python benchmarks/bench_write_queue.py [--rows 5000] [--writers 4] [--seconds 3] [--batch 20]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.bench_cache_concurrency import synthetic_rows
+from core.scholarship_cache import ScholarshipCache
+from core.write_queue import DirectWrites
+
+
+def run(mode, rows, writers, seconds, batch):
+    cache = ScholarshipCache(db_file=os.path.join(tempfile.mkdtemp(), "cache", f"bench-{mode}.db"))
+    cache.add_scholarships(synthetic_rows(rows))
+    if mode == 'direct':
+        cache.writes = DirectWrites(cache.pool.connection, cache._on_commit)
+
+    stop = threading.Event()
+    write_latencies, enqueue_latencies, written, errors = [], [], [0], []
+    lock = threading.Lock()
+
+    def writer(index):
+        offset = rows + index * 10_000_000
+        local = []
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                cache.add_scholarships(list(synthetic_rows(batch, offset)))
+                local.append(time.perf_counter() - start)
+            except sqlite3.OperationalError as e:
+                with lock:
+                    errors.append(str(e))
+            offset += batch
+        with lock:
+            write_latencies.extend(local)
+            written[0] += len(local) * batch
+
+    def foreground():
+        offset = rows + 99 * 10_000_000
+        while not stop.is_set():
+            start = time.perf_counter()
+            cache.queue_scholarships(list(synthetic_rows(5, offset)))
+            enqueue_latencies.append(time.perf_counter() - start)
+            offset += 5
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads.append(threading.Thread(target=foreground))
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    cache.flush_writes()
+
+    write_latencies.sort()
+    enqueue_latencies.sort()
+    print(f"{mode:>7}: {written[0] / seconds:8.0f} rows/s | "
+          f"add_scholarships p50 {statistics.median(write_latencies) * 1000:7.1f} ms "
+          f"p95 {write_latencies[int(len(write_latencies) * 0.95)] * 1000:7.1f} ms | "
+          f"queue_scholarships p95 {enqueue_latencies[int(len(enqueue_latencies) * 0.95)] * 1000:7.2f} ms | "
+          f"lock errors {sum('locked' in e for e in errors)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--writers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=3)
+    parser.add_argument('--batch', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"📊 {args.writers} writers of {args.batch} rows, {args.rows} seed rows, {args.seconds}s per mode")
+    for mode in ('direct', 'queued'):
+        run(mode, args.rows, args.writers, args.seconds, args.batch)
@@ -0,0 +1,27 @@
+"""
+Shared test fixtures
+"""
+
+import pytest
+
+from core.scholarship_cache import release_database
+
+
+@pytest.fixture
+def make_db_path(tmp_path):
+    """Factory of scratch database paths under tmp_path
+
+    Each call gives a new path (tmp_path/N/cache/scholarships.db). After the
+    test, release_database() closes the process-wide state of every database
+    it made, so none leaks into the next test; pytest removes the files.
+    """
+    paths = []
+
+    def make(name="scholarships.db"):
+        path = str(tmp_path / str(len(paths)) / "cache" / name)
+        paths.append(path)
+        return path
+
+    yield make
+    for path in paths:
+        release_database(path)
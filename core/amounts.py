@@ -0,0 +1,97 @@
+"""
+Amount normalization for scraped scholarships
+Turns free-text amounts into a numeric range, a currency code and a full-funding flag
+"""
+
+import re
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from .fx_rates import FX_VERSION, USD_PER_UNIT, to_usd
+
+# Symbols and words that name a currency; ISO codes from the FX table also count
+_CURRENCY_ALIASES = {
+    'us$': 'USD', '$': 'USD', '€': 'EUR', '£': 'GBP', '₦': 'NGN', '₹': 'INR', '¥': 'JPY',
+    'ush': 'UGX', 'ushs': 'UGX', 'ksh': 'KES', 'kshs': 'KES',
+    'dollars': 'USD', 'dollar': 'USD', 'euros': 'EUR', 'euro': 'EUR', 'pounds': 'GBP',
+}
+_CODES = sorted(list(_CURRENCY_ALIASES) + [code.lower() for code in USD_PER_UNIT], key=len, reverse=True)
+_PREFIX = r'(' + '|'.join(re.escape(code) for code in _CODES if not code.isalpha() or len(code) <= 4) + r')'
+_SUFFIX = r'(' + '|'.join(re.escape(code) for code in _CODES if code.isalpha()) + r')\b'
+_MULTIPLIERS = {'k': 1_000, 'thousand': 1_000, 'm': 1_000_000, 'million': 1_000_000}
+_AMOUNT = r'(\d{1,3}(?:,\d{3})+|\d+)(\.\d+)?(?:\s*(k|thousand|m|million)(?![a-z]))?'
+_RANGE_TO = r'\s*(?:-|–|to)\s*'
+
+# (pattern, currency side): a range end may repeat the currency or leave it out
+_MONEY_PATTERNS = [
+    (re.compile(r'(?<![a-z])' + _PREFIX + r'\s?' + _AMOUNT
+                + r'(?:' + _RANGE_TO + _PREFIX + r'?\s?' + _AMOUNT + r')?'), 'prefix'),
+    (re.compile(r'(?<![\d.,])' + _AMOUNT + r'(?:' + _RANGE_TO + _AMOUNT + r')?\s*' + _SUFFIX), 'suffix'),
+]
+_UP_TO = re.compile(r'\b(up to|upto|maximum( of)?|max\.?)\s*$')
+_FULL_FUNDING = re.compile(
+    r'\b(full(y)?[- ]?(funded|funding|tuition|scholarships?|ride|cost)|all expenses|tuition[- ]free)\b'
+)
+
+
+def parse_amount(text: str) -> Tuple[Optional[float], Optional[float], Optional[str], bool]:
+    """(minimum, maximum, currency code, full funding) for a free-text amount
+
+    "$5,000 seed funding" -> (5000, 5000, "USD", False); "Up to €15k" ->
+    (None, 15000, "EUR", False); "Full tuition + stipend" -> (None, None,
+    None, True). Only figures written with a currency count, so years and
+    headcounts are ignored; when several currencies appear the first wins.
+    """
+    return _parse_amount(text or '')
+
+
+@lru_cache(maxsize=4096)  # Scraped amounts repeat a lot ("Check website", "Full tuition")
+def _parse_amount(text: str) -> Tuple[Optional[float], Optional[float], Optional[str], bool]:
+    lowered = text.lower()
+    currency, values, capped = None, [], False
+    consumed = []
+    for pattern, side in _MONEY_PATTERNS:
+        for match in pattern.finditer(lowered):
+            start, end = match.span()
+            if any(start < taken_end and taken_start < end for taken_start, taken_end in consumed):
+                continue
+            consumed.append((start, end))
+            found_currency, found = _money(match.groups(), side)
+            if currency is None:
+                currency = found_currency
+            if found_currency == currency:
+                values.extend(found)
+                capped = capped or (len(found) == 1 and bool(_UP_TO.search(lowered[:start])))
+    full_funding = bool(_FULL_FUNDING.search(lowered))
+    if not values:
+        return None, None, None, full_funding
+    minimum = None if capped and len(values) == 1 else min(values)
+    return minimum, max(values), currency, full_funding
+
+
+def _money(groups, side: str):
+    """(currency, [values]) from one money match"""
+    if side == 'prefix':
+        code, digits, fraction, multiplier = groups[:4]
+        end = groups[5:8]
+    else:
+        digits, fraction, multiplier = groups[:3]
+        end, code = groups[3:6], groups[6]
+    values = [_number(digits, fraction, multiplier)]
+    if end[0]:
+        values.append(_number(*end))
+    return _CURRENCY_ALIASES.get(code, code.upper()), values
+
+
+def _number(digits: str, fraction: Optional[str], multiplier: Optional[str]) -> float:
+    value = float(digits.replace(',', '') + (fraction or ''))
+    return value * _MULTIPLIERS.get(multiplier, 1)
+
+
+def normalize_amount(text: str) -> tuple:
+    """Stored amount columns for text:
+    (amount_min, amount_max, amount_currency, full_funding, amount_min_usd, amount_max_usd, fx_version)
+    """
+    minimum, maximum, currency, full_funding = parse_amount(text)
+    return (minimum, maximum, currency, int(full_funding),
+            to_usd(minimum, currency), to_usd(maximum, currency), FX_VERSION)
@@ -0,0 +1,55 @@
+"""
+Clock abstractions for the scraper
+Lets politeness delays and retry backoff run against real or virtual time
+"""
+
+import time
+from datetime import datetime, timedelta
+
+
+class SystemClock:
+    """Real wall-clock time and real sleeping (production default)"""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock:
+    """Deterministic clock where sleeping advances virtual time instantly
+
+    Pair it with a seeded ``random.Random`` to make anti-bot delays and retry
+    backoff repeatable in tests and benchmarks.
+    """
+
+    def __init__(self, start: datetime = None):
+        self._now = start or datetime(2025, 1, 1, 9, 0, 0)
+        self._monotonic = 0.0
+        self.sleeps = []  # Every sleep requested, in order
+
+    def now(self) -> datetime:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._monotonic
+
+    def sleep(self, seconds: float):
+        if seconds <= 0:
+            return
+        self.sleeps.append(seconds)
+        self.advance(seconds)
+
+    def advance(self, seconds: float):
+        """Move virtual time forward without recording a sleep"""
+        self._now += timedelta(seconds=seconds)
+        self._monotonic += seconds
+
+    @property
+    def total_slept(self) -> float:
+        return sum(self.sleeps)
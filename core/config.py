@@ -1,11 +1,43 @@
 # Configuration variables for search_agent
+import os
+
 USAGE_FILE = "api_usage.json"
-DATABASE_FILE = "scholarships.db"
+DATABASE_FILE = "cache/scholarships.db"  # Scholarships, custom sites and user profiles
+LEGACY_DATABASE_FILE = "scholarships.db"  # Former DatabaseManager store, imported once and renamed
+DATABASE_URL = os.getenv("DATABASE_URL")  # postgresql://... to share one PostgreSQL database across dynos
+POSTGRES_POOL_SIZE = 10  # Connections per process in the PostgreSQL pool
 MAX_FREE_USERS = 10
 SCRAPING_DELAY = 2  # Base delay between requests
 MIN_DELAY = 1  # Minimum delay between requests
 MAX_DELAY = 5  # Maximum delay for randomization
 RETRY_DELAY = 3  # Base delay for retries
+INGEST_CHUNK_SIZE = 500  # Rows written per transaction by bulk ingestion
+SEED_CORPUS_FILES = ("seed_corpus.parquet", "seed_corpus.jsonl")  # Snapshot next to the database, loaded into an empty one
+QUERY_CACHE_SIZE = 256  # Distinct searches kept in the in-process result cache
+QUERY_CACHE_TTL = 300  # Seconds a cached search result may be served
+PINNED_RESULTS = 32  # Ranked-search candidate windows kept across writes for the page cursors reading them
+WRITE_BEHIND_ENABLED = True  # Apply cache writes on one writer thread per process, batched, instead of on the caller's
+WRITE_QUEUE_MAX_JOBS = 256  # Queued writes the writer applies (and publishes) as one batch at most
+WRITE_QUEUE_IDLE_SECONDS = 30  # Idle seconds before the writer thread exits (it restarts on the next write)
+WRITE_IN_FLIGHT_CHUNKS = 4  # Ingest chunks one add_scholarships call keeps queued before waiting
+RANKING_CANDIDATES = 500  # Rows a ranked search scores (in SQL order) before paging through them
+# Weight of each ranking signal (core.ranking.RANK_SIGNALS); each signal is scaled to 0..1
+RANKING_WEIGHTS = {'relevance': 3.0, 'priority': 1.0, 'geography': 2.0, 'deadline': 1.0, 'amount': 0.5,
+                   'reliability': 0.5, 'freshness': 0.5}
+SEMANTIC_DIMENSIONS = 128  # Latent topics of a semantic vector (core.semantic); a refit re-embeds every row
+SEMANTIC_VOCABULARY = 4096  # Most common corpus terms the semantic model knows
+SEMANTIC_FIT_ROWS = 20000  # The semantic model is refitted as the corpus doubles, until it was fitted on this many rows
+SEMANTIC_CANDIDATES = 200  # Nearest neighbours a semantic search blends with the keyword matches
+SEMANTIC_PROBES = 12  # Nearest-neighbour index lists scanned per query
+SEMANTIC_WEIGHT = 1.0  # Weight of a row's semantic rank against its keyword rank in the blended relevance
+FUZZY_SIMILARITY = 0.3  # Trigram similarity (core.fuzzy) a search word that matches nothing needs to its correction
+FUZZY_CANDIDATES = 5  # Most similar vocabulary words checked against the corpus per misspelled search word
+MAINTENANCE_INTERVAL = 900  # Seconds between scheduled archive/vacuum passes (shared by all processes)
+MAINTENANCE_BATCH_SIZE = 200  # Rows archived per short maintenance transaction
+MAINTENANCE_MAX_BATCHES = 10  # Batches per rule in one scheduled pass, so a pass stays bounded
+EXPIRE_AFTER_DAYS = 21  # Archive scholarships no crawl has verified for this long
+DEADLINE_GRACE_DAYS = 7  # Archive scholarships whose deadline passed this long ago
+VACUUM_PAGES = 256  # Free pages released per incremental vacuum
 
 # Rotating User Agents to avoid bot detection (Updated to latest versions)
 USER_AGENTS = [
@@ -0,0 +1,114 @@
+"""
+Scholarship corpus snapshots in JSONL and Parquet
+Streams the active corpus out of a cache and back into another one, so a
+deployment can start from a warm snapshot instead of crawling from empty.
+
+Usage: python -m core.corpus export snapshot.parquet [--db cache/scholarships.db]
+       python -m core.corpus import snapshot.jsonl [--db cache/scholarships.db]
+       python -m core.corpus import snapshot.parquet --db postgresql://user@host/scholarships
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Dict, Iterable, Iterator
+
+from .batching import chunked
+
+# What a snapshot stores per scholarship: the add_scholarships input fields.
+# Derived columns (deadline, amount, geography, clusters) are rebuilt on import.
+CORPUS_FIELDS = ('title', 'description', 'amount', 'deadline', 'category', 'source',
+                 'country', 'keywords', 'goal_type', 'priority')
+CORPUS_BATCH_SIZE = 5000  # Records per Parquet row group / read batch
+FORMATS = {'.jsonl': 'jsonl', '.parquet': 'parquet'}
+
+
+def corpus_format(path: str) -> str:
+    """'jsonl' or 'parquet' from the file extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unknown corpus format {extension!r}: use .jsonl or .parquet")
+    return FORMATS[extension]
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise ImportError("Parquet snapshots need pyarrow (pip install pyarrow); JSONL works without it")
+
+
+def _parquet_schema(pa):
+    return pa.schema([(field, pa.int64() if field == 'priority' else pa.string()) for field in CORPUS_FIELDS])
+
+
+def write_corpus(records: Iterable[Dict], path: str, batch_size: int = CORPUS_BATCH_SIZE) -> int:
+    """Write records (any iterable, consumed lazily) to path; returns how many were written"""
+    written = 0
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if corpus_format(path) == 'jsonl':
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps({field: record.get(field) for field in CORPUS_FIELDS}, ensure_ascii=False))
+                f.write('\n')
+                written += 1
+        return written
+
+    pa = _pyarrow()
+    schema = _parquet_schema(pa)
+    with pa.parquet.ParquetWriter(path, schema, compression='zstd') as writer:
+        for batch in chunked(records, batch_size):
+            columns = {field: [record.get(field) for record in batch] for field in CORPUS_FIELDS}
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+            written += len(batch)
+    return written
+
+
+def read_corpus(path: str, batch_size: int = CORPUS_BATCH_SIZE) -> Iterator[Dict]:
+    """Yield the records of a snapshot one at a time, reading batch_size rows at most at once"""
+    if corpus_format(path) == 'jsonl':
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        return
+
+    pa = _pyarrow()
+    for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+def export_corpus(cache, path: str) -> int:
+    """Stream the cache's active scholarships to path; returns how many were written"""
+    return write_corpus(cache.iter_scholarships(CORPUS_FIELDS), path)
+
+
+def import_corpus(cache, path: str) -> Dict[str, int]:
+    """Bulk-load a snapshot into the cache (indexes built after the load); returns upsert counts"""
+    return cache.bulk_load(read_corpus(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['export', 'import'])
+    parser.add_argument('path', help="Snapshot file (.jsonl or .parquet)")
+    parser.add_argument('--db', default=None,
+                        help="SQLite file or postgresql:// URL (default: the app's, see DATABASE_URL)")
+    args = parser.parse_args(argv)
+
+    from .config import DATABASE_URL
+    from .storage import open_storage
+    cache, _ = open_storage(args.db or DATABASE_URL)
+    if args.command == 'export':
+        print(f"📤 Exported {export_corpus(cache, args.path)} scholarships to {args.path}")
+    else:
+        counts = import_corpus(cache, args.path)
+        print(f"📥 Imported {args.path}: {counts['inserted']} new, {counts['updated']} updated, "
+              f"{counts['unchanged']} unchanged")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
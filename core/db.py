@@ -1,174 +1,172 @@
+import os
 import sqlite3
 import json
 from datetime import datetime
-from .config import DATABASE_FILE
+from .config import DATABASE_FILE, INGEST_CHUNK_SIZE
+from .scholarship_cache import ScholarshipCache
+
+# Columns of the former standalone scholarships table, as get_scholarships still returns them
+LEGACY_COLUMNS = ['id', 'title', 'description', 'deadline', 'amount', 'source', 'category',
+                  'target_audience', 'scraped_at']
+
 
 class DatabaseManager:
-    """Manages scholarship database"""
-    def __init__(self, db_file=DATABASE_FILE):
-        self.db_file = db_file
-        self.init_database()
-
-    def init_database(self):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scholarships (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                deadline TEXT,
-                amount TEXT,
-                source TEXT,
-                category TEXT,
-                target_audience TEXT,
-                scraped_at DATETIME,
-                UNIQUE(title, source)
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS custom_sites (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                url TEXT UNIQUE,
-                added_by TEXT,
-                added_at DATETIME,
-                last_scraped DATETIME,
-                status TEXT,
-                is_public INTEGER DEFAULT 0,
-                popularity INTEGER DEFAULT 0
-            )
-        ''')
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_profiles (
-                user_id TEXT PRIMARY KEY,
-                profile_data TEXT,
-                created_at DATETIME,
-                updated_at DATETIME
-            )
-        ''')
-        conn.commit()
-        conn.close()
-
-    def add_scholarships(self, scholarships):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        added_count = 0
-        for scholarship in scholarships:
-            try:
-                cursor.execute('''
-                    INSERT OR REPLACE INTO scholarships 
-                    (title, description, deadline, amount, source, category, target_audience, scraped_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    scholarship.get('title', ''),
-                    scholarship.get('description', ''),
-                    scholarship.get('deadline', ''),
-                    scholarship.get('amount', ''),
-                    scholarship.get('source', ''),
-                    scholarship.get('category', ''),
-                    scholarship.get('target_audience', ''),
-                    scholarship.get('scraped_at', datetime.now().isoformat())
-                ))
-                added_count += 1
-            except sqlite3.IntegrityError:
-                pass
-        conn.commit()
-        conn.close()
-        return added_count
+    """Manages custom sites and user profiles; scholarships go through ScholarshipCache
+
+    Everything lives in the ScholarshipCache database and uses its connection
+    pool; writes go through its write queue. Pass the app's cache so both
+    share one instance.
+    """
+    def __init__(self, db_file=DATABASE_FILE, cache=None, legacy_file=None):
+        self.cache = cache or ScholarshipCache(db_file)
+        self.db_file = self.cache.db_file
+        if legacy_file and os.path.exists(legacy_file):
+            self.import_legacy_database(legacy_file)
+
+    def _connection(self):
+        return self.cache.pool.connection()
+
+    def import_legacy_database(self, legacy_file):
+        """Copy scholarships, custom sites and profiles from the old standalone database, once
+
+        Scholarships go through the cache's upsert (target_audience becomes
+        goal_type); existing sites and profiles win over legacy ones. The file
+        is then renamed to <name>.migrated, which keeps it as a backup and
+        stops the import from running again. Returns the scholarship counts.
+        """
+        legacy = sqlite3.connect(legacy_file)
+        try:
+            tables = {row[0] for row in legacy.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+            if 'scholarships' in tables:
+                rows = legacy.execute('''
+                    SELECT title, description, deadline, amount, source, category, target_audience
+                    FROM scholarships
+                ''')
+                counts = self.add_scholarships(dict(zip(LEGACY_COLUMNS[1:8], row)) for row in rows)
+            # Read here: the legacy connection belongs to this thread, not the writer's
+            sites = legacy.execute('''
+                SELECT url, added_by, added_at, last_scraped, status, is_public, popularity FROM custom_sites
+            ''').fetchall() if 'custom_sites' in tables else []
+            profiles = legacy.execute(
+                "SELECT user_id, profile_data, created_at, updated_at FROM user_profiles"
+            ).fetchall() if 'user_profiles' in tables else []
+            self._import_users(sites, profiles)
+        finally:
+            legacy.close()
+        os.replace(legacy_file, legacy_file + ".migrated")
+        print(f"📦 Imported {legacy_file}: {counts['inserted']} new scholarships")
+        return counts
+
+    def _import_users(self, sites, profiles):
+        """Insert legacy custom_sites and user_profiles rows, keeping existing ones"""
+        def import_users(conn):
+            with conn:
+                conn.executemany('''
+                    INSERT OR IGNORE INTO custom_sites
+                    (url, added_by, added_at, last_scraped, status, is_public, popularity)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', sites)
+                conn.executemany('''
+                    INSERT OR IGNORE INTO user_profiles (user_id, profile_data, created_at, updated_at)
+                    VALUES (?, ?, ?, ?)
+                ''', profiles)
+
+        self.cache.writes.run(import_users, publish=None)
+
+    def add_scholarships(self, scholarships, chunk_size=INGEST_CHUNK_SIZE):
+        """Upsert scraped scholarships into the shared cache (see ScholarshipCache.add_scholarships)
+
+        Accepts scrape_site() dicts: target_audience fills in a missing
+        goal_type and empty strings count as missing. Returns counts of
+        inserted, updated and unchanged rows.
+        """
+        def normalized(scholarship):
+            row = {key: value for key, value in scholarship.items() if value != ''}
+            row.setdefault('goal_type', row.get('target_audience'))
+            return row
+
+        return self.cache.add_scholarships((normalized(s) for s in scholarships), chunk_size=chunk_size)
 
     def get_scholarships(self, goal=None, keywords=None, limit=50):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        query = "SELECT * FROM scholarships WHERE 1=1"
-        params = []
-        if goal and goal != "all":
-            query += " AND (target_audience LIKE ? OR category LIKE ?)"
-            params.extend([f"%{goal}%", f"%{goal}%"])
-        if keywords:
-            for keyword in keywords:
-                query += " AND (title LIKE ? OR description LIKE ?)"
-                params.extend([f"%{keyword}%", f"%{keyword}%"])
-        query += " ORDER BY scraped_at DESC LIMIT ?"
-        params.append(limit)
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        conn.close()
-        columns = ['id', 'title', 'description', 'deadline', 'amount', 'source', 'category', 'target_audience', 'scraped_at']
-        return [dict(zip(columns, row)) for row in results]
+        """Search the shared cache; rows keep the former table's column names"""
+        rows = self.cache.search_scholarships(goal=None if goal == "all" else goal, keywords=keywords, limit=limit)
+        return [dict(zip(LEGACY_COLUMNS, (
+            row['id'], row['title'], row['description'], row['deadline'], row['amount'], row['source'],
+            row['category'], row['goal_type'], row['last_verified']
+        ))) for row in rows]
 
     def add_custom_site(self, url, user_id, is_public=False):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        return self.cache.writes.run(lambda conn: self._add_custom_site(conn, url, user_id, is_public),
+                                     publish=None)
+
+    @staticmethod
+    def _add_custom_site(conn, url, user_id, is_public):
         try:
-            cursor.execute('''
-                INSERT INTO custom_sites (url, added_by, added_at, status, is_public, popularity)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (url, user_id, datetime.now().isoformat(), 'active', int(is_public), 1))
-            conn.commit()
-            conn.close()
+            with conn:
+                conn.execute('''
+                    INSERT INTO custom_sites (url, added_by, added_at, status, is_public, popularity)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (url, user_id, datetime.now().isoformat(), 'active', int(is_public), 1))
             return True
         except sqlite3.IntegrityError:
-            cursor.execute('''
-                UPDATE custom_sites SET popularity = popularity + 1
-                WHERE url = ?
-            ''', (url,))
-            conn.commit()
-            conn.close()
+            with conn:
+                conn.execute('''
+                    UPDATE custom_sites SET popularity = popularity + 1
+                    WHERE url = ?
+                ''', (url,))
             return False
 
     def get_custom_sites(self, user_id=None, include_public=True):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
         if user_id and include_public:
             cursor.execute('''
-                SELECT url, popularity FROM custom_sites 
+                SELECT url, popularity FROM custom_sites
                 WHERE (added_by = ? OR is_public = 1) AND status = 'active'
                 ORDER BY popularity DESC
             ''', (user_id,))
         elif user_id:
             cursor.execute('''
-                SELECT url, popularity FROM custom_sites 
+                SELECT url, popularity FROM custom_sites
                 WHERE added_by = ? AND status = 'active'
                 ORDER BY popularity DESC
             ''', (user_id,))
         else:
             cursor.execute('''
-                SELECT url, popularity FROM custom_sites 
+                SELECT url, popularity FROM custom_sites
                 WHERE is_public = 1 AND status = 'active'
                 ORDER BY popularity DESC
             ''')
-        results = [{'url': row[0], 'popularity': row[1]} for row in cursor.fetchall()]
-        conn.close()
-        return results
+        return [{'url': row[0], 'popularity': row[1]} for row in cursor.fetchall()]
+
+    def get_popular_custom_sites(self, limit=3):
+        """Most popular public custom sites, for background scraping"""
+        return self.get_custom_sites()[:limit]
 
     def get_user_custom_urls(self, user_id):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
         cursor.execute('''
-            SELECT url, popularity FROM custom_sites 
+            SELECT url, popularity FROM custom_sites
             WHERE added_by = ? AND status = 'active'
             ORDER BY added_at DESC
         ''', (user_id,))
-        results = [{'url': row[0], 'popularity': row[1]} for row in cursor.fetchall()]
-        conn.close()
-        return results
+        return [{'url': row[0], 'popularity': row[1]} for row in cursor.fetchall()]
 
     def save_user_profile(self, user_id, profile_data):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT OR REPLACE INTO user_profiles (user_id, profile_data, created_at, updated_at)
-            VALUES (?, ?, COALESCE((SELECT created_at FROM user_profiles WHERE user_id = ?), ?), ?)
-        ''', (user_id, json.dumps(profile_data), user_id, datetime.now().isoformat(), datetime.now().isoformat()))
-        conn.commit()
-        conn.close()
+        self.cache.writes.run(lambda conn: self._save_user_profile(conn, user_id, profile_data), publish=None)
+
+    @staticmethod
+    def _save_user_profile(conn, user_id, profile_data):
+        with conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO user_profiles (user_id, profile_data, created_at, updated_at)
+                VALUES (?, ?, COALESCE((SELECT created_at FROM user_profiles WHERE user_id = ?), ?), ?)
+            ''', (user_id, json.dumps(profile_data), user_id, datetime.now().isoformat(), datetime.now().isoformat()))
 
     def get_user_profile(self, user_id):
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        cursor = self._connection().cursor()
         cursor.execute('SELECT profile_data FROM user_profiles WHERE user_id = ?', (user_id,))
         result = cursor.fetchone()
-        conn.close()
         if result:
             return json.loads(result[0])
         return {}
@@ -0,0 +1,90 @@
+"""
+Deadline normalization for scraped scholarships
+Turns free-text deadlines into an ISO date plus a kind: fixed, rolling or unknown
+"""
+
+import calendar
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Optional, Tuple
+
+DEADLINE_FIXED = 'fixed'
+DEADLINE_ROLLING = 'rolling'
+DEADLINE_UNKNOWN = 'unknown'
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+_MONTH = r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?'
+_DAY = r'(\d{1,2})(?:st|nd|rd|th)?(?!\d)'
+_YEAR = r'(\d{4})\b'
+
+# (pattern, order of the captured groups), most specific first: a later
+# pattern never matches text an earlier one already consumed
+_DATE_PATTERNS = [
+    (re.compile(r'\b' + _YEAR + r'-(\d{1,2})-(\d{1,2})\b'), 'ymd'),
+    (re.compile(r'\b(\d{1,2})[/.](\d{1,2})[/.]' + _YEAR), 'numeric'),
+    (re.compile(r'\b' + _DAY + r'\s+(?:of\s+)?' + _MONTH + r'(?:\s*,?\s*' + _YEAR + r')?'), 'dmy'),
+    (re.compile(r'\b' + _MONTH + r'\s+' + _DAY + r'(?:\s*,?\s*' + _YEAR + r')?'), 'mdy'),
+    (re.compile(r'\b' + _MONTH + r'\s*,?\s*' + _YEAR), 'my'),  # "May 2026": end of that month
+]
+_ROLLING = re.compile(
+    r'\b(rolling|ongoing|open all year|year[- ]round|all year|any ?time|continuous|'
+    r'monthly|quarterly|no deadline|open until filled)\b'
+)
+
+
+def parse_deadline(text: str, today: date = None) -> Tuple[Optional[str], str]:
+    """(ISO date or None, kind) for a free-text deadline
+
+    "March 15, 2025" -> ("2025-03-15", "fixed"); "Rolling applications" ->
+    (None, "rolling"); "Check website" -> (None, "unknown"). A date without a
+    year is its next occurrence on or after today. When several dates are
+    given (opening and closing), the latest one is the deadline.
+    """
+    return _parse_deadline(text or '', today or date.today())
+
+
+@lru_cache(maxsize=4096)  # Scraped deadlines repeat a lot ("Check website", seasonal dates)
+def _parse_deadline(text: str, today: date) -> Tuple[Optional[str], str]:
+    lowered = text.lower()
+    dates, consumed = [], []
+    for pattern, order in _DATE_PATTERNS:
+        for match in pattern.finditer(lowered):
+            start, end = match.span()
+            if any(start < taken_end and taken_start < end for taken_start, taken_end in consumed):
+                continue
+            consumed.append((start, end))
+            found = _to_date(match.groups(), order, today)
+            if found:
+                dates.append(found)
+    if dates:
+        return max(dates).isoformat(), DEADLINE_FIXED
+    if _ROLLING.search(lowered):
+        return None, DEADLINE_ROLLING
+    return None, DEADLINE_UNKNOWN
+
+
+def _to_date(groups, order: str, today: date) -> Optional[date]:
+    if order == 'ymd':
+        year, month, day = (int(value) for value in groups)
+    elif order == 'my':
+        month, year = _MONTHS[groups[0][:3]], int(groups[1])
+        day = calendar.monthrange(year, month)[1]
+    elif order == 'numeric':
+        first, second, year = (int(value) for value in groups)
+        # Day-first (the convention on most African and UK sites) unless impossible
+        day, month = (second, first) if second > 12 >= first else (first, second)
+    else:
+        month_name, day, year = groups if order == 'mdy' else (groups[1], groups[0], groups[2])
+        month, day = _MONTHS[month_name[:3]], int(day)
+        year = int(year) if year else None
+    try:
+        if year is None:
+            candidate = date(today.year, month, day)
+            return candidate if candidate >= today else date(today.year + 1, month, day)
+        return date(year, month, day)
+    except ValueError:
+        return None
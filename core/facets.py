@@ -0,0 +1,101 @@
+"""
+Facet counts for search results
+Labels every row of a result set by category, goal, geography, deadline month,
+amount band and source in whole-array NumPy passes, and counts each facet's
+values, so a results view can show and drill into all of them at once
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .geography import INTERNATIONAL, canonical_place
+from .ranking import host_of
+
+FACETS = ('category', 'goal', 'geography', 'deadline_month', 'amount_band', 'source')
+# Upper bound (USD, exclusive) and label of each amount band, smallest first
+AMOUNT_BANDS = ((1_000, 'Under $1k'), (5_000, '$1k-5k'), (20_000, '$5k-20k'), (50_000, '$20k-50k'),
+                (np.inf, '$50k+'))
+FULL_FUNDING = 'Full funding'
+# Label of rows without a value, per facet
+MISSING = {'category': 'General', 'goal': 'Any', 'geography': INTERNATIONAL,
+           'deadline_month': 'Rolling or unknown', 'amount_band': 'Not specified', 'source': 'Unknown'}
+# Facets listed in their values' natural order rather than most common first
+_ORDERED = {'deadline_month': None,
+            'amount_band': [label for _, label in AMOUNT_BANDS] + [FULL_FUNDING, MISSING['amount_band']]}
+
+
+def _labels(values: Sequence, missing: str) -> np.ndarray:
+    labels = np.array(values, dtype=object)
+    labels[np.equal(labels, None) | np.equal(labels, '')] = missing
+    return labels.astype(str)
+
+
+def facet_labels(category: Sequence, goal_type: Sequence, place: Sequence, deadline_date: Sequence,
+                 amount_usd: Sequence, full_funding: Sequence, source: Sequence) -> Dict[str, np.ndarray]:
+    """Each facet's label for every row, from the rows' columns (equal-length sequences)
+
+    place is the geography node name (geography.name); deadline_date ISO
+    dates; amount_usd the upper amount in USD. Missing values get the
+    facet's MISSING label.
+    """
+    months = np.array(deadline_date, dtype='datetime64[D]').astype('datetime64[M]')  # None -> NaT
+    month_labels = np.datetime_as_string(months, unit='M').astype(object)
+    month_labels[np.isnat(months)] = MISSING['deadline_month']
+
+    amounts = np.array(amount_usd, dtype=float)  # None -> NaN
+    bands = np.array([label for _, label in AMOUNT_BANDS], dtype=object)[
+        np.searchsorted([bound for bound, _ in AMOUNT_BANDS], np.nan_to_num(amounts), side='right')
+        .clip(0, len(AMOUNT_BANDS) - 1)]
+    bands[np.isnan(amounts)] = MISSING['amount_band']
+    bands[np.nan_to_num(np.array(full_funding, dtype=float)) > 0] = FULL_FUNDING
+
+    return {
+        'category': _labels(category, MISSING['category']),
+        'goal': _labels(goal_type, MISSING['goal']),
+        'geography': _labels(place, MISSING['geography']),
+        'deadline_month': month_labels.astype(str),
+        'amount_band': bands.astype(str),
+        'source': _labels([host_of(url) for url in source], MISSING['source']),
+    }
+
+
+def result_labels(results: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """facet_labels of search results as the UI holds them (EnhancedScholarshipScraper._format_cached rows)"""
+    columns = {column: [result.get(column) for result in results]
+               for column in ('category', 'goal_type', 'country', 'deadline_date', 'amount_usd', 'full_funding',
+                              'source')}
+    return facet_labels(columns['category'], columns['goal_type'],
+                        [canonical_place(country) if country else None for country in columns['country']],
+                        columns['deadline_date'], columns['amount_usd'], columns['full_funding'],
+                        columns['source'])
+
+
+def count_facets(labels: Dict[str, np.ndarray]) -> Dict[str, List[Tuple[str, int]]]:
+    """Each facet's (label, rows) pairs: most common first, or in natural order for months and amount bands"""
+    counts = {}
+    for facet, values in labels.items():
+        names, totals = np.unique(values, return_counts=True)  # Sorted by label
+        pairs = [(str(name), int(total)) for name, total in zip(names, totals)]
+        if facet not in _ORDERED:
+            pairs.sort(key=lambda pair: -pair[1])  # Stable: equal counts stay alphabetical
+        elif _ORDERED[facet] is not None:
+            order = {label: index for index, label in enumerate(_ORDERED[facet])}
+            pairs.sort(key=lambda pair: order[pair[0]])
+        counts[facet] = pairs
+    return counts
+
+
+def drill_down(labels: Dict[str, np.ndarray], selected: Dict[str, Sequence[str]]) -> np.ndarray:
+    """Boolean mask of the rows whose labels are among the selected values of every facet with a selection"""
+    size = len(next(iter(labels.values()))) if labels else 0
+    mask = np.ones(size, dtype=bool)
+    for facet, values in (selected or {}).items():
+        if values:
+            mask &= np.isin(labels[facet], list(values))
+    return mask
+
+
+def facet_total(counts: Optional[Dict[str, List[Tuple[str, int]]]]) -> int:
+    """Rows the counts were taken over"""
+    return sum(total for _, total in counts['category']) if counts else 0
@@ -0,0 +1,105 @@
+"""
+Typo-tolerant search
+Trigram similarity, as PostgreSQL's pg_trgm measures it, between the words of a
+query and the search vocabulary (the accent-free words of scholarship titles,
+keywords and place names). The stores keep the vocabulary and each word's
+trigrams in tables, so a query word that matches nothing ("scholaship") finds
+its likely spelling ("scholarship") through a few index range scans.
+"""
+
+import math
+import re
+import unicodedata
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+from .config import FUZZY_CANDIDATES, FUZZY_SIMILARITY
+from .geography import canonical_place
+
+_WORD = re.compile(r'[a-z][a-z0-9]{2,}')  # 3+ characters, starting with a letter
+
+# (vocabulary word, trigrams shared with the query word, the word's trigram count, its frequency)
+Candidate = Tuple[str, int, int, int]
+
+
+def fold(text: Optional[str]) -> str:
+    """Lowercase, accent-free text ("Université" -> "universite")"""
+    text = unicodedata.normalize('NFKD', text or '')
+    return text.encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def vocabulary_words(title: Optional[str], keywords: Optional[str], country: Optional[str]) -> Set[str]:
+    """Words one scholarship adds to the search vocabulary: its title, keywords and canonical place name"""
+    place = canonical_place(country) if country else None
+    text = fold(' '.join(filter(None, (title, keywords, place))))
+    return set(_WORD.findall(text))
+
+
+def trigrams(word: str) -> Set[str]:
+    """The word's trigrams, padded with two spaces in front and one behind ("  s", " sc", ..., "ip ")"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(first: str, second: str) -> float:
+    """Trigrams the words share over the trigrams of either (0..1, as pg_trgm's similarity())"""
+    a, b = trigrams(first), trigrams(second)
+    return len(a & b) / len(a | b)
+
+
+def lookup_bounds(word: str, threshold: float = FUZZY_SIMILARITY) -> Tuple[List[str], int, int, int]:
+    """(trigrams, fewest and most trigrams a vocabulary word may have, fewest it must share) to be threshold-similar
+
+    Similarity is at most the ratio of the two words' trigram counts and
+    needs at least threshold times the query word's trigrams shared, so the
+    vocabulary lookup can skip every word outside these bounds.
+    """
+    grams = sorted(trigrams(word))
+    count = len(grams)
+    fewest = math.ceil(count * threshold - 1e-9)
+    return grams, fewest, math.floor(count / threshold + 1e-9), fewest
+
+
+def correct_word(word: str, is_known: Callable[[str], bool], lookup: Callable[[str], Iterable[Candidate]],
+                 threshold: float = FUZZY_SIMILARITY) -> str:
+    """The vocabulary word a query word that matches nothing was meant to be, or the word itself
+
+    is_known(word) tells whether searching for the word finds anything;
+    lookup(word) yields the vocabulary words sharing trigrams with it. Of the
+    words at least threshold-similar, the most similar (then most frequent)
+    FUZZY_CANDIDATES are tried in turn, and the first that finds something
+    wins, so words only removed rows had are never suggested.
+    """
+    if not _WORD.fullmatch(word) or is_known(word):
+        return word
+    count = len(trigrams(word))
+    scored = []
+    for term, shared, term_count, frequency in lookup(word):
+        score = shared / (count + term_count - shared)
+        if score >= threshold and term != word:
+            scored.append((-score, -frequency, term))
+    for _, _, term in sorted(scored)[:FUZZY_CANDIDATES]:
+        if is_known(term):
+            return term
+    return word
+
+
+def correct_keywords(keywords: Iterable[str], is_known: Callable[[str], bool],
+                     lookup: Callable[[str], Iterable[Candidate]]) -> Optional[List[str]]:
+    """The keywords with each word that matches nothing corrected (correct_word), or None if none was
+
+    A corrected keyword is its words, accent-free and lowercase; quoted
+    (exact-phrase) keywords stay quoted. Other keywords are kept as given.
+    """
+    corrected, changed = [], False
+    for keyword in keywords or []:
+        stripped = (keyword or '').strip()
+        exact = len(stripped) > 1 and stripped[0] == stripped[-1] == '"'
+        words = re.findall(r'\w+', fold(stripped))
+        replaced = [correct_word(word, is_known, lookup) for word in words]
+        if replaced == words:
+            corrected.append(keyword)
+            continue
+        changed = True
+        phrase = ' '.join(replaced)
+        corrected.append(f'"{phrase}"' if exact else phrase)
+    return corrected if changed else None
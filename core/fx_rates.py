@@ -0,0 +1,36 @@
+"""
+Offline exchange rates used to compare scholarship amounts in USD
+Edit the rates and bump FX_VERSION together: stored USD values are recomputed
+for every row whose fx_version differs on the next database open
+"""
+
+FX_VERSION = "2026-10"
+
+# USD per unit of each currency (approximate mid-market rates)
+USD_PER_UNIT = {
+    'USD': 1.0,
+    'EUR': 1.08,
+    'GBP': 1.27,
+    'CAD': 0.73,
+    'AUD': 0.66,
+    'CHF': 1.13,
+    'JPY': 0.0067,
+    'CNY': 0.14,
+    'INR': 0.012,
+    'UGX': 0.00027,
+    'KES': 0.0077,
+    'TZS': 0.00038,
+    'RWF': 0.00071,
+    'NGN': 0.00065,
+    'GHS': 0.066,
+    'ZAR': 0.055,
+    'EGP': 0.021,
+}
+
+
+def to_usd(value, currency):
+    """value converted with the offline table, or None when it cannot be"""
+    rate = USD_PER_UNIT.get(currency)
+    if value is None or rate is None:
+        return None
+    return round(value * rate, 2)
@@ -0,0 +1,73 @@
+"""
+Geography hierarchy for country-aware search
+Country -> region -> continent -> International for every COUNTRY_CONFIG country
+(UN M49 regions), stored in the geography table by ScholarshipCache
+"""
+
+from typing import Iterator, Optional, Tuple
+
+from .country_config import COUNTRY_CONFIG
+
+INTERNATIONAL = 'International'
+
+LEVEL_INTERNATIONAL = 'international'
+LEVEL_CONTINENT = 'continent'
+LEVEL_REGION = 'region'
+LEVEL_COUNTRY = 'country'
+LEVEL_PLACE = 'place'  # Any other location a scraper reports, filed under International
+
+REGION_CONTINENTS = {
+    'Eastern Africa': 'Africa', 'Western Africa': 'Africa', 'Southern Africa': 'Africa',
+    'Northern Africa': 'Africa',
+    'Northern America': 'Americas', 'Central America': 'Americas', 'South America': 'Americas',
+    'Eastern Asia': 'Asia', 'Southern Asia': 'Asia', 'South-eastern Asia': 'Asia', 'Western Asia': 'Asia',
+    'Northern Europe': 'Europe', 'Western Europe': 'Europe',
+    'Australia and New Zealand': 'Oceania',
+}
+
+COUNTRY_REGIONS = {
+    'Uganda': 'Eastern Africa', 'Kenya': 'Eastern Africa', 'Tanzania': 'Eastern Africa',
+    'Rwanda': 'Eastern Africa', 'Ethiopia': 'Eastern Africa', 'Zambia': 'Eastern Africa',
+    'Zimbabwe': 'Eastern Africa',
+    'Nigeria': 'Western Africa', 'Ghana': 'Western Africa',
+    'South Africa': 'Southern Africa',
+    'Egypt': 'Northern Africa',
+    'United States': 'Northern America', 'Canada': 'Northern America',
+    'Mexico': 'Central America',
+    'Brazil': 'South America',
+    'China': 'Eastern Asia',
+    'India': 'Southern Asia', 'Bangladesh': 'Southern Asia', 'Pakistan': 'Southern Asia',
+    'Indonesia': 'South-eastern Asia', 'Philippines': 'South-eastern Asia', 'Vietnam': 'South-eastern Asia',
+    'Turkey': 'Western Asia',
+    'United Kingdom': 'Northern Europe',
+    'Germany': 'Western Europe', 'France': 'Western Europe',
+    'Australia': 'Australia and New Zealand',
+}
+
+# Spellings scrapers and the seed data use for the places above
+PLACE_ALIASES = {
+    'east africa': 'Eastern Africa', 'west africa': 'Western Africa', 'north africa': 'Northern Africa',
+    'usa': 'United States', 'us': 'United States', 'united states of america': 'United States',
+    'uk': 'United Kingdom', 'great britain': 'United Kingdom',
+    'global': INTERNATIONAL, 'worldwide': INTERNATIONAL,
+}
+
+
+def canonical_place(name: Optional[str]) -> Optional[str]:
+    """Hierarchy name for a stored country value (aliases resolved, whitespace trimmed)"""
+    if name is None or not name.strip():
+        return None
+    name = ' '.join(name.split())
+    return PLACE_ALIASES.get(name.lower(), name)
+
+
+def hierarchy() -> Iterator[Tuple[str, Optional[str], str]]:
+    """(name, parent name, level) for every node, parents before children"""
+    yield INTERNATIONAL, None, LEVEL_INTERNATIONAL
+    for continent in sorted(set(REGION_CONTINENTS.values())):
+        yield continent, INTERNATIONAL, LEVEL_CONTINENT
+    for region, continent in sorted(REGION_CONTINENTS.items()):
+        yield region, continent, LEVEL_REGION
+    for country in COUNTRY_CONFIG:
+        if country in COUNTRY_REGIONS:  # 'Other' is not a place
+            yield country, COUNTRY_REGIONS[country], LEVEL_COUNTRY
@@ -0,0 +1,190 @@
+"""
+Profile-to-scholarship eligibility matching
+Scholarships and user profiles are encoded as sparse hashed topic vectors;
+a profile is scored against the whole corpus in one sparse matrix-vector
+product, with its requirements applied as vectorized eligibility masks
+"""
+
+import math
+import re
+import zlib
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+FEATURE_BITS = 18  # Hashed topic space of 2**18 dimensions; changing it means re-encoding stored vectors
+FEATURE_DIMENSIONS = 1 << FEATURE_BITS
+# Weight of each scholarship field's terms, and of each profile field's
+SCHOLARSHIP_FIELD_WEIGHTS = (('title', 3.0), ('keywords', 2.0), ('category', 2.0), ('description', 1.0))
+PROFILE_FIELD_WEIGHTS = (('major', 2.0), ('field_of_study', 2.0), ('research_area', 2.0), ('market_focus', 2.0),
+                         ('medium', 2.0), ('impact_area', 2.0), ('interests', 1.0), ('skills', 1.0))
+GEOGRAPHY_WEIGHT = 0.25  # Added to the topic similarity, times the area match (1 for the profile's own country)
+GPA_SCALE = 4.0
+
+# Words every listing uses, which say nothing about who a scholarship is for
+STOPWORDS = frozenset('''
+    about after all also and any are available award awarded awards based been being can each eligible for from
+    fund funded funding grant grants has have into its may more must not offer offered offers one open other our
+    per program programme programs provide provides scholarship scholarships such than that the their them there
+    these they this through time under upon was were which who will with within year years your specified
+'''.split())
+_WORD = re.compile(r'[a-z][a-z0-9]{2,}')
+# "minimum GPA of 3.0", "CGPA 3.5/4.0", "GPA of at least 4.0 on a 5.0 scale", "3.2 GPA"
+_GPA_AFTER = re.compile(r'\b(?:c?gpa|grade point average)\b\D{0,25}?(\d(?:\.\d{1,2})?)'
+                        r'(?:\s*(?:/|out of|on an?)\s*(\d(?:\.\d{1,2})?))?', re.IGNORECASE)
+_GPA_BEFORE = re.compile(r'\b(\d\.\d{1,2})\s*(?:/\s*(\d(?:\.\d{1,2})?)\s*)?c?gpa\b', re.IGNORECASE)
+
+
+def _stem(word: str) -> str:
+    """Crude suffix folding, so "engineering" and "engineers" share a feature with "engineer" """
+    if len(word) > 5 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 6 and word.endswith('ing'):
+        return word[:-3]
+    if len(word) > 4 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def terms(text: Optional[str]) -> List[str]:
+    """Stemmed topic terms of a text, stopwords dropped"""
+    if not text:
+        return []
+    return [_stem(word) for word in _WORD.findall(text.lower()) if word not in STOPWORDS]
+
+
+def _hashed_vector(weighted_texts: Iterable[Tuple[Optional[str], float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(indices, values) of the L2-normalized hashed term vector: weight x (1 + log tf) per term"""
+    counts = Counter()
+    for text, weight in weighted_texts:
+        for term in terms(text):
+            counts[term] += weight
+    features = Counter()
+    for term, count in counts.items():
+        features[zlib.crc32(term.encode()) & (FEATURE_DIMENSIONS - 1)] += 1 + math.log(count)
+    indices = np.fromiter(features.keys(), dtype=np.uint32, count=len(features))
+    values = np.fromiter(features.values(), dtype=np.float32, count=len(features))
+    norm = np.linalg.norm(values)
+    return indices, values / norm if norm else values
+
+
+def parse_min_gpa(text: Optional[str]) -> Optional[float]:
+    """Minimum GPA a listing asks for, on the 4.0 scale (None when it names none)"""
+    if not text:
+        return None
+    for pattern in (_GPA_AFTER, _GPA_BEFORE):
+        match = pattern.search(text)
+        if match:
+            value, scale = float(match.group(1)), float(match.group(2) or 0)
+            if scale and value <= scale:
+                return round(value / scale * GPA_SCALE, 2)
+            if value <= GPA_SCALE:
+                return value
+    return None
+
+
+def encode_scholarship(scholarship: Dict) -> Tuple[bytes, Optional[float]]:
+    """(packed topic vector, minimum GPA) stored with a scholarship (see unpack_features)"""
+    indices, values = _hashed_vector((scholarship.get(field), weight) for field, weight in SCHOLARSHIP_FIELD_WEIGHTS)
+    text = ' '.join(scholarship.get(field) or '' for field in ('title', 'description', 'keywords'))
+    return indices.astype('<u4').tobytes() + values.astype('<f4').tobytes(), parse_min_gpa(text)
+
+
+def unpack_features(blob: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """(indices, values) of a vector packed by encode_scholarship"""
+    count = len(blob) // 8
+    return np.frombuffer(blob, '<u4', count), np.frombuffer(blob, '<f4', count, offset=count * 4)
+
+
+def encode_profile(profile: Dict) -> np.ndarray:
+    """Dense topic vector of a user profile, in the scholarships' feature space"""
+    def text(field):
+        value = profile.get(field)
+        if isinstance(value, (list, tuple)):
+            value = ' '.join(map(str, value))
+        return None if value is None or str(value).strip().lower() == 'not specified' else str(value)
+
+    indices, values = _hashed_vector((text(field), weight) for field, weight in PROFILE_FIELD_WEIGHTS)
+    vector = np.zeros(FEATURE_DIMENSIONS, dtype=np.float32)
+    vector[indices] = values
+    return vector
+
+
+class MatchIndex:
+    """The matchable corpus as a CSR feature matrix plus one array per requirement
+
+    Built once per published corpus (the stores cache it until the next
+    write); matching a profile is then a handful of whole-array operations.
+    """
+
+    def __init__(self, rows: Sequence[Tuple]):
+        """rows: (id, match_features, min_gpa, goal_type, geography_id, deadline_date) per scholarship"""
+        count = len(rows)
+        self.ids = np.array([row[0] for row in rows], dtype=np.int64)
+        vectors = [unpack_features(row[1]) if row[1] else (np.zeros(0, '<u4'), np.zeros(0, '<f4'))
+                   for row in rows]
+        lengths = np.array([len(indices) for indices, _ in vectors], dtype=np.int64)
+        self.indices = np.concatenate([indices for indices, _ in vectors]) if count else np.zeros(0, np.uint32)
+        self.values = np.concatenate([values for _, values in vectors]) if count else np.zeros(0, np.float32)
+        self.row_of = np.repeat(np.arange(count), lengths)  # Row of each stored feature
+        self.min_gpa = np.array([row[2] for row in rows], dtype=float).reshape(count)  # None -> nan
+        self.goal_codes = {'': 0}  # goal_type -> its code in self.goals; 0 is no goal
+        self.goals = np.array([self.goal_codes.setdefault(row[3] or '', len(self.goal_codes)) for row in rows],
+                              dtype=np.int32).reshape(count)
+        self.geography_ids = np.nan_to_num(
+            np.array([row[4] for row in rows], dtype=float).reshape(count), nan=-1).astype(np.int64)
+        self.deadlines = np.array([row[5] for row in rows], dtype='datetime64[D]').reshape(count)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def similarities(self, profile_vector: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every scholarship to a profile vector (one sparse matrix-vector product)"""
+        products = self.values * profile_vector[self.indices]
+        return np.bincount(self.row_of, weights=products, minlength=len(self))
+
+    def eligible(self, goal: str = None, gpa: float = None, area_scores: Dict[int, float] = None,
+                 today: date = None) -> np.ndarray:
+        """Mask of scholarships a profile qualifies for: goal, GPA, place and an open deadline
+
+        Unstated requirements (no goal, GPA, geography or deadline on the
+        listing) never exclude anyone.
+        """
+        today = np.datetime64(today or date.today(), 'D')
+        mask = np.isnat(self.deadlines) | (self.deadlines >= today)
+        if goal:
+            mask &= (self.goals == self.goal_codes.get(goal, -1)) | (self.goals == 0)
+        if gpa is not None:
+            mask &= np.isnan(self.min_gpa) | (self.min_gpa <= gpa)
+        if area_scores is not None:
+            mask &= (self.geography_ids < 0) | np.isin(self.geography_ids, list(area_scores))
+        return mask
+
+    def best(self, profile: Dict, goal: str = None, area_scores: Dict[int, float] = None, limit: int = 20,
+             today: date = None) -> List[Tuple[int, float]]:
+        """(scholarship id, match score) of the best eligible matches for a profile, best first
+
+        The score is the topic similarity plus GEOGRAPHY_WEIGHT times how
+        closely the listing's place matches the profile's country. A profile
+        with topics only matches listings sharing at least one of them.
+        """
+        vector = encode_profile(profile)
+        similarity = self.similarities(vector)
+        gpa = profile.get('gpa_4_0')
+        mask = self.eligible(goal, float(gpa) if gpa else None, area_scores, today)
+        if vector.any():
+            mask &= similarity > 0
+        scores = similarity.copy()
+        if area_scores:
+            lookup = np.zeros(max(area_scores) + 2)  # Last slot: no geography
+            lookup[list(area_scores)] = list(area_scores.values())
+            ids = np.where((self.geography_ids < 0) | (self.geography_ids >= len(lookup)), len(lookup) - 1,
+                           self.geography_ids)
+            scores += GEOGRAPHY_WEIGHT * lookup[ids]
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(int(self.ids[index]), round(float(scores[index]), 4)) for index in candidates]
@@ -0,0 +1,31 @@
+"""
+Versioned schema migrations
+A database records the schema version it has reached in PRAGMA user_version,
+so opening an up-to-date database costs one pragma read instead of the DDL
+"""
+
+import sqlite3
+from typing import Callable, Sequence
+
+Migration = Callable[[sqlite3.Connection], None]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Version recorded in the database file (0 for a new or pre-versioned one)"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection, migrations: Sequence[Migration]) -> int:
+    """Run the migrations a database has not reached yet; returns the version it started at
+
+    migrations[i] brings the schema from version i to i + 1 and is recorded as
+    soon as it succeeds, so a failed run resumes at the failed step. Steps must
+    be idempotent: two processes opening the same old database may both run
+    one before either records it.
+    """
+    start = schema_version(conn)
+    for version in range(start, len(migrations)):
+        migrations[version](conn)
+        conn.commit()
+        conn.execute(f"PRAGMA user_version = {version + 1}")
+    return start
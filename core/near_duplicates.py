@@ -0,0 +1,149 @@
+"""
+Near-duplicate detection for scholarships with MinHash-LSH
+The same scholarship listed by several aggregators ends up in one cluster
+"""
+
+import hashlib
+import struct
+from typing import Dict, Iterable, List, Optional, Set
+
+from .normalize import canonical_title
+
+NUM_PERMUTATIONS = 32
+LSH_BANDS = 16                  # 16 bands x 2 rows: pairs with title similarity >= 0.5 almost always collide
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+TITLE_SHINGLE_SIZE = 3
+TITLE_THRESHOLD = 0.7           # Similar titles alone are enough ...
+TITLE_WITH_DESCRIPTION_THRESHOLD = 0.5  # ... or fairly similar titles plus similar descriptions
+DESCRIPTION_THRESHOLD = 0.5
+MAX_BUCKET_CANDIDATES = 8       # Newest members read per LSH bucket, so crowded buckets stay cheap
+MAX_CANDIDATES = 20             # Candidates compared per new row, most band hits first
+
+_MAX_HASH = (1 << 32) - 1
+_SIGNATURE = struct.Struct(f'>{NUM_PERMUTATIONS}I')
+
+
+def title_shingles(title: str) -> Set[str]:
+    """Character shingles of the canonical title (robust to small wording changes)"""
+    text = canonical_title(title)
+    if len(text) <= TITLE_SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + TITLE_SHINGLE_SIZE] for i in range(len(text) - TITLE_SHINGLE_SIZE + 1)}
+
+
+def description_tokens(description: str) -> Set[str]:
+    return set(canonical_title(description).split())
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash_signature(shingles: Iterable[str]) -> List[int]:
+    """MinHash signature (NUM_PERMUTATIONS 32-bit values) of a shingle set
+
+    One extendable-output hash per shingle yields an independent 32-bit hash
+    for every permutation at once; the signature is their column-wise minimum.
+    """
+    hashes = [_SIGNATURE.unpack(hashlib.shake_128(s.encode('utf-8')).digest(_SIGNATURE.size))
+              for s in shingles]
+    if not hashes:
+        return [_MAX_HASH] * NUM_PERMUTATIONS
+    return list(map(min, zip(*hashes)))
+
+
+def estimated_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERMUTATIONS
+
+
+def lsh_buckets(signature: List[int], numbers: Iterable[str] = ()) -> List[int]:
+    """One signed 64-bit bucket id per band (fits an SQLite INTEGER)
+
+    The title's numbers are hashed in as well: "Cohort 3" and "Cohort 4" can
+    never be duplicates, so they should not even meet as candidates.
+    """
+    salt = ' '.join(sorted(numbers)).encode('ascii')
+    buckets = []
+    for band in range(LSH_BANDS):
+        chunk = signature[band * LSH_ROWS:(band + 1) * LSH_ROWS]
+        digest = hashlib.blake2b(struct.pack(f'>{LSH_ROWS}I', *chunk) + salt, digest_size=8).digest()
+        buckets.append(int.from_bytes(digest, 'big', signed=True))
+    return buckets
+
+
+def pack_signature(signature: List[int]) -> bytes:
+    return _SIGNATURE.pack(*signature)
+
+
+def unpack_signature(blob: bytes) -> List[int]:
+    return list(_SIGNATURE.unpack(blob))
+
+
+def title_numbers(title: str) -> Set[str]:
+    """Numbers left in the canonical title ("Cohort 3") - years are already stripped"""
+    return {token for token in canonical_title(title).split() if token.isdigit()}
+
+
+def title_signature(title: str):
+    """(MinHash signature, LSH buckets) of a title"""
+    signature = minhash_signature(title_shingles(title))
+    return signature, lsh_buckets(signature, title_numbers(title))
+
+
+def is_near_duplicate(title_similarity: float, title_a: str, title_b: str,
+                      description_a: str, description_b: str) -> bool:
+    """Decide whether two scholarships are the same listing"""
+    if title_numbers(title_a) != title_numbers(title_b):
+        return False  # "Round 1" and "Round 2" are different calls
+    if title_similarity >= TITLE_THRESHOLD:
+        return True
+    if title_similarity >= TITLE_WITH_DESCRIPTION_THRESHOLD:
+        return jaccard(description_tokens(description_a),
+                       description_tokens(description_b)) >= DESCRIPTION_THRESHOLD
+    return False
+
+
+class MinHashLSH:
+    """In-memory LSH index for deduplicating result lists (no database needed)"""
+
+    def __init__(self):
+        self._buckets: Dict[tuple, List[int]] = {}
+        self._items: List[tuple] = []  # (signature, title, description)
+
+    def find(self, title: str, description: str = '') -> Optional[int]:
+        """Index of an already-added near-duplicate, or None"""
+        signature, buckets = title_signature(title)
+        seen = set()
+        for band, bucket in enumerate(buckets):
+            for index in self._buckets.get((band, bucket), [])[-MAX_BUCKET_CANDIDATES:]:
+                if index in seen:
+                    continue
+                seen.add(index)
+                other_signature, other_title, other_description = self._items[index]
+                similarity = estimated_similarity(signature, other_signature)
+                if is_near_duplicate(similarity, title, other_title, description, other_description):
+                    return index
+        return None
+
+    def add(self, title: str, description: str = '') -> int:
+        signature, buckets = title_signature(title)
+        index = len(self._items)
+        self._items.append((signature, title, description))
+        for band, bucket in enumerate(buckets):
+            self._buckets.setdefault((band, bucket), []).append(index)
+        return index
+
+
+def dedupe_scholarships(scholarships: Iterable[Dict]) -> List[Dict]:
+    """Keep the first record of every near-duplicate group, preserving order"""
+    index = MinHashLSH()
+    unique = []
+    for scholarship in scholarships:
+        title = scholarship.get('title', '')
+        description = scholarship.get('description') or ''
+        if index.find(title, description) is None:
+            index.add(title, description)
+            unique.append(scholarship)
+    return unique
@@ -0,0 +1,47 @@
+"""
+Normalization helpers for scholarship identity
+Maps the many spellings of one scholarship on one site to a single content key
+"""
+
+import hashlib
+import re
+import unicodedata
+from urllib.parse import urlparse
+
+_PARENTHETICAL = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+_DASHES = {ord(dash): '-' for dash in '\u2010\u2011\u2012\u2013\u2014\u2212'}
+# Years in year-like positions only: academic-year ranges anywhere ("2025/26",
+# "2025-2026") and a single year ending the title. Any other number, such as
+# the "2000" of "2000 Grant", is part of the name.
+_YEAR_RANGE = re.compile(r'\b(?:19|20)\d{2}\s*[/-]\s*(?:19|20)?\d{2}\b')
+_TRAILING_YEAR = re.compile(r'(?<=\S) (?:19|20)\d{2}$')
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+def canonical_title(title: str) -> str:
+    """Lowercase, accent-free title without round years, brackets or punctuation
+
+    "Chevening Scholarships 2025/26 (Graduate, Leadership)" -> "chevening scholarships"
+    "DAAD Scholarship 2024" -> "daad scholarship", but "2000 Grant" keeps its number
+    """
+    text = unicodedata.normalize('NFKD', (title or '').translate(_DASHES))
+    text = text.encode('ascii', 'ignore').decode('ascii').lower()
+    text = _PARENTHETICAL.sub(' ', text)
+    text = _YEAR_RANGE.sub(' ', text)
+    return _TRAILING_YEAR.sub('', _NON_WORD.sub(' ', text).strip())
+
+
+def source_domain(url: str) -> str:
+    """Registrable-looking host of a source URL ("https://www.mak.ac.ug/x" -> "mak.ac.ug")"""
+    if not url:
+        return ''
+    if '://' not in url:
+        url = 'https://' + url
+    host = (urlparse(url).hostname or '').lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def content_key(title: str, source: str) -> str:
+    """Stable identity for a scholarship: hash of canonical title + source domain"""
+    basis = f"{canonical_title(title)}|{source_domain(source)}"
+    return hashlib.sha1(basis.encode('utf-8')).hexdigest()
@@ -0,0 +1,1276 @@
+"""
+PostgreSQL storage backend
+Same interface as ScholarshipCache / DatabaseManager (see core/storage.py) over
+one shared PostgreSQL database, so several web dynos can serve one corpus.
+Needs psycopg 3 and psycopg_pool (pip install "psycopg[binary,pool]").
+"""
+
+import json
+import os
+import re
+import threading
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .batching import chunked
+from .config import (
+    DEADLINE_GRACE_DAYS, EXPIRE_AFTER_DAYS, INGEST_CHUNK_SIZE, MAINTENANCE_BATCH_SIZE,
+    MAINTENANCE_INTERVAL, MAINTENANCE_MAX_BATCHES, POSTGRES_POOL_SIZE, RANKING_CANDIDATES, SEMANTIC_CANDIDATES,
+    SEMANTIC_FIT_ROWS
+)
+from .db import DatabaseManager
+from .facets import count_facets, facet_labels
+from .fuzzy import correct_keywords, lookup_bounds, trigrams, vocabulary_words
+from .geography import INTERNATIONAL, LEVEL_PLACE, canonical_place, hierarchy
+from .matching import MatchIndex, encode_scholarship
+from .near_duplicates import (
+    LSH_BANDS, MAX_BUCKET_CANDIDATES, MAX_CANDIDATES, title_signature,
+    estimated_similarity, is_near_duplicate, pack_signature, unpack_signature
+)
+from .normalize import content_key
+from .query_cache import QueryResultCache
+from .ranking import host_of, signal_matrix
+from .scholarship_cache import (
+    SEARCH_ORDERS, SEED_SCHOLARSHIPS, SEMANTIC_MODEL_COLUMNS, SEMANTIC_SEQ_INDEX, TEXT_COLUMNS, ScholarshipCache,
+    decode_search_cursor, encode_search_cursor, UNEMBEDDED_INDEX, UNENCODED_INDEX, ranked_page, search_order
+)
+from .semantic import SemanticIndex, SemanticModel, blend, document_terms, needs_refit
+
+# ts_rank() runs roughly 0..1 where BM25 runs 0..20, so priority weighs in proportionally less
+PRIORITY_RELEVANCE_WEIGHT = 0.05
+# Every process migrating the same database serializes on this advisory lock
+MIGRATION_LOCK_ID = 727_001
+
+# Upsert column -> new value. Same merge rules as UPSERT_SCHOLARSHIP_SQL: fields
+# the scraper did not capture keep their stored value, priority never drops
+_UPSERT_COLUMNS = ('content_key', 'title', 'description', 'amount', 'deadline', 'category', 'source', 'country',
+                   'keywords', 'goal_type', 'priority', 'deadline_date', 'deadline_kind',
+                   'amount_min', 'amount_max', 'amount_currency', 'full_funding', 'amount_min_usd',
+                   'amount_max_usd', 'fx_version', 'geography_id')
+_MERGED = {column: f"COALESCE(excluded.{column}, s.{column})"
+           for column in ('description', 'amount', 'deadline', 'category', 'source', 'country', 'keywords',
+                          'goal_type')}
+_MERGED.update({column: f"CASE WHEN excluded.amount IS NULL THEN s.{column} ELSE excluded.{column} END"
+                for column in ('amount_min', 'amount_max', 'amount_currency', 'full_funding', 'amount_min_usd',
+                               'amount_max_usd', 'fx_version')})
+_MERGED.update({column: f"CASE WHEN excluded.deadline IS NULL THEN s.{column} ELSE excluded.{column} END"
+                for column in ('deadline_date', 'deadline_kind')})
+_MERGED['geography_id'] = "CASE WHEN excluded.country IS NULL THEN s.geography_id ELSE excluded.geography_id END"
+_MERGED['priority'] = "GREATEST(s.priority, COALESCE(excluded.priority, s.priority))"
+_MERGED['is_active'] = "1"
+
+# Rows whose merge changes nothing are left alone (no RETURNING row) and only
+# get last_verified touched afterwards, which is how they count as unchanged.
+# A changed row is re-encoded for matching and semantic search (see _encode_pending, _embed_pending)
+UPSERT_SCHOLARSHIP_SQL = f'''
+    INSERT INTO scholarships AS s ({', '.join(_UPSERT_COLUMNS)})
+    VALUES ({', '.join(['%s'] * len(_UPSERT_COLUMNS))})
+    ON CONFLICT (content_key) DO UPDATE SET
+        {', '.join(f"{column} = {value}" for column, value in _MERGED.items())},
+        last_verified = now(),
+        match_features = NULL,
+        semantic_vector = NULL
+    WHERE ({', '.join(f"s.{column}" for column in _MERGED)})
+        IS DISTINCT FROM ({', '.join(_MERGED.values())})
+    RETURNING (xmax = 0) AS inserted
+'''
+
+# Cursor keys travel as text; these cast them back for the row-value seek
+_KEY_CASTS = {'created_at': '::timestamptz', 'deadline_date': '::date', 'relevance': '::float8',
+              'amount_max_usd': '::float8', 'priority': '::int'}
+
+_pools = {}
+_query_caches = {}
+_writers = {}  # One background writer per database URL, for queue_scholarships
+_semantic_indexes = {}
+_registry_lock = threading.Lock()
+
+
+def _psycopg():
+    try:
+        import psycopg
+        import psycopg_pool
+        return psycopg, psycopg_pool
+    except ImportError:
+        raise ImportError('The PostgreSQL backend needs psycopg 3: pip install "psycopg[binary,pool]"')
+
+
+def get_postgres_pool(database_url: str):
+    """Process-wide connection pool for a database URL, shared by every store instance"""
+    _, psycopg_pool = _psycopg()
+    with _registry_lock:
+        pool = _pools.get(database_url)
+        if pool is None:
+            pool = _pools[database_url] = psycopg_pool.ConnectionPool(
+                database_url, min_size=1, max_size=POSTGRES_POOL_SIZE, open=True)
+            _query_caches[database_url] = QueryResultCache()
+            _writers[database_url] = ThreadPoolExecutor(max_workers=1, thread_name_prefix='postgres-writes')
+            _semantic_indexes[database_url] = SemanticIndex()
+        return pool
+
+
+def build_tsquery(keywords: List[str]) -> str:
+    """to_tsquery text for keywords, matching build_fts_query's semantics
+
+    Quoted keywords are exact phrases; unquoted ones are phrases whose last
+    word matches as a prefix. Keywords are OR-ed; words are reduced to \\w runs,
+    so no tsquery operator can come from user input.
+    """
+    terms = []
+    for keyword in keywords or []:
+        keyword = (keyword or '').strip()
+        exact = len(keyword) > 1 and keyword[0] == keyword[-1] == '"'
+        tokens = re.findall(r'[^\W_]+', keyword.lower())
+        if not tokens:
+            continue
+        if not exact:
+            tokens[-1] += ':*'
+        terms.append('(' + ' <-> '.join(tokens) + ')')
+    return ' | '.join(terms)
+
+
+def _plain(value):
+    """Database value as ScholarshipCache returns it: dates and timestamps as ISO text"""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+class PostgresScholarshipCache:
+    """ScholarshipCache over PostgreSQL: pooled connections, tsvector search, server-side upserts
+
+    Differences from the SQLite store: keyword search uses a generated
+    tsvector column with a GIN index and ts_rank; the in-process query
+    cache only sees this process's writes, so other dynos' writes show up
+    within QUERY_CACHE_TTL. Search results are folded into near-duplicate
+    clusters the same way (see _add_clusters).
+    """
+
+    def __init__(self, database_url: str):
+        self.database_url = database_url
+        self.pool = get_postgres_pool(database_url)
+        self.query_cache = _query_caches[database_url]
+        self.writer = _writers[database_url]
+        self.semantic = _semantic_indexes[database_url]
+        self._semantic_model = None  # Parsed semantic_model the writer embeds with (_stored_semantic_model)
+        self.fts_enabled = True
+        self._migrate([self._create_schema, self._create_user_tables, self._add_match_features,
+                       self._add_semantic_vectors, self._add_search_vocabulary, self._rekey_numbered_titles,
+                       self._add_scholarship_counts, self._add_clusters])
+        with self.pool.connection() as conn:
+            # Explicit, since columns added by migrations come after the archive's own
+            self._archive_columns = [row[0] for row in conn.execute('''
+                SELECT column_name FROM information_schema.columns
+                WHERE table_schema = current_schema() AND table_name = 'scholarships' ORDER BY ordinal_position
+            ''')]
+        self.populate_initial_data()
+
+    def _migrate(self, migrations):
+        """Run the steps the database has not reached (schema_version table, advisory-locked)"""
+        with self.pool.connection() as conn:
+            conn.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+            conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+            row = conn.execute("SELECT version FROM schema_version").fetchone()
+            if row is None:
+                conn.execute("INSERT INTO schema_version VALUES (0)")
+            for version in range(row[0] if row else 0, len(migrations)):
+                migrations[version](conn)
+                conn.execute("UPDATE schema_version SET version = %s", (version + 1,))
+
+    @staticmethod
+    def _create_schema(conn):
+        """Version 1: scholarships, archive, geography, cache metadata and the search indexes"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS geography (
+                id SERIAL PRIMARY KEY,
+                name TEXT NOT NULL,
+                parent_id INTEGER REFERENCES geography (id),
+                level TEXT NOT NULL
+            )
+        ''')
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_geography_name ON geography (lower(name))")
+        with conn.cursor() as cursor:
+            cursor.executemany('''
+                INSERT INTO geography (name, parent_id, level)
+                VALUES (%s, (SELECT id FROM geography WHERE lower(name) = lower(%s)), %s)
+                ON CONFLICT (lower(name)) DO UPDATE SET parent_id = excluded.parent_id, level = excluded.level
+            ''', list(hierarchy()))
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS scholarships (
+                id BIGSERIAL PRIMARY KEY,
+                content_key TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                description TEXT,
+                amount TEXT,
+                deadline TEXT,
+                category TEXT,
+                source TEXT,
+                country TEXT,
+                keywords TEXT,
+                goal_type TEXT,
+                priority INTEGER NOT NULL DEFAULT 1,
+                deadline_date DATE,
+                deadline_kind TEXT,
+                amount_min DOUBLE PRECISION,
+                amount_max DOUBLE PRECISION,
+                amount_currency TEXT,
+                full_funding SMALLINT NOT NULL DEFAULT 0,
+                amount_min_usd DOUBLE PRECISION,
+                amount_max_usd DOUBLE PRECISION,
+                fx_version TEXT,
+                geography_id INTEGER REFERENCES geography (id),
+                is_active SMALLINT NOT NULL DEFAULT 1,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                last_verified TIMESTAMPTZ NOT NULL DEFAULT now(),
+                search_vector TSVECTOR GENERATED ALWAYS AS (
+                    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                    setweight(to_tsvector('english', coalesce(keywords, '')), 'B') ||
+                    setweight(to_tsvector('english', coalesce(description, '')), 'C')
+                ) STORED
+            )
+        ''')
+        # Same access paths as the SQLite SEARCH_INDEXES, plus GIN for keyword search
+        for name, definition in {
+            'idx_scholarships_search_vector': 'USING GIN (search_vector)',
+            'idx_scholarships_active_goal_rank_key':
+                '(is_active, goal_type, priority DESC, created_at DESC, content_key DESC)',
+            'idx_scholarships_active_rank_key': '(is_active, priority DESC, created_at DESC, content_key DESC)',
+            'idx_scholarships_last_verified': '(last_verified)',
+            'idx_scholarships_active_deadline_key':
+                '(is_active, deadline_date, content_key) WHERE deadline_date IS NOT NULL',
+            'idx_scholarships_active_amount_key':
+                '(is_active, amount_max_usd DESC, priority DESC, created_at DESC, content_key DESC)',
+            'idx_scholarships_active_geography':
+                '(is_active, geography_id, priority DESC, created_at DESC, content_key DESC)',
+            'idx_scholarships_active_country': '(country) WHERE is_active = 1',
+        }.items():
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON scholarships {definition}")
+        # Archive rows keep every scholarships column; the newest per key is its tombstone
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS scholarships_archive (LIKE scholarships INCLUDING DEFAULTS)
+        ''')
+        conn.execute("ALTER TABLE scholarships_archive ADD COLUMN IF NOT EXISTS archived_at TIMESTAMPTZ")
+        conn.execute("ALTER TABLE scholarships_archive ADD COLUMN IF NOT EXISTS archive_reason TEXT")
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_scholarships_archive_content_key
+            ON scholarships_archive (content_key, archived_at DESC)
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache_metadata (
+                source_url TEXT PRIMARY KEY,
+                last_scraped TIMESTAMPTZ,
+                success_count INTEGER NOT NULL DEFAULT 0,
+                total_attempts INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS maintenance_log (
+                task TEXT PRIMARY KEY,
+                last_run TIMESTAMPTZ NOT NULL
+            )
+        ''')
+        conn.execute('''
+            INSERT INTO maintenance_log VALUES ('maintenance', 'epoch') ON CONFLICT (task) DO NOTHING
+        ''')
+
+    @staticmethod
+    def _create_user_tables(conn):
+        """Version 2: custom sites and user profiles (see PostgresDatabaseManager)"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS custom_sites (
+                id SERIAL PRIMARY KEY,
+                url TEXT UNIQUE,
+                added_by TEXT,
+                added_at TIMESTAMPTZ,
+                last_scraped TIMESTAMPTZ,
+                status TEXT,
+                is_public INTEGER DEFAULT 0,
+                popularity INTEGER DEFAULT 0
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS user_profiles (
+                user_id TEXT PRIMARY KEY,
+                profile_data TEXT,
+                created_at TIMESTAMPTZ,
+                updated_at TIMESTAMPTZ
+            )
+        ''')
+
+    @classmethod
+    def _add_match_features(cls, conn):
+        """Version 3: matching vectors and requirements (core.matching), encoded for the existing rows"""
+        for table in ('scholarships', 'scholarships_archive'):
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS match_features BYTEA")
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS min_gpa REAL")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_scholarships_unencoded {UNENCODED_INDEX}")
+        with conn.cursor() as cursor:
+            cls._encode_pending(cursor)
+
+    def _add_semantic_vectors(self, conn):
+        """Version 4: semantic vectors (core.semantic), with the model fitted on and embedding the existing rows"""
+        for table in ('scholarships', 'scholarships_archive'):
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS semantic_vector BYTEA")
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS semantic_seq BIGINT")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS semantic_model (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version TEXT NOT NULL,
+                fitted_rows INTEGER NOT NULL,
+                vocabulary TEXT NOT NULL,
+                idf BYTEA NOT NULL,
+                projection BYTEA NOT NULL,
+                last_seq BIGINT NOT NULL DEFAULT 0
+            )
+        ''')
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_scholarships_unembedded {UNEMBEDDED_INDEX}")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_scholarships_semantic_seq {SEMANTIC_SEQ_INDEX}")
+        with conn.cursor() as cursor:
+            self._embed_pending(cursor)
+
+    def _add_search_vocabulary(self, conn):
+        """Version 5: the typo-tolerant search vocabulary (core.fuzzy), indexed from the existing rows"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS search_terms (
+                term TEXT PRIMARY KEY,
+                trigrams INTEGER NOT NULL,
+                frequency BIGINT NOT NULL DEFAULT 0
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS term_trigrams (
+                trigram TEXT NOT NULL,
+                term TEXT NOT NULL,
+                PRIMARY KEY (trigram, term)
+            )
+        ''')
+        with conn.cursor() as cursor:
+            if cursor.execute("SELECT 1 FROM search_terms LIMIT 1").fetchone() is None:
+                self._index_vocabulary(cursor, cursor.execute(
+                    "SELECT title, keywords, country FROM scholarships").fetchall())
+
+    @staticmethod
+    def _rekey_numbered_titles(conn):
+        """Version 6: content keys of titles holding a year-like number, recomputed since canonical_title
+        keeps numbers outside year positions ("2000 Grant" and "2050 Grant" are two scholarships)"""
+        with conn.cursor() as cursor:
+            for table in ('scholarships', 'scholarships_archive'):
+                rows = cursor.execute(
+                    f"SELECT id, title, source, content_key FROM {table} WHERE title ~ '(19|20)[0-9]{{2}}'"
+                ).fetchall()
+                # A key another row already holds stays as it was: those two were merged before
+                cursor.executemany(f'''
+                    UPDATE {table} SET content_key = %(key)s WHERE id = %(id)s
+                    AND NOT EXISTS (SELECT 1 FROM {table} WHERE content_key = %(key)s)
+                ''', [{'key': key, 'id': row_id} for row_id, title, source, old_key in rows
+                      if (key := content_key(title, source)) != old_key])
+
+    @staticmethod
+    def _add_scholarship_counts(conn):
+        """Version 7: scholarship_counts, active rows per geography_id kept by triggers, so counts and
+        cache age need no scans
+
+        Statement triggers append one delta row per geography a statement
+        moves rows into or out of, and never update a shared row, so writers
+        on other dynos do not queue on (or deadlock over) hot counters;
+        run_maintenance merges the deltas. Rows without a geography count
+        under geography_id 0. Cache age seeks the newest last_verified of each
+        geography in the partial index added here.
+        """
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS scholarship_counts (
+                geography_id INTEGER NOT NULL,
+                active_delta BIGINT NOT NULL
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_scholarship_counts_geography ON scholarship_counts (geography_id)")
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_scholarships_active_geography_verified
+            ON scholarships (geography_id, last_verified) WHERE is_active = 1
+        ''')
+        conn.execute('''
+            CREATE OR REPLACE FUNCTION scholarship_counts_moved() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO scholarship_counts
+                    SELECT coalesce(geography_id, 0), count(*) FROM new_rows WHERE is_active = 1 GROUP BY 1;
+                ELSIF TG_OP = 'DELETE' THEN
+                    INSERT INTO scholarship_counts
+                    SELECT coalesce(geography_id, 0), -count(*) FROM old_rows WHERE is_active = 1 GROUP BY 1;
+                ELSE
+                    INSERT INTO scholarship_counts
+                    SELECT place, sum(delta) FROM (
+                        SELECT coalesce(geography_id, 0) AS place, -1 AS delta FROM old_rows WHERE is_active = 1
+                        UNION ALL
+                        SELECT coalesce(geography_id, 0), 1 FROM new_rows WHERE is_active = 1
+                    ) moves GROUP BY place HAVING sum(delta) <> 0;
+                END IF;
+                RETURN NULL;
+            END $$
+        ''')
+        # Created before the backfill: they lock out writes until this migration commits
+        for event, tables in (('INSERT', 'NEW TABLE AS new_rows'), ('DELETE', 'OLD TABLE AS old_rows'),
+                              ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows')):
+            conn.execute(f"DROP TRIGGER IF EXISTS scholarship_counts_{event.lower()} ON scholarships")
+            conn.execute(f'''
+                CREATE TRIGGER scholarship_counts_{event.lower()} AFTER {event} ON scholarships
+                REFERENCING {tables} FOR EACH STATEMENT EXECUTE FUNCTION scholarship_counts_moved()
+            ''')
+        conn.execute("DELETE FROM scholarship_counts")
+        conn.execute('''
+            INSERT INTO scholarship_counts
+            SELECT coalesce(geography_id, 0), count(*) FROM scholarships WHERE is_active = 1 GROUP BY 1
+        ''')
+
+    def _add_clusters(self, conn):
+        """Version 8: near-duplicate clusters (core.near_duplicates), with the existing rows clustered
+
+        As in ScholarshipCache, each written row joins the cluster of its
+        closest near-duplicate in the same transaction, and searches keep one
+        row per cluster (_canonical_member). Copies of one listing written by
+        two dynos at the same moment do not see each other, so each may start
+        its own cluster.
+        """
+        for table in ('scholarships', 'scholarships_archive'):
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS cluster_id BIGINT")
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS minhash BYTEA")
+        # MinHash-LSH buckets (one row per band), and cluster members for the canonical-row seeks
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS scholarship_lsh (
+                band SMALLINT NOT NULL,
+                bucket BIGINT NOT NULL,
+                scholarship_id BIGINT NOT NULL,
+                PRIMARY KEY (band, bucket, scholarship_id)
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_scholarship_lsh_scholarship ON scholarship_lsh (scholarship_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_scholarships_cluster ON scholarships (cluster_id, id)")
+        # Deleting (archiving) a cluster's canonical row promotes the oldest remaining member
+        conn.execute('''
+            CREATE OR REPLACE FUNCTION scholarship_clusters_deleted() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                DELETE FROM scholarship_lsh WHERE scholarship_id IN (SELECT id FROM old_rows);
+                UPDATE scholarships s SET cluster_id = members.first_id
+                FROM (
+                    SELECT cluster_id, min(id) AS first_id FROM scholarships
+                    WHERE cluster_id IN (SELECT id FROM old_rows WHERE cluster_id = id)
+                    GROUP BY cluster_id
+                ) members
+                WHERE s.cluster_id = members.cluster_id;
+                RETURN NULL;
+            END $$
+        ''')
+        conn.execute("DROP TRIGGER IF EXISTS scholarship_clusters_delete ON scholarships")
+        conn.execute('''
+            CREATE TRIGGER scholarship_clusters_delete AFTER DELETE ON scholarships
+            REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT EXECUTE FUNCTION scholarship_clusters_deleted()
+        ''')
+        with conn.cursor() as cursor:
+            self._cluster_pending(cursor)
+
+    def populate_initial_data(self):
+        """Seed an empty database with the built-in corpus (concurrent dynos upsert the same rows)"""
+        if self.get_scholarship_count() > 0:
+            return
+        self.add_scholarships(SEED_SCHOLARSHIPS)
+        print(f"✅ Populated database with {len(SEED_SCHOLARSHIPS)} scholarships")
+
+    def add_scholarships(self, scholarships: Iterable[Dict],
+                         chunk_size: int = INGEST_CHUNK_SIZE) -> Dict[str, int]:
+        """Add or refresh scholarships (upsert on the content key), one transaction per chunk
+
+        Same contract as ScholarshipCache.add_scholarships, including
+        tombstones; the merge and the changed/unchanged test run in the
+        server, one pipelined statement per row. Returns counts of inserted,
+        updated and unchanged rows.
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        for chunk in chunked(scholarships, chunk_size):
+            with self.pool.connection() as conn, conn.cursor() as cursor:
+                rows = [ScholarshipCache._upsert_params(scholarship) for scholarship in chunk]
+                places = self._place_ids(cursor, {row[7] for row in rows})
+                rows = [row + (places[row[7]],) for row in rows]
+                tombstones = self._tombstones(cursor, {row[0] for row in rows})
+
+                writes, restored, changed = [], set(), []
+                for row in rows:
+                    key = row[0]
+                    if key in tombstones:
+                        reason, closed_deadline = tombstones[key]
+                        if reason == 'past_deadline' and (row[11] or '') <= (closed_deadline or ''):
+                            counts['unchanged'] += 1  # The closed round, seen again
+                            continue
+                        restored.add(key)
+                    writes.append(row)
+
+                touches = []
+                if writes:
+                    cursor.executemany(UPSERT_SCHOLARSHIP_SQL, writes, returning=True)
+                    for row in writes:
+                        result = cursor.fetchone()
+                        if result is None:
+                            counts['unchanged'] += 1
+                            touches.append(row[0])
+                        else:
+                            counts['inserted' if result[0] else 'updated'] += 1
+                            changed.append((row[1], row[8], row[7]))
+                        cursor.nextset()
+                if touches:
+                    cursor.execute("UPDATE scholarships SET last_verified = now(), is_active = 1 "
+                                   "WHERE content_key = ANY(%s)", (touches,))
+                if restored:
+                    cursor.execute("DELETE FROM scholarships_archive WHERE content_key = ANY(%s)",
+                                   (list(restored),))
+                self._cluster_pending(cursor)
+                self._encode_pending(cursor)
+                self._embed_pending(cursor)
+                self._index_vocabulary(cursor, changed)
+            self.query_cache.bump_generation()
+        return counts
+
+    def queue_scholarships(self, scholarships: Iterable[Dict]) -> Future:
+        """add_scholarships on this process's background writer; returns a Future of its counts
+
+        PostgreSQL has no single write lock to coalesce around, so this only
+        takes the write off the caller's thread.
+        """
+        return self.writer.submit(self.add_scholarships, list(scholarships))
+
+    def flush_writes(self, timeout: float = None, durable: bool = False) -> bool:
+        """Wait for queued writes; commits are durable on the server already"""
+        try:
+            self.writer.submit(lambda: None).result(timeout)
+            return True
+        except TimeoutError:
+            return False
+
+    def bulk_load(self, scholarships: Iterable[Dict], chunk_size: int = INGEST_CHUNK_SIZE) -> Dict[str, int]:
+        """Same as add_scholarships: PostgreSQL maintains its indexes well under bulk upserts"""
+        return self.add_scholarships(scholarships, chunk_size=chunk_size)
+
+    @staticmethod
+    def _place_ids(cursor, countries) -> Dict[str, Optional[int]]:
+        """geography ids of stored country values; unknown places are filed under International"""
+        ids = {}
+        for country in countries:
+            place = canonical_place(country)
+            if place is None:
+                ids[country] = None
+                continue
+            ids[country] = cursor.execute('''
+                WITH found AS (SELECT id FROM geography WHERE lower(name) = lower(%s)),
+                inserted AS (
+                    INSERT INTO geography (name, parent_id, level)
+                    SELECT %s, (SELECT id FROM geography WHERE name = %s), %s
+                    WHERE NOT EXISTS (SELECT 1 FROM found)
+                    ON CONFLICT (lower(name)) DO UPDATE SET name = geography.name
+                    RETURNING id
+                )
+                SELECT id FROM found UNION ALL SELECT id FROM inserted
+            ''', (place, place, INTERNATIONAL, LEVEL_PLACE)).fetchone()[0]
+        return ids
+
+    @staticmethod
+    def _tombstones(cursor, keys) -> Dict[str, tuple]:
+        """(archive_reason, deadline_date) of the newest archived row for each given content key"""
+        rows = cursor.execute('''
+            SELECT DISTINCT ON (content_key) content_key, archive_reason, deadline_date
+            FROM scholarships_archive WHERE content_key = ANY(%s)
+            ORDER BY content_key, archived_at DESC
+        ''', (list(keys),)).fetchall()
+        return {key: (reason, _plain(deadline_date)) for key, reason, deadline_date in rows}
+
+    def _search_area(self, cursor, country: str) -> List[int]:
+        """geography ids a country search covers: the place, its region and continent, and International"""
+        rows = cursor.execute('''
+            WITH RECURSIVE area (id, parent_id) AS (
+                SELECT id, parent_id FROM geography WHERE lower(name) IN (lower(%s), lower(%s))
+                UNION
+                SELECT g.id, g.parent_id FROM geography g JOIN area ON g.id = area.parent_id
+            )
+            SELECT id FROM area ORDER BY id
+        ''', (canonical_place(country), INTERNATIONAL)).fetchall()
+        return [row[0] for row in rows]
+
+    def _area_scores(self, cursor, country: str) -> Dict[int, float]:
+        """How closely each geography id matches a searched place (see ScholarshipCache._area_scores)"""
+        rows = cursor.execute('''
+            WITH RECURSIVE area (id, parent_id, depth) AS (
+                SELECT id, parent_id, 0 FROM geography WHERE lower(name) = lower(%s)
+                UNION ALL
+                SELECT g.id, g.parent_id, area.depth + 1 FROM geography g JOIN area ON g.id = area.parent_id
+            )
+            SELECT id, depth FROM area
+        ''', (canonical_place(country),)).fetchall()
+        return {geography_id: 1 - depth / len(rows) for geography_id, depth in rows}
+
+    @staticmethod
+    def _assign_cluster(cursor, row_id: int, title: str, description: str) -> int:
+        """Join the cluster of the closest near-duplicate, or start a new one (see ScholarshipCache._assign_cluster)"""
+        signature, buckets = title_signature(title)
+        per_band = ' UNION ALL '.join(['''
+            (SELECT scholarship_id FROM scholarship_lsh
+             WHERE band = %s AND bucket = %s ORDER BY scholarship_id DESC LIMIT %s)
+        '''] * LSH_BANDS)
+        params = [value for band, bucket in enumerate(buckets)
+                  for value in (band, bucket, MAX_BUCKET_CANDIDATES)]
+        candidates = cursor.execute(f'''
+            SELECT s.id, s.cluster_id, s.title, s.description, s.minhash
+            FROM (SELECT scholarship_id, COUNT(*) AS hits FROM ({per_band}) b
+                  GROUP BY scholarship_id ORDER BY hits DESC LIMIT %s) c
+            JOIN scholarships s ON s.id = c.scholarship_id
+            WHERE s.id != %s AND s.cluster_id IS NOT NULL AND s.minhash IS NOT NULL
+        ''', params + [MAX_CANDIDATES, row_id]).fetchall()
+
+        cluster_id, best_similarity = row_id, 0.0
+        for _, other_cluster, other_title, other_description, blob in candidates:
+            similarity = estimated_similarity(signature, unpack_signature(blob))
+            if similarity > best_similarity and is_near_duplicate(
+                    similarity, title, other_title, description or '', other_description or ''):
+                cluster_id, best_similarity = other_cluster, similarity
+
+        cursor.executemany(
+            "INSERT INTO scholarship_lsh (band, bucket, scholarship_id) VALUES (%s, %s, %s) ON CONFLICT DO NOTHING",
+            [(band, bucket, row_id) for band, bucket in enumerate(buckets)]
+        )
+        cursor.execute(
+            "UPDATE scholarships SET cluster_id = %s, minhash = %s WHERE id = %s",
+            (cluster_id, pack_signature(signature), row_id)
+        )
+        return cluster_id
+
+    def _cluster_pending(self, cursor) -> int:
+        """Assign clusters to every row that has none yet, oldest first"""
+        pending = cursor.execute(
+            "SELECT id, title, description FROM scholarships WHERE cluster_id IS NULL ORDER BY id"
+        ).fetchall()
+        for row_id, title, description in pending:
+            self._assign_cluster(cursor, row_id, title, description)
+        return len(pending)
+
+    @staticmethod
+    def _encode_pending(cursor) -> int:
+        """Encode the matching vector and requirements of every row written since its last encoding"""
+        pending = cursor.execute(
+            "SELECT id, title, description, keywords, category FROM scholarships WHERE match_features IS NULL"
+        ).fetchall()
+        cursor.executemany(
+            "UPDATE scholarships SET match_features = %s, min_gpa = %s WHERE id = %s",
+            [encode_scholarship({'title': title, 'description': description, 'keywords': keywords,
+                                 'category': category}) + (row_id,)
+             for row_id, title, description, keywords, category in pending]
+        )
+        return len(pending)
+
+    def best_matches(self, profile: Dict, goal: str = None, country: str = None, limit: int = 20) -> List[Dict]:
+        """The scholarships a user profile fits best, with match_score (see ScholarshipCache.best_matches)"""
+        country = country or profile.get('country')
+        index = self.query_cache.get_or_compute(('match-index',), self._build_match_index)
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            area_scores = (self._area_scores(cursor, country) if country else None) or None
+            matches = index.best(profile, goal, area_scores, limit)
+            cursor.execute("SELECT * FROM scholarships WHERE id = ANY(%s)", ([row_id for row_id, _ in matches],))
+            columns = [description.name for description in cursor.description]
+            rows = {row[0]: {column: _plain(value) for column, value in zip(columns, row)
+                             if column != 'search_vector'} for row in cursor.fetchall()}
+        return [dict(rows[row_id], match_score=match_score) for row_id, match_score in matches if row_id in rows]
+
+    def _build_match_index(self) -> MatchIndex:
+        with self.pool.connection() as conn:
+            return MatchIndex(conn.execute('''
+                SELECT s.id, s.match_features, s.min_gpa, s.goal_type, s.geography_id, s.deadline_date
+                FROM scholarships s
+                WHERE s.is_active = 1 AND NOT EXISTS (
+                    SELECT 1 FROM scholarships m WHERE m.cluster_id = s.cluster_id AND m.id < s.id AND m.is_active = 1
+                )
+                ORDER BY s.id
+            ''').fetchall())
+
+    def _embed_pending(self, cursor) -> int:
+        """Embed the semantic vector of every row written since its last embedding (see ScholarshipCache._embed_pending)
+
+        The model row is locked while embedding, so concurrent dynos' embedding
+        writes commit in semantic_seq order.
+        """
+        model = self._stored_semantic_model(cursor)
+        if model is None or model.fitted_rows < SEMANTIC_FIT_ROWS:
+            rows = cursor.execute("SELECT COUNT(*) FROM scholarships").fetchone()[0]
+            if rows and needs_refit(model, rows):
+                model = SemanticModel.fit([document_terms(dict(zip(TEXT_COLUMNS, row))) for row in cursor.execute(
+                    f"SELECT {', '.join(TEXT_COLUMNS)} FROM scholarships ORDER BY id LIMIT %s", (SEMANTIC_FIT_ROWS,)
+                ).fetchall()])
+                cursor.execute(f'''
+                    INSERT INTO semantic_model (id, {', '.join(SEMANTIC_MODEL_COLUMNS)}) VALUES (1, %s, %s, %s, %s, %s)
+                    ON CONFLICT (id) DO UPDATE SET
+                        {', '.join(f"{column} = excluded.{column}" for column in SEMANTIC_MODEL_COLUMNS)}
+                ''', model.to_row())
+                cursor.execute("UPDATE scholarships SET semantic_vector = NULL WHERE semantic_vector IS NOT NULL")
+        if model is None:
+            return 0
+
+        pending = cursor.execute(
+            f"SELECT id, {', '.join(TEXT_COLUMNS)} FROM scholarships WHERE semantic_vector IS NULL").fetchall()
+        if not pending:
+            return 0
+        seq = cursor.execute("UPDATE semantic_model SET last_seq = last_seq + 1 RETURNING last_seq").fetchone()[0]
+        cursor.executemany(
+            "UPDATE scholarships SET semantic_vector = %s, semantic_seq = %s WHERE id = %s",
+            [(model.encode(dict(zip(TEXT_COLUMNS, row[1:]))), seq, row[0]) for row in pending]
+        )
+        return len(pending)
+
+    def _stored_semantic_model(self, cursor) -> Optional[SemanticModel]:
+        """The database's semantic model, parsed once per version"""
+        row = cursor.execute("SELECT version FROM semantic_model").fetchone()
+        if row is None:
+            return None
+        if self._semantic_model is None or self._semantic_model.version != row[0]:
+            self._semantic_model = SemanticModel.from_row(cursor.execute(
+                f"SELECT {', '.join(SEMANTIC_MODEL_COLUMNS)} FROM semantic_model").fetchone())
+        return self._semantic_model
+
+    def semantic_search(self, query: str, goal: str = None, country: str = None, limit: int = 20,
+                        open_only: bool = False, min_amount_usd: float = None) -> List[Dict]:
+        """Scholarships closest in meaning to a query, with semantic_score (see ScholarshipCache.semantic_search)"""
+        key = ('semantic', query, goal, country, limit, open_only, min_amount_usd)
+        rows = self.query_cache.get_or_compute(
+            key, lambda: self._semantic_matches(query, goal, country, limit, open_only, min_amount_usd))
+        return [dict(row) for row in rows]
+
+    def _semantic_matches(self, query: str, goal: str, country: str, limit: int, open_only: bool = False,
+                          min_amount_usd: float = None) -> tuple:
+        neighbours = self._semantic_index().search(query, SEMANTIC_CANDIDATES)
+        if not neighbours:
+            return ()
+        sql = "SELECT * FROM scholarships WHERE is_active = 1 AND id = ANY(%s)"
+        params = [[row_id for row_id, _ in neighbours]]
+        if open_only:
+            sql += " AND (deadline_date IS NULL OR deadline_date >= CURRENT_DATE)"
+        if min_amount_usd is not None:
+            sql += " AND amount_max_usd >= %s"
+            params.append(min_amount_usd)
+        if goal:
+            sql += " AND goal_type = %s"
+            params.append(goal)
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            if country:
+                sql += " AND geography_id = ANY(%s)"
+                params.append(self._search_area(cursor, country))
+            cursor.execute(sql, params)
+            columns = [description.name for description in cursor.description]
+            rows = {row[0]: {column: _plain(value) for column, value in zip(columns, row)
+                             if column != 'search_vector'} for row in cursor.fetchall()}
+        matches, clusters = [], set()
+        for row_id, similarity in neighbours:
+            if row_id in rows and (rows[row_id]['cluster_id'] or row_id) not in clusters and len(matches) < limit:
+                clusters.add(rows[row_id]['cluster_id'] or row_id)
+                matches.append(dict(rows[row_id], semantic_score=similarity))
+        return tuple(matches)
+
+    def _semantic_index(self) -> SemanticIndex:
+        """This process's semantic index, caught up with the database once per write it sees"""
+        def sync():
+            with self.pool.connection() as conn:
+                row = conn.execute("SELECT version FROM semantic_model").fetchone()
+                return self.semantic.sync(
+                    row[0] if row else None,
+                    lambda: SemanticModel.from_row(conn.execute(
+                        f"SELECT {', '.join(SEMANTIC_MODEL_COLUMNS)} FROM semantic_model").fetchone()),
+                    lambda seq: conn.execute('''
+                        SELECT id, semantic_seq, semantic_vector FROM scholarships
+                        WHERE semantic_seq > %s AND semantic_vector IS NOT NULL ORDER BY semantic_seq
+                    ''', (seq,)).fetchall())
+        return self.query_cache.get_or_compute(('semantic-index',), sync)
+
+    @staticmethod
+    def _index_vocabulary(cursor, texts: Iterable[Tuple[str, str, str]]):
+        """Add the words of written (title, keywords, country) to the search vocabulary (see ScholarshipCache)"""
+        counts = Counter(word for title, keywords, country in texts
+                         for word in vocabulary_words(title, keywords, country))
+        if not counts:
+            return
+        known = {row[0] for row in cursor.execute(
+            "SELECT term FROM search_terms WHERE term = ANY(%s)", (list(counts),)).fetchall()}
+        new = [word for word in counts if word not in known]
+        # Another dyno may add the same new word meanwhile: counts merge, trigrams are kept once
+        cursor.executemany('''
+            INSERT INTO search_terms (term, trigrams, frequency) VALUES (%s, %s, %s)
+            ON CONFLICT (term) DO UPDATE SET frequency = search_terms.frequency + excluded.frequency
+        ''', [(word, len(trigrams(word)), count) for word, count in counts.items()])
+        cursor.executemany("INSERT INTO term_trigrams (trigram, term) VALUES (%s, %s) ON CONFLICT DO NOTHING",
+                           [(trigram, word) for word in new for trigram in trigrams(word)])
+
+    def suggest_keywords(self, keywords: List[str]) -> Optional[List[str]]:
+        """The keywords with misspelled words corrected, or None (see ScholarshipCache.suggest_keywords)"""
+        if not keywords:
+            return None
+        corrected = self.query_cache.get_or_compute(('suggest', tuple(keywords)), lambda: correct_keywords(
+            keywords, self._finds_word, self._vocabulary_candidates))
+        return list(corrected) if corrected else None
+
+    def _corrected_keywords(self, keywords: List[str]) -> List[str]:
+        return (self.suggest_keywords(keywords) or keywords) if keywords else keywords
+
+    def _finds_word(self, word: str) -> bool:
+        with self.pool.connection() as conn:
+            return conn.execute(
+                "SELECT 1 FROM scholarships WHERE is_active = 1 AND search_vector @@ to_tsquery('english', %s) LIMIT 1",
+                (build_tsquery([word]),)).fetchone() is not None
+
+    def _vocabulary_candidates(self, word: str) -> List[tuple]:
+        grams, fewest, most, shared = lookup_bounds(word)
+        with self.pool.connection() as conn:
+            return conn.execute('''
+                SELECT t.term, COUNT(*), t.trigrams, t.frequency
+                FROM term_trigrams g JOIN search_terms t ON t.term = g.term
+                WHERE g.trigram = ANY(%s) AND t.trigrams BETWEEN %s AND %s
+                GROUP BY t.term, t.trigrams, t.frequency HAVING COUNT(*) >= %s
+            ''', (grams, fewest, most, shared)).fetchall()
+
+    def search_scholarships(self, goal: str = None, keywords: List[str] = None,
+                            country: str = None, limit: int = 50, open_only: bool = False,
+                            closing_within_days: int = None, min_amount_usd: float = None,
+                            sort_by_amount: bool = False, fuzzy: bool = False) -> List[Dict]:
+        """Search scholarships (see ScholarshipCache.search_scholarships); the first page of search_page()"""
+        return self.search_page(goal, keywords, country, page_size=limit, open_only=open_only,
+                                closing_within_days=closing_within_days, min_amount_usd=min_amount_usd,
+                                sort_by_amount=sort_by_amount, fuzzy=fuzzy)[0]
+
+    def search_page(self, goal: str = None, keywords: List[str] = None, country: str = None,
+                    page_size: int = 50, cursor: str = None, open_only: bool = False,
+                    closing_within_days: int = None, min_amount_usd: float = None,
+                    sort_by_amount: bool = False, fuzzy: bool = False) -> Tuple[List[Dict], Optional[str]]:
+        """One keyset-paginated page and the next page's cursor (see ScholarshipCache.search_page)"""
+        filters = {'open_only': open_only, 'closing_within_days': closing_within_days,
+                   'min_amount_usd': min_amount_usd, 'sort_by_amount': sort_by_amount, 'fuzzy': bool(fuzzy)}
+        key = ('search', goal, tuple(keywords) if keywords else None, country, page_size, cursor) + \
+            tuple(filters.values())
+        rows, next_cursor = self.query_cache.get_or_compute(
+            key, lambda: self._fetch_page(goal, keywords, country, page_size, cursor, **filters))
+        return [dict(row) for row in rows], next_cursor
+
+    def search_ranked_page(self, goal: str = None, keywords: List[str] = None, country: str = None,
+                           page_size: int = 50, cursor: str = None, open_only: bool = False,
+                           min_amount_usd: float = None, weights: Dict[str, float] = None,
+                           semantic: bool = False, fuzzy: bool = False) -> Tuple[List[Dict], Optional[str]]:
+        """One page in blended-signal order and the next page's cursor (see ScholarshipCache.search_ranked_page)"""
+        filters = {'open_only': open_only, 'min_amount_usd': min_amount_usd}
+        semantic = bool(semantic and keywords)
+        fuzzy = bool(fuzzy and keywords)
+        search = (goal, tuple(keywords) if keywords else None, country) + tuple(sorted(filters.items()))
+        search += ('semantic',) if semantic else ()
+        search += ('fuzzy',) if fuzzy else ()
+        return ranked_page(self.query_cache, search, lambda start, exclude: self._rank_candidates(
+            goal, keywords, country, semantic, fuzzy, start, exclude, **filters), page_size, cursor, weights)
+
+    def _rank_candidates(self, goal: str, keywords: List[str], country: str, semantic: bool = False,
+                         fuzzy: bool = False, start: str = None, exclude: Iterable[str] = (), **filters):
+        rows, next_start = self._fetch_page(goal, keywords, country, RANKING_CANDIDATES, start,
+                                            closing_within_days=None, sort_by_amount=False, fuzzy=fuzzy, **filters)
+        exclude = set(exclude)
+        if semantic:
+            text = ' '.join(self._corrected_keywords(keywords) if fuzzy else keywords)
+            matches = self._semantic_matches(text, goal, country, SEMANTIC_CANDIDATES, **filters)
+            if start is None:
+                rows = blend(rows, matches)
+            else:
+                exclude.update(row['content_key'] for row in matches)
+        rows = [row for row in rows if row['content_key'] not in exclude]
+        area_scores = None
+        if country:
+            with self.pool.connection() as conn, conn.cursor() as db_cursor:
+                area_scores = self._area_scores(db_cursor, country)
+        return rows, signal_matrix(rows, area_scores=area_scores, reliability=self.source_reliability()), next_start
+
+    def _fetch_page(self, goal: str, keywords: List[str], country: str, page_size: int,
+                    cursor: Optional[str], fuzzy: bool = False, **filters):
+        search = (goal, tuple(keywords) if keywords else None, country) + tuple(sorted(filters.items()))
+        search += ('fuzzy',) if fuzzy and keywords else ()
+        if fuzzy:
+            keywords = self._corrected_keywords(keywords)
+        tsquery = build_tsquery(keywords) if keywords else ''
+        order = search_order(bool(tsquery), filters['closing_within_days'], filters['sort_by_amount'])
+        segment, after = decode_search_cursor(cursor, order, search) if cursor else (0, None)
+
+        rows = []
+        with self.pool.connection() as conn, conn.cursor() as db_cursor:
+            area = self._search_area(db_cursor, country) if country else None
+            for index in range(segment, len(SEARCH_ORDERS[order])):
+                query, params = self._build_search_query(
+                    goal, tsquery, area, page_size + 1 - len(rows), order, index,
+                    after if index == segment else None, **filters)
+                db_cursor.execute(query, params)
+                columns = [description.name for description in db_cursor.description]
+                rows.extend((index, {column: _plain(value) for column, value in zip(columns, row)
+                                     if column != 'search_vector'})
+                            for row in db_cursor.fetchall())
+                if len(rows) > page_size:
+                    break
+
+        next_cursor = None
+        if len(rows) > page_size:
+            index, last = rows[page_size - 1]
+            keys = SEARCH_ORDERS[order][index][1]
+            next_cursor = encode_search_cursor(order, search, index, [last[column] for _, column in keys])
+        return tuple(row for _, row in rows[:page_size]), next_cursor
+
+    @staticmethod
+    def _build_search_query(goal: str, tsquery: str, area: Optional[List[int]], limit: int, order: str,
+                            segment: int, after: Optional[List], open_only: bool = False,
+                            closing_within_days: int = None, min_amount_usd: float = None,
+                            sort_by_amount: bool = False):
+        """SQL and parameters of one segment of a search page"""
+        params = []
+        if tsquery:
+            query = '''
+                SELECT s.*, r.relevance FROM scholarships s,
+                    to_tsquery('english', %s) q,
+                    LATERAL (SELECT ts_rank(s.search_vector, q) + s.priority * %s AS relevance) r
+                WHERE s.is_active = 1 AND s.search_vector @@ q
+            '''
+            params.extend([tsquery, PRIORITY_RELEVANCE_WEIGHT])
+        else:
+            query = "SELECT s.* FROM scholarships s WHERE s.is_active = 1"
+        filters, filter_params = PostgresScholarshipCache._search_filters(goal, area, open_only, closing_within_days,
+                                                                          min_amount_usd)
+        canonical, canonical_params = PostgresScholarshipCache._canonical_member(
+            bool(tsquery), goal, area, open_only, closing_within_days, min_amount_usd)
+        query += filters + canonical
+        params.extend(filter_params + canonical_params)
+
+        condition, keys, direction = SEARCH_ORDERS[order][segment]
+        expressions = ['r.relevance' if expression == 'relevance' else expression for expression, _ in keys]
+        if condition:
+            query += f" AND {condition}"
+        if after is not None:
+            placeholders = ', '.join(f"%s{_KEY_CASTS.get(column, '')}" for _, column in keys)
+            operator = '<' if direction == 'DESC' else '>'
+            query += f" AND ({', '.join(expressions)}) {operator} ({placeholders})"
+            params.extend(after)
+        query += " ORDER BY " + ', '.join(f"{expression} {direction}" for expression in expressions) + " LIMIT %s"
+        params.append(limit)
+        return query, params
+
+    @staticmethod
+    def _search_filters(goal: str, area: Optional[List[int]], open_only: bool, closing_within_days: Optional[int],
+                        min_amount_usd: Optional[float], alias: str = 's'):
+        """(" AND ..." SQL, params) of the search filters on scholarships aliased alias"""
+        query, params = '', []
+        if closing_within_days is not None:
+            query += f" AND {alias}.deadline_date >= CURRENT_DATE AND {alias}.deadline_date <= CURRENT_DATE + %s"
+            params.append(int(closing_within_days))
+        elif open_only:
+            query += f" AND ({alias}.deadline_date IS NULL OR {alias}.deadline_date >= CURRENT_DATE)"
+        if min_amount_usd is not None:
+            query += f" AND {alias}.amount_max_usd >= %s"
+            params.append(min_amount_usd)
+        if goal:
+            query += f" AND {alias}.goal_type = %s"
+            params.append(goal)
+        if area is not None:
+            query += f" AND {alias}.geography_id = ANY(%s)"
+            params.append(area)
+        return query, params
+
+    @staticmethod
+    def _canonical_member(keyword_search: bool, goal: str, area: Optional[List[int]], open_only: bool,
+                          closing_within_days: Optional[int], min_amount_usd: Optional[float]):
+        """(" AND NOT EXISTS ..." SQL, params) keeping one row of s per near-duplicate cluster
+
+        The kept row is the lowest id among the members that pass the same
+        filters (and match the same tsquery q on a keyword search), as in
+        ScholarshipCache._canonical_member.
+        """
+        member_filters, member_params = PostgresScholarshipCache._search_filters(
+            goal, area, open_only, closing_within_days, min_amount_usd, alias='m')
+        if keyword_search:
+            member_filters = " AND m.search_vector @@ q" + member_filters
+        return f'''
+            AND NOT EXISTS (
+                SELECT 1 FROM scholarships m
+                WHERE m.cluster_id = s.cluster_id AND m.id < s.id AND m.is_active = 1{member_filters}
+            )
+        ''', member_params
+
+    def search_facets(self, goal: str = None, keywords: List[str] = None, country: str = None,
+                      open_only: bool = False, closing_within_days: int = None, min_amount_usd: float = None,
+                      fuzzy: bool = False) -> Dict[str, List[Tuple[str, int]]]:
+        """Counts of every facet value over everything a search matches (see ScholarshipCache.search_facets)"""
+        filters = {'open_only': open_only, 'closing_within_days': closing_within_days,
+                   'min_amount_usd': min_amount_usd}
+        key = ('facets', goal, tuple(keywords) if keywords else None, country, bool(fuzzy)) + \
+            tuple(filters.values())
+        counts = self.query_cache.get_or_compute(key, lambda: self._count_facets(
+            goal, self._corrected_keywords(keywords) if fuzzy else keywords, country, **filters))
+        return {facet: list(pairs) for facet, pairs in counts.items()}
+
+    def _count_facets(self, goal: str, keywords: List[str], country: str, **filters):
+        tsquery = build_tsquery(keywords) if keywords else ''
+        query = '''
+            SELECT s.category, s.goal_type, g.name, s.deadline_date, s.amount_max_usd, s.full_funding, s.source
+            FROM scholarships s LEFT JOIN geography g ON g.id = s.geography_id
+        '''
+        params = []
+        if tsquery:
+            query += " CROSS JOIN to_tsquery('english', %s) q WHERE s.is_active = 1 AND s.search_vector @@ q"
+            params.append(tsquery)
+        else:
+            query += " WHERE s.is_active = 1"
+        with self.pool.connection() as conn, conn.cursor() as db_cursor:
+            area = self._search_area(db_cursor, country) if country else None
+            conditions, condition_params = self._search_filters(goal, area, **filters)
+            canonical, canonical_params = self._canonical_member(bool(tsquery), goal, area, **filters)
+            db_cursor.execute(query + conditions + canonical, params + condition_params + canonical_params)
+            rows = [tuple(_plain(value) for value in row) for row in db_cursor.fetchall()]
+        return count_facets(facet_labels(*(zip(*rows) if rows else [()] * 7)))
+
+    def iter_scholarships(self, columns: Iterable[str], batch_size: int = 1000) -> Iterable[Dict]:
+        """Yield the given columns of every active scholarship in id order, batch_size rows per query"""
+        select = ', '.join(columns)
+        last_id = 0
+        while True:
+            with self.pool.connection() as conn:
+                cursor = conn.execute(
+                    f"SELECT id, {select} FROM scholarships WHERE id > %s AND is_active = 1 ORDER BY id LIMIT %s",
+                    (last_id, batch_size))
+                names = [description.name for description in cursor.description][1:]
+                rows = cursor.fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield {name: _plain(value) for name, value in zip(names, row[1:])}
+            last_id = rows[-1][0]
+
+    def get_scholarship_count(self, country: str = None) -> int:
+        """Number of active scholarships (optionally listed for one country)"""
+        if country:
+            return self.get_scholarship_count_by_country(country)
+        with self.pool.connection() as conn:
+            return int(conn.execute("SELECT coalesce(sum(active_delta), 0) FROM scholarship_counts").fetchone()[0])
+
+    def get_scholarship_count_by_country(self, country: str = None) -> int:
+        """Number of active scholarships a search for a country returns (its region's,
+        continent's and International's included, as ScholarshipCache counts them)"""
+        if not country:
+            return self.get_scholarship_count()
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            return int(cursor.execute(
+                "SELECT coalesce(sum(active_delta), 0) FROM scholarship_counts WHERE geography_id = ANY(%s)",
+                (self._search_area(cursor, country),)).fetchone()[0])
+
+    def get_total_scholarship_count(self):
+        """Get total number of active scholarships in cache"""
+        try:
+            return self.get_scholarship_count()
+        except Exception as e:
+            print(f"Error getting total scholarship count: {e}")
+            return 0
+
+    def get_cache_age(self, country: str = None) -> float:
+        """Hours since the most recently verified active scholarship a search for the country (or any
+        search) returns; 24 when there is none"""
+        with self.pool.connection() as conn, conn.cursor() as cursor:
+            if country:
+                # One seek per geography in idx_scholarships_active_geography_verified
+                age_hours = cursor.execute('''
+                    SELECT extract(epoch FROM now() - max(newest.last_verified)) / 3600
+                    FROM unnest(%s::integer[]) AS area (id), LATERAL (
+                        SELECT last_verified FROM scholarships WHERE is_active = 1 AND geography_id = area.id
+                        ORDER BY last_verified DESC LIMIT 1
+                    ) newest
+                ''', (self._search_area(cursor, country),)).fetchone()[0]
+            else:
+                age_hours = cursor.execute(
+                    "SELECT extract(epoch FROM now() - max(last_verified)) / 3600 FROM scholarships WHERE is_active = 1"
+                ).fetchone()[0]
+        return float(age_hours) if age_hours is not None else 24
+
+    def update_cache_metadata(self, source_url: str, success: bool):
+        """Record a scrape attempt for a source"""
+        with self.pool.connection() as conn:
+            conn.execute('''
+                INSERT INTO cache_metadata AS m (source_url, last_scraped, success_count, total_attempts)
+                VALUES (%s, now(), %s, 1)
+                ON CONFLICT (source_url) DO UPDATE SET
+                    last_scraped = now(),
+                    success_count = m.success_count + excluded.success_count,
+                    total_attempts = m.total_attempts + 1
+            ''', (source_url, int(bool(success))))
+
+    def source_reliability(self) -> Dict[str, float]:
+        """Scrape success rate per source domain (cache_metadata), for core.ranking"""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT source_url, success_count, total_attempts FROM cache_metadata WHERE total_attempts > 0"
+            ).fetchall()
+        attempts = {}
+        for source_url, success_count, total_attempts in rows:
+            counts = attempts.setdefault(host_of(source_url), [0, 0])
+            counts[0] += success_count
+            counts[1] += total_attempts
+        return {domain: successes / total for domain, (successes, total) in attempts.items()}
+
+    def should_scrape_source(self, source_url: str, max_age_hours: int = 24) -> bool:
+        """Determine if a source should be scraped based on cache age and reliability"""
+        with self.pool.connection() as conn:
+            result = conn.execute('''
+                SELECT extract(epoch FROM now() - last_scraped) / 3600, success_count, total_attempts
+                FROM cache_metadata WHERE source_url = %s
+            ''', (source_url,)).fetchone()
+        if not result or result[0] is None:
+            return True  # Never scraped before
+        age_hours, success_count, total_attempts = float(result[0]), result[1], result[2]
+        # Don't scrape if recently scraped and source is unreliable
+        if age_hours < max_age_hours and total_attempts > 0 and success_count / total_attempts < 0.3:
+            return False
+        return age_hours >= max_age_hours
+
+    def cleanup_expired_scholarships(self, days_old: int = 30, max_batches: int = None) -> int:
+        """Archive scholarships no crawl has verified for days_old days"""
+        return self._archive('expired', "last_verified < now() - make_interval(days => %s)",
+                             (int(days_old),), max_batches)
+
+    def cleanup_past_deadlines(self, grace_days: int = 0, max_batches: int = None) -> int:
+        """Archive scholarships whose parsed deadline passed more than grace_days ago"""
+        return self._archive('past_deadline', "deadline_date < CURRENT_DATE - %s", (int(grace_days),), max_batches)
+
+    def _archive(self, reason: str, condition: str, params: tuple, max_batches: int = None) -> int:
+        """Move matching rows to scholarships_archive, MAINTENANCE_BATCH_SIZE rows per transaction
+
+        SKIP LOCKED lets several dynos archive at once without waiting on
+        each other's batches.
+        """
+        columns = ', '.join(self._archive_columns)
+        try:
+            archived, batches = 0, 0
+            while max_batches is None or batches < max_batches:
+                with self.pool.connection() as conn:
+                    moved = conn.execute(f'''
+                        WITH moved AS (
+                            DELETE FROM scholarships WHERE id IN (
+                                SELECT id FROM scholarships WHERE {condition}
+                                LIMIT %s FOR UPDATE SKIP LOCKED
+                            )
+                            RETURNING *
+                        )
+                        INSERT INTO scholarships_archive ({columns}, archived_at, archive_reason)
+                        SELECT {columns}, now(), %s FROM moved
+                    ''', params + (MAINTENANCE_BATCH_SIZE, reason)).rowcount
+                archived += moved
+                batches += 1
+                if moved < MAINTENANCE_BATCH_SIZE:
+                    break
+
+            if archived:
+                self.query_cache.bump_generation()
+                print(f"🗄️ Archived {archived} scholarships ({reason.replace('_', ' ')})")
+            return archived
+
+        except Exception as e:
+            print(f"Error archiving scholarships ({reason}): {e}")
+            return 0
+
+    def run_maintenance(self, force: bool = False) -> Dict[str, int]:
+        """Scheduled archiving (see ScholarshipCache.run_maintenance) and a merge of scholarship_counts'
+        deltas; autovacuum reclaims the space"""
+        with self.pool.connection() as conn:
+            claimed = conn.execute('''
+                UPDATE maintenance_log SET last_run = now()
+                WHERE task = 'maintenance' AND (%s OR last_run <= now() - make_interval(secs => %s))
+            ''', (bool(force), MAINTENANCE_INTERVAL)).rowcount
+        if not claimed:
+            return {}
+        archived = {
+            'expired': self.cleanup_expired_scholarships(EXPIRE_AFTER_DAYS, MAINTENANCE_MAX_BATCHES),
+            'past_deadline': self.cleanup_past_deadlines(DEADLINE_GRACE_DAYS, MAINTENANCE_MAX_BATCHES),
+            'inactive': self._archive('inactive', "is_active = 0", (), MAINTENANCE_MAX_BATCHES),
+        }
+        self._merge_counts()
+        return archived
+
+    def _merge_counts(self):
+        """Fold scholarship_counts' deltas into one row per geography; deltas committed meanwhile stay"""
+        with self.pool.connection() as conn:
+            conn.execute('''
+                WITH merged AS (DELETE FROM scholarship_counts RETURNING geography_id, active_delta)
+                INSERT INTO scholarship_counts
+                SELECT geography_id, sum(active_delta) FROM merged GROUP BY geography_id HAVING sum(active_delta) <> 0
+            ''')
+
+
+class PostgresDatabaseManager(DatabaseManager):
+    """DatabaseManager whose custom sites and profiles live in the PostgreSQL database"""
+
+    def __init__(self, cache: PostgresScholarshipCache, legacy_file: str = None):
+        self.cache = cache
+        self.db_file = None
+        if legacy_file and os.path.exists(legacy_file):
+            self.import_legacy_database(legacy_file)
+
+    def _connection(self):
+        return self.cache.pool.connection()
+
+    def _import_users(self, sites, profiles):
+        with self._connection() as conn, conn.cursor() as cursor:
+            cursor.executemany('''
+                INSERT INTO custom_sites (url, added_by, added_at, last_scraped, status, is_public, popularity)
+                VALUES (%s, %s, %s::timestamptz, %s::timestamptz, %s, %s, %s)
+                ON CONFLICT (url) DO NOTHING
+            ''', sites)
+            cursor.executemany('''
+                INSERT INTO user_profiles (user_id, profile_data, created_at, updated_at)
+                VALUES (%s, %s, %s::timestamptz, %s::timestamptz)
+                ON CONFLICT (user_id) DO NOTHING
+            ''', profiles)
+
+    def add_custom_site(self, url, user_id, is_public=False):
+        with self._connection() as conn:
+            inserted = conn.execute('''
+                INSERT INTO custom_sites AS c (url, added_by, added_at, status, is_public, popularity)
+                VALUES (%s, %s, now(), 'active', %s, 1)
+                ON CONFLICT (url) DO UPDATE SET popularity = c.popularity + 1
+                RETURNING (xmax = 0)
+            ''', (url, user_id, int(is_public))).fetchone()[0]
+        return inserted
+
+    def get_custom_sites(self, user_id=None, include_public=True):
+        if user_id and include_public:
+            condition, params = "(added_by = %s OR is_public = 1)", (user_id,)
+        elif user_id:
+            condition, params = "added_by = %s", (user_id,)
+        else:
+            condition, params = "is_public = 1", ()
+        with self._connection() as conn:
+            rows = conn.execute(f'''
+                SELECT url, popularity FROM custom_sites
+                WHERE {condition} AND status = 'active'
+                ORDER BY popularity DESC
+            ''', params).fetchall()
+        return [{'url': row[0], 'popularity': row[1]} for row in rows]
+
+    def get_user_custom_urls(self, user_id):
+        with self._connection() as conn:
+            rows = conn.execute('''
+                SELECT url, popularity FROM custom_sites
+                WHERE added_by = %s AND status = 'active'
+                ORDER BY added_at DESC
+            ''', (user_id,)).fetchall()
+        return [{'url': row[0], 'popularity': row[1]} for row in rows]
+
+    def save_user_profile(self, user_id, profile_data):
+        with self._connection() as conn:
+            conn.execute('''
+                INSERT INTO user_profiles AS p (user_id, profile_data, created_at, updated_at)
+                VALUES (%s, %s, now(), now())
+                ON CONFLICT (user_id) DO UPDATE SET profile_data = excluded.profile_data, updated_at = now()
+            ''', (user_id, json.dumps(profile_data)))
+
+    def get_user_profile(self, user_id):
+        with self._connection() as conn:
+            result = conn.execute("SELECT profile_data FROM user_profiles WHERE user_id = %s",
+                                  (user_id,)).fetchone()
+        return json.loads(result[0]) if result else {}
@@ -0,0 +1,112 @@
+"""
+In-process read-through cache for query results
+Size-bounded LRU with a TTL, invalidated by a write-generation counter
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+
+from .clock import SystemClock
+from .config import PINNED_RESULTS, QUERY_CACHE_SIZE, QUERY_CACHE_TTL
+
+
+class QueryResultCache:
+    """LRU + TTL cache of query results for one database file
+
+    Every write to the database calls ``bump_generation()``. Entries remember
+    the generation they were computed under and are never served once it has
+    moved on, and a result computed while a write landed is not stored, so a
+    background refresh can never leave stale results behind. The TTL only
+    bounds staleness from writes this process does not see.
+
+    get_or_pin() also keeps results for open page cursors across writes
+    (the last PINNED_RESULTS, for the TTL), so a cursor can continue the
+    very result it started on.
+    """
+
+    def __init__(self, max_entries: int = QUERY_CACHE_SIZE, ttl_seconds: float = QUERY_CACHE_TTL,
+                 clock=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock or SystemClock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (generation, expires_at, value)
+        self._pinned = OrderedDict()  # (key, generation) -> (expires_at, value), kept across writes
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached value for key, or compute(), store and return it"""
+        with self._lock:
+            generation = self.generation
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_generation, expires_at, value = entry
+                if entry_generation == generation and expires_at > self.clock.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+
+        value = compute()  # Outside the lock: other queries keep being served
+
+        with self._lock:
+            if generation == self.generation:
+                self._entries[key] = (generation, self.clock.monotonic() + self.ttl_seconds, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def get_or_pin(self, key: Hashable, compute: Callable[[], Any], generation: int = None) -> Tuple[int, Any]:
+        """(generation, value): the value pinned for key under generation if still kept, else the
+        current one (get_or_compute), pinned under the current generation"""
+        with self._lock:
+            entry = self._pinned.get((key, generation)) if generation is not None else None
+            if entry is not None and entry[0] > self.clock.monotonic():
+                self._pinned.move_to_end((key, generation))
+                self.hits += 1
+                return generation, entry[1]
+            generation = self.generation
+
+        value = self.get_or_compute(key, compute)
+
+        with self._lock:
+            self._pinned[(key, generation)] = (self.clock.monotonic() + self.ttl_seconds, value)
+            self._pinned.move_to_end((key, generation))
+            while len(self._pinned) > PINNED_RESULTS:
+                self._pinned.popitem(last=False)
+        return generation, value
+
+    def bump_generation(self):
+        """Invalidate every cached result (call after each committed write); pinned ones stay for their cursors"""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_query_cache(db_file: str) -> QueryResultCache:
+    """Process-wide result cache for a database file, shared by every cache instance"""
+    key = os.path.abspath(db_file)
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            cache = _caches[key] = QueryResultCache()
+        return cache
+
+
+def release_query_cache(db_file: str):
+    """Forget a database file's result cache"""
+    with _caches_lock:
+        _caches.pop(os.path.abspath(db_file), None)
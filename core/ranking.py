@@ -0,0 +1,107 @@
+"""
+Multi-signal ranking of search candidates
+Scores a candidate set with NumPy arrays: text relevance, priority, geography
+match, deadline proximity, amount, source reliability and freshness, blended
+by configurable weights
+"""
+
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import RANKING_WEIGHTS
+
+RANK_SIGNALS = ('relevance', 'priority', 'geography', 'deadline', 'amount', 'reliability', 'freshness')
+MAX_PRIORITY = 4                # Highest priority the ingest paths assign
+DEADLINE_HORIZON_DAYS = 60      # Upcoming deadlines score exp(-days / horizon): sooner is more urgent
+OPEN_DEADLINE_SCORE = 0.5       # Rolling or unknown deadlines: neither urgent nor closed
+AMOUNT_CEILING_USD = 50_000     # log-scaled amount score reaches 1 here; full funding always scores 1
+DEFAULT_RELIABILITY = 0.5       # Sources with no scrape history
+FRESHNESS_HALF_LIFE_DAYS = 14   # A listing last verified this long ago scores 0.5
+_SIGNAL_COLUMNS = ('relevance', 'priority', 'geography_id', 'deadline_date', 'amount_max_usd', 'full_funding',
+                   'source', 'last_verified')
+
+
+@lru_cache(maxsize=65536)  # Candidate sets of one corpus share their sources
+def host_of(url: Optional[str]) -> str:
+    """normalize.source_domain without urlparse, which would dominate ranking time"""
+    host = url.split('://', 1)[-1].split('/', 1)[0].split(':', 1)[0].lower() if url else ''
+    return host[4:] if host.startswith('www.') else host
+
+
+def signal_matrix(rows: Sequence[Dict], area_scores: Dict[int, float] = None,
+                  reliability: Dict[str, float] = None, today: np.datetime64 = None) -> np.ndarray:
+    """(len(RANK_SIGNALS), len(rows)) array of each signal in [0, 1] for every candidate
+
+    rows are search result rows (relevance is only present for keyword
+    searches). area_scores maps geography ids to how closely they match the
+    searched place (see ScholarshipCache._area_scores); reliability maps
+    source domains (normalize.source_domain) to scrape success rates.
+    """
+    today = np.datetime64('today', 'D') if today is None else np.datetime64(today, 'D')
+    signals = np.zeros((len(RANK_SIGNALS), len(rows)))
+    if not len(rows):
+        return signals
+    # The only per-row Python: pulling out the columns; everything after it works on whole arrays
+    (relevance, priority, geography_ids, deadlines, amounts, full_funding, sources,
+     verified) = ([row.get(column) for row in rows] for column in _SIGNAL_COLUMNS)
+
+    relevance = np.nan_to_num(np.array(relevance, dtype=float), nan=0.0)
+    top = relevance.max()
+    if top > 0:
+        signals[0] = np.clip(relevance / top, 0, 1)
+
+    signals[1] = np.clip(np.nan_to_num(np.array(priority, dtype=float), nan=1.0) / MAX_PRIORITY, 0, 1)
+
+    if area_scores:
+        lookup = np.zeros(max(area_scores) + 2)  # Last slot: rows without a geography, or outside the area
+        for geography_id, score in area_scores.items():
+            lookup[geography_id] = score
+        ids = np.nan_to_num(np.array(geography_ids, dtype=float), nan=-1).astype(np.int64)
+        ids[(ids < 0) | (ids >= len(lookup))] = len(lookup) - 1
+        signals[2] = lookup[ids]
+
+    deadlines = np.array(deadlines, dtype='datetime64[D]')
+    days = (deadlines - today).astype(float)  # NaT rows are masked below
+    signals[3] = np.where(np.isnat(deadlines), OPEN_DEADLINE_SCORE,
+                          np.where(days < 0, 0.0, np.exp(-np.maximum(days, 0) / DEADLINE_HORIZON_DAYS)))
+
+    amounts = np.nan_to_num(np.array(amounts, dtype=float), nan=0.0)
+    amount_score = np.clip(np.log1p(np.maximum(amounts, 0)) / np.log1p(AMOUNT_CEILING_USD), 0, 1)
+    signals[4] = np.where(np.nan_to_num(np.array(full_funding, dtype=float)) > 0, 1.0, amount_score)
+
+    if reliability:
+        signals[5] = [reliability.get(host_of(source), DEFAULT_RELIABILITY) for source in sources]
+    else:
+        signals[5] = DEFAULT_RELIABILITY
+
+    # Day precision is enough, and drops the time and any UTC offset
+    verified = np.array([value[:10] if value else None for value in verified], dtype='datetime64[D]')
+    age = np.maximum((today - verified).astype(float), 0)
+    signals[6] = np.where(np.isnat(verified), 0.0, 0.5 ** np.minimum(age / FRESHNESS_HALF_LIFE_DAYS, 64))
+    return signals
+
+
+def weight_vector(weights: Optional[Dict[str, float]] = None) -> np.ndarray:
+    """RANKING_WEIGHTS with the given overrides, in RANK_SIGNALS order"""
+    merged = dict(RANKING_WEIGHTS, **(weights or {}))
+    unknown = set(merged) - set(RANK_SIGNALS)
+    if unknown:
+        raise ValueError(f"Unknown ranking signals: {', '.join(sorted(unknown))}")
+    return np.array([merged.get(signal, 0.0) for signal in RANK_SIGNALS])
+
+
+def score(signals: np.ndarray, weights: Dict[str, float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """(order, scores) for a signal_matrix: candidate indices best first and their blended scores
+
+    One matrix-vector product and one sort; ties keep the input (SQL) order.
+    """
+    scores = weight_vector(weights) @ signals
+    return np.argsort(-scores, kind='stable'), scores
+
+
+def rank_rows(rows: Sequence[Dict], weights: Dict[str, float] = None, **signal_options) -> List[Dict]:
+    """Copies of rows, best first, each with its rank_score (signal_options go to signal_matrix)"""
+    order, scores = score(signal_matrix(rows, **signal_options), weights)
+    return [dict(rows[index], rank_score=float(scores[index])) for index in order]
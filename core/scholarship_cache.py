@@ -4,24 +4,666 @@ Provides fast access to scholarships with country-specific data
 """
 
 import sqlite3
+import base64
+import hashlib
 import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from datetime import datetime
+from typing import Callable, Iterable, List, Dict, Optional, Tuple
 import os
+import re
+from collections import Counter, deque
+from concurrent.futures import Future
+from .batching import chunked
+from .config import (
+    DATABASE_FILE, DEADLINE_GRACE_DAYS, EXPIRE_AFTER_DAYS, INGEST_CHUNK_SIZE, MAINTENANCE_BATCH_SIZE,
+    MAINTENANCE_INTERVAL, MAINTENANCE_MAX_BATCHES, RANKING_CANDIDATES, SEED_CORPUS_FILES, SEMANTIC_CANDIDATES,
+    SEMANTIC_FIT_ROWS, VACUUM_PAGES, WRITE_BEHIND_ENABLED, WRITE_IN_FLIGHT_CHUNKS
+)
+from .connection_pool import get_pool, release_pool
+from .migrations import migrate
+from .amounts import normalize_amount
+from .deadlines import parse_deadline
+from .fx_rates import FX_VERSION
+from .fuzzy import correct_keywords, lookup_bounds, trigrams, vocabulary_words
+from .geography import INTERNATIONAL, LEVEL_PLACE, canonical_place, hierarchy
+from .query_cache import get_query_cache, release_query_cache
+from .facets import count_facets, facet_labels
+from .matching import MatchIndex, encode_scholarship
+from .ranking import host_of, score, signal_matrix
+from .semantic import (
+    SemanticIndex, SemanticModel, blend, document_terms, get_semantic_index, needs_refit, release_semantic_index
+)
+from .write_queue import DirectWrites, get_write_queue, release_write_queue
+from .normalize import content_key
+from .near_duplicates import (
+    LSH_BANDS, MAX_BUCKET_CANDIDATES, MAX_CANDIDATES, title_signature,
+    estimated_similarity, is_near_duplicate, pack_signature, unpack_signature
+)
+
+# BM25 weights for the (title, description, keywords) FTS columns
+FTS_COLUMN_WEIGHTS = "10.0, 2.0, 5.0"
+# How much one priority level counts against BM25 relevance
+PRIORITY_RELEVANCE_WEIGHT = 0.5
+
+# Re-crawls refresh the existing row: fields the scraper did not capture keep
+# their stored value, the title keeps its first spelling and priority never drops.
+# A changed row is re-encoded for matching and semantic search (see _encode_pending, _embed_pending)
+UPSERT_SCHOLARSHIP_SQL = '''
+    INSERT INTO scholarships
+    (content_key, title, description, amount, deadline, category, source, country, keywords, goal_type, priority,
+     deadline_date, deadline_kind,
+     amount_min, amount_max, amount_currency, full_funding, amount_min_usd, amount_max_usd, fx_version,
+     geography_id)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (content_key) DO UPDATE SET
+        description = COALESCE(excluded.description, description),
+        amount = COALESCE(excluded.amount, amount),
+        amount_min = CASE WHEN excluded.amount IS NULL THEN amount_min ELSE excluded.amount_min END,
+        amount_max = CASE WHEN excluded.amount IS NULL THEN amount_max ELSE excluded.amount_max END,
+        amount_currency = CASE WHEN excluded.amount IS NULL THEN amount_currency ELSE excluded.amount_currency END,
+        full_funding = CASE WHEN excluded.amount IS NULL THEN full_funding ELSE excluded.full_funding END,
+        amount_min_usd = CASE WHEN excluded.amount IS NULL THEN amount_min_usd ELSE excluded.amount_min_usd END,
+        amount_max_usd = CASE WHEN excluded.amount IS NULL THEN amount_max_usd ELSE excluded.amount_max_usd END,
+        fx_version = CASE WHEN excluded.amount IS NULL THEN fx_version ELSE excluded.fx_version END,
+        deadline = COALESCE(excluded.deadline, deadline),
+        deadline_date = CASE WHEN excluded.deadline IS NULL THEN deadline_date ELSE excluded.deadline_date END,
+        deadline_kind = CASE WHEN excluded.deadline IS NULL THEN deadline_kind ELSE excluded.deadline_kind END,
+        category = COALESCE(excluded.category, category),
+        source = COALESCE(excluded.source, source),
+        country = COALESCE(excluded.country, country),
+        geography_id = CASE WHEN excluded.country IS NULL THEN geography_id ELSE excluded.geography_id END,
+        keywords = COALESCE(excluded.keywords, keywords),
+        goal_type = COALESCE(excluded.goal_type, goal_type),
+        priority = MAX(priority, COALESCE(excluded.priority, priority)),
+        last_verified = CURRENT_TIMESTAMP,
+        is_active = 1,
+        match_features = NULL,
+        semantic_vector = NULL
+'''
+# Columns the upsert may change, compared to classify a re-crawled row
+REFRESHED_COLUMNS = ('description', 'amount', 'deadline', 'category', 'source',
+                     'country', 'keywords', 'goal_type', 'priority', 'is_active',
+                     'deadline_date', 'deadline_kind',
+                     'amount_min', 'amount_max', 'amount_currency', 'full_funding',
+                     'amount_min_usd', 'amount_max_usd', 'fx_version', 'geography_id')
+# Unchanged re-crawls only confirm the row is still listed
+TOUCH_SCHOLARSHIP_SQL = '''
+    UPDATE scholarships SET last_verified = CURRENT_TIMESTAMP, is_active = 1
+    WHERE content_key = ?
+'''
+# Search and cleanup indexes (see init_database); bulk_load builds them after the rows are in
+SEARCH_INDEXES = {
+    'idx_scholarships_active_goal_rank_key':
+        'ON scholarships (is_active, goal_type, priority DESC, created_at DESC, content_key DESC)',
+    'idx_scholarships_active_rank_key':
+        'ON scholarships (is_active, priority DESC, created_at DESC, content_key DESC)',
+    'idx_scholarships_last_verified': 'ON scholarships (last_verified)',
+    'idx_scholarships_deadline': 'ON scholarships (deadline_date) WHERE deadline_date IS NOT NULL',
+    'idx_scholarships_active_deadline_key':
+        'ON scholarships (is_active, deadline_date, content_key) WHERE deadline_date IS NOT NULL',
+    'idx_scholarships_active_amount_key':
+        'ON scholarships (is_active, amount_max_usd DESC, priority DESC, created_at DESC, content_key DESC)',
+    'idx_scholarships_active_geography':
+        'ON scholarships (is_active, geography_id, priority DESC, created_at DESC, content_key DESC)',
+}
+KEY_LOOKUP_BATCH = 500  # Keys per IN (...) lookup, well under SQLite's parameter limit
+# Matching vector and requirements of each row (core.matching), and the index of rows still to encode
+MATCH_COLUMNS = {'match_features': 'BLOB', 'min_gpa': 'REAL'}
+UNENCODED_INDEX = 'ON scholarships (id) WHERE match_features IS NULL'
+# Semantic vector of each row (core.semantic) and the write that embedded it, which the search index
+# catches up by; the index of rows still to embed, and the fitted model with the last embedding write
+SEMANTIC_COLUMNS = {'semantic_vector': 'BLOB', 'semantic_seq': 'INTEGER'}
+UNEMBEDDED_INDEX = 'ON scholarships (id) WHERE semantic_vector IS NULL'
+SEMANTIC_SEQ_INDEX = 'ON scholarships (semantic_seq)'
+SEMANTIC_MODEL_COLUMNS = ('version', 'fitted_rows', 'vocabulary', 'idf', 'projection')
+TEXT_COLUMNS = ('title', 'description', 'keywords', 'category')  # The text semantic vectors are embedded from
+INGEST_OUTCOMES = ('inserted', 'updated', 'unchanged')
+
+
+def count_outcomes(outcomes: Iterable[str]) -> Dict[str, int]:
+    """Per-row ingest outcomes as the counts add_scholarships returns"""
+    counts = dict.fromkeys(INGEST_OUTCOMES, 0)
+    for outcome in outcomes:
+        counts[outcome] += 1
+    return counts
+
+
+def build_fts_query(keywords: List[str]) -> str:
+    """Turn user keywords into an FTS5 MATCH expression
+
+    Each keyword becomes one OR-ed term. Quoted keywords ("computer science")
+    are exact phrases; unquoted ones match as prefixes, so "engin" finds
+    "engineering". Returns an empty string when nothing searchable remains.
+    """
+    terms = []
+    for keyword in keywords or []:
+        keyword = (keyword or '').strip()
+        exact = len(keyword) > 1 and keyword[0] == keyword[-1] == '"'
+        tokens = re.findall(r'\w+', keyword.lower())
+        if not tokens:
+            continue
+        phrase = '"' + ' '.join(tokens) + '"'
+        terms.append(phrase if exact else phrase + '*')
+    return ' OR '.join(terms)
+
+
+# Search orders as segments of (extra condition, sort keys as (SQL, result column),
+# direction). Keys share one direction and end with the unique content_key, so a
+# row-value comparison against a page cursor seeks straight into the matching index
+_RANK_KEYS = (('s.priority', 'priority'), ('s.created_at', 'created_at'), ('s.content_key', 'content_key'))
+SEARCH_ORDERS = {
+    'rank': [('', _RANK_KEYS, 'DESC')],
+    'relevance': [('', (('relevance', 'relevance'),) + _RANK_KEYS[1:], 'DESC')],
+    'deadline': [('', (('s.deadline_date', 'deadline_date'), ('s.content_key', 'content_key')), 'ASC')],
+    # Scholarships without a USD value follow the valued ones
+    'amount': [('s.amount_max_usd IS NOT NULL', (('s.amount_max_usd', 'amount_max_usd'),) + _RANK_KEYS, 'DESC'),
+               ('s.amount_max_usd IS NULL', _RANK_KEYS, 'DESC')],
+}
+
+
+def search_order(use_fts: bool, closing_within_days: int = None, sort_by_amount: bool = False) -> str:
+    """Name of the SEARCH_ORDERS entry a search is sorted by"""
+    if sort_by_amount:
+        return 'amount'
+    if closing_within_days is not None:
+        return 'deadline'
+    return 'relevance' if use_fts else 'rank'
+
+
+def _search_fingerprint(order: str, search: tuple) -> str:
+    return hashlib.blake2b(repr((order, search)).encode(), digest_size=8).hexdigest()
+
+
+def encode_search_cursor(order: str, search: tuple, segment: int, keys: List) -> str:
+    """Opaque page cursor: the last row's sort key, tied to the search it came from"""
+    payload = json.dumps([_search_fingerprint(order, search), segment, keys], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_search_cursor(cursor: str, order: str, search: tuple):
+    """(segment, sort key) of a cursor from encode_search_cursor for the same search"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        fingerprint, segment, keys = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        valid = (fingerprint == _search_fingerprint(order, search) and
+                 0 <= segment < len(SEARCH_ORDERS[order]) and len(keys) == len(SEARCH_ORDERS[order][segment][1]))
+    except (ValueError, TypeError):
+        valid = False
+    if not valid:
+        raise ValueError("Invalid search cursor or cursor from a different search")
+    return segment, keys
+
+
+def encode_rank_cursor(search: tuple, start: Optional[str], generation: Optional[int],
+                       after: Optional[Tuple[float, str]]) -> str:
+    """Page cursor of a ranked search, tied to the search: its candidate window (the keyset cursor the
+    window starts at and the generation it was computed under) and the (score, content_key) last served"""
+    payload = json.dumps([_search_fingerprint('ranked', search), start, generation, after], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_rank_cursor(cursor: str, search: tuple):
+    """(start, generation, after) of a cursor from encode_rank_cursor for the same search"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        fingerprint, start, generation, after = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        valid = (fingerprint == _search_fingerprint('ranked', search) and
+                 (start is None or isinstance(start, str)) and (generation is None or isinstance(generation, int)) and
+                 (after is None or (len(after) == 2 and isinstance(after[0], (int, float)))))
+    except (ValueError, TypeError):
+        valid = False
+    if not valid:
+        raise ValueError("Invalid search cursor or cursor from a different search")
+    return start, generation, tuple(after) if after else None
+
+
+def _resume_at(order, scores, rows: List[Dict], after: Tuple[float, str]) -> int:
+    """Position in a window's ranking just past the (score, content_key) last served
+
+    In the window the cursor was made on that is the row itself. In a window
+    computed afresh, where the row may have moved or gone, it is the row if
+    still there, else the first one scored below it.
+    """
+    last_score, last_key = after
+    for position, index in enumerate(order):
+        if rows[index].get('content_key') == last_key:
+            return position + 1
+    return next((position for position, index in enumerate(order) if scores[index] < last_score), len(order))
+
+
+def ranked_page(query_cache, search: tuple, candidates: Callable, page_size: int, cursor: Optional[str],
+                weights: Dict[str, float] = None) -> Tuple[List[Dict], Optional[str]]:
+    """One page of a ranked search in blended-score order, and the next page's cursor
+
+    candidates(start, exclude) returns (rows, signal_matrix, next start) for
+    the window of up to RANKING_CANDIDATES matches from keyset cursor start
+    (None: the first), leaving out the content keys in exclude. Windows are
+    pinned in query_cache, so a cursor keeps paging through the candidates
+    it started on even after writes; once its window is no longer kept
+    (QUERY_CACHE_TTL, PINNED_RESULTS, another process) a fresh one resumes
+    past the last row served. A window's last page continues into the next
+    window, ranked on its own and without the rows of the one before (a
+    write in between moves relevance, so the keyset seek alone could repeat
+    them), so paging goes on past RANKING_CANDIDATES until the matches run out.
+    """
+    weighed = search + tuple(sorted((weights or {}).items()))  # Weights only re-score the same windows
+    start, generation, after = decode_rank_cursor(cursor, weighed) if cursor else (None, None, None)
+    page, served = [], frozenset()
+    while True:
+        generation, (rows, signals, next_start) = query_cache.get_or_pin(
+            ('ranked', start) + search, lambda: candidates(start, served), generation)
+        order, scores = score(signals, weights)
+        position = _resume_at(order, scores, rows, after) if after else 0
+        taken = order[position:position + page_size - len(page)]
+        page.extend(dict(rows[index], rank_score=round(float(scores[index]), 4)) for index in taken)
+        if len(page) == page_size and position + len(taken) < len(order):
+            last = taken[-1]
+            return page, encode_rank_cursor(weighed, start, generation,
+                                            (float(scores[last]), rows[last].get('content_key')))
+        if next_start is None:
+            return page, None
+        if len(page) == page_size:
+            return page, encode_rank_cursor(weighed, next_start, None, None)
+        served = frozenset(row.get('content_key') for row in rows)
+        start, generation, after = next_start, None, None
+
+
+# Built-in seed corpus (see populate_initial_data), with a focus on Uganda and Africa
+SEED_SCHOLARSHIPS = [
+    # Uganda-specific scholarships
+    {
+        "title": "Makerere University Excellence Scholarship",
+        "description": "Merit-based scholarship for outstanding Ugandan students pursuing undergraduate degrees at Makerere University",
+        "amount": "Full tuition + stipend",
+        "deadline": "March 15, 2025",
+        "category": "Academic Excellence",
+        "source": "https://www.mak.ac.ug/scholarships",
+        "country": "Uganda",
+        "keywords": "undergraduate,excellence,merit,makerere",
+        "goal_type": "student",
+        "priority": 3
+    },
+    {
+        "title": "Uganda Government Scholarship Scheme",
+        "description": "Government-sponsored scholarships for Ugandan citizens in STEM fields",
+        "amount": "Full tuition + living allowance",
+        "deadline": "April 30, 2025",
+        "category": "Government",
+        "source": "https://www.education.go.ug/scholarships",
+        "country": "Uganda",
+        "keywords": "government,stem,science,engineering,technology",
+        "goal_type": "student",
+        "priority": 3
+    },
+    {
+        "title": "Kampala International University Bursary",
+        "description": "Need-based financial assistance for deserving students at KIU",
+        "amount": "50-75% tuition coverage",
+        "deadline": "June 1, 2025",
+        "category": "Financial Aid",
+        "source": "https://www.kiu.ac.ug/bursaries",
+        "country": "Uganda",
+        "keywords": "financial aid,need-based,undergraduate",
+        "goal_type": "student",
+        "priority": 3
+    },
+    {
+        "title": "Uganda Christian University Scholarship",
+        "description": "Academic and leadership scholarships for UCU students",
+        "amount": "Varies",
+        "deadline": "February 28, 2025",
+        "category": "Leadership",
+        "source": "https://www.ucu.ac.ug/scholarships",
+        "country": "Uganda",
+        "keywords": "leadership,academic,christian,undergraduate",
+        "goal_type": "student",
+        "priority": 3
+    },
+
+    # East African scholarships
+    {
+        "title": "East African Community Scholarship",
+        "description": "Regional scholarships for students from EAC member countries",
+        "amount": "$5,000 - $15,000",
+        "deadline": "May 15, 2025",
+        "category": "Regional",
+        "source": "https://www.eac.int/scholarships",
+        "country": "East Africa",
+        "keywords": "regional,east africa,undergraduate,graduate",
+        "goal_type": "student",
+        "priority": 2
+    },
+
+    # African scholarships
+    {
+        "title": "Mastercard Foundation Scholars Program",
+        "description": "Comprehensive scholarship for academically talented African students",
+        "amount": "Full scholarship + mentorship",
+        "deadline": "Rolling applications",
+        "category": "Foundation",
+        "source": "https://mastercardfdn.org/scholars/",
+        "country": "Africa",
+        "keywords": "mastercard,foundation,african,leadership,undergraduate,graduate",
+        "goal_type": "student",
+        "priority": 2
+    },
+    {
+        "title": "African Union Scholarship Programme",
+        "description": "Continental scholarship program for African students",
+        "amount": "Full tuition + allowances",
+        "deadline": "March 31, 2025",
+        "category": "Continental",
+        "source": "https://au.int/en/scholarships",
+        "country": "Africa",
+        "keywords": "african union,continental,graduate,research",
+        "goal_type": "student",
+        "priority": 2
+    },
+
+    # International scholarships accessible to Ugandans
+    {
+        "title": "Commonwealth Scholarships",
+        "description": "UK government scholarships for Commonwealth country citizens including Uganda",
+        "amount": "Full funding",
+        "deadline": "October 31, 2025",
+        "category": "International",
+        "source": "https://cscuk.fcdo.gov.uk/",
+        "country": "International",
+        "keywords": "commonwealth,uk,graduate,research,uganda",
+        "goal_type": "student",
+        "priority": 1
+    },
+    {
+        "title": "Chevening Scholarships",
+        "description": "UK government's global scholarship programme for future leaders",
+        "amount": "Full funding + networking",
+        "deadline": "November 7, 2025",
+        "category": "Leadership",
+        "source": "https://www.chevening.org/",
+        "country": "International",
+        "keywords": "chevening,uk,leadership,graduate,masters",
+        "goal_type": "student",
+        "priority": 1
+    },
+    {
+        "title": "Fulbright Foreign Student Program",
+        "description": "US government scholarship for international students including Ugandans",
+        "amount": "Full funding",
+        "deadline": "May 15, 2025",
+        "category": "International",
+        "source": "https://www.fulbright.org/",
+        "country": "International",
+        "keywords": "fulbright,usa,graduate,research,exchange",
+        "goal_type": "student",
+        "priority": 1
+    },
+
+    # Entrepreneurship scholarships
+    {
+        "title": "YALI Regional Leadership Center Scholarship",
+        "description": "Leadership development program for young African entrepreneurs",
+        "amount": "Full program coverage",
+        "deadline": "Quarterly applications",
+        "category": "Entrepreneurship",
+        "source": "https://yali.state.gov/",
+        "country": "Africa",
+        "keywords": "entrepreneurship,leadership,young,african,business",
+        "goal_type": "entrepreneur",
+        "priority": 2
+    },
+    {
+        "title": "Tony Elumelu Foundation Entrepreneurship Programme",
+        "description": "Seed funding and mentorship for African entrepreneurs",
+        "amount": "$5,000 seed funding",
+        "deadline": "January 31, 2025",
+        "category": "Entrepreneurship",
+        "source": "https://www.tonyelumelufoundation.org/",
+        "country": "Africa",
+        "keywords": "entrepreneurship,startup,seed funding,african,business",
+        "goal_type": "entrepreneur",
+        "priority": 2
+    },
+
+    # Research scholarships
+    {
+        "title": "African Institute for Mathematical Sciences Scholarships",
+        "description": "Graduate scholarships in mathematical sciences for African students",
+        "amount": "Full funding",
+        "deadline": "February 28, 2025",
+        "category": "Research",
+        "source": "https://www.aims.ac.za/",
+        "country": "Africa",
+        "keywords": "mathematics,science,research,graduate,african",
+        "goal_type": "researcher",
+        "priority": 2
+    },
+
+    # Arts scholarships
+    {
+        "title": "UNESCO-Aschberg Programme for Artists",
+        "description": "Residency program for young artists from developing countries",
+        "amount": "Residency + stipend",
+        "deadline": "Rolling applications",
+        "category": "Arts",
+        "source": "https://en.unesco.org/",
+        "country": "International",
+        "keywords": "arts,artist,residency,unesco,cultural",
+        "goal_type": "artist",
+        "priority": 1
+    },
+
+    # Nonprofit/social work scholarships
+    {
+        "title": "Acumen Academy Fellowships",
+        "description": "Leadership development for social sector professionals",
+        "amount": "Program coverage",
+        "deadline": "Multiple deadlines",
+        "category": "Social Impact",
+        "source": "https://acumenacademy.org/",
+        "country": "International",
+        "keywords": "social impact,nonprofit,leadership,development",
+        "goal_type": "nonprofit",
+        "priority": 1
+    }
+]
+
+
+def release_database(db_file: str):
+    """Flush a database file's queued writes and close its process-wide pool, writer and caches
+
+    The next ScholarshipCache on the file starts afresh. For tests and tools
+    that open many short-lived databases in one process.
+    """
+    release_write_queue(db_file)
+    release_query_cache(db_file)
+    release_semantic_index(db_file)
+    release_pool(db_file)
+
 
 class ScholarshipCache:
-    """Manages shared scholarship database with intelligent caching"""
+    """Manages shared scholarship database with intelligent caching
+
+    The database also holds the custom sites and user profiles served by
+    DatabaseManager, so the app has one schema, one pool and one write path.
+    Every write after the schema migrations goes through self.writes, one
+    writer thread per process that batches them (core.write_queue).
+    """
     
-    def __init__(self, db_file="cache/scholarships.db"):
+    def __init__(self, db_file=DATABASE_FILE):
         self.db_file = db_file
         os.makedirs(os.path.dirname(db_file), exist_ok=True)
+        self.pool = get_pool(db_file)  # Shared per-thread connections (WAL, mmap, busy_timeout)
+        self.query_cache = get_query_cache(db_file)  # Search results, invalidated by every write
+        self.semantic = get_semantic_index(db_file)  # Nearest-neighbour index of the semantic vectors
+        self._semantic_model = None  # Parsed semantic_model the writer embeds with (_stored_semantic_model)
+        # Single writer: mutations are queued, coalesced into transactions and published per batch
+        self.writes = (get_write_queue(db_file, self.pool.connection, self._on_commit) if WRITE_BEHIND_ENABLED
+                       else DirectWrites(self.pool.connection, self._on_commit))
+        conn = self.pool.connection()
+        # migrations[i] takes the schema from version i to i + 1; append, never edit
+        migrate(conn, [self._create_schema, self._create_user_tables, self._add_match_features,
+                       self._add_semantic_vectors, self._add_search_vocabulary, self._rekey_numbered_titles,
+                       self._add_data_versions, self._rekey_stats_by_geography])
+        self._load_schema_state(conn)
+        self._publish()
+
+    def _publish(self):
+        """Make committed writes visible to searches: drop cached results"""
+        self.query_cache.bump_generation()
+
+    def _on_commit(self, publish: bool):
+        """After a batch of queued writes (bulk_load's chunks too): drop cached results"""
+        self._publish()
+
+    def flush_writes(self, timeout: float = None, durable: bool = False) -> bool:
+        """Wait until queued writes are committed and searchable; durable also syncs them to disk
+
+        Returns False if timeout seconds passed first.
+        """
+        return self.writes.flush(timeout, durable)
+
+    def _create_schema(self, conn):
+        """Version 1: the full schema (idempotent, so it also upgrades pre-versioned databases) and seed data"""
         self.init_database()
         self.populate_initial_data()
+
+    @staticmethod
+    def _create_user_tables(conn):
+        """Version 2: custom sites and user profiles, formerly in DatabaseManager's own database"""
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS custom_sites (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT UNIQUE,
+                added_by TEXT,
+                added_at DATETIME,
+                last_scraped DATETIME,
+                status TEXT,
+                is_public INTEGER DEFAULT 0,
+                popularity INTEGER DEFAULT 0
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS user_profiles (
+                user_id TEXT PRIMARY KEY,
+                profile_data TEXT,
+                created_at DATETIME,
+                updated_at DATETIME
+            )
+        ''')
+
+    def _add_match_features(self, conn):
+        """Version 3: matching vectors and requirements (core.matching), encoded for the existing rows"""
+        self._add_missing_columns(conn, MATCH_COLUMNS)
+        self._add_missing_columns(conn, MATCH_COLUMNS, table='scholarships_archive')
+        with conn:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_scholarships_unencoded {UNENCODED_INDEX}")
+            self._encode_pending(conn.cursor())
+
+    def _add_semantic_vectors(self, conn):
+        """Version 4: semantic vectors (core.semantic), with the model fitted on and embedding the existing rows"""
+        self._add_missing_columns(conn, SEMANTIC_COLUMNS)
+        self._add_missing_columns(conn, SEMANTIC_COLUMNS, table='scholarships_archive')
+        with conn:
+            self._create_semantic_tables(conn.cursor())
+            self._embed_pending(conn.cursor())
+
+    def _add_search_vocabulary(self, conn):
+        """Version 5: the typo-tolerant search vocabulary (core.fuzzy), indexed from the existing rows"""
+        with conn:
+            cursor = conn.cursor()
+            self._create_vocabulary_tables(cursor)
+            if cursor.execute("SELECT 1 FROM search_terms LIMIT 1").fetchone() is None:
+                self._index_vocabulary(cursor, cursor.execute(
+                    "SELECT title, keywords, country FROM scholarships").fetchall())
+
+    def _rekey_numbered_titles(self, conn):
+        """Version 6: content keys of titles holding a year-like number, recomputed since canonical_title
+        keeps numbers outside year positions ("2000 Grant" and "2050 Grant" are two scholarships)"""
+        with conn:
+            for table in ('scholarships', 'scholarships_archive'):
+                rows = conn.execute(
+                    f"SELECT id, title, source, content_key FROM {table} WHERE title GLOB '*[12][09][0-9][0-9]*'"
+                ).fetchall()
+                # A key another row already holds stays as it was: those two were merged before
+                conn.executemany(f"UPDATE OR IGNORE {table} SET content_key = ? WHERE id = ?", [
+                    (key, row_id) for row_id, title, source, old_key in rows
+                    if (key := content_key(title, source)) != old_key
+                ])
+
+    @staticmethod
+    def _add_data_versions(conn):
+        """Version 7: data_versions, the code-side versions stored values were computed with (FX_VERSION)"""
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS data_versions (
+                    name TEXT PRIMARY KEY,
+                    version TEXT NOT NULL
+                ) WITHOUT ROWID
+            ''')
+
+    def _rekey_stats_by_geography(self, conn):
+        """Version 8: scholarship_stats keyed by geography_id instead of the stored country text, so a
+        country's figures are a keyed sum over its search area; rebuilt from the rows"""
+        with conn:
+            for trigger in ('insert', 'update', 'delete'):
+                conn.execute(f"DROP TRIGGER IF EXISTS scholarships_stats_{trigger}")
+            conn.execute("DROP TABLE IF EXISTS scholarship_stats")
+            conn.execute("DROP INDEX IF EXISTS idx_scholarships_group_verified")
+        self._init_stats(conn)
+
+    @staticmethod
+    def _create_semantic_tables(cursor):
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS semantic_model (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version TEXT NOT NULL,
+                fitted_rows INTEGER NOT NULL,
+                vocabulary TEXT NOT NULL,
+                idf BLOB NOT NULL,
+                projection BLOB NOT NULL,
+                last_seq INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_scholarships_unembedded {UNEMBEDDED_INDEX}")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_scholarships_semantic_seq {SEMANTIC_SEQ_INDEX}")
+
+    @staticmethod
+    def _create_vocabulary_tables(cursor):
+        # Words of titles, keywords and places, and the trigrams each word is found by
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS search_terms (
+                term TEXT PRIMARY KEY,
+                trigrams INTEGER NOT NULL,
+                frequency INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS term_trigrams (
+                trigram TEXT NOT NULL,
+                term TEXT NOT NULL,
+                PRIMARY KEY (trigram, term)
+            ) WITHOUT ROWID
+        ''')
+
+    def _load_schema_state(self, conn):
+        """Read what this instance needs to know about an already-migrated schema"""
+        self.fts_enabled = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'scholarships_fts'"
+        ).fetchone() is not None
+        self._archive_columns = [row[1] for row in conn.execute("PRAGMA table_info(scholarships)")]
+        # Rates are code, not schema: a bumped FX_VERSION re-converts stored amounts on the next open
+        applied = conn.execute("SELECT version FROM data_versions WHERE name = 'fx_version'").fetchone()
+        if applied is None or applied[0] != FX_VERSION:
+            self._normalize_amounts(conn)
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO data_versions VALUES ('fx_version', ?)", (FX_VERSION,))
+            self.query_cache.bump_generation()
     
     def init_database(self):
         """Initialize the scholarship cache database"""
-        conn = sqlite3.connect(self.db_file)
+        conn = self.pool.connection()
         cursor = conn.cursor()
+        self._init_auto_vacuum(conn)
         
         # Main scholarships table
         cursor.execute('''
@@ -39,9 +681,59 @@ class ScholarshipCache:
                 priority INTEGER DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 last_verified TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active BOOLEAN DEFAULT 1
+                is_active BOOLEAN DEFAULT 1,
+                content_key TEXT,
+                cluster_id INTEGER,
+                minhash BLOB,
+                deadline_date TEXT,
+                deadline_kind TEXT,
+                amount_min REAL,
+                amount_max REAL,
+                amount_currency TEXT,
+                full_funding INTEGER,
+                amount_min_usd REAL,
+                amount_max_usd REAL,
+                fx_version TEXT,
+                geography_id INTEGER,
+                match_features BLOB,
+                min_gpa REAL,
+                semantic_vector BLOB,
+                semantic_seq INTEGER
             )
         ''')
+        self._add_missing_columns(conn, {'content_key': 'TEXT', 'cluster_id': 'INTEGER', 'minhash': 'BLOB',
+                                         'deadline_date': 'TEXT', 'deadline_kind': 'TEXT',
+                                         'amount_min': 'REAL', 'amount_max': 'REAL', 'amount_currency': 'TEXT',
+                                         'full_funding': 'INTEGER', 'amount_min_usd': 'REAL',
+                                         'amount_max_usd': 'REAL', 'fx_version': 'TEXT',
+                                         'geography_id': 'INTEGER', **MATCH_COLUMNS, **SEMANTIC_COLUMNS})
+        self._migrate_content_keys(conn)
+        self._normalize_deadlines(conn)
+        self._normalize_amounts(conn)
+        self._init_geography(conn)
+
+        # MinHash-LSH buckets for near-duplicate clustering (one row per band)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scholarship_lsh (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                scholarship_id INTEGER NOT NULL,
+                PRIMARY KEY (band, bucket, scholarship_id)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_scholarship_lsh_scholarship
+            ON scholarship_lsh (scholarship_id)
+        ''')
+        # Deleting a cluster's canonical row promotes the oldest remaining member
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS scholarships_cluster_delete AFTER DELETE ON scholarships BEGIN
+                DELETE FROM scholarship_lsh WHERE scholarship_id = old.id;
+                UPDATE scholarships
+                SET cluster_id = (SELECT MIN(id) FROM scholarships WHERE cluster_id = old.id)
+                WHERE cluster_id = old.id AND old.cluster_id = old.id;
+            END
+        ''')
         
         # Cache metadata table
         cursor.execute('''
@@ -54,394 +746,1228 @@ class ScholarshipCache:
                 is_reliable BOOLEAN DEFAULT 1
             )
         ''')
-        
+
+        # Secondary indexes for the hot access paths:
+        # - ingestion: unique content key (canonical title + source domain) for upserts,
+        #   cluster members for re-homing when a canonical row is deleted, rows
+        #   still to be encoded for matching or embedded for semantic search
+        # - semantic index catch-up: rows by the write that embedded them
+        # - search without keywords: active [+ goal] ordered by priority, recency; every
+        #   search index ends with content_key so page cursors seek (SEARCH_ORDERS)
+        # - counts / cache age: scholarship_stats (see _init_stats); its triggers
+        #   re-read a group's newest/oldest last_verified through a partial index
+        # - cleanup: last_verified and deadline_date range scans
+        # - closing-soon search: active rows by deadline_date range, in deadline order
+        # - amount search: active rows by USD value range, largest first
+        # - country search: active rows in the searched place and its ancestors (IN on geography_id)
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_scholarships_content_key
+            ON scholarships (content_key)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_scholarships_cluster
+            ON scholarships (cluster_id)
+        ''')
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_scholarships_unencoded {UNENCODED_INDEX}")
+        self._create_semantic_tables(cursor)
+        self._create_vocabulary_tables(cursor)
+        # Freshness moved from created_at to last_verified, and counts/cache age
+        # to scholarship_stats, and the search orders gained a content_key
+        # tiebreak for keyset pagination, which replaced these indexes
+        for superseded in ('active_created', 'created', 'active_verified', 'active_goal_rank', 'active_rank',
+                           'active_deadline', 'active_amount'):
+            cursor.execute(f"DROP INDEX IF EXISTS idx_scholarships_{superseded}")
+        self._create_search_indexes(cursor)
+
         conn.commit()
-        conn.close()
-    
+        self.fts_enabled = self._init_fulltext_index(conn)
+        self._init_stats(conn)
+        self._init_archive(conn)
+        self._cluster_unassigned(conn)
+        self.query_cache.bump_generation()
+
+    @staticmethod
+    def _create_search_indexes(cursor):
+        for name, definition in SEARCH_INDEXES.items():
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} {definition}")
+
+    def _add_missing_columns(self, conn, columns: Dict[str, str], table: str = 'scholarships'):
+        """Add columns introduced after a database was first created"""
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        with conn:
+            for name, column_type in columns.items():
+                if name not in existing:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}")
+
+    def _init_auto_vacuum(self, conn):
+        """Switch the database to incremental auto-vacuum so maintenance can return free pages
+
+        Once the file header exists (the pool's WAL switch writes it) the mode
+        only changes through a full VACUUM: instant for a new database, a
+        one-time rewrite for an existing one, then only incremental passes run.
+        """
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+            return
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            try:
+                conn.execute("VACUUM")
+            except sqlite3.OperationalError as e:  # Another process is busy; retried on next start
+                print(f"Auto-vacuum conversion postponed: {e}")
+
+    def _init_archive(self, conn):
+        """Create scholarships_archive, where maintenance moves rows that left the hot table
+
+        An archived row is also a tombstone: it records why and when its content
+        key left, so a re-crawl of a closed round is not re-inserted (see
+        add_scholarships). The archive mirrors every scholarships column.
+        """
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS scholarships_archive AS SELECT * FROM scholarships WHERE 0")
+        hot_columns = {row[1]: row[2] or 'TEXT' for row in conn.execute("PRAGMA table_info(scholarships)")}
+        self._add_missing_columns(conn, dict(hot_columns, archived_at='TIMESTAMP', archive_reason='TEXT'),
+                                  table='scholarships_archive')
+        with conn:
+            conn.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_scholarships_archive_content_key
+                ON scholarships_archive (content_key)
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS maintenance_log (
+                    task TEXT PRIMARY KEY,
+                    last_run TIMESTAMP NOT NULL
+                )
+            ''')
+            conn.execute("INSERT OR IGNORE INTO maintenance_log VALUES ('maintenance', '1970-01-01 00:00:00')")
+
+    def _migrate_content_keys(self, conn):
+        """Backfill content keys on older databases and collapse rows that share one"""
+        with conn:
+            pending = conn.execute(
+                "SELECT id, title, source FROM scholarships WHERE content_key IS NULL"
+            ).fetchall()
+            if not pending:
+                return
+            conn.executemany(
+                "UPDATE scholarships SET content_key = ? WHERE id = ?",
+                [(content_key(title, source), row_id) for row_id, title, source in pending]
+            )
+            # Keep the oldest copy of each scholarship so the unique index can be built
+            removed = conn.execute('''
+                DELETE FROM scholarships
+                WHERE id NOT IN (SELECT MIN(id) FROM scholarships GROUP BY content_key)
+            ''').rowcount
+        if removed:
+            print(f"🧹 Merged {removed} duplicate scholarships while adding content keys")
+
+    def _normalize_deadlines(self, conn) -> int:
+        """Parse free-text deadlines of rows stored before deadline_date existed"""
+        with conn:
+            pending = conn.execute(
+                "SELECT id, deadline FROM scholarships WHERE deadline_kind IS NULL"
+            ).fetchall()
+            conn.executemany(
+                "UPDATE scholarships SET deadline_date = ?, deadline_kind = ? WHERE id = ?",
+                [parse_deadline(deadline) + (row_id,) for row_id, deadline in pending]
+            )
+        return len(pending)
+
+    def _normalize_amounts(self, conn) -> int:
+        """Parse free-text amounts of rows never parsed or converted with older FX rates"""
+        with conn:
+            pending = conn.execute(
+                "SELECT id, amount FROM scholarships WHERE fx_version IS NOT ?", (FX_VERSION,)
+            ).fetchall()
+            conn.executemany('''
+                UPDATE scholarships SET amount_min = ?, amount_max = ?, amount_currency = ?, full_funding = ?,
+                    amount_min_usd = ?, amount_max_usd = ?, fx_version = ?
+                WHERE id = ?
+            ''', [normalize_amount(amount) + (row_id,) for row_id, amount in pending])
+        return len(pending)
+
+    def _init_geography(self, conn):
+        """Create the geography hierarchy (core.geography) and tag untagged scholarships
+
+        Node ids are assigned once by name, so they stay stable when
+        COUNTRY_CONFIG grows; scholarships point at a node with geography_id.
+        """
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS geography (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+                    parent_id INTEGER REFERENCES geography (id),
+                    level TEXT NOT NULL
+                )
+            ''')
+            conn.executemany('''
+                INSERT INTO geography (name, parent_id, level)
+                VALUES (?, (SELECT id FROM geography WHERE name = ?), ?)
+                ON CONFLICT (name) DO UPDATE SET parent_id = excluded.parent_id, level = excluded.level
+            ''', list(hierarchy()))
+            pending = conn.execute(
+                "SELECT id, country FROM scholarships WHERE geography_id IS NULL AND country IS NOT NULL"
+            ).fetchall()
+            places = self._place_ids(conn.cursor(), {country for _, country in pending})
+            conn.executemany("UPDATE scholarships SET geography_id = ? WHERE id = ?",
+                             [(places[country], row_id) for row_id, country in pending])
+
+    @staticmethod
+    def _place_ids(cursor, countries) -> Dict[str, Optional[int]]:
+        """geography ids of stored country values; unknown places are filed under International"""
+        ids = {}
+        for country in countries:
+            place = canonical_place(country)
+            if place is None:
+                ids[country] = None
+                continue
+            row = cursor.execute("SELECT id FROM geography WHERE name = ?", (place,)).fetchone()
+            if row is None:
+                cursor.execute('''
+                    INSERT INTO geography (name, parent_id, level)
+                    VALUES (?, (SELECT id FROM geography WHERE name = ?), ?)
+                ''', (place, INTERNATIONAL, LEVEL_PLACE))
+                row = (cursor.lastrowid,)
+            ids[country] = row[0]
+        return ids
+
+    def _search_area(self, country: str) -> List[int]:
+        """geography ids a country search covers: the place, its region and continent, and International"""
+        rows = self.pool.connection().execute('''
+            WITH RECURSIVE area (id, parent_id) AS (
+                SELECT id, parent_id FROM geography WHERE name IN (?, ?)
+                UNION
+                SELECT g.id, g.parent_id FROM geography g JOIN area ON g.id = area.parent_id
+            )
+            SELECT id FROM area ORDER BY id
+        ''', (canonical_place(country), INTERNATIONAL)).fetchall()
+        return [row[0] for row in rows]
+
+    def _area_scores(self, country: str) -> Dict[int, float]:
+        """How closely each geography id matches a searched place: 1 for the place, less per level up
+
+        For a country: the country 1, its region 0.75, continent 0.5 and
+        International 0.25 (core.ranking's geography signal).
+        """
+        rows = self.pool.connection().execute('''
+            WITH RECURSIVE area (id, parent_id, depth) AS (
+                SELECT id, parent_id, 0 FROM geography WHERE name = ?
+                UNION ALL
+                SELECT g.id, g.parent_id, area.depth + 1 FROM geography g JOIN area ON g.id = area.parent_id
+            )
+            SELECT id, depth FROM area
+        ''', (canonical_place(country),)).fetchall()
+        return {geography_id: 1 - depth / len(rows) for geography_id, depth in rows}
+
+    def _init_fulltext_index(self, conn) -> bool:
+        """Create the FTS5 index over scholarships and keep it in sync via triggers"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'scholarships_fts'"
+        ).fetchone()
+        try:
+            with conn:
+                conn.execute('''
+                    CREATE VIRTUAL TABLE IF NOT EXISTS scholarships_fts USING fts5(
+                        title, description, keywords,
+                        content='scholarships', content_rowid='id',
+                        tokenize='porter unicode61 remove_diacritics 2',
+                        prefix='2 3'
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS scholarships_fts_insert AFTER INSERT ON scholarships BEGIN
+                        INSERT INTO scholarships_fts(rowid, title, description, keywords)
+                        VALUES (new.id, new.title, new.description, new.keywords);
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS scholarships_fts_delete AFTER DELETE ON scholarships BEGIN
+                        INSERT INTO scholarships_fts(scholarships_fts, rowid, title, description, keywords)
+                        VALUES ('delete', old.id, old.title, old.description, old.keywords);
+                    END
+                ''')
+                conn.execute('''
+                    CREATE TRIGGER IF NOT EXISTS scholarships_fts_update
+                    AFTER UPDATE OF title, description, keywords ON scholarships
+                    WHEN old.title IS NOT new.title OR old.description IS NOT new.description
+                      OR old.keywords IS NOT new.keywords BEGIN
+                        INSERT INTO scholarships_fts(scholarships_fts, rowid, title, description, keywords)
+                        VALUES ('delete', old.id, old.title, old.description, old.keywords);
+                        INSERT INTO scholarships_fts(rowid, title, description, keywords)
+                        VALUES (new.id, new.title, new.description, new.keywords);
+                    END
+                ''')
+                if not exists:
+                    # Index rows written before the FTS table existed
+                    conn.execute("INSERT INTO scholarships_fts(scholarships_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable, falling back to LIKE matching: {e}")
+            return False
+
+    def _init_stats(self, conn):
+        """Create scholarship_stats: active counts and freshness per (geography_id, goal_type)
+
+        Triggers keep it current, so counts and cache age are keyed lookups
+        instead of scans: a country's figures sum the rows of its search area's
+        geography ids. Counts move by one per write; newest/oldest
+        last_verified of a group a row leaves are re-read with a MIN/MAX seek on
+        idx_scholarships_group_verified. Rows without a place are stored under
+        geography_id 0 and NULL goal_type as ''; goal types compare NOCASE,
+        as the stats key does.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'scholarship_stats'"
+        ).fetchone()
+        group_of = lambda row: f'''
+            COALESCE(geography_id, 0) = COALESCE({row}.geography_id, 0)
+            AND COALESCE(goal_type, '') = COALESCE({row}.goal_type, '') COLLATE NOCASE AND is_active = 1
+        '''
+        leave_group = lambda row: f'''
+            UPDATE scholarship_stats SET
+                active_count = active_count - 1,
+                newest_verified = (SELECT MAX(last_verified) FROM scholarships WHERE {group_of(row)}),
+                oldest_verified = (SELECT MIN(last_verified) FROM scholarships WHERE {group_of(row)})
+            WHERE geography_id = COALESCE({row}.geography_id, 0) AND goal_type = COALESCE({row}.goal_type, '')
+              AND {row}.is_active = 1;
+        '''
+        join_group = lambda row: f'''
+            INSERT INTO scholarship_stats (geography_id, goal_type, active_count, newest_verified, oldest_verified)
+            SELECT COALESCE({row}.geography_id, 0), COALESCE({row}.goal_type, ''), 1,
+                   {row}.last_verified, {row}.last_verified
+            WHERE {row}.is_active = 1
+            ON CONFLICT (geography_id, goal_type) DO UPDATE SET
+                active_count = active_count + 1,
+                newest_verified = MAX(COALESCE(newest_verified, excluded.newest_verified), excluded.newest_verified),
+                oldest_verified = MIN(COALESCE(oldest_verified, excluded.oldest_verified), excluded.oldest_verified);
+        '''
+        with conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS scholarship_stats (
+                    geography_id INTEGER NOT NULL,
+                    goal_type TEXT NOT NULL COLLATE NOCASE,
+                    active_count INTEGER NOT NULL DEFAULT 0,
+                    newest_verified TIMESTAMP,
+                    oldest_verified TIMESTAMP,
+                    PRIMARY KEY (geography_id, goal_type)
+                ) WITHOUT ROWID
+            ''')
+            # The group expressions of group_of, so a group's MIN/MAX is one seek
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_scholarships_group_verified
+                ON scholarships (COALESCE(geography_id, 0), COALESCE(goal_type, '') COLLATE NOCASE, last_verified)
+                WHERE is_active = 1
+            ''')
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS scholarships_stats_insert AFTER INSERT ON scholarships BEGIN
+                    {join_group('new')}
+                END
+            ''')
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS scholarships_stats_delete AFTER DELETE ON scholarships BEGIN
+                    {leave_group('old')}
+                END
+            ''')
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS scholarships_stats_update
+                AFTER UPDATE OF geography_id, goal_type, is_active, last_verified ON scholarships
+                WHEN old.geography_id IS NOT new.geography_id OR old.goal_type IS NOT new.goal_type
+                  OR old.is_active IS NOT new.is_active OR old.last_verified IS NOT new.last_verified BEGIN
+                    {leave_group('old')}
+                    {join_group('new')}
+                END
+            ''')
+            if not exists:
+                # Count rows written before the stats table existed
+                conn.execute('''
+                    INSERT INTO scholarship_stats
+                    SELECT COALESCE(geography_id, 0), COALESCE(goal_type, ''), COUNT(*),
+                           MAX(last_verified), MIN(last_verified)
+                    FROM scholarships WHERE is_active = 1
+                    GROUP BY COALESCE(geography_id, 0), COALESCE(goal_type, '') COLLATE NOCASE
+                ''')
+
     def populate_initial_data(self):
-        """Populate database with initial scholarship data"""
+        """Populate database with initial scholarship data
+
+        A corpus snapshot next to the database (SEED_CORPUS_FILES, written by
+        python -m core.corpus export) is bulk-loaded instead of the built-in list.
+        """
         if self.get_scholarship_count() > 0:
             return  # Already populated
+
+        for name in SEED_CORPUS_FILES:
+            snapshot = os.path.join(os.path.dirname(self.db_file), name)
+            if os.path.exists(snapshot):
+                from .corpus import read_corpus
+                counts = self.bulk_load(read_corpus(snapshot))
+                print(f"✅ Populated database with {counts['inserted']} scholarships from {name}")
+                return
         
-        # Comprehensive scholarship data with focus on Uganda and Africa
-        initial_scholarships = [
-            # Uganda-specific scholarships
-            {
-                "title": "Makerere University Excellence Scholarship",
-                "description": "Merit-based scholarship for outstanding Ugandan students pursuing undergraduate degrees at Makerere University",
-                "amount": "Full tuition + stipend",
-                "deadline": "March 15, 2025",
-                "category": "Academic Excellence",
-                "source": "https://www.mak.ac.ug/scholarships",
-                "country": "Uganda",
-                "keywords": "undergraduate,excellence,merit,makerere",
-                "goal_type": "student",
-                "priority": 3
-            },
-            {
-                "title": "Uganda Government Scholarship Scheme",
-                "description": "Government-sponsored scholarships for Ugandan citizens in STEM fields",
-                "amount": "Full tuition + living allowance",
-                "deadline": "April 30, 2025",
-                "category": "Government",
-                "source": "https://www.education.go.ug/scholarships",
-                "country": "Uganda",
-                "keywords": "government,stem,science,engineering,technology",
-                "goal_type": "student",
-                "priority": 3
-            },
-            {
-                "title": "Kampala International University Bursary",
-                "description": "Need-based financial assistance for deserving students at KIU",
-                "amount": "50-75% tuition coverage",
-                "deadline": "June 1, 2025",
-                "category": "Financial Aid",
-                "source": "https://www.kiu.ac.ug/bursaries",
-                "country": "Uganda",
-                "keywords": "financial aid,need-based,undergraduate",
-                "goal_type": "student",
-                "priority": 3
-            },
-            {
-                "title": "Uganda Christian University Scholarship",
-                "description": "Academic and leadership scholarships for UCU students",
-                "amount": "Varies",
-                "deadline": "February 28, 2025",
-                "category": "Leadership",
-                "source": "https://www.ucu.ac.ug/scholarships",
-                "country": "Uganda",
-                "keywords": "leadership,academic,christian,undergraduate",
-                "goal_type": "student",
-                "priority": 3
-            },
-            
-            # East African scholarships
-            {
-                "title": "East African Community Scholarship",
-                "description": "Regional scholarships for students from EAC member countries",
-                "amount": "$5,000 - $15,000",
-                "deadline": "May 15, 2025",
-                "category": "Regional",
-                "source": "https://www.eac.int/scholarships",
-                "country": "East Africa",
-                "keywords": "regional,east africa,undergraduate,graduate",
-                "goal_type": "student",
-                "priority": 2
-            },
-            
-            # African scholarships
-            {
-                "title": "Mastercard Foundation Scholars Program",
-                "description": "Comprehensive scholarship for academically talented African students",
-                "amount": "Full scholarship + mentorship",
-                "deadline": "Rolling applications",
-                "category": "Foundation",
-                "source": "https://mastercardfdn.org/scholars/",
-                "country": "Africa",
-                "keywords": "mastercard,foundation,african,leadership,undergraduate,graduate",
-                "goal_type": "student",
-                "priority": 2
-            },
-            {
-                "title": "African Union Scholarship Programme",
-                "description": "Continental scholarship program for African students",
-                "amount": "Full tuition + allowances",
-                "deadline": "March 31, 2025",
-                "category": "Continental",
-                "source": "https://au.int/en/scholarships",
-                "country": "Africa",
-                "keywords": "african union,continental,graduate,research",
-                "goal_type": "student",
-                "priority": 2
-            },
-            
-            # International scholarships accessible to Ugandans
-            {
-                "title": "Commonwealth Scholarships",
-                "description": "UK government scholarships for Commonwealth country citizens including Uganda",
-                "amount": "Full funding",
-                "deadline": "October 31, 2025",
-                "category": "International",
-                "source": "https://cscuk.fcdo.gov.uk/",
-                "country": "International",
-                "keywords": "commonwealth,uk,graduate,research,uganda",
-                "goal_type": "student",
-                "priority": 1
-            },
-            {
-                "title": "Chevening Scholarships",
-                "description": "UK government's global scholarship programme for future leaders",
-                "amount": "Full funding + networking",
-                "deadline": "November 7, 2025",
-                "category": "Leadership",
-                "source": "https://www.chevening.org/",
-                "country": "International",
-                "keywords": "chevening,uk,leadership,graduate,masters",
-                "goal_type": "student",
-                "priority": 1
-            },
-            {
-                "title": "Fulbright Foreign Student Program",
-                "description": "US government scholarship for international students including Ugandans",
-                "amount": "Full funding",
-                "deadline": "May 15, 2025",
-                "category": "International",
-                "source": "https://www.fulbright.org/",
-                "country": "International",
-                "keywords": "fulbright,usa,graduate,research,exchange",
-                "goal_type": "student",
-                "priority": 1
-            },
-            
-            # Entrepreneurship scholarships
-            {
-                "title": "YALI Regional Leadership Center Scholarship",
-                "description": "Leadership development program for young African entrepreneurs",
-                "amount": "Full program coverage",
-                "deadline": "Quarterly applications",
-                "category": "Entrepreneurship",
-                "source": "https://yali.state.gov/",
-                "country": "Africa",
-                "keywords": "entrepreneurship,leadership,young,african,business",
-                "goal_type": "entrepreneur",
-                "priority": 2
-            },
-            {
-                "title": "Tony Elumelu Foundation Entrepreneurship Programme",
-                "description": "Seed funding and mentorship for African entrepreneurs",
-                "amount": "$5,000 seed funding",
-                "deadline": "January 31, 2025",
-                "category": "Entrepreneurship",
-                "source": "https://www.tonyelumelufoundation.org/",
-                "country": "Africa",
-                "keywords": "entrepreneurship,startup,seed funding,african,business",
-                "goal_type": "entrepreneur",
-                "priority": 2
-            },
-            
-            # Research scholarships
-            {
-                "title": "African Institute for Mathematical Sciences Scholarships",
-                "description": "Graduate scholarships in mathematical sciences for African students",
-                "amount": "Full funding",
-                "deadline": "February 28, 2025",
-                "category": "Research",
-                "source": "https://www.aims.ac.za/",
-                "country": "Africa",
-                "keywords": "mathematics,science,research,graduate,african",
-                "goal_type": "researcher",
-                "priority": 2
-            },
-            
-            # Arts scholarships
-            {
-                "title": "UNESCO-Aschberg Programme for Artists",
-                "description": "Residency program for young artists from developing countries",
-                "amount": "Residency + stipend",
-                "deadline": "Rolling applications",
-                "category": "Arts",
-                "source": "https://en.unesco.org/",
-                "country": "International",
-                "keywords": "arts,artist,residency,unesco,cultural",
-                "goal_type": "artist",
-                "priority": 1
-            },
-            
-            # Nonprofit/social work scholarships
-            {
-                "title": "Acumen Academy Fellowships",
-                "description": "Leadership development for social sector professionals",
-                "amount": "Program coverage",
-                "deadline": "Multiple deadlines",
-                "category": "Social Impact",
-                "source": "https://acumenacademy.org/",
-                "country": "International",
-                "keywords": "social impact,nonprofit,leadership,development",
-                "goal_type": "nonprofit",
-                "priority": 1
-            }
-        ]
-        
-        self.add_scholarships(initial_scholarships)
-        print(f"✅ Populated database with {len(initial_scholarships)} scholarships")
+        self.add_scholarships(SEED_SCHOLARSHIPS)
+        print(f"✅ Populated database with {len(SEED_SCHOLARSHIPS)} scholarships")
     
-    def add_scholarships(self, scholarships: List[Dict]):
-        """Add multiple scholarships to the database"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        for scholarship in scholarships:
-            cursor.execute('''
-                INSERT OR REPLACE INTO scholarships 
-                (title, description, amount, deadline, category, source, country, keywords, goal_type, priority)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                scholarship.get('title'),
-                scholarship.get('description'),
-                scholarship.get('amount'),
-                scholarship.get('deadline'),
-                scholarship.get('category'),
-                scholarship.get('source'),
-                scholarship.get('country'),
-                scholarship.get('keywords'),
-                scholarship.get('goal_type'),
-                scholarship.get('priority', 1)
-            ))
-        
-        conn.commit()
-        conn.close()
+    def add_scholarships(self, scholarships: Iterable[Dict],
+                         chunk_size: int = INGEST_CHUNK_SIZE) -> Dict[str, int]:
+        """Add or refresh scholarships (upsert on the content key)
+
+        A scholarship seen again on the same site updates the stored row and its
+        last_verified timestamp instead of appending a duplicate. Any iterable
+        works, including generators: rows are written with executemany in
+        transactions of chunk_size rows, so large imports stream. New rows are
+        clustered with their near-duplicates in the same transaction, and
+        searches see each chunk once it is committed.
+
+        A key archived past its deadline stays archived (counted as unchanged)
+        unless the crawl reports a later deadline, i.e. a new round; any other
+        archived key is restored and its tombstone dropped.
+
+        Chunks are parsed on the calling thread and applied by the writer
+        thread (small chunks from concurrent callers share a transaction).
+        Returns counts of inserted, updated and unchanged rows once every
+        chunk is committed and searchable.
+        """
+        return self._ingest(scholarships, chunk_size, publish=True)
+
+    def queue_scholarships(self, scholarships: Iterable[Dict]) -> Future:
+        """add_scholarships without waiting: returns a Future of its counts
+
+        For the scrapers, so a foreground search never waits on the database;
+        the rows are searchable once the future is done (see flush_writes).
+        """
+        return self.writes.submit_rows(self._ingest_rows, [self._upsert_params(s) for s in scholarships],
+                                       collect=count_outcomes)
+
+    def _ingest(self, scholarships: Iterable[Dict], chunk_size: int, publish: bool) -> Dict[str, int]:
+        """add_scholarships' loop: queues one row job per chunk, at most WRITE_IN_FLIGHT_CHUNKS unfinished"""
+        counts = dict.fromkeys(INGEST_OUTCOMES, 0)
+        in_flight = deque()
+
+        def wait_oldest():
+            for outcome, count in in_flight.popleft().result().items():
+                counts[outcome] += count
+
+        for chunk in chunked(scholarships, chunk_size):
+            in_flight.append(self.writes.submit_rows(
+                self._ingest_rows, [self._upsert_params(s) for s in chunk], publish, collect=count_outcomes))
+            if len(in_flight) >= WRITE_IN_FLIGHT_CHUNKS:
+                wait_oldest()
+        while in_flight:
+            wait_oldest()
+        return counts
+
+    def _ingest_rows(self, cursor, params: List[tuple]) -> List[str]:
+        """Upsert _upsert_params rows in cursor's transaction; returns each row's outcome (INGEST_OUTCOMES)"""
+        places = self._place_ids(cursor, {row[7] for row in params})
+        rows = [row + (places[row[7]],) for row in params]
+        stored = self._stored_columns(cursor, {row[0] for row in rows})
+        tombstones = self._tombstones(cursor, {row[0] for row in rows} - stored.keys())
+        writes, touches, restored, outcomes = [], [], [], []
+        for row in rows:
+            key = row[0]
+            current = stored.get(key)
+            if current is None and key in tombstones:
+                reason, closed_deadline = tombstones[key]
+                if reason == 'past_deadline' and (row[11] or '') <= (closed_deadline or ''):
+                    outcomes.append('unchanged')  # The closed round, seen again
+                    continue
+                restored.append((key,))
+                del tombstones[key]
+            merged = self._merge_columns(current, row)
+            if current is None:
+                outcomes.append('inserted')
+                writes.append(row)
+            elif merged != current:
+                outcomes.append('updated')
+                writes.append(row)
+            else:
+                outcomes.append('unchanged')
+                touches.append((key,))
+            stored[key] = merged  # Repeats within the transaction compare against this write
+
+        cursor.executemany(UPSERT_SCHOLARSHIP_SQL, writes)
+        cursor.executemany(TOUCH_SCHOLARSHIP_SQL, touches)
+        cursor.executemany("DELETE FROM scholarships_archive WHERE content_key = ?", restored)
+        self._cluster_pending(cursor)
+        self._encode_pending(cursor)
+        self._embed_pending(cursor)
+        self._index_vocabulary(cursor, [(row[1], row[8], row[7]) for row in writes])
+        return outcomes
+
+    def bulk_load(self, scholarships: Iterable[Dict], chunk_size: int = INGEST_CHUNK_SIZE) -> Dict[str, int]:
+        """add_scholarships for large loads: search indexes and full-text are built after the rows
+
+        SEARCH_INDEXES and the full-text triggers are dropped for the load, so
+        each row only maintains the content-key index, then the indexes are
+        rebuilt in one sorted pass each and the full-text index from the
+        table. Meant for seeding and imports: searches running meanwhile are
+        slower and keyword search misses the new rows until the load ends.
+        """
+        self.writes.run(self._drop_search_indexes, publish=None)
+        try:
+            return self._ingest(scholarships, chunk_size, publish=False)
+        finally:
+            self.writes.run(self._rebuild_search_indexes)
+
+    def _drop_search_indexes(self, conn):
+        with conn:
+            for name in SEARCH_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            if self.fts_enabled:
+                for trigger in ('insert', 'delete', 'update'):
+                    conn.execute(f"DROP TRIGGER IF EXISTS scholarships_fts_{trigger}")
+
+    def _rebuild_search_indexes(self, conn):
+        with conn:
+            self._create_search_indexes(conn.cursor())
+        if self.fts_enabled:
+            self._init_fulltext_index(conn)
+            with conn:
+                conn.execute("INSERT INTO scholarships_fts(scholarships_fts) VALUES ('rebuild')")
+
+    def iter_scholarships(self, columns: Iterable[str], batch_size: int = 1000) -> Iterable[Dict]:
+        """Yield the given columns of every active scholarship in id order, batch_size rows per query"""
+        select = ', '.join(columns)
+        cursor = self.pool.connection().cursor()
+        last_id = 0
+        while True:
+            rows = cursor.execute(
+                f"SELECT id, {select} FROM scholarships WHERE id > ? AND is_active = 1 ORDER BY id LIMIT ?",
+                (last_id, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            names = [description[0] for description in cursor.description][1:]
+            for row in rows:
+                yield dict(zip(names, row[1:]))
+            last_id = rows[-1][0]
+
+    @staticmethod
+    def _upsert_params(scholarship: Dict) -> tuple:
+        """UPSERT_SCHOLARSHIP_SQL parameters for one scholarship (content key first), less geography_id"""
+        return (
+            content_key(scholarship.get('title'), scholarship.get('source')),
+            scholarship.get('title'),
+            scholarship.get('description'),
+            scholarship.get('amount'),
+            scholarship.get('deadline'),
+            scholarship.get('category'),
+            scholarship.get('source'),
+            scholarship.get('country'),
+            scholarship.get('keywords'),
+            scholarship.get('goal_type'),
+            scholarship.get('priority', 1)
+        ) + parse_deadline(scholarship.get('deadline')) + normalize_amount(scholarship.get('amount'))
+
+    @staticmethod
+    def _stored_columns(cursor, keys) -> Dict[str, tuple]:
+        """REFRESHED_COLUMNS of the stored rows for the given content keys"""
+        stored = {}
+        for batch in chunked(keys, KEY_LOOKUP_BATCH):
+            placeholders = ', '.join('?' * len(batch))
+            for row in cursor.execute(
+                f"SELECT content_key, {', '.join(REFRESHED_COLUMNS)} FROM scholarships "
+                f"WHERE content_key IN ({placeholders})", batch
+            ):
+                stored[row[0]] = tuple(row[1:])
+        return stored
+
+    @staticmethod
+    def _tombstones(cursor, keys) -> Dict[str, tuple]:
+        """(archive_reason, deadline_date) of archived rows for the given content keys"""
+        tombstones = {}
+        for batch in chunked(keys, KEY_LOOKUP_BATCH):
+            placeholders = ', '.join('?' * len(batch))
+            for key, reason, deadline_date in cursor.execute(
+                f"SELECT content_key, archive_reason, deadline_date FROM scholarships_archive "
+                f"WHERE content_key IN ({placeholders})", batch
+            ):
+                tombstones[key] = (reason, deadline_date)
+        return tombstones
+
+    @staticmethod
+    def _merge_columns(current: Optional[tuple], row: tuple) -> tuple:
+        """REFRESHED_COLUMNS as they will be after upserting row (mirrors the SQL)"""
+        incoming = row[2:10]
+        priority = row[10]
+        parsed_deadline = row[11:13]
+        parsed_amount = row[13:20]
+        geography = row[20:21]
+        if current is None:
+            return tuple(incoming) + (priority, 1) + parsed_deadline + parsed_amount + geography
+        merged = tuple(new if new is not None else old for new, old in zip(incoming, current[:8]))
+        stored_priority = current[8]
+        if priority is not None and stored_priority is not None:
+            priority = max(priority, stored_priority)
+        elif priority is None:
+            priority = stored_priority
+        if row[4] is None:  # No deadline text: the stored parse is kept
+            parsed_deadline = current[10:12]
+        if row[3] is None:  # Likewise for the amount
+            parsed_amount = current[12:19]
+        if row[7] is None:  # And the geography of the country
+            geography = current[19:20]
+        return merged + (priority, 1) + parsed_deadline + parsed_amount + geography
+
+    def _assign_cluster(self, cursor, row_id: int, title: str, description: str) -> int:
+        """Join the cluster of the closest near-duplicate, or start a new one"""
+        signature, buckets = title_signature(title)
+
+        # Read at most MAX_BUCKET_CANDIDATES per band and compare the rows that
+        # share the most bands, so ingest stays linear even for crowded buckets
+        per_band = ' UNION ALL '.join(['''
+            SELECT * FROM (SELECT scholarship_id FROM scholarship_lsh
+                           WHERE band = ? AND bucket = ? ORDER BY scholarship_id DESC LIMIT ?)
+        '''] * LSH_BANDS)
+        params = [value for band, bucket in enumerate(buckets)
+                  for value in (band, bucket, MAX_BUCKET_CANDIDATES)]
+        candidates = cursor.execute(f'''
+            SELECT s.id, s.cluster_id, s.title, s.description, s.minhash
+            FROM (SELECT scholarship_id, COUNT(*) AS hits FROM ({per_band})
+                  GROUP BY scholarship_id ORDER BY hits DESC LIMIT ?) c
+            JOIN scholarships s ON s.id = c.scholarship_id
+            WHERE s.id != ? AND s.cluster_id IS NOT NULL AND s.minhash IS NOT NULL
+        ''', params + [MAX_CANDIDATES, row_id]).fetchall()
+
+        cluster_id, best_similarity = row_id, 0.0
+        for _, other_cluster, other_title, other_description, blob in candidates:
+            similarity = estimated_similarity(signature, unpack_signature(blob))
+            if similarity > best_similarity and is_near_duplicate(
+                    similarity, title, other_title, description or '', other_description or ''):
+                cluster_id, best_similarity = other_cluster, similarity
+
+        cursor.executemany(
+            "INSERT OR IGNORE INTO scholarship_lsh (band, bucket, scholarship_id) VALUES (?, ?, ?)",
+            [(band, bucket, row_id) for band, bucket in enumerate(buckets)]
+        )
+        cursor.execute(
+            "UPDATE scholarships SET cluster_id = ?, minhash = ? WHERE id = ?",
+            (cluster_id, pack_signature(signature), row_id)
+        )
+        return cluster_id
+
+    def _cluster_unassigned(self, conn) -> int:
+        """Cluster rows written without a cluster (older databases, bulk SQL loads)"""
+        with conn:
+            return self._cluster_pending(conn.cursor())
+
+    def _cluster_pending(self, cursor) -> int:
+        """Assign clusters to every row that has none yet, oldest first"""
+        pending = cursor.execute(
+            "SELECT id, title, description FROM scholarships WHERE cluster_id IS NULL ORDER BY id"
+        ).fetchall()
+        for row_id, title, description in pending:
+            self._assign_cluster(cursor, row_id, title, description)
+        return len(pending)
     
+    @staticmethod
+    def _encode_pending(cursor) -> int:
+        """Encode the matching vector and requirements of every row written since its last encoding"""
+        pending = cursor.execute(
+            "SELECT id, title, description, keywords, category FROM scholarships WHERE match_features IS NULL"
+        ).fetchall()
+        cursor.executemany(
+            "UPDATE scholarships SET match_features = ?, min_gpa = ? WHERE id = ?",
+            [encode_scholarship({'title': title, 'description': description, 'keywords': keywords,
+                                 'category': category}) + (row_id,)
+             for row_id, title, description, keywords, category in pending]
+        )
+        return len(pending)
+
+    def best_matches(self, profile: Dict, goal: str = None, country: str = None, limit: int = 20) -> List[Dict]:
+        """The scholarships a user profile fits best, each with its match_score
+
+        The profile's topics (major, field of study, research area...) are
+        scored against every active scholarship's vector at once; goal, the
+        profile's GPA (gpa_4_0), country (defaults to the profile's) and open
+        deadlines filter them (see core.matching.MatchIndex.best). One row per
+        near-duplicate cluster. The index is built once per published corpus.
+        """
+        country = country or profile.get('country')
+        index = self.query_cache.get_or_compute(('match-index',), self._build_match_index)
+        area_scores = (self._area_scores(country) if country else None) or None  # Unknown place: anywhere
+        matches = index.best(profile, goal, area_scores, limit)
+        rows = self._rows_by_id([row_id for row_id, _ in matches])
+        return [dict(rows[row_id], match_score=match_score) for row_id, match_score in matches if row_id in rows]
+
+    def _build_match_index(self) -> MatchIndex:
+        return MatchIndex(self.pool.connection().execute('''
+            SELECT s.id, s.match_features, s.min_gpa, s.goal_type, s.geography_id, s.deadline_date
+            FROM scholarships s
+            WHERE s.is_active = 1 AND NOT EXISTS (
+                SELECT 1 FROM scholarships m WHERE m.cluster_id = s.cluster_id AND m.id < s.id AND m.is_active = 1
+            )
+            ORDER BY s.id
+        ''').fetchall())
+
+    @staticmethod
+    def _index_vocabulary(cursor, texts: Iterable[Tuple[str, str, str]]):
+        """Add the words of written (title, keywords, country) to the search vocabulary, trigrams for new words
+
+        A word's frequency counts the row writes that had it and is never
+        decremented; it only breaks ties between equally similar corrections.
+        """
+        counts = Counter(word for title, keywords, country in texts
+                         for word in vocabulary_words(title, keywords, country))
+        known = set()
+        for batch in chunked(counts, KEY_LOOKUP_BATCH):
+            known.update(row[0] for row in cursor.execute(
+                f"SELECT term FROM search_terms WHERE term IN ({', '.join('?' * len(batch))})", batch))
+        new = [word for word in counts if word not in known]
+        cursor.executemany("UPDATE search_terms SET frequency = frequency + ? WHERE term = ?",
+                           [(counts[word], word) for word in known])
+        cursor.executemany("INSERT INTO search_terms (term, trigrams, frequency) VALUES (?, ?, ?)",
+                           [(word, len(trigrams(word)), counts[word]) for word in new])
+        cursor.executemany("INSERT OR IGNORE INTO term_trigrams (trigram, term) VALUES (?, ?)",
+                           [(trigram, word) for word in new for trigram in trigrams(word)])
+
+    def suggest_keywords(self, keywords: List[str]) -> Optional[List[str]]:
+        """The keywords with misspelled words corrected ("scholaship" -> "scholarship"), or None if none was
+
+        Only words that find no active scholarship are corrected, each to the
+        vocabulary word (titles, keywords, places) most similar by trigrams,
+        at least FUZZY_SIMILARITY (core.fuzzy), that does. Served from the
+        query cache until the next write.
+        """
+        if not keywords:
+            return None
+        corrected = self.query_cache.get_or_compute(('suggest', tuple(keywords)), lambda: correct_keywords(
+            keywords, self._finds_word, self._vocabulary_candidates))
+        return list(corrected) if corrected else None
+
+    def _corrected_keywords(self, keywords: List[str]) -> List[str]:
+        """What a fuzzy search matches: the suggested keywords, or the keywords themselves"""
+        return (self.suggest_keywords(keywords) or keywords) if keywords else keywords
+
+    def _finds_word(self, word: str) -> bool:
+        conn = self.pool.connection()
+        if self.fts_enabled:
+            # CROSS JOIN keeps the match driving; the planner would rather scan active rows and probe each
+            return conn.execute('''
+                SELECT 1 FROM scholarships_fts CROSS JOIN scholarships s ON s.id = scholarships_fts.rowid
+                WHERE scholarships_fts MATCH ? AND s.is_active = 1 LIMIT 1
+            ''', (build_fts_query([word]),)).fetchone() is not None
+        # Without full-text search, any vocabulary word the word starts counts (as LIKE matching would)
+        return conn.execute("SELECT 1 FROM search_terms WHERE term >= ? AND term < ? LIMIT 1",
+                            (word, word + '{')).fetchone() is not None
+
+    def _vocabulary_candidates(self, word: str) -> List[tuple]:
+        """Vocabulary words that can be FUZZY_SIMILARITY-similar to word (core.fuzzy.Candidate rows)"""
+        grams, fewest, most, shared = lookup_bounds(word)
+        return self.pool.connection().execute(f'''
+            SELECT t.term, COUNT(*), t.trigrams, t.frequency
+            FROM term_trigrams g JOIN search_terms t ON t.term = g.term
+            WHERE g.trigram IN ({', '.join('?' * len(grams))}) AND t.trigrams BETWEEN ? AND ?
+            GROUP BY t.term HAVING COUNT(*) >= ?
+        ''', grams + [fewest, most, shared]).fetchall()
+
+    def _rows_by_id(self, ids: List[int]) -> Dict[int, Dict]:
+        cursor = self.pool.connection().cursor()
+        rows = {}
+        for batch in chunked(ids, KEY_LOOKUP_BATCH):
+            cursor.execute(f"SELECT * FROM scholarships WHERE id IN ({', '.join('?' * len(batch))})", batch)
+            columns = [description[0] for description in cursor.description]
+            for row in cursor.fetchall():
+                row = dict(zip(columns, row))
+                rows[row['id']] = row
+        return rows
+
+    def _embed_pending(self, cursor) -> int:
+        """Embed the semantic vector of every row written since its last embedding
+
+        The first rows fit the model (core.semantic.SemanticModel), and it is
+        refitted each time the corpus doubles until it was fitted on
+        SEMANTIC_FIT_ROWS rows; a refit re-embeds every row. Each embedding
+        write gets the next semantic_seq, which the search index catches up by.
+        """
+        model = self._stored_semantic_model(cursor)
+        if model is None or model.fitted_rows < SEMANTIC_FIT_ROWS:
+            rows = cursor.execute("SELECT COUNT(*) FROM scholarships").fetchone()[0]
+            if rows and needs_refit(model, rows):
+                model = SemanticModel.fit([document_terms(dict(zip(TEXT_COLUMNS, row))) for row in cursor.execute(
+                    f"SELECT {', '.join(TEXT_COLUMNS)} FROM scholarships ORDER BY id LIMIT ?", (SEMANTIC_FIT_ROWS,))])
+                cursor.execute(f'''
+                    INSERT INTO semantic_model (id, {', '.join(SEMANTIC_MODEL_COLUMNS)}) VALUES (1, ?, ?, ?, ?, ?)
+                    ON CONFLICT (id) DO UPDATE SET
+                        {', '.join(f"{column} = excluded.{column}" for column in SEMANTIC_MODEL_COLUMNS)}
+                ''', model.to_row())
+                cursor.execute("UPDATE scholarships SET semantic_vector = NULL WHERE semantic_vector IS NOT NULL")
+        if model is None:
+            return 0
+
+        pending = cursor.execute(
+            f"SELECT id, {', '.join(TEXT_COLUMNS)} FROM scholarships WHERE semantic_vector IS NULL").fetchall()
+        if not pending:
+            return 0
+        cursor.execute("UPDATE semantic_model SET last_seq = last_seq + 1")
+        seq = cursor.execute("SELECT last_seq FROM semantic_model").fetchone()[0]
+        cursor.executemany(
+            "UPDATE scholarships SET semantic_vector = ?, semantic_seq = ? WHERE id = ?",
+            [(model.encode(dict(zip(TEXT_COLUMNS, row[1:]))), seq, row[0]) for row in pending]
+        )
+        return len(pending)
+
+    def _stored_semantic_model(self, cursor) -> Optional[SemanticModel]:
+        """The database's semantic model, parsed once per version"""
+        row = cursor.execute("SELECT version FROM semantic_model").fetchone()
+        if row is None:
+            return None
+        if self._semantic_model is None or self._semantic_model.version != row[0]:
+            self._semantic_model = SemanticModel.from_row(cursor.execute(
+                f"SELECT {', '.join(SEMANTIC_MODEL_COLUMNS)} FROM semantic_model").fetchone())
+        return self._semantic_model
+
+    def semantic_search(self, query: str, goal: str = None, country: str = None, limit: int = 20,
+                        open_only: bool = False, min_amount_usd: float = None) -> List[Dict]:
+        """Scholarships closest in meaning to a free-text query, best first, each with its semantic_score
+
+        Matches topics rather than words (core.semantic): "computer science
+        masters" finds a "Graduate STEM Scholarship". Filters as search_page,
+        one row per near-duplicate cluster. Served from the query cache until
+        the next write, which the index then catches up with incrementally.
+        """
+        key = ('semantic', query, goal, country, limit, open_only, min_amount_usd)
+        rows = self.query_cache.get_or_compute(
+            key, lambda: self._semantic_matches(query, goal, country, limit, open_only, min_amount_usd))
+        return [dict(row) for row in rows]
+
+    def _semantic_matches(self, query: str, goal: str, country: str, limit: int, open_only: bool = False,
+                          min_amount_usd: float = None) -> tuple:
+        neighbours = self._semantic_index().search(query, SEMANTIC_CANDIDATES)
+        if not neighbours:
+            return ()
+        area = self._search_area(country) if country else None
+        filters, params = self._search_filters('s', goal, None, area, open_only=open_only,
+                                               min_amount_usd=min_amount_usd)
+        # NOT INDEXED: the rowid lookups, not a scan of whichever filter index the planner likes
+        passing = dict(self.pool.connection().execute(
+            f"SELECT s.id, s.cluster_id FROM scholarships s NOT INDEXED WHERE s.is_active = 1 "
+            f"AND s.id IN ({', '.join('?' * len(neighbours))}){filters}",
+            [row_id for row_id, _ in neighbours] + params).fetchall())
+        matches, clusters = [], set()
+        for row_id, similarity in neighbours:
+            if row_id in passing and (passing[row_id] or row_id) not in clusters and len(matches) < limit:
+                clusters.add(passing[row_id] or row_id)
+                matches.append((row_id, similarity))
+        rows = self._rows_by_id([row_id for row_id, _ in matches])
+        return tuple(dict(rows[row_id], semantic_score=similarity) for row_id, similarity in matches)
+
+    def _semantic_index(self) -> SemanticIndex:
+        """The process's semantic index, caught up with the published corpus once per write"""
+        def sync():
+            conn = self.pool.connection()
+            row = conn.execute("SELECT version FROM semantic_model").fetchone()
+            return self.semantic.sync(
+                row[0] if row else None,
+                lambda: SemanticModel.from_row(conn.execute(
+                    f"SELECT {', '.join(SEMANTIC_MODEL_COLUMNS)} FROM semantic_model").fetchone()),
+                lambda seq: conn.execute('''
+                    SELECT id, semantic_seq, semantic_vector FROM scholarships
+                    WHERE semantic_seq > ? AND semantic_vector IS NOT NULL ORDER BY semantic_seq
+                ''', (seq,)))
+        return self.query_cache.get_or_compute(('semantic-index',), sync)
+
     def search_scholarships(self, goal: str = None, keywords: List[str] = None, 
-                          country: str = None, limit: int = 50) -> List[Dict]:
-        """Search scholarships with intelligent filtering"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        # Build dynamic query
-        query = "SELECT * FROM scholarships WHERE is_active = 1"
+                          country: str = None, limit: int = 50, open_only: bool = False,
+                          closing_within_days: int = None, min_amount_usd: float = None,
+                          sort_by_amount: bool = False, fuzzy: bool = False) -> List[Dict]:
+        """Search scholarships with intelligent filtering
+
+        open_only drops scholarships whose deadline has passed (rolling and
+        unknown deadlines stay); closing_within_days keeps only fixed deadlines
+        in the next N days, most urgent first. min_amount_usd keeps amounts
+        worth at least that much in USD and sort_by_amount puts the largest
+        first. fuzzy matches misspelled keywords as their suggest_keywords
+        corrections. Returns the first page of search_page().
+        """
+        return self.search_page(goal, keywords, country, page_size=limit, open_only=open_only,
+                                closing_within_days=closing_within_days, min_amount_usd=min_amount_usd,
+                                sort_by_amount=sort_by_amount, fuzzy=fuzzy)[0]
+
+    def search_page(self, goal: str = None, keywords: List[str] = None, country: str = None,
+                    page_size: int = 50, cursor: str = None, open_only: bool = False,
+                    closing_within_days: int = None, min_amount_usd: float = None,
+                    sort_by_amount: bool = False, fuzzy: bool = False) -> Tuple[List[Dict], Optional[str]]:
+        """One page of search results and the cursor of the next page (None after the last)
+
+        Pages are keyset-paginated: the cursor holds the sort key of the last
+        row, and the next page seeks past it in the same index, so deep pages
+        cost the same as the first. A cursor only continues the search that
+        produced it (ValueError otherwise). Pages are served from the
+        in-process query cache until the next write.
+        With fuzzy, keywords are matched as corrected by suggest_keywords.
+        """
+        filters = {'open_only': open_only, 'closing_within_days': closing_within_days,
+                   'min_amount_usd': min_amount_usd, 'sort_by_amount': sort_by_amount, 'fuzzy': bool(fuzzy)}
+        key = ('search', goal, tuple(keywords) if keywords else None, country, page_size, cursor) + \
+            tuple(filters.values())
+        rows, next_cursor = self.query_cache.get_or_compute(
+            key, lambda: self._search_uncached(goal, keywords, country, page_size, cursor, **filters))
+        return [dict(row) for row in rows], next_cursor  # Copies, so callers cannot alter cached rows
+
+    def search_ranked_page(self, goal: str = None, keywords: List[str] = None, country: str = None,
+                           page_size: int = 50, cursor: str = None, open_only: bool = False,
+                           min_amount_usd: float = None, weights: Dict[str, float] = None,
+                           semantic: bool = False, fuzzy: bool = False) -> Tuple[List[Dict], Optional[str]]:
+        """One page of results in blended-signal order (core.ranking), and the next page's cursor
+
+        Matches are ranked in windows of RANKING_CANDIDATES in search_page
+        order, each scored on relevance, priority, geography match, deadline
+        proximity, amount, source reliability and freshness, combined by
+        weights (overrides of RANKING_WEIGHTS); paging runs through one window
+        and on into the next (see ranked_page). With semantic, the keywords'
+        semantic_search matches join the first window and relevance is the
+        keyword and semantic ranks blended (core.semantic.blend). fuzzy
+        matches misspelled keywords as corrected by suggest_keywords. A
+        window's signal matrix is kept with it, across writes while a cursor
+        may still read it, so later pages and other weights only re-score.
+        Each row carries its rank_score.
+        """
+        filters = {'open_only': open_only, 'min_amount_usd': min_amount_usd}
+        semantic = bool(semantic and keywords)
+        fuzzy = bool(fuzzy and keywords)
+        search = (goal, tuple(keywords) if keywords else None, country) + tuple(sorted(filters.items()))
+        search += ('semantic',) if semantic else ()
+        search += ('fuzzy',) if fuzzy else ()
+        return ranked_page(self.query_cache, search, lambda start, exclude: self._rank_candidates(
+            goal, keywords, country, semantic, fuzzy, start, exclude, **filters), page_size, cursor, weights)
+
+    def _rank_candidates(self, goal: str, keywords: List[str], country: str, semantic: bool = False,
+                         fuzzy: bool = False, start: str = None, exclude: Iterable[str] = (), **filters):
+        """(rows, signal_matrix, next start) of a ranked search's candidate window from keyset cursor start,
+        without the content keys in exclude
+
+        Semantic matches join the first window; later windows leave them out.
+        """
+        rows, next_start = self._search_uncached(goal, keywords, country, RANKING_CANDIDATES, start,
+                                                 closing_within_days=None, sort_by_amount=False, fuzzy=fuzzy,
+                                                 **filters)
+        exclude = set(exclude)
+        if semantic:
+            text = ' '.join(self._corrected_keywords(keywords) if fuzzy else keywords)
+            matches = self._semantic_matches(text, goal, country, SEMANTIC_CANDIDATES, **filters)
+            if start is None:
+                rows = blend(rows, matches)
+            else:
+                exclude.update(row['content_key'] for row in matches)
+        rows = [row for row in rows if row['content_key'] not in exclude]
+        area_scores = self._area_scores(country) if country else None
+        return rows, signal_matrix(rows, area_scores=area_scores, reliability=self.source_reliability()), next_start
+
+    def _search_uncached(self, goal: str, keywords: List[str], country: str, page_size: int,
+                         cursor: Optional[str], **filters):
+        try:
+            return self._fetch_page(goal, keywords, country, page_size, cursor, **filters)
+        except sqlite3.OperationalError as e:
+            if not self.fts_enabled or not keywords:
+                raise
+            print(f"Full-text query failed, retrying with LIKE matching: {e}")
+            return self._fetch_page(goal, keywords, country, page_size, cursor, use_fts=False, **filters)
+
+    def _fetch_page(self, goal: str, keywords: List[str], country: str, page_size: int,
+                    cursor: Optional[str], use_fts: bool = None, fuzzy: bool = False, **filters):
+        """(rows, next cursor) for one page, walking the order's segments from the cursor on"""
+        search = (goal, tuple(keywords) if keywords else None, country) + tuple(sorted(filters.items()))
+        search += ('fuzzy',) if fuzzy and keywords else ()
+        if fuzzy:
+            # Cursors name the keywords as searched; the corrections are what is matched
+            keywords = self._corrected_keywords(keywords)
+        use_fts = self._uses_fts(keywords, use_fts)
+        order = search_order(use_fts, filters['closing_within_days'], filters['sort_by_amount'])
+        segment, after = decode_search_cursor(cursor, order, search) if cursor else (0, None)
+        db_cursor = self.pool.connection().cursor()
+
+        # One row beyond the page tells whether another page follows
+        rows = []
+        for index in range(segment, len(SEARCH_ORDERS[order])):
+            query, params = self._build_search_query(
+                goal, keywords, country, page_size + 1 - len(rows), use_fts,
+                segment=index, after=after if index == segment else None, **filters)
+            db_cursor.execute(query, params)
+            columns = [description[0] for description in db_cursor.description]
+            rows.extend((index, dict(zip(columns, row))) for row in db_cursor.fetchall())
+            if len(rows) > page_size:
+                break
+
+        next_cursor = None
+        if len(rows) > page_size:
+            index, last = rows[page_size - 1]
+            keys = SEARCH_ORDERS[order][index][1]
+            next_cursor = encode_search_cursor(order, search, index, [last[column] for _, column in keys])
+        return tuple(row for _, row in rows[:page_size]), next_cursor
+
+    def _uses_fts(self, keywords: List[str], use_fts: bool = None) -> bool:
+        if use_fts is None:
+            use_fts = self.fts_enabled
+        return bool(use_fts and build_fts_query(keywords))
+
+    def _build_search_query(self, goal: str = None, keywords: List[str] = None,
+                            country: str = None, limit: int = 50, use_fts: bool = None,
+                            open_only: bool = False, closing_within_days: int = None,
+                            min_amount_usd: float = None, sort_by_amount: bool = False,
+                            segment: int = 0, after: List = None):
+        """Build the SQL and parameters of one search page
+
+        Keyword searches go through the FTS5 index and are ranked by BM25
+        relevance blended with priority; other searches use priority order.
+        sort_by_amount, then closing_within_days, override the ranking (see
+        SEARCH_ORDERS). The query covers one segment of the order, after the
+        sort key of the previous page's last row when one is given.
+        """
+        match_expression = build_fts_query(keywords) if keywords else None
+        use_fts = self._uses_fts(keywords, use_fts)
+
         params = []
-        
+        if use_fts:
+            # bm25() is lower-is-better, so negate it before adding the priority boost
+            query = f'''
+                SELECT s.*, (-bm25(scholarships_fts, {FTS_COLUMN_WEIGHTS}) + s.priority * ?) AS relevance
+                FROM scholarships_fts
+                JOIN scholarships s ON s.id = scholarships_fts.rowid
+                WHERE scholarships_fts MATCH ? AND s.is_active = 1
+            '''
+            params.extend([PRIORITY_RELEVANCE_WEIGHT, match_expression])
+        else:
+            query = "SELECT s.* FROM scholarships s WHERE s.is_active = 1"
+
+        # With FTS the join above already applies the keyword match
+        row_filters = {'open_only': open_only, 'closing_within_days': closing_within_days,
+                       'min_amount_usd': min_amount_usd}
+        order = search_order(use_fts, closing_within_days, sort_by_amount)
+        area = self._search_area(country) if country else None
+        filters, filter_params = self._search_filters('s', goal, None if use_fts else keywords, area,
+                                                      cursor_seeks_deadline=after is not None and order == 'deadline',
+                                                      **row_filters)
+        query += filters
+        params.extend(filter_params)
+
+        canonical, canonical_params = self._canonical_member(goal, keywords, area, use_fts, match_expression,
+                                                             **row_filters)
+        query += canonical
+        params.extend(canonical_params)
+
+        condition, keys, direction = SEARCH_ORDERS[order][segment]
+        if condition:
+            query += f" AND {condition}"
+        if after is not None:
+            # Row-value comparison: an index seek past the previous page's last row
+            columns = ', '.join(expression for expression, _ in keys)
+            operator = '<' if direction == 'DESC' else '>'
+            query += f" AND ({columns}) {operator} ({', '.join('?' * len(keys))})"
+            params.extend(after)
+        query += " ORDER BY " + ', '.join(f"{expression} {direction}" for expression, _ in keys) + " LIMIT ?"
+        params.append(limit)
+
+        return query, params
+
+    def _canonical_member(self, goal: str, keywords: List[str], area: Optional[List[int]], use_fts: bool,
+                          match_expression: Optional[str], **row_filters):
+        """(" AND NOT EXISTS ..." SQL, params) keeping one row of s per near-duplicate cluster
+
+        The kept row is the lowest id among the members that pass the same
+        filters, so a filtered-out canonical row never hides a matching duplicate.
+        """
+        member_filters, member_params = self._search_filters(
+            'm', goal, keywords, area, use_fts, match_expression, **row_filters)
+        return f'''
+            AND NOT EXISTS (
+                SELECT 1 FROM scholarships m
+                WHERE m.cluster_id = s.cluster_id AND m.id < s.id AND m.is_active = 1{member_filters}
+            )
+        ''', member_params
+
+    def search_facets(self, goal: str = None, keywords: List[str] = None, country: str = None,
+                      open_only: bool = False, closing_within_days: int = None, min_amount_usd: float = None,
+                      fuzzy: bool = False) -> Dict[str, List[Tuple[str, int]]]:
+        """Counts of every facet value over everything a search matches (core.facets.count_facets)
+
+        Same matching set as search_page with the same arguments, one row
+        per near-duplicate cluster, not only the first page: one query reads
+        the facet columns of the matching rows and one NumPy pass labels and
+        counts category, goal, geography, deadline month, amount band and
+        source. Served from the query cache until the next write.
+        """
+        filters = {'open_only': open_only, 'closing_within_days': closing_within_days,
+                   'min_amount_usd': min_amount_usd}
+        key = ('facets', goal, tuple(keywords) if keywords else None, country, bool(fuzzy)) + \
+            tuple(filters.values())
+        counts = self.query_cache.get_or_compute(key, lambda: self._count_facets(
+            goal, self._corrected_keywords(keywords) if fuzzy else keywords, country, **filters))
+        return {facet: list(pairs) for facet, pairs in counts.items()}
+
+    def _count_facets(self, goal: str, keywords: List[str], country: str, **filters):
+        use_fts = self._uses_fts(keywords)
+        match_expression = build_fts_query(keywords) if keywords else None
+        area = self._search_area(country) if country else None
+        columns = '''s.category, s.goal_type, g.name, s.deadline_date, s.amount_max_usd, s.full_funding, s.source'''
+        if use_fts:
+            # CROSS JOIN keeps the match driving, as in _finds_word
+            query = f'''
+                SELECT {columns} FROM scholarships_fts CROSS JOIN scholarships s ON s.id = scholarships_fts.rowid
+                LEFT JOIN geography g ON g.id = s.geography_id
+                WHERE scholarships_fts MATCH ? AND s.is_active = 1
+            '''
+            params = [match_expression]
+        else:
+            query = f'''
+                SELECT {columns} FROM scholarships s LEFT JOIN geography g ON g.id = s.geography_id
+                WHERE s.is_active = 1
+            '''
+            params = []
+        row_filters, row_params = self._search_filters('s', goal, None if use_fts else keywords, area, **filters)
+        canonical, canonical_params = self._canonical_member(goal, keywords, area, use_fts, match_expression,
+                                                             **filters)
+        rows = self.pool.connection().execute(query + row_filters + canonical,
+                                               params + row_params + canonical_params).fetchall()
+        return count_facets(facet_labels(*(zip(*rows) if rows else [()] * 7)))
+
+    def _search_filters(self, alias: str, goal: str = None, keywords: List[str] = None,
+                        area: List[int] = None, use_fts: bool = False, match_expression: str = None,
+                        open_only: bool = False, closing_within_days: int = None,
+                        min_amount_usd: float = None, cursor_seeks_deadline: bool = False):
+        """Goal/area/keyword/deadline/amount conditions on one table alias (" AND ..." SQL, params)
+
+        area is the geography ids of a country search (_search_area). With use_fts the keyword condition is an FTS match on the row; otherwise
+        keywords are matched with LIKE. cursor_seeks_deadline keeps today's
+        deadline bound out of index selection (unary +), so the page cursor's
+        row-value seek is the lower bound the index uses.
+        """
+        sql = ""
+        params = []
+
+        if closing_within_days is not None:
+            floor = '+' if cursor_seeks_deadline else ''
+            sql += (f" AND {floor}{alias}.deadline_date >= date('now')"
+                    f" AND {alias}.deadline_date <= date('now', ?)")
+            params.append(f'+{int(closing_within_days)} days')
+        elif open_only:
+            sql += f" AND ({alias}.deadline_date IS NULL OR {alias}.deadline_date >= date('now'))"
+
+        if min_amount_usd is not None:
+            # "Up to $X" counts by its maximum
+            sql += f" AND {alias}.amount_max_usd >= ?"
+            params.append(min_amount_usd)
+
         if goal:
-            query += " AND goal_type = ?"
+            sql += f" AND {alias}.goal_type = ?"
             params.append(goal)
-        
-        if country:
-            # Prioritize country-specific, then regional, then international
-            query += " AND (country = ? OR country LIKE '%Africa%' OR country = 'International')"
-            params.append(country)
-        
-        if keywords:
+
+        if area:
+            # The country itself, its region and continent, and international scholarships
+            sql += f" AND {alias}.geography_id IN ({', '.join('?' * len(area))})"
+            params.extend(area)
+
+        if keywords and use_fts:
+            sql += (" AND EXISTS (SELECT 1 FROM scholarships_fts"
+                    f" WHERE scholarships_fts MATCH ? AND scholarships_fts.rowid = {alias}.id)")
+            params.append(match_expression)
+        elif keywords:
             keyword_conditions = []
             for keyword in keywords:
-                keyword_conditions.append("(title LIKE ? OR description LIKE ? OR keywords LIKE ?)")
+                keyword_conditions.append(
+                    f"({alias}.title LIKE ? OR {alias}.description LIKE ? OR {alias}.keywords LIKE ?)")
                 params.extend([f"%{keyword}%", f"%{keyword}%", f"%{keyword}%"])
-            
+
             if keyword_conditions:
-                query += " AND (" + " OR ".join(keyword_conditions) + ")"
-        
-        # Order by priority (country-specific first), then by creation date
-        query += " ORDER BY priority DESC, created_at DESC LIMIT ?"
-        params.append(limit)
-        
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        
-        # Convert to dictionary format
-        columns = [description[0] for description in cursor.description]
-        scholarships = [dict(zip(columns, row)) for row in rows]
-        
-        conn.close()
-        return scholarships
+                sql += " AND (" + " OR ".join(keyword_conditions) + ")"
+
+        return sql, params
     
-    def get_scholarship_count(self) -> int:
-        """Get total number of scholarships in cache"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM scholarships WHERE is_active = 1")
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+    def get_scholarship_count(self, country: str = None) -> int:
+        """Get total number of scholarships in cache (optionally for one country)"""
+        if country:
+            return self.get_scholarship_count_by_country(country)
+        cursor = self.pool.connection().cursor()
+        cursor.execute("SELECT COALESCE(SUM(active_count), 0) FROM scholarship_stats")
+        return cursor.fetchone()[0]
     
     def get_scholarship_count_by_country(self, country: str = None) -> int:
-        """Get number of scholarships by country"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        if country:
-            # Count scholarships that mention the country in title, description, or category
-            cursor.execute("""
-                SELECT COUNT(*) FROM scholarships 
-                WHERE is_active = 1 AND (
-                    LOWER(title) LIKE ? OR 
-                    LOWER(description) LIKE ? OR 
-                    LOWER(category) LIKE ? OR
-                    LOWER(source) LIKE ?
-                )
-            """, (f'%{country.lower()}%', f'%{country.lower()}%', f'%{country.lower()}%', f'%{country.lower()}%'))
-        else:
-            cursor.execute("SELECT COUNT(*) FROM scholarships WHERE is_active = 1")
-            
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count
+        """Get number of active scholarships a search for a country returns (from scholarship_stats)
+
+        Listings for its region, continent and International count too (see
+        _area_stats), so the figure is what the user searching it can be shown.
+        """
+        if not country:
+            return self.get_scholarship_count()
+        return self._area_stats(country)[0]
 
     def get_cache_age(self, country: str = None) -> float:
-        """Get age of cache in hours for a specific country or overall"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
+        """Get age of cache in hours for a specific country or overall
+
+        Age is measured from last_verified, which every re-crawl refreshes, so a
+        source that keeps returning the same scholarships still counts as fresh.
+        """
+        cursor = self.pool.connection().cursor()
+
         if country:
-            # Get newest entry for this country
-            cursor.execute("""
-                SELECT MAX(created_at) FROM scholarships 
-                WHERE is_active = 1 AND (
-                    LOWER(country) LIKE ? OR 
-                    LOWER(title) LIKE ? OR 
-                    LOWER(source) LIKE ?
-                )
-            """, (f'%{country.lower()}%', f'%{country.lower()}%', f'%{country.lower()}%'))
+            # Most recently verified entry a search for this country covers
+            cursor.execute("SELECT (julianday('now') - julianday(?)) * 24", (self._area_stats(country)[1],))
         else:
-            cursor.execute("SELECT MAX(created_at) FROM scholarships WHERE is_active = 1")
+            cursor.execute("""
+                SELECT (julianday('now') - julianday(MAX(newest_verified))) * 24
+                FROM scholarship_stats WHERE active_count > 0
+            """)
         
-        result = cursor.fetchone()[0]
-        conn.close()
+        age_hours = cursor.fetchone()[0]
         
-        if result:
-            # Parse timestamp and calculate age in hours
-            last_update = datetime.strptime(result, '%Y-%m-%d %H:%M:%S')
-            age_hours = (datetime.now() - last_update).total_seconds() / 3600
+        if age_hours is not None:
             return age_hours
         
         return 24  # Return 24 hours if no data (triggers update)
 
-    def cleanup_expired_scholarships(self, days_old: int = 90):
-        """Remove scholarships older than specified days"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        cutoff_date = datetime.now() - timedelta(days=days_old)
-        cursor.execute("""
-            UPDATE scholarships 
-            SET is_active = 0 
-            WHERE created_at < ? AND is_active = 1
-        """, (cutoff_date.strftime('%Y-%m-%d %H:%M:%S'),))
-        
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
-        
-        return deleted_count
+    def _area_stats(self, country: str) -> Tuple[int, Optional[str]]:
+        """Active count and newest last_verified of the listings a search for a country returns
+
+        The country's own listings and its region's, continent's and
+        International's: the scholarship_stats rows of its search area's
+        geography ids (_search_area).
+        """
+        area = self._search_area(country)
+        count, newest = self.pool.connection().execute(f'''
+            SELECT COALESCE(SUM(active_count), 0), MAX(newest_verified) FROM scholarship_stats
+            WHERE geography_id IN ({', '.join('?' * len(area))}) AND active_count > 0
+        ''', area).fetchone()
+        return count, newest
 
     def update_cache_metadata(self, source_url: str, success: bool):
-        """Update cache metadata for a source"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR IGNORE INTO cache_metadata (source_url, last_scraped, success_count, total_attempts)
-            VALUES (?, ?, 0, 0)
-        ''', (source_url, datetime.now()))
-        
-        if success:
-            cursor.execute('''
-                UPDATE cache_metadata 
-                SET last_scraped = ?, success_count = success_count + 1, total_attempts = total_attempts + 1
-                WHERE source_url = ?
-            ''', (datetime.now(), source_url))
-        else:
+        """Record a scrape attempt for a source (queued, so the caller never waits)"""
+        self.writes.submit(lambda conn: self._record_scrape(conn, source_url, success), publish=None)
+
+    @staticmethod
+    def _record_scrape(conn, source_url: str, success: bool):
+        with conn:
+            cursor = conn.cursor()
             cursor.execute('''
-                UPDATE cache_metadata 
-                SET last_scraped = ?, total_attempts = total_attempts + 1
-                WHERE source_url = ?
-            ''', (datetime.now(), source_url))
-        
-        conn.commit()
-        conn.close()
+                INSERT OR IGNORE INTO cache_metadata (source_url, last_scraped, success_count, total_attempts)
+                VALUES (?, ?, 0, 0)
+            ''', (source_url, datetime.now()))
+            
+            if success:
+                cursor.execute('''
+                    UPDATE cache_metadata 
+                    SET last_scraped = ?, success_count = success_count + 1, total_attempts = total_attempts + 1
+                    WHERE source_url = ?
+                ''', (datetime.now(), source_url))
+            else:
+                cursor.execute('''
+                    UPDATE cache_metadata 
+                    SET last_scraped = ?, total_attempts = total_attempts + 1
+                    WHERE source_url = ?
+                ''', (datetime.now(), source_url))
     
+    def source_reliability(self) -> Dict[str, float]:
+        """Scrape success rate per source domain (cache_metadata), for core.ranking"""
+        attempts = {}
+        for source_url, success_count, total_attempts in self.pool.connection().execute(
+                "SELECT source_url, success_count, total_attempts FROM cache_metadata WHERE total_attempts > 0"):
+            counts = attempts.setdefault(host_of(source_url), [0, 0])
+            counts[0] += success_count
+            counts[1] += total_attempts
+        return {domain: successes / total for domain, (successes, total) in attempts.items()}
+
     def should_scrape_source(self, source_url: str, max_age_hours: int = 24) -> bool:
         """Determine if a source should be scraped based on cache age and reliability"""
-        conn = sqlite3.connect(self.db_file)
-        cursor = conn.cursor()
+        cursor = self.pool.connection().cursor()
         
         cursor.execute('''
             SELECT last_scraped, success_count, total_attempts 
@@ -450,7 +1976,6 @@ class ScholarshipCache:
         ''', (source_url,))
         
         result = cursor.fetchone()
-        conn.close()
         
         if not result:
             return True  # Never scraped before
@@ -475,69 +2000,143 @@ class ScholarshipCache:
     def get_total_scholarship_count(self):
         """Get total number of active scholarships in cache"""
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM scholarships WHERE is_active = 1")
-            count = cursor.fetchone()[0]
-            conn.close()
-            return count
+            return self.get_scholarship_count()
         except Exception as e:
             print(f"Error getting total scholarship count: {e}")
             return 0
     
     def remove_duplicate_scholarships(self):
-        """Remove duplicate scholarships based on title similarity"""
+        """Fold near-duplicate scholarships into clusters
+
+        Rows are clustered at ingest time and search returns one canonical row
+        per cluster, so nothing is deleted here; this only clusters rows that
+        were written without one. Returns how many active rows are hidden as
+        near-duplicates of another listing.
+        """
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
+            if self.writes.run(self._cluster_unassigned, publish=None):
+                self.writes.publish().result()
             
-            # Find duplicates based on similar titles (first 50 characters)
-            cursor.execute('''
-                DELETE FROM scholarships 
-                WHERE id NOT IN (
-                    SELECT MIN(id) 
-                    FROM scholarships 
-                    WHERE is_active = 1
-                    GROUP BY LOWER(SUBSTR(title, 1, 50))
-                )
-            ''')
+            hidden_count = self.pool.connection().execute(
+                "SELECT COUNT(*) FROM scholarships WHERE is_active = 1 AND cluster_id != id"
+            ).fetchone()[0]
             
-            removed_count = cursor.rowcount
-            conn.commit()
-            conn.close()
+            if hidden_count > 0:
+                print(f"🧹 {hidden_count} near-duplicate scholarships folded into clusters")
             
-            if removed_count > 0:
-                print(f"🧹 Removed {removed_count} duplicate scholarships")
-            
-            return removed_count
+            return hidden_count
             
         except Exception as e:
             print(f"Error removing duplicates: {e}")
             return 0
     
-    def cleanup_expired_scholarships(self, days_old=30):
-        """Enhanced cleanup with configurable age threshold"""
+    def cleanup_expired_scholarships(self, days_old: int = 30, max_batches: int = None) -> int:
+        """Archive scholarships no crawl has verified for days_old days
+
+        Age is measured from last_verified (same UTC clock as CURRENT_TIMESTAMP),
+        a range scan on idx_scholarships_last_verified. Returns rows archived.
+        """
+        return self._archive('expired', "last_verified < datetime('now', ?)",
+                             (f'-{int(days_old)} days',), max_batches)
+
+    def cleanup_past_deadlines(self, grace_days: int = 0, max_batches: int = None) -> int:
+        """Archive scholarships whose parsed deadline passed more than grace_days ago
+
+        Only fixed deadlines have a deadline_date, so rolling and unknown ones are
+        never archived here; the batches are range scans on idx_scholarships_deadline.
+        The archived row is a tombstone that keeps re-crawls of the closed round out.
+        """
+        return self._archive('past_deadline', "deadline_date < date('now', ?)",
+                             (f'-{int(grace_days)} days',), max_batches)
+
+    def _archive(self, reason: str, condition: str, params: tuple, max_batches: int = None) -> int:
+        """Move rows matching condition from scholarships to scholarships_archive
+
+        Each batch of MAINTENANCE_BATCH_SIZE rows is its own queued write, so
+        other writes are applied between batches and WAL readers are never
+        blocked; the result is published once at the end. Stops after
+        max_batches batches (None: until nothing matches).
+        """
         try:
-            conn = sqlite3.connect(self.db_file)
-            cursor = conn.cursor()
-            
-            # Remove scholarships older than specified days
-            cutoff_date = datetime.now() - timedelta(days=days_old)
-            
-            cursor.execute('''
-                DELETE FROM scholarships 
-                WHERE created_at < ? OR last_verified < ?
-            ''', (cutoff_date, cutoff_date))
-            
-            removed_count = cursor.rowcount
-            conn.commit()
-            conn.close()
-            
-            if removed_count > 0:
-                print(f"🧹 Removed {removed_count} expired scholarships (older than {days_old} days)")
-            
-            return removed_count
-            
+            archived, batches = 0, 0
+            while max_batches is None or batches < max_batches:
+                moved = self.writes.run(
+                    lambda conn: self._archive_batch(conn, reason, condition, params, MAINTENANCE_BATCH_SIZE),
+                    publish=False)
+                archived += moved
+                batches += 1
+                if moved < MAINTENANCE_BATCH_SIZE:
+                    break
+
+            if archived:
+                self.writes.publish().result()
+                print(f"🗄️ Archived {archived} scholarships ({reason.replace('_', ' ')})")
+            return archived
+
         except Exception as e:
-            print(f"Error cleaning up expired scholarships: {e}")
+            print(f"Error archiving scholarships ({reason}): {e}")
+            return 0
+
+    def _archive_batch(self, conn, reason: str, condition: str, params: tuple, batch_size: int) -> int:
+        """Archive up to batch_size rows matching condition in one transaction"""
+        columns = ', '.join(self._archive_columns)
+        with conn:
+            ids = [row[0] for row in conn.execute(
+                f"SELECT id FROM scholarships WHERE {condition} LIMIT ?", params + (batch_size,))]
+            if not ids:
+                return 0
+            placeholders = ', '.join('?' * len(ids))
+            # A newer archive of the same key replaces the older tombstone
+            conn.execute(f'''
+                INSERT OR REPLACE INTO scholarships_archive ({columns}, archived_at, archive_reason)
+                SELECT {columns}, CURRENT_TIMESTAMP, ? FROM scholarships WHERE id IN ({placeholders})
+            ''', [reason] + ids)
+            # FTS, stats and cluster triggers follow the delete
+            conn.execute(f"DELETE FROM scholarships WHERE id IN ({placeholders})", ids)
+        return len(ids)
+
+    def run_maintenance(self, force: bool = False) -> Dict[str, int]:
+        """Scheduled maintenance: archive expired, closed and inactive rows, then vacuum a little
+
+        Runs at most once per MAINTENANCE_INTERVAL across all processes sharing
+        the database (the run is claimed in maintenance_log), and each rule
+        archives at most MAINTENANCE_MAX_BATCHES batches, so a pass is bounded
+        and a backlog drains over several passes. Returns what was done, or {}
+        when the pass was not due.
+        """
+        claimed = self.writes.run(lambda conn: self._claim_maintenance(conn, force), publish=None)
+        if not claimed:
+            return {}
+
+        report = {
+            'expired': self.cleanup_expired_scholarships(EXPIRE_AFTER_DAYS, MAINTENANCE_MAX_BATCHES),
+            'past_deadline': self.cleanup_past_deadlines(DEADLINE_GRACE_DAYS, MAINTENANCE_MAX_BATCHES),
+            'inactive': self._archive('inactive', "is_active = 0", (), MAINTENANCE_MAX_BATCHES),
+            'clustered': self.writes.run(self._cluster_unassigned, publish=None),
+            'vacuumed_pages': self.writes.run(lambda conn: self._incremental_vacuum(conn, VACUUM_PAGES),
+                                              publish=None),
+        }
+        if report['clustered']:
+            self.writes.publish().result()
+        return report
+
+    @staticmethod
+    def _claim_maintenance(conn, force: bool) -> int:
+        """Claim the maintenance pass in maintenance_log if it is due (or forced); returns 1 if claimed"""
+        with conn:
+            return conn.execute('''
+                UPDATE maintenance_log SET last_run = CURRENT_TIMESTAMP
+                WHERE task = 'maintenance' AND (? OR last_run <= datetime('now', ?))
+            ''', (int(force), f'-{int(MAINTENANCE_INTERVAL)} seconds')).rowcount
+
+    @staticmethod
+    def _incremental_vacuum(conn, pages: int) -> int:
+        """Return up to pages free pages to the filesystem; returns how many were released"""
+        try:
+            free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            # execute() stops after the first step, which frees a single page
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+            return free_before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        except sqlite3.OperationalError as e:
+            print(f"Incremental vacuum skipped: {e}")
             return 0
@@ -1,7 +1,6 @@
 import requests
 from bs4 import BeautifulSoup
 import re
-import time
 import random
 import streamlit as st
 from datetime import datetime, timedelta
@@ -15,25 +14,35 @@ from .config import (
     BROWSER_HEADERS, REFERRERS, MAX_REQUESTS_PER_DOMAIN, DOMAIN_COOLDOWN
 )
 from .scholarship_cache import ScholarshipCache
+from .clock import SystemClock
+from .near_duplicates import MinHashLSH, dedupe_scholarships
 
 class EnhancedScholarshipScraper:
     """Enhanced scraper with advanced anti-bot measures and intelligent caching"""
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, clock=None, rng=None, seed=None, cache=None):
         self.db_manager = db_manager
-        self.cache = ScholarshipCache()  # Initialize intelligent cache
+        # Time and randomness are injectable so politeness/retry logic can run
+        # against a VirtualClock and a seeded RNG in tests and benchmarks
+        self.clock = clock or SystemClock()
+        self.rng = rng or random.Random(seed)
+        # One store for everything: reuse the DatabaseManager's cache when there is one
+        self.cache = cache or getattr(db_manager, 'cache', None) or ScholarshipCache()
+        self.next_cursor = None  # Continuation of the last search_by_goal page, None after the last page
+        self.suggestion = None  # Corrected keywords of the last search_by_goal, None when none was misspelled
+        self.facets = None  # Facet counts over everything the last search_by_goal matched (core.facets)
         self.session = requests.Session()
         # Advanced anti-bot state tracking
         self.domain_requests = {}  # Track requests per domain
         self.last_request_time = {}  # Track last request time per domain
         self.failed_domains = set()  # Track temporarily failed domains
-        self.current_user_agent = random.choice(USER_AGENTS)
+        self.current_user_agent = self.rng.choice(USER_AGENTS)
         
         # Enhanced session state to mimic real browsing
         self.session_persistence = {
             'cookies_cleared_count': 0,
             'user_agent_rotations': 0,
             'total_requests': 0,
-            'session_start_time': datetime.now()
+            'session_start_time': self.clock.now()
         }
         
         # Initialize session with realistic headers
@@ -217,13 +226,13 @@ class EnhancedScholarshipScraper:
 
     def rotate_user_agent(self):
         """Rotate user agent to avoid detection"""
-        self.current_user_agent = random.choice(USER_AGENTS)
+        self.current_user_agent = self.rng.choice(USER_AGENTS)
         self.session.headers.update({'User-Agent': self.current_user_agent})
 
     def can_request_domain(self, url):
         """Check if we can make a request to this domain (enhanced rate limiting)"""
         domain = urlparse(url).netloc
-        current_time = datetime.now()
+        current_time = self.clock.now()
         
         # Check if domain is temporarily blocked
         if domain in self.failed_domains:
@@ -249,7 +258,7 @@ class EnhancedScholarshipScraper:
     def track_domain_request(self, url, success=True):
         """Track domain requests for rate limiting"""
         domain = urlparse(url).netloc
-        current_time = datetime.now()
+        current_time = self.clock.now()
         
         if domain not in self.domain_requests:
             self.domain_requests[domain] = 0
@@ -266,18 +275,18 @@ class EnhancedScholarshipScraper:
     def simulate_human_reading_pattern(self, content_length):
         """Simulate human reading patterns based on content length"""
         if content_length < 1000:
-            reading_time = random.uniform(0.5, 2.0)  # Quick scan
+            reading_time = self.rng.uniform(0.5, 2.0)  # Quick scan
         elif content_length < 5000:
-            reading_time = random.uniform(2.0, 8.0)  # Normal reading
+            reading_time = self.rng.uniform(2.0, 8.0)  # Normal reading
         else:
-            reading_time = random.uniform(5.0, 15.0)  # Detailed reading
+            reading_time = self.rng.uniform(5.0, 15.0)  # Detailed reading
             
         # Add some variability
-        reading_time *= random.uniform(0.7, 1.3)
+        reading_time *= self.rng.uniform(0.7, 1.3)
         
-        if random.random() < 0.3:  # 30% chance to actually wait
+        if self.rng.random() < 0.3:  # 30% chance to actually wait
             st.info(f"📖 Reading content ({reading_time:.1f}s)")
-            time.sleep(reading_time)
+            self.clock.sleep(reading_time)
         
         return reading_time
 
@@ -285,28 +294,43 @@ class EnhancedScholarshipScraper:
         """Add random delay between requests (legacy method, uses intelligent_delay)"""
         return self.intelligent_delay()
 
+    def intelligent_delay(self):
+        """Human-like pause before a first attempt, longer once a session gets busy"""
+        delay = self.rng.uniform(MIN_DELAY, MAX_DELAY)
+        if self.session_persistence['total_requests'] > MAX_REQUESTS_PER_DOMAIN:
+            delay += self.rng.uniform(1, 3)
+        self.clock.sleep(delay)
+        return delay
+
+    def adaptive_retry_strategy(self, status_code, attempt):
+        """Exponential backoff with jitter, tuned per HTTP status (seconds to wait)"""
+        multipliers = {403: 1.5, 429: 2.0, 503: 1.0}
+        backoff = RETRY_DELAY * (2 ** attempt) * multipliers.get(status_code, 1.0)
+        jitter = self.rng.uniform(0, RETRY_DELAY)
+        return round(min(backoff + jitter, DOMAIN_COOLDOWN), 1)
+
     def enhanced_session_management(self):
         """Enhanced session management to mimic real browser behavior"""
-        current_time = datetime.now()
+        current_time = self.clock.now()
         session_duration = (current_time - self.session_persistence['session_start_time']).total_seconds()
         
         # Clear cookies periodically (like a real browser session)
-        if session_duration > 1800 and random.random() < 0.1:  # 30 minutes, 10% chance
+        if session_duration > 1800 and self.rng.random() < 0.1:  # 30 minutes, 10% chance
             self.session.cookies.clear()
             self.session_persistence['cookies_cleared_count'] += 1
             st.info("🍪 Session refresh (cleared cookies)")
         
         # Rotate user agent based on session activity
-        if self.session_persistence['total_requests'] % 15 == 0 and random.random() < 0.4:
+        if self.session_persistence['total_requests'] % 15 == 0 and self.rng.random() < 0.4:
             self.rotate_user_agent()
             self.session_persistence['user_agent_rotations'] += 1
             st.info("🔄 Browser identity rotation")
         
         # Simulate occasional network latency
-        if random.random() < 0.05:  # 5% chance
-            latency = random.uniform(0.5, 2.0)
+        if self.rng.random() < 0.05:  # 5% chance
+            latency = self.rng.uniform(0.5, 2.0)
             st.info(f"🌐 Network latency simulation ({latency:.1f}s)")
-            time.sleep(latency)
+            self.clock.sleep(latency)
 
     def make_request_with_retry(self, url, max_retries=3):
         """Make request with advanced retry logic and enhanced anti-bot measures"""
@@ -321,24 +345,24 @@ class EnhancedScholarshipScraper:
             try:
                 # Enhanced user agent rotation logic
                 rotation_chance = 0.15 + (attempt * 0.25)  # 15% first try, 40% second, 65% third
-                if random.random() < rotation_chance:
+                if self.rng.random() < rotation_chance:
                     self.rotate_user_agent()
                     st.info(f"🔄 Switching browser identity for attempt {attempt + 1}")
                 
                 # Intelligent delay with human-like patterns
                 if attempt > 0:
-                    retry_delay = RETRY_DELAY * (attempt + 1) + random.uniform(2, 5)
+                    retry_delay = RETRY_DELAY * (attempt + 1) + self.rng.uniform(2, 5)
                     st.info(f"⏱️ Smart retry delay: {retry_delay:.1f}s (attempt {attempt + 1})")
-                    time.sleep(retry_delay)
+                    self.clock.sleep(retry_delay)
                 else:
                     self.intelligent_delay()
                 
                 # Add random pre-request behavior
-                if random.random() < 0.2:  # 20% chance
+                if self.rng.random() < 0.2:  # 20% chance
                     self.mimic_pre_request_behavior()
                 
                 # Make the request with timeout variation
-                timeout = random.uniform(15, 25)  # Variable timeout to seem more human
+                timeout = self.rng.uniform(15, 25)  # Variable timeout to seem more human
                 response = self.session.get(url, timeout=timeout)
                 
                 if response.status_code == 200:
@@ -352,31 +376,31 @@ class EnhancedScholarshipScraper:
                     st.warning(f"🚫 Access denied on {url} (attempt {attempt + 1}) - Enhanced stealth mode")
                     self.activate_stealth_mode()
                     retry_delay = self.adaptive_retry_strategy(403, attempt)
-                    time.sleep(retry_delay)
+                    self.clock.sleep(retry_delay)
                 elif response.status_code == 429:
                     retry_delay = self.adaptive_retry_strategy(429, attempt)
                     st.warning(f"⏱️ Rate limited on {url}, intelligent backoff: {retry_delay}s...")
-                    time.sleep(retry_delay)
+                    self.clock.sleep(retry_delay)
                 elif response.status_code == 503:
                     retry_delay = self.adaptive_retry_strategy(503, attempt)
                     st.warning(f"🔧 Service unavailable on {url}, adaptive retry in {retry_delay}s...")
-                    time.sleep(retry_delay)
+                    self.clock.sleep(retry_delay)
                 else:
                     st.warning(f"❓ HTTP {response.status_code} on {url}")
                     response.raise_for_status()
                     
             except requests.exceptions.Timeout:
                 st.warning(f"⏰ Timeout on {url} (attempt {attempt + 1}) - Adjusting timeout")
-                time.sleep(random.uniform(3, 10))
+                self.clock.sleep(self.rng.uniform(3, 10))
             except requests.exceptions.ConnectionError:
                 st.warning(f"🔌 Connection error on {url} (attempt {attempt + 1}) - Network retry")
-                time.sleep(random.uniform(5, 15))
+                self.clock.sleep(self.rng.uniform(5, 15))
             except requests.exceptions.RequestException as e:
                 st.warning(f"⚠️ Request error on {url}: {str(e)}")
                 if attempt == max_retries - 1:
                     self.track_domain_request(url, success=False)
                     return None
-                time.sleep(random.uniform(3, 12))
+                self.clock.sleep(self.rng.uniform(3, 12))
         
         self.track_domain_request(url, success=False)
         st.error(f"❌ Failed to access {url} after {max_retries} enhanced attempts")
@@ -385,14 +409,14 @@ class EnhancedScholarshipScraper:
     def mimic_pre_request_behavior(self):
         """Mimic human pre-request behaviors"""
         behaviors = [
-            ("🤔 Checking page...", random.uniform(0.5, 1.5)),
-            ("🔍 Reading URL...", random.uniform(0.3, 1.0)),
-            ("📱 Adjusting browser...", random.uniform(0.5, 2.0)),
+            ("🤔 Checking page...", self.rng.uniform(0.5, 1.5)),
+            ("🔍 Reading URL...", self.rng.uniform(0.3, 1.0)),
+            ("📱 Adjusting browser...", self.rng.uniform(0.5, 2.0)),
         ]
         
-        behavior, delay = random.choice(behaviors)
+        behavior, delay = self.rng.choice(behaviors)
         st.info(behavior)
-        time.sleep(delay)
+        self.clock.sleep(delay)
 
     def activate_stealth_mode(self):
         """Activate enhanced stealth mode when blocked"""
@@ -408,9 +432,9 @@ class EnhancedScholarshipScraper:
         self.update_session_headers()
         
         # Add a longer delay
-        stealth_delay = random.uniform(10, 20)
+        stealth_delay = self.rng.uniform(10, 20)
         st.info(f"🔒 Stealth delay: {stealth_delay:.1f}s")
-        time.sleep(stealth_delay)
+        self.clock.sleep(stealth_delay)
 
     def scrape_site(self, url, goal="student"):
         try:
@@ -448,42 +472,75 @@ class EnhancedScholarshipScraper:
                         'source': url,
                         'category': goal,
                         'target_audience': goal,
-                        'scraped_at': datetime.now().isoformat()
+                        'scraped_at': self.clock.now().isoformat()
                     })
             return opportunities[:25]
         except Exception as e:
             st.error(f"Error scraping {url}: {str(e)}")
             return []
 
-    def search_by_goal(self, goal="student", keywords=None, custom_sites=None, user_id=None, country=None):
-        """Fast search using intelligent caching with background database updates"""
+    def search_by_goal(self, goal="student", keywords=None, custom_sites=None, user_id=None, country=None,
+                       open_only=False, closing_within_days=None, min_amount_usd=None, sort_by_amount=False,
+                       cursor=None, semantic=False):
+        """Fast search using intelligent caching with background database updates
+
+        Returns one page of results; self.next_cursor continues the search
+        (pass it back as cursor to load more). Later pages are read from the
+        cache only. Without sort_by_amount or closing_within_days, results are
+        in blended-signal order (core.ranking) and carry their rank_score;
+        semantic also matches the keywords by meaning (core.semantic).
+        Misspelled keywords are matched as their corrections (core.fuzzy),
+        which self.suggestion holds (None when nothing was corrected).
+        self.facets holds the facet counts of every cached match, not only
+        this page (see ScholarshipCache.search_facets).
+        """
         
         # Step 1: Get cached scholarships immediately (fast response)
-        st.info(f"🚀 Searching cached scholarships for {goal} opportunities{f' in {country}' if country else ''}...")
-        
-        cached_opportunities = self.cache.search_scholarships(
-            goal=goal,
-            keywords=keywords,
-            country=country,
-            limit=50
-        )
+        if not cursor:
+            st.info(f"🚀 Searching cached scholarships for {goal} opportunities{f' in {country}' if country else ''}...")
+            self.suggestion = self.cache.suggest_keywords(keywords)
+            if self.suggestion:
+                st.info(f"🔤 Showing results for: {', '.join(self.suggestion)}")
+            self.facets = self.cache.search_facets(goal=goal, keywords=keywords, country=country,
+                                                   open_only=open_only, closing_within_days=closing_within_days,
+                                                   min_amount_usd=min_amount_usd, fuzzy=True)
+        
+        if sort_by_amount or closing_within_days is not None:
+            cached_opportunities, self.next_cursor = self.cache.search_page(
+                goal=goal,
+                keywords=keywords,
+                country=country,
+                page_size=50,
+                cursor=cursor,
+                open_only=open_only,
+                closing_within_days=closing_within_days,
+                min_amount_usd=min_amount_usd,
+                sort_by_amount=sort_by_amount,
+                fuzzy=True
+            )
+        else:
+            # Default order: relevance, geography, deadline, amount and source signals blended
+            cached_opportunities, self.next_cursor = self.cache.search_ranked_page(
+                goal=goal,
+                keywords=keywords,
+                country=country,
+                page_size=50,
+                cursor=cursor,
+                open_only=open_only,
+                min_amount_usd=min_amount_usd,
+                semantic=semantic,
+                fuzzy=True
+            )
         
         # Format cached data for consistency
-        formatted_opportunities = []
-        for opp in cached_opportunities:
-            formatted_opportunities.append({
-                'title': opp['title'],
-                'description': opp['description'] or 'No description available',
-                'amount': opp['amount'] or 'Amount not specified',
-                'deadline': opp['deadline'] or 'Check website for deadline',
-                'category': opp['category'] or 'General',
-                'source': opp['source'] or '#',
-                'goal_type': opp['goal_type'],
-                'country': opp['country'],
-                'priority': opp['priority']
-            })
+        formatted_opportunities = [self._format_cached(opp) for opp in cached_opportunities]
+        
+        if cursor:
+            # The first page already started the background refresh
+            return formatted_opportunities
         
         st.success(f"✅ Found {len(formatted_opportunities)} scholarships from cache (instant results)")
+        keywords = self.suggestion or keywords  # Sites are searched for the corrected words too
         
         # Step 2: Start background database update (non-blocking)
         self._start_background_update(goal, keywords, country, user_id)
@@ -495,9 +552,9 @@ class EnhancedScholarshipScraper:
             # Get fresh scholarships from a few reliable sources
             fresh_opportunities = self._perform_limited_scraping(goal, keywords, country)
             
-            # Add fresh scholarships to cache
+            # Queue fresh scholarships for the cache's writer; the search does not wait for the write
             if fresh_opportunities:
-                self.cache.add_scholarships([{
+                self.cache.queue_scholarships([{
                     'title': opp['title'],
                     'description': opp['description'],
                     'amount': opp['amount'],
@@ -515,6 +572,36 @@ class EnhancedScholarshipScraper:
         
         return formatted_opportunities
 
+    def best_matches(self, profile, goal=None, country=None, limit=20):
+        """Personalized results: the cached scholarships that fit a user profile best, each with its match_score
+
+        Eligibility (goal, GPA, country, open deadline) and topic similarity
+        come from the store's matching index (see ScholarshipCache.best_matches).
+        """
+        self.next_cursor = None
+        self.facets = None
+        return [dict(self._format_cached(opp), match_score=opp['match_score'])
+                for opp in self.cache.best_matches(profile, goal=goal, country=country, limit=limit)]
+
+    @staticmethod
+    def _format_cached(opp):
+        """A cached scholarship row in the result format the UI shows"""
+        return {
+            'title': opp['title'],
+            'description': opp['description'] or 'No description available',
+            'amount': opp['amount'] or 'Amount not specified',
+            'amount_usd': opp['amount_max_usd'],
+            'full_funding': bool(opp['full_funding']),
+            'deadline': opp['deadline'] or 'Check website for deadline',
+            'deadline_date': opp['deadline_date'],
+            'category': opp['category'] or 'General',
+            'source': opp['source'] or '#',
+            'goal_type': opp['goal_type'],
+            'country': opp['country'],
+            'priority': opp['priority'],
+            'rank_score': opp.get('rank_score')
+        }
+
     def _start_background_update(self, goal, keywords, country, user_id):
         """Start background scraping to update database (non-blocking)"""
         
@@ -612,7 +699,7 @@ class EnhancedScholarshipScraper:
                     print(f"✅ Found {len(site_scholarships)} scholarships from {site}")
                 
                 # ENHANCED: Shorter delays for background (was 2-5, now 1-3)
-                time.sleep(random.uniform(1, 3))
+                self.clock.sleep(self.rng.uniform(1, 3))
                 
             except Exception as e:
                 print(f"⚠️ Background scraping failed for {site}: {e}")
@@ -632,13 +719,11 @@ class EnhancedScholarshipScraper:
                 'priority': 2  # Higher priority for background finds
             } for sch in new_scholarships]
             
-            self.cache.add_scholarships(formatted_scholarships)
+            self.cache.queue_scholarships(formatted_scholarships)
             print(f"🎉 ENHANCED background update complete: {len(new_scholarships)} new scholarships added")
         
-        # ENHANCED: More thorough cleanup
-        self.cache.cleanup_expired_scholarships(days_old=21)  # Remove older than 3 weeks
-        self.cache.remove_duplicate_scholarships()  # NEW: Remove duplicates
-        print("🧹 Enhanced cleanup: removed expired and duplicate scholarships")
+        # Archive expired and closed scholarships in bounded batches (no-op until due)
+        self.cache.run_maintenance()
 
     def _update_background_timestamp(self, country):
         """Update timestamp for last background update"""
@@ -646,7 +731,7 @@ class EnhancedScholarshipScraper:
         timestamp_key = f"bg_update_{country or 'global'}"
         if not hasattr(self, '_background_timestamps'):
             self._background_timestamps = {}
-        self._background_timestamps[timestamp_key] = datetime.now()
+        self._background_timestamps[timestamp_key] = self.clock.now()
 
     def _perform_limited_scraping(self, goal, keywords, country):
         """Perform limited scraping for immediate results"""
@@ -691,6 +776,7 @@ class EnhancedScholarshipScraper:
             
             soup = BeautifulSoup(response.content, 'html.parser')
             scholarships = []
+            seen = MinHashLSH()  # Same listing matched by several patterns counts once
             
             # Generic scholarship extraction patterns
             scholarship_patterns = [
@@ -710,14 +796,15 @@ class EnhancedScholarshipScraper:
                 for elem in elements[:5]:  # Limit per pattern
                     try:
                         scholarship = self._extract_scholarship_from_element(elem, url, goal, country)
-                        if scholarship and scholarship not in scholarships:
+                        if scholarship and seen.find(scholarship['title'], scholarship.get('description') or '') is None:
+                            seen.add(scholarship['title'], scholarship.get('description') or '')
                             scholarships.append(scholarship)
                     except Exception:
                         continue
             
-            # Save to cache for future searches
+            # Queue for the cache's writer, so future searches find them
             if scholarships:
-                self.cache.add_scholarships([{
+                self.cache.queue_scholarships([{
                     'title': s['title'],
                     'description': s['description'],
                     'amount': s['amount'],
@@ -854,23 +941,23 @@ class EnhancedScholarshipScraper:
                 
                 # Anti-bot delay between sites
                 if i < len(target_sites) - 1:
-                    time.sleep(random.uniform(2, 4))
+                    self.clock.sleep(self.rng.uniform(2, 4))
                     
             except Exception as e:
                 st.warning(f"⚠️ Could not scrape {site}: {str(e)}")
                 continue
         
+        # Aggregators often list the same scholarship as the country sites
+        all_scholarships = dedupe_scholarships(all_scholarships)
         st.success(f"🎉 Aggressive search complete! Found {len(all_scholarships)} fresh scholarships")
         return all_scholarships
 
     def update_session_headers(self):
         """Update the session headers with a new random user agent and referrer."""
-        import random
-        from .config import USER_AGENTS, REFERRERS, BROWSER_HEADERS
-        self.current_user_agent = random.choice(USER_AGENTS)
+        self.current_user_agent = self.rng.choice(USER_AGENTS)
         headers = BROWSER_HEADERS.copy()
         headers['User-Agent'] = self.current_user_agent
-        headers['Referer'] = random.choice(REFERRERS)
+        headers['Referer'] = self.rng.choice(REFERRERS)
         self.session.headers.update(headers)
         # Optionally rotate cookies or clear session if needed
         self.session_persistence['user_agent_rotations'] += 1
@@ -880,23 +967,24 @@ class EnhancedScholarshipScraper:
         self.session_persistence['user_agent_rotations'] += 1
         
         # Rotate every 5-8 requests
-        if self.session_persistence['user_agent_rotations'] % random.randint(5, 8) == 0:
+        if self.session_persistence['user_agent_rotations'] % self.rng.randint(5, 8) == 0:
             self.update_session_headers()
     
     def _apply_anti_bot_delay(self):
         """Apply intelligent delays to avoid bot detection"""
         
         # Base delay between requests
-        base_delay = random.uniform(MIN_DELAY, MAX_DELAY)
+        base_delay = self.rng.uniform(MIN_DELAY, MAX_DELAY)
         
         # Additional delay based on request frequency
         if self.session_persistence['total_requests'] > 10:
-            frequency_delay = random.uniform(1, 3)
+            frequency_delay = self.rng.uniform(1, 3)
             base_delay += frequency_delay
         
         # Random human-like pauses
-        if random.random() < 0.1:  # 10% chance of longer pause
-            base_delay += random.uniform(5, 10)
+        if self.rng.random() < 0.1:  # 10% chance of longer pause
+            base_delay += self.rng.uniform(5, 10)
         
-        time.sleep(base_delay)
+        self.clock.sleep(base_delay)
         self.session_persistence['total_requests'] += 1
+        return base_delay
@@ -0,0 +1,358 @@
+"""
+Offline semantic search
+Scholarships are embedded at ingest as latent semantic (LSA) vectors: TF-IDF
+over the corpus vocabulary projected onto its leading topics, fitted from the
+corpus itself, so nothing is downloaded and no network call is made. Queries
+are also expanded with related study terms, so "computer science masters"
+reaches a "Graduate STEM Scholarship". Searches go through an in-process
+inverted-file (IVF) index over a float32 memory-mapped matrix of the vectors.
+"""
+
+import json
+import math
+import os
+import tempfile
+import threading
+import uuid
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import SEMANTIC_DIMENSIONS, SEMANTIC_FIT_ROWS, SEMANTIC_PROBES, SEMANTIC_VOCABULARY, SEMANTIC_WEIGHT
+from .matching import SCHOLARSHIP_FIELD_WEIGHTS, terms
+
+# Words a query word also searches for: each group is one topic
+RELATED_TERMS = (
+    'stem science technology engineering mathematics math computer computing software informatics data '
+    'statistics physics chemistry biology',
+    'graduate postgraduate masters msc mba mphil phd doctoral doctorate',
+    'undergraduate bachelor bachelors bsc diploma',
+    'medicine medical health nursing clinical pharmacy dentistry',
+    'business entrepreneur entrepreneurship startup enterprise innovation',
+    'arts artist music film creative design writing theatre',
+    'agriculture farming agribusiness food',
+    'women girls female gender',
+    'leadership leader civic community',
+    'research researcher fellowship postdoctoral',
+    'law legal justice',
+    'education teaching teacher',
+    'environment climate conservation sustainability energy',
+)
+RELATED_WEIGHT = 0.5  # Term frequency a related word gets in the query, against 1 for a typed word
+RRF_K = 60  # Reciprocal rank fusion constant: how flat the blend weighs ranks
+MIN_SIMILARITY = 0.1  # Cosine below which a neighbour is not considered related
+IVF_MIN_ROWS = 4096  # Below this many vectors every query scans them all
+IVF_REBUILD_GROWTH = 0.1  # Vectors appended since the last build, as a share of it, that trigger a rebuild
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE_PER_LIST = 64
+
+
+def _related_groups() -> Dict[str, frozenset]:
+    """Stemmed term -> the stemmed terms of its RELATED_TERMS group"""
+    groups = {}
+    for line in RELATED_TERMS:
+        group = frozenset(terms(line))
+        for term in group:
+            groups.setdefault(term, group)
+    return groups
+
+
+_RELATED = _related_groups()
+
+
+def document_terms(scholarship: Dict) -> Counter:
+    """Field-weighted term counts of a scholarship (the same fields and weights as matching)"""
+    counts = Counter()
+    for field, weight in SCHOLARSHIP_FIELD_WEIGHTS:
+        for term in terms(scholarship.get(field)):
+            counts[term] += weight
+    return counts
+
+
+def query_terms(text: str) -> Counter:
+    """Term frequencies of a query: its own terms, plus RELATED_WEIGHT for each related term"""
+    counts = Counter(terms(text))
+    for group in {_RELATED[term] for term in counts if term in _RELATED}:
+        for term in group:
+            counts[term] = max(counts[term], RELATED_WEIGHT)
+    return counts
+
+
+class SemanticModel:
+    """Vocabulary, IDF weights and LSA projection a corpus was fitted with
+
+    Stored in the database (semantic_model) with a version: vectors embedded
+    by one version are only compared with queries embedded by the same one.
+    """
+
+    def __init__(self, version: str, fitted_rows: int, vocabulary: List[str], idf: np.ndarray,
+                 projection: np.ndarray):
+        self.version = version
+        self.fitted_rows = fitted_rows
+        self.vocabulary = vocabulary
+        self.columns = {term: index for index, term in enumerate(vocabulary)}
+        self.idf = idf
+        self.projection = projection  # len(vocabulary) x dimensions
+
+    @property
+    def dimensions(self) -> int:
+        return self.projection.shape[1]
+
+    @classmethod
+    def fit(cls, documents: Sequence[Counter], dimensions: int = SEMANTIC_DIMENSIONS) -> 'SemanticModel':
+        """Fit on document_terms of the corpus: the SEMANTIC_VOCABULARY most common terms, then LSA
+
+        The projection is the leading eigenvectors of the TF-IDF term
+        co-occurrence matrix (the right singular vectors of LSA), found by
+        randomized subspace iteration; a corpus with fewer terms than
+        dimensions keeps all of them, which is plain TF-IDF cosine.
+        """
+        frequency = Counter()
+        for document in documents:
+            frequency.update(document.keys())
+        vocabulary = [term for term, _ in sorted(frequency.items(), key=lambda item: (-item[1], item[0]))
+                      [:SEMANTIC_VOCABULARY]]
+        df = np.array([frequency[term] for term in vocabulary], dtype=np.float64)
+        idf = (np.log((1 + len(documents)) / (1 + df)) + 1).astype(np.float32)
+        model = cls(uuid.uuid4().hex[:12], len(documents), vocabulary, idf,
+                    np.eye(len(vocabulary), dtype=np.float32))
+
+        gram = np.zeros((len(vocabulary), len(vocabulary)), dtype=np.float32)
+        for start in range(0, len(documents), 2048):
+            tfidf = np.stack([model.tfidf(document, sublinear=True) for document in documents[start:start + 2048]])
+            gram += tfidf.T @ tfidf
+        model.projection = _leading_eigenvectors(gram, dimensions)
+        return model
+
+    def tfidf(self, counts: Counter, sublinear: bool = False) -> np.ndarray:
+        """L2-normalized TF-IDF vector over the vocabulary (tf = 1 + log(count) when sublinear)"""
+        vector = np.zeros(len(self.vocabulary), dtype=np.float32)
+        for term, count in counts.items():
+            column = self.columns.get(term)
+            if column is not None:
+                vector[column] = (1 + math.log(count) if sublinear else count) * self.idf[column]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _embed(self, tfidf: np.ndarray) -> np.ndarray:
+        columns = np.flatnonzero(tfidf)
+        vector = tfidf[columns] @ self.projection[columns]
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).astype(np.float32)
+
+    def embed_scholarship(self, scholarship: Dict) -> np.ndarray:
+        """Unit vector of a scholarship (zeros when none of its terms is in the vocabulary)"""
+        return self._embed(self.tfidf(document_terms(scholarship), sublinear=True))
+
+    def encode(self, scholarship: Dict) -> bytes:
+        """embed_scholarship packed as stored in semantic_vector"""
+        return self.embed_scholarship(scholarship).astype('<f4').tobytes()
+
+    def embed_query(self, text: str) -> np.ndarray:
+        """Unit vector of a search query, related terms included"""
+        return self._embed(self.tfidf(query_terms(text)))
+
+    def to_row(self) -> tuple:
+        """(version, fitted_rows, vocabulary, idf, projection) as stored in semantic_model"""
+        return (self.version, self.fitted_rows, json.dumps(self.vocabulary),
+                self.idf.astype('<f4').tobytes(), self.projection.astype('<f4').tobytes())
+
+    @classmethod
+    def from_row(cls, row: Sequence) -> 'SemanticModel':
+        version, fitted_rows, vocabulary, idf, projection = row
+        vocabulary = json.loads(vocabulary)
+        projection = np.frombuffer(bytes(projection), '<f4').reshape(len(vocabulary), -1)
+        return cls(version, fitted_rows, vocabulary, np.frombuffer(bytes(idf), '<f4'), projection)
+
+
+def _leading_eigenvectors(gram: np.ndarray, count: int) -> np.ndarray:
+    """The count leading eigenvectors of a symmetric matrix, as columns"""
+    size = len(gram)
+    if size <= count:
+        return np.linalg.eigh(gram)[1][:, ::-1].astype(np.float32)
+    rng = np.random.default_rng(0)
+    basis = np.linalg.qr(gram @ rng.standard_normal((size, count + 16)).astype(np.float32))[0]
+    for _ in range(3):
+        basis = np.linalg.qr(gram @ basis)[0]
+    values, vectors = np.linalg.eigh(basis.T @ gram @ basis)
+    return (basis @ vectors[:, np.argsort(values)[::-1][:count]]).astype(np.float32)
+
+
+def needs_refit(model: Optional[SemanticModel], rows: int) -> bool:
+    """Whether a corpus of rows rows should be (re)fitted: no model yet, or it doubled since, up to SEMANTIC_FIT_ROWS"""
+    return model is None or (model.fitted_rows < SEMANTIC_FIT_ROWS and rows >= 2 * max(model.fitted_rows, 1))
+
+
+class SemanticIndex:
+    """Approximate nearest neighbours over the stored vectors of one database
+
+    The vectors sit in a float32 matrix memory-mapped from a temporary file,
+    so the OS pages it rather than the Python heap holding it. Once there are
+    IVF_MIN_ROWS of them they are clustered into about sqrt(n) lists
+    (spherical k-means) and stored list by list; a query scans the
+    SEMANTIC_PROBES lists whose centroids are closest, plus the vectors
+    appended since the last build. sync() catches up with the database
+    through each row's semantic_seq and rebuilds on a new model or after
+    IVF_REBUILD_GROWTH growth.
+    """
+
+    def __init__(self):
+        self.version = None  # Model version of the indexed vectors
+        self.model = None
+        self.seq = 0  # Highest semantic_seq indexed
+        self._lock = threading.Lock()
+        self._clear(0)
+
+    def _clear(self, dimensions: int):
+        self.ids = np.zeros(0, dtype=np.int64)  # Per slot; -1 once a newer vector of the row replaced it
+        self.vectors = self._allocate(1024, dimensions)
+        self.count = 0
+        self.slot_of = {}
+        self.centroids = None
+        self.list_bounds = np.zeros(1, dtype=np.int64)  # List i holds slots list_bounds[i]:list_bounds[i + 1]
+        self.built_count = 0
+
+    @staticmethod
+    def _allocate(rows: int, dimensions: int) -> np.memmap:
+        return np.memmap(tempfile.TemporaryFile(), dtype=np.float32,
+                         mode='w+', shape=(rows, max(dimensions, 1)))
+
+    def __len__(self):
+        return len(self.slot_of)
+
+    def sync(self, version: Optional[str], load_model: Callable[[], SemanticModel],
+             changed_since: Callable[[int], Iterable[Tuple[int, int, bytes]]]) -> 'SemanticIndex':
+        """Catch up with the database
+
+        version is the stored model's (None before one is fitted), load_model
+        reads it, and changed_since(seq) yields (id, semantic_seq, vector)
+        of the rows embedded after seq, in semantic_seq order.
+        """
+        with self._lock:
+            if version != self.version:
+                self.model = load_model() if version else None
+                self.version, self.seq = version, 0
+                self._clear(self.model.dimensions if self.model else 0)
+            changed = list(changed_since(self.seq)) if self.model else []
+            if not changed:
+                return self
+            if self.seq == 0 or len(changed) > IVF_REBUILD_GROWTH * max(self.built_count, IVF_MIN_ROWS):
+                if self.seq:
+                    changed = list(changed_since(0))
+                self._clear(self.model.dimensions)
+                self._append(changed)
+                self._build()
+            else:
+                self._append(changed)
+            self.seq = changed[-1][1]
+        return self
+
+    def _append(self, rows: List[Tuple[int, int, bytes]]):
+        needed = self.count + len(rows)
+        if needed > len(self.vectors):
+            grown = self._allocate(max(needed, 2 * len(self.vectors)), self.vectors.shape[1])
+            grown[:self.count] = self.vectors[:self.count]
+            self.vectors = grown
+        ids = np.empty(needed, dtype=np.int64)
+        ids[:self.count] = self.ids[:self.count]
+        for offset, (row_id, _, blob) in enumerate(rows):
+            previous = self.slot_of.get(row_id)
+            if previous is not None:
+                ids[previous] = -1
+            self.slot_of[row_id] = self.count + offset
+            ids[self.count + offset] = row_id
+        self.vectors[self.count:needed] = np.frombuffer(b''.join(blob for _, _, blob in rows), '<f4').reshape(
+            len(rows), -1)
+        self.ids, self.count = ids, needed
+
+    def _build(self):
+        """Cluster the vectors into lists and lay them out list by list"""
+        self.built_count = self.count
+        if self.count < IVF_MIN_ROWS:
+            return
+        vectors = np.asarray(self.vectors[:self.count])
+        lists = int(math.sqrt(self.count))
+        rng = np.random.default_rng(0)
+        sample = vectors[rng.choice(self.count, min(self.count, lists * KMEANS_SAMPLE_PER_LIST), replace=False)]
+        centroids = sample[rng.choice(len(sample), lists, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+
+        assignment = np.concatenate([np.argmax(vectors[start:start + 8192] @ centroids.T, axis=1)
+                                     for start in range(0, self.count, 8192)])
+        order = np.argsort(assignment, kind='stable')
+        self.vectors[:self.count] = vectors[order]
+        self.ids = self.ids[order]
+        self.slot_of = {int(row_id): slot for slot, row_id in enumerate(self.ids) if row_id >= 0}
+        self.centroids = centroids
+        self.list_bounds = np.searchsorted(assignment[order], np.arange(lists + 1))
+
+    def search(self, text: str, limit: int) -> List[Tuple[int, float]]:
+        """(id, cosine similarity) of up to limit rows closest in meaning to a query, at least MIN_SIMILARITY"""
+        with self._lock:
+            if self.model is None:
+                return []
+            return self._nearest(self.model.embed_query(text), limit)
+
+    def _nearest(self, vector: np.ndarray, limit: int, probes: int = SEMANTIC_PROBES) -> List[Tuple[int, float]]:
+        if not self.count or not vector.any():
+            return []
+        if self.centroids is None:
+            ranges = [(0, self.count)]
+        else:
+            closest = np.argsort(-(self.centroids @ vector))[:probes]
+            ranges = [(self.list_bounds[i], self.list_bounds[i + 1]) for i in closest]
+            ranges.append((self.built_count, self.count))  # Appended since the build
+        slots = np.concatenate([np.arange(start, end) for start, end in ranges])
+        scores = np.concatenate([self.vectors[start:end] @ vector for start, end in ranges])
+        keep = (scores >= MIN_SIMILARITY) & (self.ids[slots] >= 0)
+        slots, scores = slots[keep], scores[keep]
+        if len(slots) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+            slots, scores = slots[best], scores[best]
+        order = np.argsort(-scores, kind='stable')
+        return [(int(self.ids[slot]), round(float(score), 4)) for slot, score in zip(slots[order], scores[order])]
+
+
+def blend(keyword_rows: Sequence[Dict], semantic_rows: Sequence[Dict], weight: float = SEMANTIC_WEIGHT) -> tuple:
+    """Keyword and semantic matches merged by reciprocal rank fusion, best first
+
+    Each row's relevance becomes 1 / (RRF_K + its keyword rank) plus weight /
+    (RRF_K + its semantic rank): rows both searches find come first, and a
+    row only one of them finds ranks by how high it was found. Rows are
+    folded by near-duplicate cluster; semantic matches keep their
+    semantic_score.
+    """
+    blended = {}
+    for rank, row in enumerate(keyword_rows, 1):
+        blended.setdefault(row.get('cluster_id') or row['id'], dict(row, relevance=1 / (RRF_K + rank)))
+    for rank, row in enumerate(semantic_rows, 1):
+        entry = blended.setdefault(row.get('cluster_id') or row['id'], dict(row, relevance=0.0))
+        entry['relevance'] += weight / (RRF_K + rank)
+        entry['semantic_score'] = row['semantic_score']
+    return tuple(sorted(blended.values(), key=lambda row: -row['relevance']))
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_semantic_index(db_file: str) -> SemanticIndex:
+    """Process-wide semantic index of a database file, shared by every cache instance"""
+    key = os.path.abspath(db_file)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = SemanticIndex()
+        return index
+
+
+def release_semantic_index(db_file: str):
+    """Forget a database file's semantic index (its vectors' temporary file goes with it)"""
+    with _indexes_lock:
+        _indexes.pop(os.path.abspath(db_file), None)
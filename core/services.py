@@ -0,0 +1,37 @@
+"""
+Process-wide service container
+Builds the databases and shared helpers once per process; the UI caches the
+container with st.cache_resource so reruns reuse it instead of rebuilding
+"""
+
+from .api import APIManager
+from .config import DATABASE_FILE, DATABASE_URL, LEGACY_DATABASE_FILE
+from .cv_templates import CVTemplateGenerator
+from .profile import CVExtractor
+from .scraping import EnhancedScholarshipScraper
+from .storage import ScholarshipStore, UserStore, open_storage
+
+
+class Services:
+    """Shared, thread-safe services: one database, cache and DatabaseManager per process
+
+    With DATABASE_URL set to a PostgreSQL URL every process shares that
+    database; otherwise each deployment uses its own SQLite db_file.
+    """
+
+    cache: ScholarshipStore
+    db_manager: UserStore
+
+    def __init__(self, db_file=DATABASE_FILE, legacy_file=LEGACY_DATABASE_FILE, database_url=DATABASE_URL):
+        self.cache, self.db_manager = open_storage(database_url, db_file=db_file, legacy_file=legacy_file)
+        self.api_manager = APIManager()
+        self.cv_extractor = CVExtractor()
+        self.cv_generator = CVTemplateGenerator()
+
+    def new_scraper(self) -> EnhancedScholarshipScraper:
+        """Scraper for one user session, writing through the shared cache
+
+        Scrapers keep per-session state (the next-page cursor, HTTP session and
+        politeness counters), so each session gets its own instead of sharing one.
+        """
+        return EnhancedScholarshipScraper(self.db_manager, cache=self.cache)
@@ -0,0 +1,126 @@
+"""
+Storage backends
+The app talks to two objects: a scholarship store (ScholarshipStore) and a
+user store (UserStore). Both come in a SQLite flavour
+(one file per deployment) and a PostgreSQL one (one database shared by every
+dyno); open_storage picks by the configured database URL.
+"""
+
+from concurrent.futures import Future
+from typing import Dict, Iterable, List, Optional, Protocol, Tuple
+
+from .config import DATABASE_FILE, DATABASE_URL, INGEST_CHUNK_SIZE
+
+
+class ScholarshipStore(Protocol):
+    """What the rest of the app may call on a scholarship store, whichever backend it is
+
+    ScholarshipCache (SQLite) and PostgresScholarshipCache implement it;
+    see ScholarshipCache for what each method does.
+    """
+
+    def add_scholarships(self, scholarships: Iterable[Dict],
+                         chunk_size: int = INGEST_CHUNK_SIZE) -> Dict[str, int]: ...
+
+    def queue_scholarships(self, scholarships: Iterable[Dict]) -> Future: ...
+
+    def flush_writes(self, timeout: float = None, durable: bool = False) -> bool: ...
+
+    def bulk_load(self, scholarships: Iterable[Dict], chunk_size: int = INGEST_CHUNK_SIZE) -> Dict[str, int]: ...
+
+    def iter_scholarships(self, columns: Iterable[str], batch_size: int = 1000) -> Iterable[Dict]: ...
+
+    def search_scholarships(self, goal: str = None, keywords: List[str] = None,
+                            country: str = None, limit: int = 50, open_only: bool = False,
+                            closing_within_days: int = None, min_amount_usd: float = None,
+                            sort_by_amount: bool = False, fuzzy: bool = False) -> List[Dict]: ...
+
+    def search_page(self, goal: str = None, keywords: List[str] = None, country: str = None,
+                    page_size: int = 50, cursor: str = None, open_only: bool = False,
+                    closing_within_days: int = None, min_amount_usd: float = None,
+                    sort_by_amount: bool = False, fuzzy: bool = False) -> Tuple[List[Dict], Optional[str]]: ...
+
+    def search_ranked_page(self, goal: str = None, keywords: List[str] = None, country: str = None,
+                           page_size: int = 50, cursor: str = None, open_only: bool = False,
+                           min_amount_usd: float = None, weights: Dict[str, float] = None,
+                           semantic: bool = False, fuzzy: bool = False) -> Tuple[List[Dict], Optional[str]]: ...
+
+    def source_reliability(self) -> Dict[str, float]: ...
+
+    def best_matches(self, profile: Dict, goal: str = None, country: str = None, limit: int = 20) -> List[Dict]: ...
+
+    def semantic_search(self, query: str, goal: str = None, country: str = None, limit: int = 20,
+                        open_only: bool = False, min_amount_usd: float = None) -> List[Dict]: ...
+
+    def suggest_keywords(self, keywords: List[str]) -> Optional[List[str]]: ...
+
+    def search_facets(self, goal: str = None, keywords: List[str] = None, country: str = None,
+                      open_only: bool = False, closing_within_days: int = None, min_amount_usd: float = None,
+                      fuzzy: bool = False) -> Dict[str, List[Tuple[str, int]]]: ...
+
+    def get_scholarship_count(self, country: str = None) -> int: ...
+
+    def get_scholarship_count_by_country(self, country: str = None) -> int: ...
+
+    def get_total_scholarship_count(self) -> int: ...
+
+    def get_cache_age(self, country: str = None) -> float: ...
+
+    def update_cache_metadata(self, source_url: str, success: bool): ...
+
+    def should_scrape_source(self, source_url: str, max_age_hours: int = 24) -> bool: ...
+
+    def cleanup_expired_scholarships(self, days_old: int = 30, max_batches: int = None) -> int: ...
+
+    def cleanup_past_deadlines(self, grace_days: int = 0, max_batches: int = None) -> int: ...
+
+    def run_maintenance(self, force: bool = False) -> Dict[str, int]: ...
+
+
+class UserStore(Protocol):
+    """What the rest of the app may call on a user store: DatabaseManager and PostgresDatabaseManager"""
+
+    def add_scholarships(self, scholarships: Iterable[Dict],
+                         chunk_size: int = INGEST_CHUNK_SIZE) -> Dict[str, int]: ...
+
+    def get_scholarships(self, goal: str = None, keywords: List[str] = None, limit: int = 50) -> List[Dict]: ...
+
+    def add_custom_site(self, url: str, user_id: str, is_public: bool = False) -> bool: ...
+
+    def get_custom_sites(self, user_id: str = None, include_public: bool = True) -> List[Dict]: ...
+
+    def get_popular_custom_sites(self, limit: int = 3) -> List[Dict]: ...
+
+    def get_user_custom_urls(self, user_id: str) -> List[Dict]: ...
+
+    def save_user_profile(self, user_id: str, profile_data: Dict): ...
+
+    def get_user_profile(self, user_id: str) -> Dict: ...
+
+
+def _protocol_methods(protocol) -> Tuple[str, ...]:
+    """Names of a store protocol's methods, in declaration order"""
+    return tuple(name for name, value in vars(protocol).items() if callable(value) and not name.startswith('_'))
+
+
+SCHOLARSHIP_STORE_METHODS = _protocol_methods(ScholarshipStore)
+USER_STORE_METHODS = _protocol_methods(UserStore)
+POSTGRES_SCHEMES = ('postgres://', 'postgresql://')
+
+
+def is_postgres_url(location: Optional[str]) -> bool:
+    return bool(location) and location.startswith(POSTGRES_SCHEMES)
+
+
+def open_storage(database_url: Optional[str] = DATABASE_URL, db_file: str = DATABASE_FILE,
+                 legacy_file: Optional[str] = None) -> Tuple[ScholarshipStore, UserStore]:
+    """(scholarship store, user store) for a PostgreSQL URL, or for the SQLite db_file when there is none"""
+    if is_postgres_url(database_url):
+        from .postgres_store import PostgresDatabaseManager, PostgresScholarshipCache
+        cache = PostgresScholarshipCache(database_url)
+        return cache, PostgresDatabaseManager(cache, legacy_file=legacy_file)
+
+    from .db import DatabaseManager
+    from .scholarship_cache import ScholarshipCache
+    cache = ScholarshipCache(database_url or db_file)
+    return cache, DatabaseManager(cache=cache, legacy_file=legacy_file)
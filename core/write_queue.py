@@ -0,0 +1,247 @@
+"""
+Single-writer write-behind queue
+One thread per database applies every cache mutation, coalescing queued
+writes into batched transactions and one publish per batch
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import Future, TimeoutError
+from typing import Any, Callable, List, Optional
+
+from .config import INGEST_CHUNK_SIZE, WRITE_QUEUE_IDLE_SECONDS, WRITE_QUEUE_MAX_JOBS
+
+
+class WriteJob:
+    """One queued mutation: apply(conn), or apply(cursor, rows) for a row job"""
+
+    __slots__ = ('apply', 'rows', 'publish', 'collect', 'future')
+
+    def __init__(self, apply: Callable, rows: Optional[List] = None, publish: Optional[bool] = True,
+                 collect: Callable[[List], Any] = None):
+        self.apply = apply
+        self.rows = rows
+        self.publish = publish
+        self.collect = collect
+        self.future = Future()
+
+
+class DirectWrites:
+    """Runs each mutation at once on the calling thread (the behaviour without a writer thread)
+
+    Same interface as WriteBehindQueue, so callers do not care which one
+    they hold. Futures come back already resolved.
+    """
+
+    def __init__(self, connection: Callable[[], sqlite3.Connection], on_commit: Callable[[bool], None],
+                 batch_rows: int = INGEST_CHUNK_SIZE):
+        self.connection = connection
+        self.on_commit = on_commit
+        self.batch_rows = batch_rows
+
+    def submit(self, mutation: Callable[[sqlite3.Connection], Any], publish: Optional[bool] = True) -> Future:
+        """Queue mutation(conn), which commits its own transactions
+
+        publish says what the batch does for searches once it commits: True
+        publishes the writes, False only drops cached results, None (writes
+        searches cannot see) neither.
+        """
+        return self._enqueue(WriteJob(mutation, publish=publish))
+
+    def submit_rows(self, apply: Callable[[sqlite3.Cursor, List], List], rows: List,
+                    publish: Optional[bool] = True, collect: Callable[[List], Any] = None) -> Future:
+        """Queue apply(cursor, rows), which returns one result per row, inside a transaction it may share
+
+        Consecutive row jobs with the same apply are handed to it as one list
+        in one transaction of up to batch_rows rows. The future gets this
+        job's results, passed through collect when given.
+        """
+        return self._enqueue(WriteJob(apply, list(rows), publish, collect))
+
+    def publish(self) -> Future:
+        """Queue a publish of everything written before it (after writes submitted with publish=False)"""
+        return self.submit(lambda conn: None, publish=True)
+
+    def run(self, mutation: Callable[[sqlite3.Connection], Any], publish: Optional[bool] = True) -> Any:
+        """submit() and wait for the result"""
+        return self.submit(mutation, publish).result()
+
+    def flush(self, timeout: float = None, durable: bool = False) -> bool:
+        """Wait until every write submitted so far is committed and visible to searches
+
+        durable also checkpoints the WAL with a full sync, so those commits
+        survive a power loss (synchronous=NORMAL only syncs at checkpoints).
+        Returns False if timeout seconds passed first.
+        """
+        checkpoint = (lambda conn: conn.execute("PRAGMA wal_checkpoint(FULL)").fetchone()) if durable \
+            else (lambda conn: None)
+        try:
+            self.submit(checkpoint, publish=None).result(timeout)
+            return True
+        except TimeoutError:
+            return False
+
+    def pending(self) -> int:
+        """Writes submitted but not applied yet"""
+        return 0
+
+    def _enqueue(self, job: WriteJob) -> Future:
+        self._execute([job])
+        return job.future
+
+    def _execute(self, jobs: List[WriteJob]):
+        """Apply jobs in order, publish once for all of them, then resolve their futures"""
+        outcomes = []  # (job, succeeded, result or exception)
+        group = []
+        for job in jobs:
+            if group and (job.rows is None or job.apply != group[0].apply or
+                          sum(len(queued.rows) for queued in group) + len(job.rows) > self.batch_rows):
+                outcomes.extend(self._apply_rows(group))
+                group = []
+            if job.rows is not None:
+                group.append(job)
+                continue
+            try:
+                outcomes.append((job, True, job.apply(self.connection())))
+            except Exception as e:
+                outcomes.append((job, False, e))
+        if group:
+            outcomes.extend(self._apply_rows(group))
+
+        effects = [job.publish for job, succeeded, _ in outcomes if succeeded and job.publish is not None]
+        if effects:
+            try:
+                self.on_commit(any(effects))
+            except Exception as e:  # Committed all the same; searches catch up on the next publish
+                print(f"Publishing queued writes failed: {e}")
+        for job, succeeded, result in outcomes:
+            if succeeded:
+                job.future.set_result(job.collect(result) if job.collect else result)
+            else:
+                job.future.set_exception(result)
+
+    def _apply_rows(self, group: List[WriteJob]) -> List[tuple]:
+        """Apply a group of row jobs in one transaction
+
+        A failed group is rolled back as a whole and its jobs are retried one
+        by one, so only the job that caused the failure gets the exception.
+        """
+        conn = self.connection()
+        try:
+            with conn:
+                results = group[0].apply(conn.cursor(), [row for job in group for row in job.rows])
+        except Exception as e:
+            if len(group) == 1:
+                return [(group[0], False, e)]
+            return [outcome for job in group for outcome in self._apply_rows([job])]
+        outcomes, start = [], 0
+        for job in group:
+            outcomes.append((job, True, results[start:start + len(job.rows)]))
+            start += len(job.rows)
+        return outcomes
+
+
+class WriteBehindQueue(DirectWrites):
+    """Serializes a database's writes through one writer thread
+
+    Callers submit mutations and get a Future back instead of taking the
+    write lock themselves, so they never wait on SQLite's lock; waiting for
+    the future is optional. The writer drains whatever has queued up (at most
+    max_jobs), applies it in order, coalescing row jobs into shared
+    transactions, then calls on_commit(publish) once for the whole batch
+    before resolving the futures, so a resolved write is visible to
+    searches. While one batch is published the next one queues up, so the
+    busier the writers, the larger the batches.
+
+    The thread starts on the first submit and exits after idle_seconds
+    without work. A mutation that submits further writes runs them inline.
+    Queued writes are flushed when the interpreter exits.
+    """
+
+    def __init__(self, connection: Callable[[], sqlite3.Connection], on_commit: Callable[[bool], None],
+                 batch_rows: int = INGEST_CHUNK_SIZE, max_jobs: int = WRITE_QUEUE_MAX_JOBS,
+                 idle_seconds: float = WRITE_QUEUE_IDLE_SECONDS, name: str = 'write-behind'):
+        super().__init__(connection, on_commit, batch_rows)
+        self.max_jobs = max_jobs
+        self.idle_seconds = idle_seconds
+        self.name = name
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()  # Guards starting and retiring the thread, and _unfinished
+        self._thread = None
+        self._unfinished = 0  # Queued or being applied
+        atexit.register(self._flush_at_exit)
+
+    def pending(self) -> int:
+        return self._unfinished
+
+    def _enqueue(self, job: WriteJob) -> Future:
+        if threading.current_thread() is self._thread:
+            self._execute([job])
+            return job.future
+        with self._lock:
+            self._unfinished += 1
+            self._queue.put(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        return job.future
+
+    def _run(self):
+        while True:
+            try:
+                jobs = [self._queue.get(timeout=self.idle_seconds)]
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+            while len(jobs) < self.max_jobs:
+                try:
+                    jobs.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._execute(jobs)
+            except Exception as e:  # Never let the writer die with futures unresolved
+                for job in jobs:
+                    if not job.future.done():
+                        job.future.set_exception(e)
+            with self._lock:
+                self._unfinished -= len(jobs)
+
+    def _flush_at_exit(self):
+        if self.pending():  # The thread is still alive, so the flush needs no new one
+            self.flush(timeout=WRITE_QUEUE_IDLE_SECONDS)
+
+
+_queues = {}
+_queues_lock = threading.Lock()
+
+
+def get_write_queue(db_file: str, connection: Callable[[], sqlite3.Connection],
+                    on_commit: Callable[[bool], None]) -> WriteBehindQueue:
+    """Process-wide write queue of a database file, shared by every cache instance
+
+    The first instance's connection and on_commit are used; instances of one
+    file share their pool and query cache, so any would do.
+    """
+    key = os.path.abspath(db_file)
+    with _queues_lock:
+        writes = _queues.get(key)
+        if writes is None:
+            writes = _queues[key] = WriteBehindQueue(
+                connection, on_commit, name=f"write-behind-{os.path.basename(db_file)}")
+        return writes
+
+
+def release_write_queue(db_file: str, timeout: float = None):
+    """Flush a database file's write queue and forget it (the next get_write_queue starts a new one)"""
+    with _queues_lock:
+        writes = _queues.pop(os.path.abspath(db_file), None)
+    if writes is not None:
+        writes.flush(timeout)
+        atexit.unregister(writes._flush_at_exit)
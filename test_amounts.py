@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for amount normalization, USD conversion and amount filtering/sorting
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.amounts import normalize_amount, parse_amount
+from core.fx_rates import FX_VERSION, USD_PER_UNIT
+from core.scholarship_cache import ScholarshipCache
+
+
+def test_parse_amount_formats():
+    cases = {
+        "$5,000 seed funding": (5000, 5000, 'USD', False),
+        "Full tuition + stipend": (None, None, None, True),
+        "Fully funded scholarship": (None, None, None, True),
+        "UGX 2,000,000": (2_000_000, 2_000_000, 'UGX', False),
+        "50000 UGX per year": (50_000, 50_000, 'UGX', False),
+        "Up to $10,000": (None, 10_000, 'USD', False),
+        "€10k - €15k": (10_000, 15_000, 'EUR', False),
+        "$5,000 - 10,000": (5_000, 10_000, 'USD', False),
+        "2,000 dollars": (2_000, 2_000, 'USD', False),
+        "$1.5 million for 30 students": (1_500_000, 1_500_000, 'USD', False),
+        "KES 50,000 (about $390)": (50_000, 50_000, 'KES', False),
+        "Awarded in 2025 to 30 students": (None, None, None, False),
+        "Check website": (None, None, None, False),
+        "": (None, None, None, False),
+    }
+    for text, expected in cases.items():
+        assert parse_amount(text) == expected, text
+    assert parse_amount(None) == (None, None, None, False)
+
+
+def test_normalize_amount_converts_with_the_offline_table():
+    assert normalize_amount("UGX 2,000,000") == (
+        2_000_000, 2_000_000, 'UGX', 0,
+        round(2_000_000 * USD_PER_UNIT['UGX'], 2), round(2_000_000 * USD_PER_UNIT['UGX'], 2), FX_VERSION)
+    assert normalize_amount("Up to $10,000")[4:6] == (None, 10_000)
+    assert normalize_amount("500 zorkmids")[:3] == (None, None, None)
+
+
+def test_min_amount_filter_and_amount_sort(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    amounts = {
+        "Delta Seed Grant": "$5,000 seed funding",
+        "Delta Capped Grant": "Up to $12,000",
+        "Delta Shilling Grant": "UGX 2,000,000",
+        "Delta Euro Grant": "€8k - €9k",
+        "Delta Tuition Grant": "Full tuition + stipend",
+    }
+    cache.add_scholarships({'title': title, 'source': "https://delta.example.org", 'amount': amount,
+                            'country': "Deltaland"} for title, amount in amounts.items())
+
+    def titles(**filters):
+        rows = cache.search_scholarships(country="Deltaland", limit=100, **filters)
+        return [row['title'] for row in rows if row['title'].startswith("Delta ")]
+
+    assert titles(min_amount_usd=5000, sort_by_amount=True) == [
+        "Delta Capped Grant", "Delta Euro Grant", "Delta Seed Grant"]
+    assert set(titles(min_amount_usd=9000)) == {"Delta Capped Grant", "Delta Euro Grant"}
+    assert titles(sort_by_amount=True)[-2:] == ["Delta Shilling Grant", "Delta Tuition Grant"]
+    tuition = cache.search_scholarships(country="Deltaland", keywords=['"Delta Tuition"'])[0]
+    assert tuition['full_funding'] == 1 and tuition['amount_max_usd'] is None
+
+
+def test_recrawl_without_amount_keeps_parsed_columns(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    cache.add_scholarships([{'title': "Kept Amount Grant", 'source': "https://kept.example.org",
+                             'amount': "$7,500"}])
+    cache.add_scholarships([{'title': "Kept Amount Grant", 'source': "https://kept.example.org",
+                             'description': "Re-crawled without an amount"}])
+    row = cache.pool.connection().execute(
+        "SELECT amount_max, amount_currency FROM scholarships WHERE title = 'Kept Amount Grant'").fetchone()
+    assert tuple(row) == (7500, 'USD')
+
+
+def test_rows_from_older_fx_versions_are_recomputed(make_db_path):
+    db_file = make_db_path()
+    ScholarshipCache(db_file=db_file).add_scholarships([
+        {'title': "Rate Change Grant", 'source': "https://rates.example.org", 'amount': "KES 100,000"}])
+    conn = sqlite3.connect(db_file)
+    conn.execute("UPDATE scholarships SET amount_max_usd = 1, fx_version = '1999-01' "
+                 "WHERE title = 'Rate Change Grant'")
+    conn.execute("UPDATE scholarships SET amount_max_usd = NULL, fx_version = NULL WHERE title != 'Rate Change Grant'")
+    conn.execute("UPDATE data_versions SET version = '1999-01' WHERE name = 'fx_version'")
+    conn.commit()
+    conn.close()
+
+    conn = ScholarshipCache(db_file=db_file).pool.connection()
+    assert conn.execute("SELECT COUNT(*) FROM scholarships WHERE fx_version IS NOT ?",
+                        (FX_VERSION,)).fetchone()[0] == 0
+    assert conn.execute("SELECT amount_max_usd FROM scholarships WHERE title = 'Rate Change Grant'"
+                        ).fetchone()[0] == round(100_000 * USD_PER_UNIT['KES'], 2)
+    assert conn.execute("SELECT version FROM data_versions").fetchall() == [(FX_VERSION,)]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
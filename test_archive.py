@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for the hot/archive split, tombstones and scheduled maintenance
+"""
+
+import inspect
+import os
+import sqlite3
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core import scholarship_cache
+from core.scholarship_cache import ScholarshipCache
+
+
+def archived(conn, title):
+    return conn.execute("SELECT archive_reason FROM scholarships_archive WHERE title = ?", (title,)).fetchone()
+
+
+def hot_titles(conn, prefix):
+    return {row[0] for row in conn.execute("SELECT title FROM scholarships WHERE title LIKE ?", (prefix + '%',))}
+
+
+def test_cleanup_has_one_definition():
+    source = inspect.getsource(ScholarshipCache)
+    assert source.count("def cleanup_expired_scholarships(") == 1
+
+
+def test_expired_rows_move_to_the_archive_in_batches(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    cache.add_scholarships({'title': f"Stale Award {i:02d}", 'source': "https://stale.example.org",
+                            'description': "Stale listing", 'country': "Kenya"} for i in range(25))
+    conn = cache.pool.connection()
+    conn.execute("UPDATE scholarships SET last_verified = datetime('now', '-40 days') WHERE title LIKE 'Stale %'")
+    conn.commit()
+    assert cache.search_scholarships(keywords=['"Stale Award"'])
+
+    original_batch = scholarship_cache.MAINTENANCE_BATCH_SIZE
+    scholarship_cache.MAINTENANCE_BATCH_SIZE = 10
+    try:
+        assert cache.cleanup_expired_scholarships(days_old=30, max_batches=2) == 20
+        assert len(hot_titles(conn, "Stale ")) == 5
+        assert cache.cleanup_expired_scholarships(days_old=30) == 5
+    finally:
+        scholarship_cache.MAINTENANCE_BATCH_SIZE = original_batch
+
+    assert hot_titles(conn, "Stale ") == set()
+    assert tuple(archived(conn, "Stale Award 07")) == ('expired',)
+    row = conn.execute("SELECT description, country, archived_at FROM scholarships_archive "
+                       "WHERE title = 'Stale Award 07'").fetchone()
+    assert row[:2] == ("Stale listing", "Kenya") and row[2] is not None
+    assert cache.search_scholarships(keywords=['"Stale Award"']) == []
+
+
+def test_tombstones_keep_closed_rounds_out_and_restore_others(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    past = (date.today() - timedelta(days=30)).isoformat()
+    cache.add_scholarships([
+        {'title': "Closed Round Award", 'source': "https://round.example.org", 'deadline': past},
+        {'title': "Quiet Award", 'source': "https://quiet.example.org"},
+    ])
+    conn = cache.pool.connection()
+    conn.execute("UPDATE scholarships SET last_verified = datetime('now', '-40 days') WHERE title = 'Quiet Award'")
+    conn.commit()
+    assert cache.cleanup_past_deadlines(grace_days=7) >= 1
+    assert cache.cleanup_expired_scholarships(days_old=30) >= 1
+
+    # The closed round re-crawled with the same deadline stays archived
+    counts = cache.add_scholarships([{'title': "Closed Round Award", 'source': "https://round.example.org",
+                                      'deadline': past}])
+    assert counts == {'inserted': 0, 'updated': 0, 'unchanged': 1}
+    assert "Closed Round Award" not in hot_titles(conn, "Closed ")
+
+    # A new round and a listing seen again come back; their tombstones go
+    next_round = (date.today() + timedelta(days=60)).isoformat()
+    counts = cache.add_scholarships([
+        {'title': "Closed Round Award", 'source': "https://round.example.org", 'deadline': next_round},
+        {'title': "Quiet Award", 'source': "https://quiet.example.org"},
+    ])
+    assert counts['inserted'] == 2
+    assert hot_titles(conn, "Closed ") == {"Closed Round Award"}
+    assert archived(conn, "Closed Round Award") is None and archived(conn, "Quiet Award") is None
+
+
+def test_maintenance_runs_on_schedule(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    cache.add_scholarships([{'title': "Inactive Award", 'source': "https://inactive.example.org"}])
+    conn = cache.pool.connection()
+    conn.execute("UPDATE scholarships SET is_active = 0 WHERE title = 'Inactive Award'")
+    conn.commit()
+
+    report = cache.run_maintenance()  # Never run on this database, so it is due
+    assert report['inactive'] == 1
+    assert set(report) == {'expired', 'past_deadline', 'inactive', 'clustered', 'vacuumed_pages'}
+    assert tuple(archived(conn, "Inactive Award")) == ('inactive',)
+
+    other_process = ScholarshipCache(db_file=cache.db_file)
+    assert other_process.run_maintenance() == {}  # Claimed moments ago
+    assert other_process.run_maintenance(force=True) != {}
+
+
+def test_incremental_vacuum_releases_free_pages(make_db_path):
+    db_file = make_db_path()
+    cache = ScholarshipCache(db_file=db_file)
+    conn = cache.pool.connection()
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2  # INCREMENTAL
+
+    cache.add_scholarships({'title': f"Bulky Award {i}", 'source': "https://bulky.example.org",
+                            'description': "x" * 2000} for i in range(300))
+    conn.execute("UPDATE scholarships SET last_verified = datetime('now', '-40 days') WHERE title LIKE 'Bulky %'")
+    conn.commit()
+    cache.cleanup_expired_scholarships(days_old=30)
+    conn.execute("DELETE FROM scholarships_archive")
+    conn.commit()
+    assert conn.execute("PRAGMA freelist_count").fetchone()[0] > 0
+
+    assert ScholarshipCache._incremental_vacuum(conn, 10) == 10
+    released = cache.run_maintenance(force=True)['vacuumed_pages']
+    assert released > 0
+
+
+def test_existing_database_converts_to_incremental_vacuum(make_db_path):
+    db_file = make_db_path()
+    os.makedirs(os.path.dirname(db_file))
+    conn = sqlite3.connect(db_file)
+    conn.execute("CREATE TABLE legacy (id INTEGER)")
+    conn.commit()
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+    conn.close()
+
+    conn = ScholarshipCache(db_file=db_file).pool.connection()
+    assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for chunked, generator-fed bulk ingestion in ScholarshipCache and DatabaseManager
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.batching import chunked
+from core.db import DatabaseManager
+from core.scholarship_cache import ScholarshipCache
+
+
+def feed(count, amount="$1000", consumed=None):
+    """Generator of synthetic listings; records how far it has been consumed"""
+    for i in range(count):
+        if consumed is not None:
+            consumed.append(i)
+        yield {'title': f"Bulk Grant {i}", 'source': f"https://bulk{i % 7}.org/{i}",
+               'description': f"Funding call number {i}", 'amount': amount, 'goal_type': "student"}
+
+
+def test_chunked_is_lazy():
+    consumed = []
+    chunks = chunked(feed(10, consumed=consumed), 4)
+
+    first = next(chunks)
+    assert len(first) == 4 and len(consumed) == 4
+    assert [len(chunk) for chunk in chunks] == [4, 2]
+
+
+def test_cache_counts_inserted_updated_unchanged(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    baseline = cache.get_scholarship_count()
+
+    assert cache.add_scholarships(feed(1200), chunk_size=250) == \
+        {'inserted': 1200, 'updated': 0, 'unchanged': 0}
+    # Re-crawl: first 300 listings changed amount, the rest are identical
+    recrawl = (dict(row, amount="$2000") if i < 300 else row for i, row in enumerate(feed(1200)))
+    assert cache.add_scholarships(recrawl, chunk_size=250) == \
+        {'inserted': 0, 'updated': 300, 'unchanged': 900}
+    # Missing fields keep their stored value, so they do not count as changes
+    assert cache.add_scholarships({'title': "Bulk Grant 5", 'source': "https://bulk5.org/5"}
+                                  for _ in range(2)) == {'inserted': 0, 'updated': 0, 'unchanged': 2}
+
+    assert cache.get_scholarship_count() == baseline + 1200
+
+
+def test_cache_repeats_within_a_chunk_are_counted_once_as_insert(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    rows = list(feed(3))
+
+    counts = cache.add_scholarships(rows + rows + [dict(rows[0], amount="$5")])
+
+    assert counts == {'inserted': 3, 'updated': 1, 'unchanged': 3}
+    amount = cache.pool.connection().execute(
+        "SELECT amount FROM scholarships WHERE title = 'Bulk Grant 0'").fetchone()[0]
+    assert amount == "$5"
+
+
+def test_database_manager_bulk_upsert(make_db_path):
+    db = DatabaseManager(db_file=make_db_path())
+    baseline = db.cache.get_scholarship_count()
+
+    assert db.add_scholarships(feed(700), chunk_size=200) == \
+        {'inserted': 700, 'updated': 0, 'unchanged': 0}
+    assert db.add_scholarships(feed(700, amount="$3000"), chunk_size=200) == \
+        {'inserted': 0, 'updated': 700, 'unchanged': 0}
+    assert db.add_scholarships(feed(750, amount="$3000")) == \
+        {'inserted': 50, 'updated': 0, 'unchanged': 700}
+    assert db.cache.get_scholarship_count() == baseline + 750
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for content-key identity and upsert ingestion in ScholarshipCache
+"""
+
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.normalize import canonical_title, source_domain, content_key
+from core.scholarship_cache import ScholarshipCache, release_database
+
+
+def crawl_batch():
+    return [
+        {'title': "DAAD Scholarship 2025 (Graduate)", 'description': "Study in Germany",
+         'amount': "€934/month", 'source': "https://www.daad.de/en/scholarships",
+         'country': "International", 'goal_type': "student", 'priority': 2},
+        {'title': "Ashinaga Africa Initiative", 'description': "Undergraduate study abroad",
+         'source': "https://ashinaga.org/en/", 'country': "Africa", 'goal_type': "student"},
+    ]
+
+
+def test_canonical_title_and_domain():
+    assert canonical_title("Chevening Scholarships 2025/26 (Graduate, Leadership)") == "chevening scholarships"
+    assert canonical_title("  Université  Scholarship!! ") == "universite scholarship"
+    assert source_domain("https://www.mak.ac.ug/scholarships?page=2") == "mak.ac.ug"
+    assert source_domain("mak.ac.ug/scholarships") == "mak.ac.ug"
+    assert content_key("DAAD Scholarship 2024", "https://daad.de/a") == \
+        content_key("daad scholarship", "http://www.daad.de/b")
+    assert content_key("DAAD Scholarship", "https://daad.de") != \
+        content_key("DAAD Scholarship", "https://scholars4dev.com")
+
+
+def test_numbers_outside_year_positions_stay_in_the_title(make_db_path):
+    assert canonical_title("Mastercard Scholars 2025–2026 Intake") == "mastercard scholars intake"
+    assert canonical_title("2000 Grant") == "2000 grant"
+    assert canonical_title("Fulbright 2026 Fellowship") == "fulbright 2026 fellowship"
+
+    db_file = make_db_path()
+    cache = ScholarshipCache(db_file=db_file)
+    counted = cache.get_scholarship_count()
+    cache.add_scholarships([{'title': "2000 Grant", 'source': "https://grants.example.org/a"},
+                            {'title': "2050 Grant", 'source': "https://grants.example.org/b"}])
+    assert cache.get_scholarship_count() == counted + 2
+
+    # Rows keyed before version 6 stripped the number; reopening re-keys them
+    conn = cache.pool.connection()
+    with conn:
+        conn.execute("UPDATE scholarships SET content_key = ? WHERE title = '2000 Grant'",
+                     (content_key("Grant", "grants.example.org"),))
+        conn.execute("PRAGMA user_version = 5")
+    release_database(db_file)
+    conn = ScholarshipCache(db_file=db_file).pool.connection()
+    assert conn.execute("SELECT title FROM scholarships WHERE content_key = ?",
+                        (content_key("2000 Grant", "grants.example.org"),)).fetchone() == ("2000 Grant",)
+
+
+def test_recrawls_do_not_grow_the_table(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    baseline = cache.get_scholarship_count()
+
+    for _ in range(5):
+        cache.add_scholarships(crawl_batch())
+
+    assert cache.get_scholarship_count() == baseline + 2
+
+
+def test_upsert_refreshes_changed_fields_and_last_verified(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    cache.add_scholarships(crawl_batch())
+    conn = cache.pool.connection()
+    with conn:
+        conn.execute("UPDATE scholarships SET last_verified = '2020-01-01 00:00:00'")
+
+    cache.add_scholarships([{'title': "DAAD Scholarship 2026", 'source': "https://daad.de/new",
+                             'amount': "€992/month", 'priority': 1}])
+
+    row = conn.execute(
+        "SELECT title, amount, description, priority, last_verified FROM scholarships "
+        "WHERE content_key = ?", (content_key("DAAD Scholarship", "daad.de"),)
+    ).fetchone()
+    title, amount, description, priority, last_verified = row
+    assert title == "DAAD Scholarship 2025 (Graduate)"   # first spelling kept
+    assert amount == "€992/month"                        # changed field refreshed
+    assert description == "Study in Germany"             # missing field not wiped
+    assert priority == 2                                 # priority never lowered
+    assert last_verified > '2020-01-01 00:00:00'
+
+
+def test_recrawl_keeps_rows_fresh_for_age_and_cleanup(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    seeded = cache.get_scholarship_count()
+    cache.add_scholarships(crawl_batch())
+    conn = cache.pool.connection()
+    with conn:
+        # Everything was first seen and last verified 60 days ago
+        conn.execute("UPDATE scholarships SET created_at = datetime('now', '-60 days'), "
+                     "last_verified = datetime('now', '-60 days')")
+    assert cache.get_cache_age() > 24 * 59
+
+    # Re-crawl returns the DAAD listing again; the Ashinaga one has disappeared
+    cache.add_scholarships(crawl_batch()[:1])
+
+    assert cache.get_cache_age() < 1
+    assert cache.get_cache_age('International') < 1
+    removed = cache.cleanup_expired_scholarships(days_old=30)
+    titles = [row[0] for row in conn.execute("SELECT title FROM scholarships")]
+    assert "DAAD Scholarship 2025 (Graduate)" in titles   # re-verified despite old created_at
+    assert "Ashinaga Africa Initiative" not in titles
+    assert removed == seeded + 1   # unseen seed rows and the vanished listing
+
+
+def test_legacy_database_is_migrated_and_deduplicated(make_db_path):
+    db_file = make_db_path()
+    os.makedirs(os.path.dirname(db_file))
+    conn = sqlite3.connect(db_file)
+    conn.execute('''
+        CREATE TABLE scholarships (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, description TEXT,
+            amount TEXT, deadline TEXT, category TEXT, source TEXT, country TEXT, keywords TEXT,
+            goal_type TEXT, priority INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_verified TIMESTAMP DEFAULT CURRENT_TIMESTAMP, is_active BOOLEAN DEFAULT 1
+        )
+    ''')
+    conn.executemany("INSERT INTO scholarships (title, source) VALUES (?, ?)", [
+        ("Mastercard Scholars", "https://mastercardfdn.org/scholars/"),
+        ("Mastercard Scholars", "https://mastercardfdn.org/scholars/"),
+        ("Mastercard Scholars 2025", "https://www.mastercardfdn.org/"),
+        ("Mastercard Scholars", "https://scholars4dev.com/mastercard"),
+    ])
+    conn.commit()
+    conn.close()
+
+    cache = ScholarshipCache(db_file=db_file)
+
+    rows = cache.pool.connection().execute(
+        "SELECT id, content_key FROM scholarships ORDER BY id").fetchall()
+    assert [row[0] for row in rows] == [1, 4]
+    assert all(key for _, key in rows)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
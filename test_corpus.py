@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for corpus snapshots (JSONL / Parquet) and the bulk loader
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.corpus import CORPUS_FIELDS, export_corpus, import_corpus, read_corpus, write_corpus
+from core.scholarship_cache import SEARCH_INDEXES, ScholarshipCache
+
+
+def corpus(count):
+    for i in range(count):
+        yield {'title': f"Snapshot Grant {i:04d}", 'description': f"Snapshot listing for cohort {i}",
+               'amount': f"${(i % 9 + 1) * 1000}", 'deadline': "June 30, 2030", 'category': "Snapshot",
+               'source': f"https://snap{i % 11}.example.org/{i}", 'country': "Kenya",
+               'keywords': "engineering", 'goal_type': "student", 'priority': i % 3 + 1}
+
+
+def index_names(cache):
+    return {row[0] for row in cache.pool.connection().execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('index', 'trigger')")}
+
+
+def round_trip(path, make_db_path):
+    source = ScholarshipCache(db_file=make_db_path())
+    source.add_scholarships(corpus(300))
+    expected = sorted(tuple(row[field] for field in CORPUS_FIELDS)
+                      for row in source.iter_scholarships(CORPUS_FIELDS, batch_size=64))
+
+    assert export_corpus(source, path) == len(expected)
+    target = ScholarshipCache(db_file=make_db_path())  # Seeded with the same built-in list
+    counts = import_corpus(target, path)
+    assert counts['inserted'] == 300 and counts['inserted'] + counts['unchanged'] == len(expected)
+    copied = sorted(tuple(row[field] for field in CORPUS_FIELDS)
+                    for row in target.iter_scholarships(CORPUS_FIELDS))
+    assert copied == expected, path
+
+    # Derived columns and the deferred indexes are rebuilt
+    row = target.search_scholarships(keywords=['"Snapshot Grant 0042"'])[0]
+    assert row['amount_max_usd'] == 7000 and row['deadline_date'] == "2030-06-30"
+    assert set(SEARCH_INDEXES) | {'scholarships_fts_insert', 'scholarships_fts_update'} <= index_names(target)
+
+
+def streams(path):
+    write_corpus(corpus(12000), path, batch_size=1000)
+    records = read_corpus(path, batch_size=500)
+    assert next(records)['title'] == "Snapshot Grant 0000"
+    assert sum(1 for _ in records) == 11999
+
+
+def test_jsonl_snapshots_round_trip_and_stream(make_db_path, tmp_path):
+    round_trip(str(tmp_path / "snapshot.jsonl"), make_db_path)
+    streams(str(tmp_path / "big.jsonl"))
+
+
+def test_parquet_snapshots_round_trip_and_stream(make_db_path, tmp_path):
+    pytest.importorskip("pyarrow")  # Optional: only Parquet snapshots need it
+    round_trip(str(tmp_path / "snapshot.parquet"), make_db_path)
+    streams(str(tmp_path / "big.parquet"))
+
+
+def test_unknown_snapshot_formats_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        write_corpus([], str(tmp_path / "snapshot.csv"))
+
+
+def test_snapshot_next_to_a_new_database_replaces_the_builtin_seed(make_db_path):
+    db_file = make_db_path()
+    write_corpus(corpus(500), os.path.join(os.path.dirname(db_file), "seed_corpus.jsonl"))
+    cache = ScholarshipCache(db_file=db_file)
+    assert cache.get_scholarship_count() == 500
+    assert not cache.search_scholarships(keywords=['"Makerere University Excellence"'])
+    assert len(cache.search_scholarships(country="Kenya", keywords=['snapshot'], limit=1000)) == 500
+
+
+def test_failed_bulk_load_still_restores_indexes(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    before = index_names(cache)
+
+    def broken_feed():
+        yield from corpus(10)
+        raise IOError("snapshot truncated")
+
+    try:
+        cache.bulk_load(broken_feed(), chunk_size=4)
+    except IOError:
+        pass
+    assert index_names(cache) == before
+    assert len(cache.search_scholarships(keywords=['"Snapshot Grant"'], limit=100)) == 8  # Two full chunks
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for deadline normalization and the open / closing-soon / past-deadline queries
+"""
+
+import sqlite3
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.deadlines import DEADLINE_FIXED, DEADLINE_ROLLING, DEADLINE_UNKNOWN, parse_deadline
+from core.scholarship_cache import ScholarshipCache
+
+
+def test_parse_deadline_formats():
+    today = date(2025, 6, 1)
+    cases = {
+        "March 15, 2025": ("2025-03-15", DEADLINE_FIXED),
+        "Deadline: 15th March 2026": ("2026-03-15", DEADLINE_FIXED),
+        "2025-09-30": ("2025-09-30", DEADLINE_FIXED),
+        "31/08/2025": ("2025-08-31", DEADLINE_FIXED),
+        "08/31/2025": ("2025-08-31", DEADLINE_FIXED),
+        "May 2026": ("2026-05-31", DEADLINE_FIXED),
+        "Opens Jan 10, closes Feb 28, 2026": ("2026-02-28", DEADLINE_FIXED),
+        "December 1": ("2025-12-01", DEADLINE_FIXED),
+        "March 1": ("2026-03-01", DEADLINE_FIXED),          # already passed this year
+        "Rolling applications": (None, DEADLINE_ROLLING),
+        "Open all year": (None, DEADLINE_ROLLING),
+        "Check website": (None, DEADLINE_UNKNOWN),
+        "February 30, 2025": (None, DEADLINE_UNKNOWN),
+        "": (None, DEADLINE_UNKNOWN),
+    }
+    for text, expected in cases.items():
+        assert parse_deadline(text, today=today) == expected, text
+    assert parse_deadline(None, today=today) == (None, DEADLINE_UNKNOWN)
+
+
+def test_ingest_fills_deadline_columns_and_keeps_them_on_missing_deadline(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    cache.add_scholarships([
+        {'title': "Nile Fixed Grant", 'source': "https://nile.example.org", 'deadline': "2031-04-30"},
+        {'title': "Nile Rolling Grant", 'source': "https://nile.example.org", 'deadline': "Rolling"},
+    ])
+    conn = cache.pool.connection()
+    stored = dict((title, (deadline_date, kind)) for title, deadline_date, kind in conn.execute(
+        "SELECT title, deadline_date, deadline_kind FROM scholarships WHERE title LIKE 'Nile%'"))
+    assert stored == {"Nile Fixed Grant": ("2031-04-30", DEADLINE_FIXED),
+                      "Nile Rolling Grant": (None, DEADLINE_ROLLING)}
+
+    # A re-crawl that lost the deadline text keeps the parsed date
+    cache.add_scholarships([{'title': "Nile Fixed Grant", 'source': "https://nile.example.org",
+                             'description': "Updated"}])
+    assert conn.execute("SELECT deadline_date FROM scholarships WHERE title = 'Nile Fixed Grant'"
+                        ).fetchone()[0] == "2031-04-30"
+
+
+def test_open_and_closing_soon_filters(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    today = date.today()
+    deadlines = {
+        "Lake Closed Grant": (today - timedelta(days=3)).isoformat(),
+        "Lake Soon Grant": (today + timedelta(days=10)).isoformat(),
+        "Lake Sooner Grant": (today + timedelta(days=2)).isoformat(),
+        "Lake Later Grant": (today + timedelta(days=200)).isoformat(),
+        "Lake Rolling Grant": "Rolling",
+    }
+    cache.add_scholarships({'title': title, 'source': "https://lake.example.org", 'deadline': deadline,
+                            'country': "Lakeland"} for title, deadline in deadlines.items())
+
+    def titles(**filters):
+        rows = cache.search_scholarships(country="Lakeland", limit=100, **filters)
+        return [row['title'] for row in rows if row['title'].startswith("Lake ")]  # Seed data is International
+
+    assert set(titles()) == set(deadlines)
+    assert set(titles(open_only=True)) == set(deadlines) - {"Lake Closed Grant"}
+    assert titles(closing_within_days=30) == ["Lake Sooner Grant", "Lake Soon Grant"]
+    assert titles(keywords=["grant"], closing_within_days=5) == ["Lake Sooner Grant"]
+
+
+def test_cleanup_past_deadlines_respects_grace_and_kind(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    today = date.today()
+    cache.add_scholarships([
+        {'title': "Old Closed Grant", 'source': "https://old.example.org",
+         'deadline': (today - timedelta(days=30)).isoformat()},
+        {'title': "Just Closed Grant", 'source': "https://old.example.org",
+         'deadline': (today - timedelta(days=2)).isoformat()},
+        {'title': "Undated Grant", 'source': "https://old.example.org", 'deadline': "Check website"},
+    ])
+    cache.cleanup_past_deadlines(grace_days=7)
+    remaining = {row[0] for row in cache.pool.connection().execute(
+        "SELECT title FROM scholarships WHERE source = 'https://old.example.org'")}
+    assert remaining == {"Just Closed Grant", "Undated Grant"}
+
+
+def test_existing_database_is_backfilled(make_db_path):
+    db_file = make_db_path()
+    cache = ScholarshipCache(db_file=db_file)
+    cache.add_scholarships([{'title': "Legacy Grant", 'source': "https://legacy.example.org",
+                             'deadline': "June 30, 2030"}])
+    conn = sqlite3.connect(db_file)
+    conn.execute("UPDATE scholarships SET deadline_date = NULL, deadline_kind = NULL")
+    conn.execute("PRAGMA user_version = 0")  # As written before schema versioning
+    conn.commit()
+    conn.close()
+
+    conn = ScholarshipCache(db_file=db_file).pool.connection()
+    assert conn.execute("SELECT COUNT(*) FROM scholarships WHERE deadline_kind IS NULL").fetchone()[0] == 0
+    assert conn.execute("SELECT deadline_date, deadline_kind FROM scholarships WHERE title = 'Legacy Grant'"
+                        ).fetchone() == ("2030-06-30", DEADLINE_FIXED)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for search facet counts and drill-down
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.facets import count_facets, drill_down, facet_labels, facet_total, result_labels
+from core.scholarship_cache import ScholarshipCache
+
+
+def test_rows_are_labelled_counted_and_drilled_into():
+    labels = facet_labels(
+        category=["Research", None, "Research"], goal_type=["student", "student", ""],
+        place=["Uganda", None, "Kenya"], deadline_date=["2026-11-30", None, "2026-03-01"],
+        amount_usd=[800.0, 25000.0, None], full_funding=[0, 0, 1],
+        source=["https://www.mak.ac.ug/x", "https://chevening.org/apply", None])
+    assert list(labels['category']) == ["Research", "General", "Research"]
+    assert list(labels['geography']) == ["Uganda", "International", "Kenya"]
+    assert list(labels['deadline_month']) == ["2026-11", "Rolling or unknown", "2026-03"]
+    assert list(labels['amount_band']) == ["Under $1k", "$20k-50k", "Full funding"]
+    assert list(labels['source']) == ["mak.ac.ug", "chevening.org", "Unknown"]
+
+    counts = count_facets(labels)
+    assert counts['category'] == [("Research", 2), ("General", 1)]
+    assert counts['goal'] == [("student", 2), ("Any", 1)]
+    assert counts['deadline_month'] == [("2026-03", 1), ("2026-11", 1), ("Rolling or unknown", 1)]
+    assert counts['amount_band'] == [("Under $1k", 1), ("$20k-50k", 1), ("Full funding", 1)]
+    assert facet_total(counts) == 3 and facet_total(None) == 0
+
+    assert list(drill_down(labels, {'category': ["Research"], 'goal': []})) == [True, False, True]
+    assert list(drill_down(labels, {'category': ["Research"], 'geography': ["Kenya"]})) == [False, False, True]
+    assert count_facets(facet_labels(*[()] * 7))['source'] == []
+
+    shown = result_labels([{'title': "A", 'country': "usa", 'category': "General", 'source': "#"}])
+    assert list(shown['geography']) == ["United States"] and list(shown['amount_band']) == ["Not specified"]
+
+
+def test_facets_count_everything_the_search_matches(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    cache.add_scholarships(
+        [{'title': f"Kestrel Engineering Bursary {i}", 'keywords': "engineering",
+          'category': "Academic" if i % 3 else "Research", 'amount': "$2,000" if i % 2 else "Full scholarship",
+          'source': f"https://kestrel{i % 2}.example.org/{i}", 'goal_type': "student", 'deadline': "Rolling",
+          'country': "Uganda" if i % 4 else "Kenya"} for i in range(12)]
+        + [{'title': "Kestrel Music Residency", 'source': "https://music.example.org", 'goal_type': "artist",
+            'deadline': "Rolling", 'country': "Uganda"}])
+
+    facets = cache.search_facets(goal="student", keywords=["kestrel"])
+    rows = cache.search_scholarships(goal="student", keywords=["kestrel"], limit=100)
+    assert facet_total(facets) == len(rows) == 12
+    assert dict(facets['category']) == {"Academic": 8, "Research": 4}
+    assert dict(facets['geography']) == {"Uganda": 9, "Kenya": 3}
+    assert dict(facets['amount_band']) == {"$1k-5k": 6, "Full funding": 6}
+    assert dict(facets['source']) == {"kestrel0.example.org": 6, "kestrel1.example.org": 6}
+    assert dict(facets['goal']) == {"student": 12}
+    assert cache.search_facets(keywords=["kestrel"], country="Uganda")['geography'] == [("Uganda", 10)]
+
+    # More than the first page, misspellings corrected, and fresh after writes
+    page, cursor = cache.search_page(keywords=["kestrel"], page_size=5)
+    assert len(page) == 5 and cursor and facet_total(cache.search_facets(keywords=["kestrel"])) == 13
+    assert facet_total(cache.search_facets(keywords=["kestrell"], fuzzy=True)) == 13
+    assert cache.search_facets(goal="artist", keywords=["kestrel"])['goal'] == [("artist", 1)]
+    cache.add_scholarships([{'title': "Kestrel Film Award", 'source': "https://film.example.org",
+                             'goal_type': "artist", 'deadline': "Rolling"}])
+    assert cache.search_facets(goal="artist", keywords=["kestrel"])['goal'] == [("artist", 2)]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
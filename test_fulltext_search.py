@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for FTS5-backed keyword search and BM25 ranking in ScholarshipCache
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.scholarship_cache import ScholarshipCache, build_fts_query
+
+
+def make_cache(db_file):
+    return ScholarshipCache(db_file=db_file)
+
+
+def test_build_fts_query():
+    assert build_fts_query(['engineering']) == '"engineering"*'
+    assert build_fts_query(['"computer science"', 'women']) == '"computer science" OR "women"*'
+    assert build_fts_query(['seed-funding']) == '"seed funding"*'
+    assert build_fts_query(['  ', '***']) == ''
+
+
+def test_prefix_and_phrase_search(make_db_path):
+    cache = make_cache(make_db_path())
+
+    prefix = cache.search_scholarships(keywords=['engin'])
+    assert any('engineering' in (s['keywords'] or '') for s in prefix)
+
+    phrase = cache.search_scholarships(keywords=['"seed funding"'])
+    assert [s['title'] for s in phrase] == ["Tony Elumelu Foundation Entrepreneurship Programme"]
+
+
+def test_title_matches_rank_first(make_db_path):
+    cache = make_cache(make_db_path())
+    cache.add_scholarships([
+        {'title': "Robotics Research Grant", 'description': "For labs", 'keywords': "grant",
+         'goal_type': 'researcher', 'country': 'International', 'priority': 1},
+        {'title': "General Research Award", 'description': "Open to robotics teams among others",
+         'keywords': "award", 'goal_type': 'researcher', 'country': 'International', 'priority': 1},
+    ])
+
+    results = cache.search_scholarships(goal='researcher', keywords=['robotics'])
+    assert [s['title'] for s in results] == ["Robotics Research Grant", "General Research Award"]
+    assert results[0]['relevance'] > results[1]['relevance']
+
+
+def test_index_follows_updates_and_deletes(make_db_path):
+    cache = make_cache(make_db_path())
+    conn = cache.pool.connection()
+    with conn:
+        conn.execute("UPDATE scholarships SET title = 'Zanzibar Marine Biology Fund' "
+                     "WHERE title = 'Chevening Scholarships'")
+    cache._publish()  # Raw SQL bypasses the cache's write hooks
+    assert len(cache.search_scholarships(keywords=['zanzibar'])) == 1
+    assert cache.search_scholarships(keywords=['chevening'])[0]['title'] != 'Chevening Scholarships'
+
+    with conn:
+        conn.execute("DELETE FROM scholarships WHERE title LIKE 'Zanzibar%'")
+    cache._publish()
+    assert cache.search_scholarships(keywords=['zanzibar']) == []
+
+
+def test_like_fallback_matches_fts_results(make_db_path):
+    cache = make_cache(make_db_path())
+    fts_query, fts_params = cache._build_search_query(goal='student', keywords=['makerere'])
+    like_query, like_params = cache._build_search_query(goal='student', keywords=['makerere'], use_fts=False)
+    cursor = cache.pool.connection().cursor()
+
+    fts_titles = {row[1] for row in cursor.execute(fts_query, fts_params)}
+    like_titles = {row[1] for row in cursor.execute(like_query, like_params)}
+    assert fts_titles == like_titles == {"Makerere University Excellence Scholarship"}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
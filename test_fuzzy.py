@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for typo-tolerant search
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.fuzzy import correct_keywords, lookup_bounds, similarity, trigrams, vocabulary_words
+from core.migrations import schema_version
+from core.scholarship_cache import ScholarshipCache
+
+
+def test_words_are_corrected_to_similar_vocabulary_words_that_find_something():
+    assert trigrams("cat") == {"  c", " ca", "cat", "at "}
+    assert similarity("scholaship", "scholarship") == 9 / 14
+    grams, fewest, most, shared = lookup_bounds("scholaship", 0.5)
+    assert len(grams) == 11 and (fewest, most, shared) == (6, 22, 6)
+    assert vocabulary_words("Université Makerere Award 2025", "women,stem", "usa") == {
+        "universite", "makerere", "award", "women", "stem", "united", "states"}
+
+    vocabulary = {"scholarship": 40, "scholars": 2, "engineering": 9, "nursing": 1, "women": 5}
+    found = set(vocabulary) - {"nursing"}  # Only rows since removed had "nursing"
+    lookups = []
+
+    def lookup(word):
+        lookups.append(word)
+        for term, frequency in vocabulary.items():
+            shared = len(trigrams(word) & trigrams(term))
+            if shared:
+                yield term, shared, len(trigrams(term)), frequency
+
+    corrected = correct_keywords(["Scholaship", '"womn in enginering"', "engin", "nursng"],
+                                 lambda word: word in found or word in ("in", "engin"), lookup)
+    assert corrected == ["scholarship", '"women in engineering"', "engin", "nursng"]
+    assert "engin" not in lookups  # Words that find something are never looked up
+    assert correct_keywords(["Women", "x"], lambda word: True, lookup) is None
+
+
+def test_misspelled_searches_find_the_corrected_words(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    cache.add_scholarships([{'title': f"Makerere Engineering Bursary {i}", 'keywords': "engineering,women",
+                             'source': f"https://mak{i}.example.org", 'goal_type': "student",
+                             'country': "Uganda"} for i in range(3)])
+    assert cache.search_scholarships(keywords=["Makarere"]) == []
+    assert cache.suggest_keywords(["Makarere"]) == ["makerere"]
+    assert cache.suggest_keywords(["Makerere", "engin"]) is None and cache.suggest_keywords(None) is None
+
+    titles = {row['title'] for row in cache.search_scholarships(keywords=["Makarere"], fuzzy=True)}
+    assert {f"Makerere Engineering Bursary {i}" for i in range(3)} <= titles
+    ranked, _ = cache.search_ranked_page(keywords=["Makarere"], country="Uganda", fuzzy=True)
+    assert {f"Makerere Engineering Bursary {i}" for i in range(3)} <= {row['title'] for row in ranked}
+
+    # Later pages continue the search as typed
+    first, cursor = cache.search_page(keywords=["Makarere"], page_size=2, fuzzy=True)
+    second, _ = cache.search_page(keywords=["Makarere"], page_size=2, cursor=cursor, fuzzy=True)
+    assert len(first) == 2 and second and not {row['id'] for row in first} & {row['id'] for row in second}
+
+
+def test_removed_words_are_not_suggested_and_upgrades_index_the_corpus(make_db_path):
+    path = make_db_path()
+    cache = ScholarshipCache(db_file=path)
+    cache.add_scholarships([{'title': "Quetzal Conservation Grant", 'deadline': "2020-01-31",
+                             'source': "https://quetzal.example.org"},
+                            {'title': "Heron Wetland Award", 'deadline': "Rolling",
+                             'source': "https://heron.example.org"}])
+    assert cache.suggest_keywords(["quetzel"]) == ["quetzal"]
+    cache.cleanup_past_deadlines()
+    assert cache.suggest_keywords(["quetzel"]) is None
+
+    conn = cache.pool.connection()
+    with conn:
+        conn.execute("DELETE FROM search_terms")
+        conn.execute("DELETE FROM term_trigrams")
+    conn.execute("PRAGMA user_version = 4")
+    cache = ScholarshipCache(db_file=path)
+    assert schema_version(conn) >= 5
+    assert cache.suggest_keywords(["herron"]) == ["heron"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for the geography hierarchy and country-aware search
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.country_config import COUNTRY_CONFIG
+from core.geography import INTERNATIONAL, LEVEL_COUNTRY, canonical_place, hierarchy
+from core.scholarship_cache import ScholarshipCache
+
+
+def ancestors(conn, name):
+    chain = []
+    row = conn.execute("SELECT name, parent_id FROM geography WHERE name = ?", (name,)).fetchone()
+    while row:
+        chain.append(row[0])
+        row = conn.execute("SELECT name, parent_id FROM geography WHERE id = ?", (row[1],)).fetchone()
+    return chain
+
+
+def test_hierarchy_covers_every_configured_country(make_db_path):
+    nodes = list(hierarchy())
+    seen = set()
+    for name, parent, _ in nodes:
+        assert parent is None or parent in seen, name
+        seen.add(name)
+    countries = {name for name, _, level in nodes if level == LEVEL_COUNTRY}
+    assert countries == set(COUNTRY_CONFIG) - {'Other'}
+    assert canonical_place("  East   Africa ") == "Eastern Africa"
+    assert canonical_place("UK") == "United Kingdom"
+    assert canonical_place("") is None
+
+    conn = ScholarshipCache(db_file=make_db_path()).pool.connection()
+    assert ancestors(conn, 'Uganda') == ['Uganda', 'Eastern Africa', 'Africa', INTERNATIONAL]
+    assert ancestors(conn, 'India') == ['India', 'Southern Asia', 'Asia', INTERNATIONAL]
+    assert ancestors(conn, 'germany') == ['Germany', 'Western Europe', 'Europe', INTERNATIONAL]
+
+
+def test_country_search_covers_region_continent_and_international(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    cache.add_scholarships({'title': f"Geo {country} Award", 'source': "https://geo.example.org", 'country': country}
+                           for country in ['India', 'Southern Asia', 'Asia', 'Kenya', 'South Africa',
+                                           'East Africa', 'Africa', 'Germany', 'Worldwide'])
+
+    def titles(country):
+        rows = cache.search_scholarships(country=country, limit=200)
+        return {row['title'] for row in rows if row['title'].startswith("Geo ")}
+
+    assert titles('India') == {"Geo India Award", "Geo Southern Asia Award", "Geo Asia Award",
+                               "Geo Worldwide Award"}
+    assert titles('Uganda') == {"Geo East Africa Award", "Geo Africa Award", "Geo Worldwide Award"}
+    assert titles('South Africa') == {"Geo South Africa Award", "Geo Africa Award", "Geo Worldwide Award"}
+    assert titles('Germany') == {"Geo Germany Award", "Geo Worldwide Award"}
+    assert titles('Atlantis') == {"Geo Worldwide Award"}
+
+
+def test_unknown_places_are_filed_under_international(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    cache.add_scholarships([{'title': "Lakeland Local Award", 'source': "https://lake.example.org",
+                             'country': "Lakeland"}])
+    conn = cache.pool.connection()
+    assert ancestors(conn, 'Lakeland') == ['Lakeland', INTERNATIONAL]
+    titles = {row['title'] for row in cache.search_scholarships(country="lakeland", limit=200)}
+    assert "Lakeland Local Award" in titles
+    assert "Lakeland Local Award" not in {row['title'] for row in cache.search_scholarships(country="Kenya")}
+
+    # A re-crawl without a country keeps the tag
+    cache.add_scholarships([{'title': "Lakeland Local Award", 'source': "https://lake.example.org",
+                             'description': "Re-crawled"}])
+    assert conn.execute("SELECT g.name FROM scholarships s JOIN geography g ON g.id = s.geography_id "
+                        "WHERE s.title = 'Lakeland Local Award'").fetchone()[0] == "Lakeland"
+
+
+def test_existing_database_is_tagged_with_stable_ids(make_db_path):
+    db_file = make_db_path()
+    ScholarshipCache(db_file=db_file)
+    conn = sqlite3.connect(db_file)
+    ids_before = dict(conn.execute("SELECT name, id FROM geography"))
+    conn.execute("UPDATE scholarships SET geography_id = NULL")
+    conn.execute("PRAGMA user_version = 0")  # As written before schema versioning
+    conn.commit()
+    conn.close()
+
+    conn = ScholarshipCache(db_file=db_file).pool.connection()
+    assert dict(conn.execute("SELECT name, id FROM geography")) == ids_before
+    untagged = conn.execute(
+        "SELECT COUNT(*) FROM scholarships WHERE country IS NOT NULL AND geography_id IS NULL").fetchone()[0]
+    assert untagged == 0
+    assert conn.execute("SELECT g.name FROM scholarships s JOIN geography g ON g.id = s.geography_id "
+                        "WHERE s.country = 'East Africa'").fetchone()[0] == "Eastern Africa"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
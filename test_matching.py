@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for profile-to-scholarship eligibility matching
+"""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.matching import MatchIndex, encode_profile, encode_scholarship, parse_min_gpa, unpack_features
+from core.migrations import schema_version
+from core.scholarship_cache import ScholarshipCache
+
+TODAY = date(2026, 3, 1)
+
+
+def test_min_gpa_is_read_on_the_four_point_scale():
+    assert parse_min_gpa("Applicants need a minimum GPA of 3.2") == 3.2
+    assert parse_min_gpa("CGPA of at least 4.0 on a 5.0 scale") == 3.2
+    assert parse_min_gpa("A 3.5 GPA or higher is required") == 3.5
+    assert parse_min_gpa("Open to all; GPA not considered") is None
+    assert parse_min_gpa("Grade point average above 80 percent") is None
+    assert parse_min_gpa(None) is None
+
+
+def test_scholarship_and_profile_vectors_share_one_space():
+    blob, min_gpa = encode_scholarship({'title': "Civil Engineering Scholarship",
+                                        'description': "For engineers with a GPA of 3.0",
+                                        'keywords': "engineering,infrastructure"})
+    indices, values = unpack_features(blob)
+    assert min_gpa == 3.0 and np.linalg.norm(values) == pytest.approx(1.0)
+
+    engineer = encode_profile({'major': "Engineering", 'field_of_study': "Not specified"})
+    assert float(engineer[indices] @ values) > 0.3
+    assert float(encode_profile({'medium': "Sculpture"})[indices] @ values) == 0
+    assert not encode_profile({'name': "No topics"}).any()
+
+
+def test_requirements_filter_the_batched_scores():
+    def row(row_id, text, min_gpa=None, goal='student', geography_id=None, deadline_date=None):
+        return (row_id, encode_scholarship({'title': text})[0], min_gpa, goal, geography_id, deadline_date)
+
+    index = MatchIndex([
+        row(1, "Data science fellowship", min_gpa=3.5),
+        row(2, "Data science research grant", goal='researcher'),
+        row(3, "Data science bursary", geography_id=9),
+        row(4, "Data science award", deadline_date='2026-02-01'),
+        row(5, "Data science prize", geography_id=7),
+        row(6, "Pottery residency"),
+        row(7, ""),
+    ])
+    profile = {'major': "Data Science", 'gpa_4_0': 3.0}
+    # Out: 1 on GPA, 2 on goal, 3 on place, 4 closed, 6 and 7 share no topic
+    best = index.best(profile, goal='student', area_scores={7: 1.0, 1: 0.25}, today=TODAY)
+    assert [row_id for row_id, _ in best] == [5]
+    assert [row_id for row_id, _ in index.best(profile, today=TODAY)] == [2, 3, 5]
+    assert len(index.best(profile, today=TODAY, limit=1)) == 1
+    assert len(index.similarities(encode_profile(profile))) == len(index) == 7
+
+
+def test_best_matches_reads_the_stored_vectors(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    cache.add_scholarships([
+        {'title': "Marine Biology Fellowship", 'description': "Ocean research, minimum GPA of 3.5",
+         'country': "Uganda", 'source': "https://marine.example.org", 'goal_type': "student"},
+        {'title': "Marine Biology Travel Grant", 'description': "Fieldwork at sea",
+         'country': "Kenya", 'source': "https://travel.example.org", 'goal_type': "student"},
+        {'title': "Jazz Composition Prize", 'description': "For composers",
+         'country': "Uganda", 'source': "https://jazz.example.org", 'goal_type': "student"},
+    ])
+    profile = {'major': "Marine Biology", 'country': "Uganda", 'gpa_4_0': 3.8}
+    matches = cache.best_matches(profile, goal='student')
+    assert [match['title'] for match in matches] == ["Marine Biology Fellowship"]
+    assert matches[0]['match_score'] > 0 and matches[0]['min_gpa'] == 3.5
+    assert cache.best_matches(dict(profile, gpa_4_0=3.0), goal='student') == []
+
+    # A changed listing is re-encoded, and the new corpus is matched after the write
+    cache.add_scholarships([{'title': "Jazz Composition Prize", 'description': "For marine biology composers",
+                             'source': "https://jazz.example.org"}])
+    titles = [match['title'] for match in cache.best_matches(profile, goal='student')]
+    assert titles == ["Marine Biology Fellowship", "Jazz Composition Prize"]
+
+
+def test_existing_databases_are_encoded_on_upgrade(make_db_path):
+    path = make_db_path()
+    cache = ScholarshipCache(db_file=path)
+    conn = cache.pool.connection()
+    with conn:
+        conn.execute("UPDATE scholarships SET match_features = NULL, min_gpa = NULL")
+    conn.execute("PRAGMA user_version = 2")
+
+    ScholarshipCache(db_file=path)
+    assert schema_version(conn) >= 3
+    assert conn.execute("SELECT COUNT(*) FROM scholarships WHERE match_features IS NULL").fetchone()[0] == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
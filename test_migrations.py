@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests for versioned schema migrations and the process-wide service container
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.db import DatabaseManager
+from core.migrations import migrate, schema_version
+from core.scholarship_cache import ScholarshipCache
+from core.scraping import EnhancedScholarshipScraper
+from core.services import Services
+
+
+def test_migrate_runs_each_step_once_and_resumes_after_failure(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "steps.db"))
+    ran = []
+
+    def create(conn):
+        ran.append('create')
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+
+    def broken(conn):
+        ran.append('broken')
+        raise sqlite3.OperationalError("disk on fire")
+
+    def add_name(conn):
+        ran.append('add_name')
+        conn.execute("ALTER TABLE items ADD COLUMN name TEXT")
+
+    try:
+        migrate(conn, [create, broken])
+    except sqlite3.OperationalError:
+        pass
+    assert schema_version(conn) == 1
+
+    assert migrate(conn, [create, add_name]) == 1
+    assert ran == ['create', 'broken', 'add_name']
+    assert schema_version(conn) == 2
+    assert migrate(conn, [create, add_name]) == 2 and len(ran) == 3
+
+
+def test_reopening_a_migrated_database_runs_no_ddl(make_db_path):
+    db_file = make_db_path()
+    ScholarshipCache(db_file=db_file)
+    conn = ScholarshipCache(db_file=db_file).pool.connection()
+    assert schema_version(conn) == 8  # Every migration, through the stats keyed by geography
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        cache = ScholarshipCache(db_file=db_file)
+    finally:
+        conn.set_trace_callback(None)
+    ddl = [s for s in statements if s.lstrip().upper().startswith(('CREATE', 'ALTER', 'DROP', 'INSERT'))]
+    assert ddl == []
+    assert not any('fx_version IS NOT' in s for s in statements)  # Applied rates read from data_versions
+    assert cache.fts_enabled
+    assert cache.search_scholarships(keywords=['scholarship'])
+
+
+def test_services_share_one_cache(make_db_path, tmp_path):
+    services = Services(db_file=make_db_path(), legacy_file=str(tmp_path / "scholarships.db"))
+    first, second = services.new_scraper(), services.new_scraper()
+    assert first is not second
+    assert first.cache is services.cache and second.cache is services.cache
+    assert first.db_manager is services.db_manager and services.db_manager.cache is services.cache
+    assert EnhancedScholarshipScraper(DatabaseManager(cache=services.cache)).cache is services.cache
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
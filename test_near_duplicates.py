@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for MinHash-LSH near-duplicate clustering of scholarships
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.near_duplicates import (
+    title_signature, estimated_similarity, is_near_duplicate, dedupe_scholarships
+)
+from core.scholarship_cache import ScholarshipCache
+
+
+def make_cache(db_file):
+    return ScholarshipCache(db_file=db_file)
+
+
+def aggregator_listings():
+    """One Mastercard listing as three different sites publish it, plus an unrelated one"""
+    return [
+        {'title': "Mastercard Foundation Scholars Program 2025", 'source': "https://mastercardfdn.org/scholars",
+         'description': "Full scholarships for young Africans", 'country': "Africa", 'goal_type': "student"},
+        {'title': "MasterCard Foundation Scholars Programme", 'source': "https://www.scholars4dev.com/mc",
+         'description': "Full scholarships for young Africans at partner universities",
+         'country': "Africa", 'goal_type': "researcher"},
+        {'title': "Mastercard Foundation Scholars Program (Undergraduate)",
+         'source': "https://opportunitiesforafricans.com/mc", 'description': "Young Africans",
+         'country': "Africa", 'goal_type': "student"},
+        {'title': "Chevening Scholarships", 'source': "https://chevening.org",
+         'description': "UK government scholarships", 'country': "International", 'goal_type': "student"},
+    ]
+
+
+def test_signatures_and_duplicate_rules():
+    a, _ = title_signature("Mastercard Foundation Scholars Program")
+    b, _ = title_signature("MasterCard Foundation Scholars Programme")
+    c, _ = title_signature("Chevening Scholarships")
+
+    assert estimated_similarity(a, b) > 0.7
+    assert estimated_similarity(a, c) < 0.3
+    assert is_near_duplicate(0.9, "Innovation Grant Round 1", "Innovation Grant Round 2", "", "") is False
+    assert is_near_duplicate(0.9, "Innovation Grant", "Innovation Grant!", "", "") is True
+
+
+def test_dedupe_keeps_first_of_each_group():
+    listings = aggregator_listings() + [
+        {'title': "Innovation Grant Round 1"}, {'title': "Innovation Grant Round 2"},
+    ]
+
+    unique = dedupe_scholarships(listings)
+
+    assert [s['title'] for s in unique] == [
+        "Mastercard Foundation Scholars Program 2025", "Chevening Scholarships",
+        "Innovation Grant Round 1", "Innovation Grant Round 2",
+    ]
+
+
+def test_search_returns_one_row_per_cluster(make_db_path):
+    cache = make_cache(make_db_path())
+    cache.add_scholarships(aggregator_listings())
+
+    results = cache.search_scholarships(country="Uganda", limit=100)
+    mastercard = [r for r in results if 'mastercard' in r['title'].lower()]
+    assert len(mastercard) == 1
+    assert mastercard[0]['source'] == "https://mastercardfdn.org/scholars"
+
+    keyword_results = cache.search_scholarships(keywords=["mastercard"])
+    assert len(keyword_results) == 1
+
+
+def test_filtered_out_canonical_row_does_not_hide_duplicates(make_db_path):
+    cache = make_cache(make_db_path())
+    cache.add_scholarships(aggregator_listings())
+
+    # The canonical Mastercard row is a 'student' listing; the researcher copy must still show
+    results = cache.search_scholarships(goal="researcher")
+    assert [r['source'] for r in results if 'mastercard' in r['title'].lower()] == \
+        ["https://www.scholars4dev.com/mc"]
+
+    # Likewise when the keyword only matches a non-canonical member
+    results = cache.search_scholarships(keywords=["partner universities"])
+    assert [r['source'] for r in results] == ["https://www.scholars4dev.com/mc"]
+
+
+def test_deleting_canonical_row_rehomes_cluster_without_dropping_members(make_db_path):
+    cache = make_cache(make_db_path())
+    cache.add_scholarships(aggregator_listings())
+    total = cache.get_scholarship_count()
+    conn = cache.pool.connection()
+
+    assert cache.remove_duplicate_scholarships() >= 2     # folded, not deleted
+    assert cache.get_scholarship_count() == total
+
+    with conn:
+        conn.execute("DELETE FROM scholarships WHERE source = 'https://mastercardfdn.org/scholars'")
+    cache._publish()  # Raw SQL bypasses the cache's write hooks
+    results = cache.search_scholarships(keywords=["mastercard"])
+    assert [r['source'] for r in results] == ["https://www.scholars4dev.com/mc"]
+    clusters = {row[0] for row in conn.execute(
+        "SELECT cluster_id FROM scholarships WHERE title LIKE '%Mastercard%'")}
+    assert len(clusters) == 1
+
+
+def test_crowded_buckets_still_cluster(make_db_path):
+    cache = make_cache(make_db_path())
+    cache.add_scholarships({
+        'title': "Women in STEM Scholarship", 'description': "For women in science",
+        'source': f"https://mirror{i}.example.org/stem",
+    } for i in range(300))
+
+    conn = cache.pool.connection()
+    clusters = conn.execute(
+        "SELECT COUNT(DISTINCT cluster_id), COUNT(*) FROM scholarships WHERE title LIKE 'Women in STEM%'"
+    ).fetchone()
+    assert clusters == (1, 300)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
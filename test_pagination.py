@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for keyset (cursor) pagination of scholarship searches
+"""
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.scholarship_cache import ScholarshipCache
+
+
+def make_cache(db_file):
+    """Cache with 120 extra scholarships spread over priorities, deadlines and amounts"""
+    cache = ScholarshipCache(db_file=db_file)
+    today = date.today()
+    cache.add_scholarships({
+        'title': f"Paged Engineering Award {i:03d}",
+        'description': "Engineering scholarship for students",
+        'source': f"https://paged{i % 6}.example.org/{i}",
+        'country': "Uganda",
+        'goal_type': "student",
+        'priority': i % 4 + 1,
+        'deadline': (today + timedelta(days=i % 45)).isoformat(),
+        'amount': f"${(i % 9) * 1000}" if i % 5 else "Full tuition",
+    } for i in range(120))
+    return cache
+
+
+def all_pages(cache, page_size, **filters):
+    rows, cursor, pages = [], None, 0
+    while True:
+        page, cursor = cache.search_page(page_size=page_size, cursor=cursor, **filters)
+        rows.extend(page)
+        pages += 1
+        if cursor is None:
+            return rows, pages
+        assert len(page) == page_size
+
+
+def test_pages_concatenate_to_the_full_result(make_db_path):
+    cache = make_cache(make_db_path())
+    searches = [
+        {},
+        {'goal': 'student', 'country': 'Uganda'},
+        {'keywords': ['engineering']},
+        {'closing_within_days': 30},
+        {'sort_by_amount': True},
+        {'min_amount_usd': 3000, 'sort_by_amount': True},
+    ]
+    for filters in searches:
+        everything = cache.search_scholarships(limit=1000, **filters)
+        paged, pages = all_pages(cache, 7, **filters)
+        assert [row['id'] for row in paged] == [row['id'] for row in everything], filters
+        assert pages == max(1, -(-len(everything) // 7))
+        assert len({row['id'] for row in paged}) == len(paged)
+
+
+def test_amount_order_continues_into_unvalued_rows(make_db_path):
+    cache = make_cache(make_db_path())
+    rows, _ = all_pages(cache, 10, sort_by_amount=True, country='Uganda')
+    values = [row['amount_max_usd'] for row in rows]
+    first_unvalued = values.index(None)
+    assert all(value is not None for value in values[:first_unvalued])
+    assert all(value is None for value in values[first_unvalued:])
+    assert values[:first_unvalued] == sorted(values[:first_unvalued], reverse=True)
+
+
+def test_writes_between_pages_neither_repeat_nor_skip_rows(make_db_path):
+    cache = make_cache(make_db_path())
+    first, cursor = cache.search_page(goal='student', page_size=20)
+    cache.add_scholarships([{'title': "Late Top Priority Award", 'source': "https://late.example.org",
+                             'goal_type': "student", 'priority': 9}])
+    seen = list(first)
+    while cursor:
+        page, cursor = cache.search_page(goal='student', page_size=20, cursor=cursor)
+        seen.extend(page)
+    titles = [row['title'] for row in seen]
+    assert "Late Top Priority Award" not in titles  # Sorts before the cursor
+    expected = [row['title'] for row in cache.search_scholarships(goal='student', limit=1000)]
+    assert titles == [title for title in expected if title != "Late Top Priority Award"]
+
+
+def test_foreign_or_garbled_cursor_is_rejected(make_db_path):
+    cache = make_cache(make_db_path())
+    _, cursor = cache.search_page(goal='student', page_size=5)
+    for bad_search in ({'goal': 'artist'}, {'goal': 'student', 'sort_by_amount': True}):
+        try:
+            cache.search_page(page_size=5, cursor=cursor, **bad_search)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"cursor accepted for {bad_search}")
+    for garbled in ("not-a-cursor", cursor[:-3], "W10"):
+        try:
+            cache.search_page(goal='student', page_size=5, cursor=garbled)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"garbled cursor {garbled!r} accepted")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for the read-through search result cache (LRU + TTL + write generations)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.clock import VirtualClock
+from core.query_cache import QueryResultCache
+from core.scholarship_cache import ScholarshipCache
+
+
+def test_lru_eviction_and_ttl():
+    clock = VirtualClock()
+    cache = QueryResultCache(max_entries=2, ttl_seconds=60, clock=clock)
+    calls = []
+
+    def compute(value):
+        return lambda: calls.append(value) or value
+
+    cache.get_or_compute('a', compute('a'))
+    cache.get_or_compute('b', compute('b'))
+    cache.get_or_compute('a', compute('a'))      # hit, 'a' becomes most recent
+    cache.get_or_compute('c', compute('c'))      # evicts 'b'
+    cache.get_or_compute('b', compute('b'))
+    assert calls == ['a', 'b', 'c', 'b']
+    assert len(cache) == 2
+
+    clock.advance(61)
+    cache.get_or_compute('b', compute('b'))      # expired
+    assert calls[-1] == 'b' and len(calls) == 5
+    assert (cache.hits, cache.misses) == (1, 5)
+
+
+def test_result_computed_across_a_write_is_not_stored():
+    cache = QueryResultCache()
+
+    def compute_while_writer_commits():
+        cache.bump_generation()
+        return "old rows"
+
+    assert cache.get_or_compute('q', compute_while_writer_commits) == "old rows"
+    assert len(cache) == 0
+    assert cache.get_or_compute('q', lambda: "new rows") == "new rows"
+
+
+def test_repeated_search_is_served_from_cache(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    first = cache.search_scholarships(goal="student", country="Uganda")
+    hits = cache.query_cache.hits
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        again = cache.search_scholarships(goal="student", country="Uganda")
+    per_call = (time.perf_counter() - start) / 1000
+
+    assert again == first
+    assert cache.query_cache.hits == hits + 1000
+    assert per_call < 0.001
+
+    again[0]['title'] = "Edited by caller"
+    assert cache.search_scholarships(goal="student", country="Uganda") == first
+
+
+def test_writes_from_another_instance_invalidate_results(make_db_path):
+    db_file = make_db_path()
+    ui_cache = ScholarshipCache(db_file=db_file)
+    background_cache = ScholarshipCache(db_file=db_file)   # e.g. the scraper's background refresh
+    before = ui_cache.search_scholarships(goal="student", country="Uganda", limit=100)
+
+    background_cache.add_scholarships([{
+        'title': "Kampala Innovators Bursary", 'source': "https://kib.ug", 'country': "Uganda",
+        'goal_type': "student", 'priority': 5,
+    }])
+    after = ui_cache.search_scholarships(goal="student", country="Uganda", limit=100)
+    assert len(after) == len(before) + 1
+    assert after[0]['title'] == "Kampala Innovators Bursary"
+
+    conn = ui_cache.pool.connection()
+    with conn:
+        conn.execute("UPDATE scholarships SET last_verified = datetime('now', '-90 days') "
+                     "WHERE source = 'https://kib.ug'")
+    background_cache.cleanup_expired_scholarships(days_old=30)
+    titles = [row['title'] for row in ui_cache.search_scholarships(goal="student", country="Uganda", limit=100)]
+    assert "Kampala Innovators Bursary" not in titles
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression check for the scholarship cache schema
+
+Runs the real cache methods against a large synthetic corpus, captures every
+statement they execute and fails if EXPLAIN QUERY PLAN shows a hot query
+falling back to a full table scan or sorting without an index.
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.scholarship_cache import ScholarshipCache, release_database
+
+CORPUS_SIZE = 30000
+# Any SCAN of the table counts, including full index scans ("SCAN s USING INDEX ...")
+FULL_SCAN = re.compile(r'^SCAN (scholarships|s)\b')
+# A SEARCH constrained only by is_active reads every active row: a full scan in practice
+ACTIVE_ONLY_SEARCH = re.compile(r'^SEARCH (scholarships|s) USING .*\(is_active=\?\)$')
+SCHOLARSHIPS_READ = re.compile(r'^(SCAN|SEARCH) (scholarships|s)\b')
+
+
+@pytest.fixture(scope="module")
+def corpus_cache(tmp_path_factory):
+    """Cache filled with a synthetic corpus (built once for the module)"""
+    goals = ['student', 'entrepreneur', 'researcher', 'nonprofit', 'artist']
+    countries = ['Uganda', 'Kenya', 'Nigeria', 'Africa', 'International', 'India', 'Germany']
+    db_file = str(tmp_path_factory.mktemp("plans") / "cache" / "scholarships.db")
+    cache = ScholarshipCache(db_file=db_file)
+    cache.add_scholarships({
+        'title': f"Synthetic Scholarship {i}",
+        'description': f"Support for {goals[i % 5]}s in {countries[i % 7]}, cohort {i % 113}",
+        'amount': f"${(i % 20 + 1) * 500}",
+        'deadline': "June 30, 2026",
+        'category': "Synthetic",
+        'source': f"https://example{i % 40}.org/funding/{i}",
+        'country': countries[i % 7],
+        'keywords': "engineering,science" if i % 3 else "arts,design",
+        'goal_type': goals[i % 5],
+        'priority': i % 4 + 1,
+    } for i in range(CORPUS_SIZE))
+    yield cache
+    release_database(db_file)
+
+
+def captured_plans(cache, action):
+    """Run action(cache) and return {statement: [plan detail lines]} for each query it issued"""
+    # Writes run on the writer thread's connection, searches on this thread's
+    writer_connection = cache.writes.run(lambda conn: conn, publish=None)
+    connections = {cache.pool.connection(), writer_connection}
+    statements = []
+    for conn in connections:
+        conn.set_trace_callback(lambda statement, conn=conn: statements.append((conn, statement)))
+    try:
+        action(cache)
+    finally:
+        for conn in connections:
+            conn.set_trace_callback(None)
+
+    plans = {}
+    for conn, statement in statements:
+        if not re.match(r'\s*(SELECT|UPDATE|DELETE)', statement, re.I):
+            continue
+        rows = conn.execute("EXPLAIN QUERY PLAN " + statement).fetchall()
+        plans[' '.join(statement.split())] = [row[3] for row in rows]
+    assert plans, "action did not run any queries"
+    return plans
+
+
+def assert_indexed(cache, action, allow_sort=False, allow_active_only=None):
+    """Fail on full scans; allow_active_only names why an is_active-only SEARCH is acceptable"""
+    for statement, plan in captured_plans(cache, action).items():
+        scans = [line for line in plan if FULL_SCAN.match(line)]
+        assert not scans, f"Full table scan in:\n  {statement}\n  plan: {plan}"
+        if not allow_active_only:
+            active_only = [line for line in plan if ACTIVE_ONLY_SEARCH.match(line)]
+            assert not active_only, f"Search bounded only by is_active in:\n  {statement}\n  plan: {plan}"
+        if not allow_sort:
+            assert not any('TEMP B-TREE' in line for line in plan), \
+                f"Unindexed sort in:\n  {statement}\n  plan: {plan}"
+
+
+def test_search_by_goal_and_country_uses_rank_index(corpus_cache):
+    assert_indexed(corpus_cache, lambda c: c.search_scholarships(goal='student', country='Uganda'))
+    assert_indexed(corpus_cache, lambda c: c.search_scholarships(goal='artist'))
+
+
+def test_search_without_filters_uses_rank_index(corpus_cache):
+    # Walks the rank index in order and stops after LIMIT rows, so no sort and no full read
+    assert_indexed(corpus_cache, lambda c: c.search_scholarships(),
+                   allow_active_only="ordered LIMIT walk of idx_scholarships_active_rank_key")
+
+
+def test_keyword_search_is_driven_by_fulltext_index(corpus_cache):
+    # Relevance ordering needs a sort over the FTS matches, but never a table scan
+    assert_indexed(corpus_cache, lambda c: c.search_scholarships(goal='student', keywords=['engineering']),
+                   allow_sort=True)
+
+
+def test_counts_and_cache_age_only_read_stats_table(corpus_cache):
+    actions = [
+        lambda c: c.get_scholarship_count(),
+        lambda c: c.get_total_scholarship_count(),
+        lambda c: c.get_scholarship_count_by_country('Uganda'),
+        lambda c: c.get_cache_age(),
+        lambda c: c.get_cache_age('Uganda'),
+    ]
+    for action in actions:
+        plans = captured_plans(corpus_cache, action)
+        assert any('scholarship_stats' in line for plan in plans.values() for line in plan)
+        for statement, plan in plans.items():
+            # A country's figures resolve the stats groups through geography, never the scholarships
+            assert not any(SCHOLARSHIPS_READ.match(line) for line in plan), \
+                f"Expected only scholarship_stats and geography reads in:\n  {statement}\n  plan: {plan}"
+
+
+def test_cleanup_uses_range_scans(corpus_cache):
+    # days_old is large so the corpus survives for the other tests
+    assert_indexed(corpus_cache, lambda c: c.cleanup_expired_scholarships(days_old=3650))
+    assert_indexed(corpus_cache, lambda c: c.cleanup_past_deadlines(grace_days=3650))
+
+
+def test_closing_soon_search_walks_deadline_index(corpus_cache):
+    # Deadline range in index order, so neither a scan nor a sort
+    assert_indexed(corpus_cache, lambda c: c.search_scholarships(closing_within_days=30))
+
+
+def test_amount_search_walks_amount_index(corpus_cache):
+    # "At least $5k, largest first": a USD range in index order
+    assert_indexed(corpus_cache, lambda c: c.search_scholarships(min_amount_usd=5000, sort_by_amount=True))
+    assert_indexed(corpus_cache, lambda c: c.search_scholarships(sort_by_amount=True),
+                   allow_active_only="ordered LIMIT walk of idx_scholarships_active_amount_key")
+
+
+def test_deep_pages_seek_past_the_cursor(corpus_cache):
+    # A later page starts with a row-value range seek at the cursor, so it reads
+    # no more rows than the first page: no OFFSET-style walk, scan or sort
+    seek = re.compile(r'^SEARCH s USING .*\(is_active=\? AND .*\([a-z_,]+\)[<>]\(\?')
+    searches = [{}, {'goal': 'student'}, {'sort_by_amount': True}, {'min_amount_usd': 2000, 'sort_by_amount': True}]
+    for filters in searches:
+        cursor = None
+        for _ in range(3):
+            _, cursor = corpus_cache.search_page(page_size=100, cursor=cursor, **filters)
+        for statement, plan in captured_plans(corpus_cache, lambda c: c.search_page(page_size=100, cursor=cursor, **filters)).items():
+            assert any(seek.match(line) for line in plan), f"No cursor seek in:\n  {statement}\n  plan: {plan}"
+            assert not any(FULL_SCAN.match(line) or 'TEMP B-TREE' in line for line in plan), plan
+
+    # The corpus deadlines have passed, so build a closing-soon page query directly
+    query, params = corpus_cache._build_search_query(closing_within_days=30, after=['2026-07-01', 'key'])
+    plan = [row[3] for row in corpus_cache.pool.connection().execute("EXPLAIN QUERY PLAN " + query, params)]
+    assert seek.match(plan[0]) and not any('TEMP B-TREE' in line for line in plan), plan
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Tests for multi-signal ranking of search results
+"""
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+import core.scholarship_cache
+from core.ranking import RANK_SIGNALS, rank_rows, signal_matrix, weight_vector
+from core.scholarship_cache import ScholarshipCache
+
+TODAY = date(2026, 3, 1)
+
+
+def signal(signals, name):
+    return signals[RANK_SIGNALS.index(name)]
+
+
+def test_signals_are_scaled_per_candidate():
+    rows = [
+        {'relevance': 8.0, 'priority': 4, 'geography_id': 7, 'deadline_date': '2026-03-11',
+         'amount_max_usd': None, 'full_funding': 1, 'source': 'https://www.trusted.org/a',
+         'last_verified': '2026-03-01 09:30:00'},
+        {'relevance': 2.0, 'priority': 2, 'geography_id': 99, 'deadline_date': '2026-02-01',
+         'amount_max_usd': 50_000.0, 'full_funding': 0, 'source': 'http://Flaky.org:8080/b',
+         'last_verified': '2026-02-15T00:00:00+00:00'},
+        {'priority': None, 'geography_id': None, 'deadline_date': None, 'amount_max_usd': None,
+         'full_funding': 0, 'source': None, 'last_verified': None},
+    ]
+    signals = signal_matrix(rows, area_scores={7: 1.0, 3: 0.5}, reliability={'trusted.org': 0.9, 'flaky.org': 0.2},
+                            today=TODAY)
+
+    assert signals.shape == (len(RANK_SIGNALS), 3)
+    assert signal(signals, 'relevance').tolist() == [1.0, 0.25, 0.0]
+    assert signal(signals, 'priority').tolist() == [1.0, 0.5, 0.25]
+    assert signal(signals, 'geography').tolist() == [1.0, 0.0, 0.0]
+    deadline = signal(signals, 'deadline')
+    assert deadline[0] == pytest.approx(np.exp(-10 / 60)) and deadline[1] == 0.0 and deadline[2] == 0.5
+    assert signal(signals, 'amount').tolist() == [1.0, 1.0, 0.0]
+    assert signal(signals, 'reliability').tolist() == [0.9, 0.2, 0.5]
+    assert signal(signals, 'freshness').tolist() == [1.0, 0.5, 0.0]
+
+
+def test_weights_decide_the_order():
+    rows = [{'title': "Near", 'geography_id': 1, 'priority': 1},
+            {'title': "Rich", 'geography_id': 2, 'priority': 1, 'full_funding': 1}]
+    options = {'area_scores': {1: 1.0, 2: 0.25}, 'today': TODAY}
+    assert [row['title'] for row in rank_rows(rows, **options)] == ["Near", "Rich"]
+    assert [row['title'] for row in rank_rows(rows, {'geography': 0.0}, **options)] == ["Rich", "Near"]
+    assert rank_rows([], **options) == []
+    with pytest.raises(ValueError):
+        weight_vector({'popularity': 1.0})
+
+
+def test_ranked_search_pages_through_the_blended_order(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    soon = (date.today() + timedelta(days=5)).isoformat()
+    cache.add_scholarships([
+        {'title': "Kestrel Local Grant", 'description': "Kestrel award", 'country': "Uganda",
+         'source': "https://kestrel.example.org/local", 'priority': 2, 'deadline': soon},
+        {'title': "Kestrel Regional Grant", 'description': "Kestrel award", 'country': "East Africa",
+         'source': "https://kestrel.example.org/regional", 'priority': 2, 'deadline': soon},
+        {'title': "Kestrel Global Grant", 'description': "Kestrel award", 'country': "International",
+         'source': "https://kestrel.example.org/global", 'priority': 2, 'deadline': soon},
+    ])
+    area = cache._area_scores("Uganda")
+    assert sorted(area.values()) == [0.25, 0.5, 0.75, 1.0]
+
+    first, cursor = cache.search_ranked_page(keywords=['kestrel'], country="Uganda", page_size=2)
+    assert [row['title'] for row in first] == ["Kestrel Local Grant", "Kestrel Regional Grant"]
+    assert first[0]['rank_score'] > first[1]['rank_score']
+    rest, end = cache.search_ranked_page(keywords=['kestrel'], country="Uganda", page_size=2, cursor=cursor)
+    assert [row['title'] for row in rest] == ["Kestrel Global Grant"] and end is None
+
+    with pytest.raises(ValueError):  # A cursor only continues its own search and weights
+        cache.search_ranked_page(keywords=['kestrel'], country="Uganda", page_size=2, cursor=cursor,
+                                 weights={'geography': 0.0})
+
+
+def test_ranked_cursors_survive_writes_and_page_past_the_candidate_window(make_db_path, monkeypatch):
+    monkeypatch.setattr(core.scholarship_cache, 'RANKING_CANDIDATES', 8)
+    cache = ScholarshipCache(db_file=make_db_path())
+    cache.add_scholarships([{'title': f"Heron Wetland Grant {i}", 'description': "Heron award", 'priority': i % 3 + 1,
+                             'country': ["Uganda", "East Africa", "International"][i % 3],
+                             'source': f"https://heron{i}.example.org/grant"} for i in range(20)])
+
+    def titles_from(cursor, write=None):
+        titles = []
+        while True:
+            page, cursor = cache.search_ranked_page(keywords=['heron'], country="Uganda", page_size=3, cursor=cursor)
+            titles += [row['title'] for row in page]
+            if cursor is None:
+                return titles
+            if write:
+                write(len(titles))
+
+    unchanged = titles_from(None)
+    assert len(unchanged) == len(set(unchanged)) == 20  # Three windows of 8, 8 and 4
+
+    # Writes between pages re-rank new searches, not the window an open cursor is reading; later
+    # windows may take in the new rows, but never serve a row twice or skip an old one
+    late = lambda served: cache.add_scholarships([{'title': f"Heron Latecomer {served}", 'priority': 5,
+                                                   'country': "Uganda",
+                                                   'source': f"https://late{served}.example.org"}])
+    written = titles_from(None, late)
+    assert written[:8] == unchanged[:8]
+    assert len(written) == len(set(written)) and set(unchanged) <= set(written)
+    first, _ = cache.search_ranked_page(keywords=['heron'], country="Uganda", page_size=40)
+    assert len(first) > 20 and first[0]['title'].startswith("Heron Latecomer")
+
+    # A window no longer kept is recomputed, and the cursor resumes past its last row
+    page, cursor = cache.search_ranked_page(keywords=['heron'], country="Uganda", page_size=5)
+    cache.query_cache._pinned.clear()
+    rest, _ = cache.search_ranked_page(keywords=['heron'], country="Uganda", page_size=3, cursor=cursor)
+    assert [row['title'] for row in rest] == [row['title'] for row in first[5:8]]
+
+
+def test_source_reliability_comes_from_scrape_history(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    for success in (True, True, False, True):
+        cache.update_cache_metadata("https://www.osprey.example.org/list", success)
+    cache.update_cache_metadata("https://osprey.example.org/other", False)
+    cache.flush_writes()
+    assert cache.source_reliability()['osprey.example.org'] == pytest.approx(3 / 5)
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
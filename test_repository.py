@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the single scholarship store: DatabaseManager on the cache database
+and the one-time import of the former standalone database
+"""
+
+import json
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.db import DatabaseManager
+from core.scholarship_cache import ScholarshipCache
+
+
+def make_legacy_database(path):
+    """Database in the schema DatabaseManager used to write to scholarships.db"""
+    conn = sqlite3.connect(path)
+    conn.executescript('''
+        CREATE TABLE scholarships (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, description TEXT, deadline TEXT,
+            amount TEXT, source TEXT, category TEXT, target_audience TEXT, scraped_at DATETIME,
+            UNIQUE(title, source)
+        );
+        CREATE TABLE custom_sites (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE, added_by TEXT, added_at DATETIME,
+            last_scraped DATETIME, status TEXT, is_public INTEGER DEFAULT 0, popularity INTEGER DEFAULT 0
+        );
+        CREATE TABLE user_profiles (
+            user_id TEXT PRIMARY KEY, profile_data TEXT, created_at DATETIME, updated_at DATETIME
+        );
+    ''')
+    conn.executemany("INSERT INTO scholarships (title, description, deadline, amount, source, category, "
+                     "target_audience, scraped_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+                         ("Legacy Harbor Fellowship", "Coastal research fellowship", "June 30, 2030", "$4,000",
+                          "https://harbor.example.org", "researcher", "researcher", "2025-01-01T00:00:00"),
+                         ("Legacy Orchard Grant", "Farming grant", "", "", "https://orchard.example.org",
+                          "entrepreneur", "entrepreneur", "2025-01-01T00:00:00"),
+                     ])
+    conn.execute("INSERT INTO custom_sites (url, added_by, added_at, status, is_public, popularity) "
+                 "VALUES ('https://legacy-site.example.org', 'u1', '2025-01-01', 'active', 1, 4)")
+    conn.execute("INSERT INTO user_profiles VALUES ('u1', ?, '2025-01-01', '2025-01-02')",
+                 (json.dumps({'name': "Ada"}),))
+    conn.commit()
+    conn.close()
+
+
+def test_legacy_database_is_imported_once(make_db_path, tmp_path):
+    legacy_file = str(tmp_path / "scholarships.db")
+    make_legacy_database(legacy_file)
+    cache = ScholarshipCache(db_file=make_db_path())
+
+    db = DatabaseManager(cache=cache, legacy_file=legacy_file)
+    assert not os.path.exists(legacy_file) and os.path.exists(legacy_file + ".migrated")
+    assert db.get_user_profile('u1') == {'name': "Ada"}
+    assert db.get_custom_sites() == [{'url': "https://legacy-site.example.org", 'popularity': 4}]
+    assert db.get_popular_custom_sites(limit=1)[0]['url'] == "https://legacy-site.example.org"
+
+    harbor = cache.search_scholarships(keywords=['"Legacy Harbor"'])[0]
+    assert harbor['goal_type'] == "researcher" and harbor['amount_max_usd'] == 4000
+    assert harbor['deadline_date'] == "2030-06-30"
+    orchard = cache.search_scholarships(goal="entrepreneur", keywords=['"Legacy Orchard"'])[0]
+    assert orchard['amount'] is None and orchard['deadline'] is None
+
+    count = cache.get_scholarship_count()
+    DatabaseManager(cache=cache, legacy_file=legacy_file)  # Nothing left to import
+    assert cache.get_scholarship_count() == count
+
+
+def test_scraped_results_reach_search_through_one_write_path(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    db = DatabaseManager(cache=cache)
+    assert db.cache.pool is cache.pool
+    scraped = {'title': "Scraped Lantern Award", 'description': "Found on a site", 'deadline': '',
+               'amount': "$900", 'source': "https://lantern.example.org", 'category': "student",
+               'target_audience': "student", 'scraped_at': "2026-01-01T00:00:00"}
+    assert db.add_scholarships([scraped])['inserted'] == 1
+    assert db.add_scholarships([scraped]) == {'inserted': 0, 'updated': 0, 'unchanged': 1}
+
+    row = db.get_scholarships(goal="student", keywords=['"Scraped Lantern"'])[0]
+    assert row['title'] == "Scraped Lantern Award" and row['target_audience'] == "student"
+    assert set(row) == {'id', 'title', 'description', 'deadline', 'amount', 'source', 'category',
+                        'target_audience', 'scraped_at'}
+
+    db.save_user_profile('u2', {'goal': "student"})
+    db.add_custom_site("https://mine.example.org", 'u2')
+    conn = cache.pool.connection()
+    assert conn.execute("SELECT COUNT(*) FROM user_profiles").fetchone()[0] == 1
+    assert db.get_user_custom_urls('u2') == [{'url': "https://mine.example.org", 'popularity': 1}]
+    assert db.add_custom_site("https://mine.example.org", 'u3') is False
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for the trigger-maintained scholarship_stats table (counts and freshness)
+"""
+
+import random
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.scholarship_cache import ScholarshipCache
+
+RECOMPUTED_STATS = '''
+    SELECT COALESCE(geography_id, 0), lower(COALESCE(goal_type, '')), COUNT(*), MAX(last_verified),
+           MIN(last_verified)
+    FROM scholarships WHERE is_active = 1
+    GROUP BY COALESCE(geography_id, 0), COALESCE(goal_type, '') COLLATE NOCASE
+    ORDER BY 1, 2
+'''
+
+
+def stored_stats(conn):
+    return conn.execute('''
+        SELECT geography_id, lower(goal_type), active_count, newest_verified, oldest_verified
+        FROM scholarship_stats WHERE active_count > 0 ORDER BY 1, 2
+    ''').fetchall()
+
+
+def area_count(conn, *countries):
+    return conn.execute(
+        f"SELECT COUNT(*) FROM scholarships WHERE is_active = 1 AND country IN ({', '.join('?' * len(countries))})",
+        countries).fetchone()[0]
+
+
+def test_stats_match_a_full_recount_after_mixed_writes(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    conn = cache.pool.connection()
+    rng = random.Random(11)
+    countries = ['Uganda', 'Kenya', 'International', None]
+    goals = ['student', 'Student', 'researcher', '', None]  # One group per goal, whatever its case
+
+    for round_number in range(6):
+        cache.add_scholarships({
+            'title': f"Stats Grant {rng.randrange(120):04d}", 'source': "https://stats.example.org",
+            'country': rng.choice(countries), 'goal_type': rng.choice(goals),
+        } for _ in range(40))
+        with conn:
+            conn.execute("UPDATE scholarships SET last_verified = datetime('now', ?) WHERE id % 7 = ?",
+                         (f'-{rng.randrange(1, 90)} days', round_number))
+            conn.execute("UPDATE scholarships SET country = 'Kenya', geography_id = "
+                         "(SELECT id FROM geography WHERE name = 'Kenya') WHERE id % 11 = ?", (round_number,))
+            conn.execute("UPDATE scholarships SET goal_type = upper(goal_type) WHERE id % 5 = ?", (round_number,))
+            conn.execute("UPDATE scholarships SET is_active = 1 - is_active WHERE id % 13 = ?", (round_number,))
+        cache.cleanup_expired_scholarships(days_old=60)
+
+        assert stored_stats(conn) == conn.execute(RECOMPUTED_STATS).fetchall()
+
+
+def test_counts_and_age_come_from_stats(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    conn = cache.pool.connection()
+    active = conn.execute("SELECT COUNT(*) FROM scholarships WHERE is_active = 1").fetchone()[0]
+    uganda = area_count(conn, 'Uganda', 'East Africa', 'Africa', 'International')
+
+    assert cache.get_scholarship_count() == cache.get_total_scholarship_count() == active
+    assert cache.get_scholarship_count_by_country('uganda') == uganda
+    assert cache.get_scholarship_count(country='Uganda') == uganda
+    assert cache.get_scholarship_count_by_country('Atlantis') == area_count(conn, 'International')
+    assert cache.get_cache_age('Uganda') < 1
+    with conn:
+        conn.execute("UPDATE scholarships SET is_active = 0")
+    assert cache.get_scholarship_count_by_country('Uganda') == 0
+    assert cache.get_cache_age('Uganda') == 24
+
+
+def test_country_figures_cover_the_places_its_searches_return(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    conn = cache.pool.connection()
+    with conn:
+        conn.execute("UPDATE scholarships SET is_active = 0")
+    cache.add_scholarships({'title': title, 'source': "https://area.example.org", 'country': place}
+                           for title, place in [("Volta Teaching Bursary", 'Ghana'),
+                                                ("Sahel Engineering Award", 'West Africa'),
+                                                ("Continental Nursing Grant", 'Africa'),
+                                                ("Open Research Fellowship", 'International'),
+                                                ("Rift Valley Farming Prize", 'Kenya')])
+
+    assert cache.get_scholarship_count_by_country('Ghana') == 4 == \
+        len(cache.search_scholarships(country='Ghana', limit=50))
+    assert cache.get_scholarship_count_by_country('Kenya') == 3   # Not West Africa's listing
+    assert cache.get_scholarship_count_by_country('Germany') == 1  # International only
+
+    with conn:
+        conn.execute("UPDATE scholarships SET last_verified = datetime('now', '-10 days') WHERE country != 'Kenya'")
+    assert cache.get_cache_age('Kenya') < 1
+    assert cache.get_cache_age('Ghana') > 24 * 9
+
+
+def test_existing_database_is_backfilled(make_db_path):
+    db_file = make_db_path()
+    ScholarshipCache(db_file=db_file)
+    conn = sqlite3.connect(db_file)
+    conn.execute("DROP TABLE scholarship_stats")
+    for trigger in ('insert', 'update', 'delete'):
+        conn.execute(f"DROP TRIGGER scholarships_stats_{trigger}")
+    conn.execute("UPDATE scholarships SET is_active = 0 WHERE country = 'Uganda'")
+    conn.execute("PRAGMA user_version = 0")  # As written before schema versioning
+    conn.commit()
+    conn.close()
+
+    cache = ScholarshipCache(db_file=db_file)
+    conn = cache.pool.connection()
+    assert stored_stats(conn) == conn.execute(RECOMPUTED_STATS).fetchall()
+    assert cache.get_scholarship_count_by_country('Uganda') == \
+        area_count(conn, 'East Africa', 'Africa', 'International')
+    assert cache.get_scholarship_count() > 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for offline semantic search
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core import semantic
+from core.migrations import schema_version
+from core.scholarship_cache import ScholarshipCache
+from core.semantic import SemanticIndex, SemanticModel, blend, document_terms, query_terms
+
+
+def test_queries_reach_related_terms():
+    expanded = query_terms("computer science masters")
+    assert expanded['computer'] == 1 and expanded['master'] == 1
+    assert expanded['stem'] == expanded['graduate'] == semantic.RELATED_WEIGHT
+
+    model = SemanticModel.fit([document_terms(s) for s in (
+        {'title': "Graduate STEM Scholarship", 'keywords': "graduate,stem"},
+        {'title': "Pottery Residency", 'description': "Ceramics studio time"},
+        {'title': "Nursing Bursary", 'description': "For nursing students"},
+    )])
+    query = model.embed_query("computer science masters")
+    stem, pottery, nursing = (model.embed_scholarship(s) for s in (
+        {'title': "Graduate STEM Scholarship", 'keywords': "graduate,stem"},
+        {'title': "Pottery Residency"}, {'title': "Nursing Bursary"}))
+    assert np.linalg.norm(stem) == pytest.approx(1.0)
+    assert float(query @ stem) > 0.5
+    assert float(query @ pottery) == pytest.approx(0, abs=1e-6)
+    assert float(query @ nursing) == pytest.approx(0, abs=1e-6)
+    assert SemanticModel.from_row(model.to_row()).embed_query("stem") @ stem == pytest.approx(
+        float(model.embed_query("stem") @ stem))
+
+
+def test_index_probes_lists_and_keeps_up_with_changes(monkeypatch):
+    monkeypatch.setattr(semantic, 'IVF_MIN_ROWS', 500)
+    dimensions = 16
+    model = SemanticModel('v1', 0, [str(i) for i in range(dimensions)], np.ones(dimensions, np.float32),
+                          np.eye(dimensions, dtype=np.float32))
+    rng = np.random.default_rng(3)
+    vectors = rng.standard_normal((2000, dimensions)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    rows = [(row_id, 1, vector.tobytes()) for row_id, vector in enumerate(vectors, 1)]
+
+    index = SemanticIndex().sync('v1', lambda: model, lambda seq: [row for row in rows if row[1] > seq])
+    assert index.centroids is not None and len(index) == 2000
+    query = vectors[41]
+    exact = list(np.argsort(-(vectors @ query))[:10] + 1)
+    assert [row_id for row_id, _ in index._nearest(query, 10, probes=len(index.centroids))] == exact
+    approximate = [row_id for row_id, _ in index._nearest(query, 10)]
+    assert approximate[0] == 42 and len(set(approximate) & set(exact)) >= 7
+
+    # A re-embedded row replaces its old vector; new rows are searched before the next rebuild
+    rows += [(42, 2, (-query).tobytes()), (5000, 2, query.tobytes())]
+    index.sync('v1', lambda: model, lambda seq: [row for row in rows if row[1] > seq])
+    assert len(index) == 2001 and index.built_count == 2000
+    assert [row_id for row_id, _ in index._nearest(query, 2)] == [5000, exact[1]]
+
+
+def test_blend_rewards_rows_both_searches_find():
+    keyword_rows = [{'id': 1, 'cluster_id': 1}, {'id': 2, 'cluster_id': 2}]
+    semantic_rows = [{'id': 3, 'cluster_id': 3, 'semantic_score': 0.9},
+                     {'id': 2, 'cluster_id': 2, 'semantic_score': 0.5},
+                     {'id': 4, 'cluster_id': 1, 'semantic_score': 0.4}]  # A near-duplicate of row 1
+    blended = blend(keyword_rows, semantic_rows)
+    assert [row['id'] for row in blended] == [1, 2, 3]
+    assert blended[1]['semantic_score'] == 0.5 and 'semantic_score' not in blend(keyword_rows, [])[0]
+
+
+def test_semantic_search_finds_what_keywords_miss(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    cache.add_scholarships([
+        {'title': "Graduate STEM Scholarship", 'description': "Postgraduate study in science and technology",
+         'source': "https://stem.example.org", 'goal_type': "student", 'country': "Uganda"},
+        {'title': "Pottery Residency", 'description': "Ceramics studio time",
+         'source': "https://pottery.example.org", 'goal_type': "artist", 'country': "Uganda"},
+    ])
+    keywords = ["computer science masters"]
+    assert cache.search_ranked_page(keywords=keywords, country="Uganda")[0] == []
+    page, _ = cache.search_ranked_page(keywords=keywords, country="Uganda", semantic=True)
+    found = {row['title']: row for row in page}
+    assert found["Graduate STEM Scholarship"]['semantic_score'] > 0 and "Pottery Residency" not in found
+    assert cache.semantic_search("computer science masters", goal='artist') == []
+
+    # A changed listing is re-embedded and found after the write
+    cache.add_scholarships([{'title': "Pottery Residency", 'description': "Ceramics for software engineers",
+                             'source': "https://pottery.example.org"}])
+    titles = [row['title'] for row in cache.semantic_search("computer science masters")]
+    assert "Pottery Residency" in titles
+
+
+def test_model_is_refitted_as_the_corpus_grows_and_on_upgrade(make_db_path):
+    path = make_db_path()
+    cache = ScholarshipCache(db_file=path)
+    conn = cache.pool.connection()
+    version, fitted = conn.execute("SELECT version, fitted_rows FROM semantic_model").fetchone()
+    cache.add_scholarships([{'title': f"Heron Grant {i}", 'description': "Wetland ecology",
+                             'source': f"https://heron{i}.example.org"} for i in range(fitted)])
+    assert conn.execute("SELECT version FROM semantic_model").fetchone()[0] != version
+    assert conn.execute("SELECT COUNT(*) FROM scholarships WHERE semantic_vector IS NULL").fetchone()[0] == 0
+    assert cache.semantic_search("wetland")[0]['title'].startswith("Heron Grant")
+
+    with conn:
+        conn.execute("UPDATE scholarships SET semantic_vector = NULL")
+    conn.execute("PRAGMA user_version = 3")
+    ScholarshipCache(db_file=path)
+    assert schema_version(conn) >= 4
+    assert conn.execute("SELECT COUNT(*) FROM scholarships WHERE semantic_vector IS NULL").fetchone()[0] == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
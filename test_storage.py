@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Tests for the storage backends: the SQLite pair and, when a server is
+available, PostgreSQL (set SCHOLARSHIP_TEST_POSTGRES_URL to a scratch database)
+"""
+
+import inspect
+import os
+import sqlite3
+import sys
+import uuid
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.db import DatabaseManager
+from core.postgres_store import build_tsquery
+from core.scholarship_cache import ScholarshipCache
+from core.storage import (
+    SCHOLARSHIP_STORE_METHODS, USER_STORE_METHODS, ScholarshipStore, UserStore, open_storage
+)
+
+POSTGRES_URL = os.getenv("SCHOLARSHIP_TEST_POSTGRES_URL")
+
+
+def assert_implements(store, protocol, methods):
+    """Every protocol method is on store, taking the same parameters with the same defaults"""
+    for method in methods:
+        assert callable(getattr(store, method, None)), method
+        expected, actual = (
+            [(parameter.name, parameter.kind, parameter.default)
+             for parameter in inspect.signature(getattr(owner, method)).parameters.values()]
+            for owner in (protocol, store))
+        assert actual == expected, method
+
+
+def test_sqlite_is_the_default_backend(make_db_path):
+    cache, db = open_storage(None, db_file=make_db_path())
+    assert isinstance(cache, ScholarshipCache) and isinstance(db, DatabaseManager) and db.cache is cache
+    assert_implements(type(cache), ScholarshipStore, SCHOLARSHIP_STORE_METHODS)
+    assert_implements(type(db), UserStore, USER_STORE_METHODS)
+
+    path = make_db_path()
+    cache, _ = open_storage(path)  # A plain path is a SQLite file
+    assert cache.db_file == path
+
+
+def test_postgres_store_has_the_same_interface():
+    from core.postgres_store import PostgresDatabaseManager, PostgresScholarshipCache
+    assert_implements(PostgresScholarshipCache, ScholarshipStore, SCHOLARSHIP_STORE_METHODS)
+    assert_implements(PostgresDatabaseManager, UserStore, USER_STORE_METHODS)
+
+
+def test_tsquery_matches_fts_query_semantics():
+    assert build_tsquery(['engineering']) == "(engineering:*)"
+    assert build_tsquery(['"Harbor Fellowship"', 'ocean science']) == \
+        "(harbor <-> fellowship) | (ocean <-> science:*)"
+    assert build_tsquery(["'; DROP TABLE scholarships; --", '&|!']) == "(drop <-> table <-> scholarships:*)"
+    assert build_tsquery(['', None]) == ''
+
+
+def scanned_counts(cache):
+    """(active rows, active rows in Kenya's search area) counted by scanning scholarships"""
+    with cache.pool.connection() as conn, conn.cursor() as cursor:
+        area = cache._search_area(cursor, "Kenya")
+        return cursor.execute(
+            "SELECT count(*), count(*) FILTER (WHERE geography_id = ANY(%s)) FROM scholarships WHERE is_active = 1",
+            (area,)).fetchone()
+
+
+def test_postgres_round_trip():
+    if not POSTGRES_URL:
+        pytest.skip("SCHOLARSHIP_TEST_POSTGRES_URL not set")
+    cache, db = open_storage(POSTGRES_URL)
+    tag = uuid.uuid4().hex[:8]
+    rows = [{'title': f"Pg Harbor Fellowship {tag} {i}", 'description': "Coastal research", 'amount': "$4,000",
+             'deadline': "June 30, 2030", 'source': f"https://pg{i}.example.org/{tag}", 'country': "Kenya",
+             'keywords': "ocean", 'goal_type': "researcher", 'priority': i % 3 + 1} for i in range(5)]
+    assert cache.add_scholarships(rows)['inserted'] == 5
+    assert cache.add_scholarships(rows) == {'inserted': 0, 'updated': 0, 'unchanged': 5}
+    assert cache.add_scholarships([dict(rows[0], description="Updated")])['updated'] == 1
+
+    page, next_cursor = cache.search_page(keywords=[f'"Pg Harbor Fellowship {tag}"'], page_size=3)
+    rest, last_cursor = cache.search_page(keywords=[f'"Pg Harbor Fellowship {tag}"'], page_size=3,
+                                          cursor=next_cursor)
+    assert len(page) == 3 and len(rest) == 2 and last_cursor is None
+    assert page[0]['deadline_date'] == "2030-06-30" and page[0]['amount_max_usd'] == 4000
+    assert len(cache.search_scholarships(country="Kenya", keywords=[tag])) == 5
+    assert not cache.search_scholarships(country="Uganda", keywords=[tag])
+    assert cache.get_scholarship_count_by_country("Kenya") >= 5 and cache.get_cache_age("Kenya") < 1
+    assert cache.get_cache_age() < 1
+
+    ranked, ranked_cursor = cache.search_ranked_page(keywords=[f'"Pg Harbor Fellowship {tag}"'], page_size=3)
+    cache.add_scholarships([dict(rows[0], title=f"Pg Harbor Fellowship {tag} late")])
+    more, _ = cache.search_ranked_page(keywords=[f'"Pg Harbor Fellowship {tag}"'], page_size=3, cursor=ranked_cursor)
+    assert len({row['title'] for row in ranked + more}) == 5 and 'rank_score' in ranked[0]  # The cursor's candidates
+    assert len(cache.search_ranked_page(keywords=[f'"Pg Harbor Fellowship {tag}"'], page_size=10)[0]) == 6
+    assert cache.search_facets(keywords=[f'"Pg Harbor Fellowship {tag}"'])['geography'] == [("Kenya", 6)]
+    assert cache.suggest_keywords(["harbr"]) == ["harbor"]
+    assert any(row['title'].startswith("Pg Harbor Fellowship")
+               for row in cache.semantic_search("coastal ocean research fellowship", country="Kenya"))
+    matches = cache.best_matches({'major': "Coastal ocean research"}, goal="researcher", country="Kenya")
+    assert any(row['title'].startswith("Pg Harbor Fellowship") and row['match_score'] > 0 for row in matches)
+
+    # Counts come from scholarship_counts' deltas, and agree with a scan through writes and maintenance
+    assert (cache.get_scholarship_count(), cache.get_scholarship_count_by_country("Kenya")) == scanned_counts(cache)
+    with cache.pool.connection() as conn:
+        conn.execute("UPDATE scholarships SET is_active = 0 WHERE title = %s", (rows[4]['title'],))
+    assert (cache.get_scholarship_count(), cache.get_scholarship_count_by_country("Kenya")) == scanned_counts(cache)
+    cache.run_maintenance(force=True)
+    assert (cache.get_scholarship_count(), cache.get_scholarship_count_by_country("Kenya")) == scanned_counts(cache)
+    with cache.pool.connection() as conn:
+        assert conn.execute("SELECT count(*) = count(DISTINCT geography_id) FROM scholarship_counts").fetchone()[0]
+
+    db.save_user_profile(f"u-{tag}", {'goal': "researcher"})
+    assert db.get_user_profile(f"u-{tag}") == {'goal': "researcher"}
+    assert db.add_custom_site(f"https://{tag}.example.org", f"u-{tag}") is True
+    assert db.add_custom_site(f"https://{tag}.example.org", "someone") is False
+    assert db.get_user_custom_urls(f"u-{tag}") == [{'url': f"https://{tag}.example.org", 'popularity': 2}]
+
+
+def test_postgres_folds_near_duplicates():
+    if not POSTGRES_URL:
+        pytest.skip("SCHOLARSHIP_TEST_POSTGRES_URL not set")
+    cache, _ = open_storage(POSTGRES_URL)
+    tag = uuid.uuid4().hex  # Most of each title, so earlier runs' rows are not near-duplicates of these
+    official, copy = listings = [
+        {'title': f"Pg {tag} Scholars Program", 'source': f"https://tidewater.example.org/{tag}",
+         'description': "Full scholarships for young coastal researchers", 'country': "Kenya", 'goal_type': "student"},
+        {'title': f"Pg {tag} Scholars Programme", 'source': f"https://aggregator.example.org/{tag}",
+         'description': "Full scholarships for young coastal researchers at partner universities",
+         'country': "Kenya", 'goal_type': "researcher"},
+    ]
+    cache.add_scholarships(listings)
+
+    assert [row['source'] for row in cache.search_scholarships(keywords=[tag])] == [official['source']]
+    assert [row['source'] for row in cache.search_scholarships(keywords=[tag], goal="researcher")] == \
+        [copy['source']]  # A filtered-out canonical row does not hide its duplicate
+    assert cache.search_facets(keywords=[tag])['geography'] == [("Kenya", 1)]
+    assert len([row for row in cache.semantic_search("young coastal researchers scholars program", limit=50)
+                if tag in row['title']]) <= 1  # Earlier runs' listings read the same, so possibly none
+    index = cache._build_match_index()
+    with cache.pool.connection() as conn:
+        ids = [row[0] for row in conn.execute("SELECT id FROM scholarships WHERE title LIKE %s ORDER BY id",
+                                               (f"Pg {tag}%",))]
+        assert len(set(index.ids.tolist()) & set(ids)) == 1
+
+        # Archiving the canonical row promotes the copy
+        conn.execute("DELETE FROM scholarships WHERE id = %s", (ids[0],))
+        assert conn.execute("SELECT cluster_id FROM scholarships WHERE id = %s", (ids[1],)).fetchone()[0] == ids[1]
+    cache.query_cache.bump_generation()  # Raw SQL bypasses the store's write hooks
+    assert [row['source'] for row in cache.search_scholarships(keywords=[tag])] == [copy['source']]
+
+
+def test_postgres_imports_a_legacy_database(tmp_path):
+    if not POSTGRES_URL:
+        pytest.skip("SCHOLARSHIP_TEST_POSTGRES_URL not set")
+    tag = uuid.uuid4().hex[:8]
+    legacy_file = str(tmp_path / "scholarships.db")
+    legacy = sqlite3.connect(legacy_file)
+    legacy.executescript('''
+        CREATE TABLE scholarships (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, description TEXT, deadline TEXT,
+            amount TEXT, source TEXT, category TEXT, target_audience TEXT, scraped_at DATETIME
+        );
+        CREATE TABLE custom_sites (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT UNIQUE, added_by TEXT, added_at DATETIME,
+            last_scraped DATETIME, status TEXT, is_public INTEGER DEFAULT 0, popularity INTEGER DEFAULT 0
+        );
+        CREATE TABLE user_profiles (user_id TEXT PRIMARY KEY, profile_data TEXT, created_at DATETIME, updated_at DATETIME);
+    ''')
+    legacy.execute("INSERT INTO scholarships (title, description, deadline, amount, source, category, target_audience) "
+                   "VALUES (?, 'Coastal research', 'June 30, 2030', '$4,000', ?, 'Research', 'researcher')",
+                   (f"Pg Legacy Fellowship {tag}", f"https://legacy.example.org/{tag}"))
+    legacy.execute("INSERT INTO custom_sites (url, added_by, added_at, status, is_public, popularity) "
+                   "VALUES (?, ?, '2025-01-01', 'active', 0, 4)", (f"https://{tag}.example.org", f"u-{tag}"))
+    legacy.execute("INSERT INTO user_profiles VALUES (?, '{\"name\": \"Ada\"}', '2025-01-01', '2025-01-02')",
+                   (f"u-{tag}",))
+    legacy.commit()
+    legacy.close()
+
+    cache, db = open_storage(POSTGRES_URL, legacy_file=legacy_file)
+    assert not os.path.exists(legacy_file) and os.path.exists(legacy_file + ".migrated")
+    assert db.get_user_profile(f"u-{tag}") == {'name': "Ada"}
+    assert db.get_user_custom_urls(f"u-{tag}") == [{'url': f"https://{tag}.example.org", 'popularity': 4}]
+    fellowship = cache.search_scholarships(keywords=[f'"Pg Legacy Fellowship {tag}"'])[0]
+    assert fellowship['goal_type'] == "researcher" and fellowship['deadline_date'] == "2030-06-30"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for the injectable clock/RNG used by the scraper's anti-bot policy
+Everything runs in virtual time, so retries and politeness delays cost milliseconds
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.clock import VirtualClock
+from core.scholarship_cache import ScholarshipCache
+from core.scraping import EnhancedScholarshipScraper
+
+
+class FakeResponse:
+    def __init__(self, status_code, content=b"<html>ok</html>"):
+        self.status_code = status_code
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"HTTP {self.status_code}")
+
+
+class ScriptedSession(requests.Session):
+    """Session that replays a fixed list of status codes instead of hitting the network"""
+
+    def __init__(self, statuses):
+        super().__init__()
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def get(self, url, **kwargs):
+        self.calls += 1
+        return FakeResponse(self.statuses.pop(0))
+
+
+def make_scraper(db_file, seed, statuses):
+    """Build a scraper on a throwaway cache with virtual time"""
+    cache = ScholarshipCache(db_file=db_file)
+    scraper = EnhancedScholarshipScraper(None, clock=VirtualClock(), seed=seed, cache=cache)
+    scraper.session = ScriptedSession(statuses)
+    return scraper
+
+
+def test_virtual_clock_advances_without_sleeping():
+    clock = VirtualClock()
+    start = clock.now()
+    wall_start = time.perf_counter()
+
+    clock.sleep(3600)
+    clock.sleep(0)
+
+    assert (clock.now() - start).total_seconds() == 3600
+    assert clock.monotonic() == 3600
+    assert clock.sleeps == [3600]
+    assert time.perf_counter() - wall_start < 0.5
+
+
+def test_retry_logic_runs_in_virtual_time(make_db_path):
+    scraper = make_scraper(make_db_path(), seed=7, statuses=[429, 503, 200])
+    wall_start = time.perf_counter()
+
+    response = scraper.make_request_with_retry("https://example.org/scholarships")
+
+    assert response is not None and response.status_code == 200
+    assert scraper.session.calls == 3
+    # Two backoffs plus politeness delays happened, but only in virtual time
+    assert scraper.clock.total_slept > 5
+    assert time.perf_counter() - wall_start < 2
+
+
+def test_same_seed_gives_identical_timings(make_db_path):
+    first = make_scraper(make_db_path(), seed=42, statuses=[403, 200])
+    second = make_scraper(make_db_path(), seed=42, statuses=[403, 200])
+
+    first.make_request_with_retry("https://example.org/a")
+    second.make_request_with_retry("https://example.org/a")
+
+    assert first.clock.sleeps == second.clock.sleeps
+    assert first.current_user_agent == second.current_user_agent
+
+
+def test_anti_bot_delay_is_bounded_and_recorded(make_db_path):
+    scraper = make_scraper(make_db_path(), seed=1, statuses=[])
+    delays = [scraper._apply_anti_bot_delay() for _ in range(20)]
+
+    assert delays == scraper.clock.sleeps
+    assert all(1 <= d <= 5 + 3 + 10 for d in delays)
+    assert scraper.session_persistence['total_requests'] == 20
+
+
+def test_adaptive_retry_backoff_grows_with_attempts(make_db_path):
+    scraper = make_scraper(make_db_path(), seed=3, statuses=[])
+    waits = [scraper.adaptive_retry_strategy(429, attempt) for attempt in range(4)]
+
+    assert waits == sorted(waits)
+    assert waits[-1] <= 300
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-writer write-behind queue all cache mutations go through
+"""
+
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from core.scholarship_cache import ScholarshipCache, release_database
+from core.write_queue import WriteBehindQueue
+
+
+def make_queue(db_file, **options):
+    local = threading.local()
+
+    def connection():
+        if not hasattr(local, 'conn'):
+            local.conn = sqlite3.connect(db_file, check_same_thread=False)
+        return local.conn
+
+    with connection() as conn:
+        conn.execute("CREATE TABLE items (name TEXT PRIMARY KEY)")
+    commits = []
+    return WriteBehindQueue(connection, commits.append, **options), connection, commits
+
+
+inserted = []  # Rows per insert_items call
+
+
+def insert_items(cursor, rows):
+    inserted.append(len(rows))
+    cursor.executemany("INSERT INTO items VALUES (?)", [(row,) for row in rows])
+    return [row.upper() for row in rows]
+
+
+def hold_writer(writes):
+    """Park the writer on a mutation until the returned event is set, so later writes queue up"""
+    release, parked = threading.Event(), threading.Event()
+    writes.submit(lambda conn: (parked.set(), release.wait()), publish=None)
+    parked.wait()
+    return release
+
+
+def test_queued_row_jobs_share_one_transaction_and_one_publish(tmp_path):
+    writes, connection, commits = make_queue(str(tmp_path / "writes.db"), batch_rows=100)
+    inserted.clear()
+    release = hold_writer(writes)
+    futures = [writes.submit_rows(insert_items, [f"item-{i}-{j}" for j in range(10)]) for i in range(5)]
+    futures.append(writes.submit(lambda conn: conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]))
+    assert writes.pending() == 7
+    release.set()
+
+    assert futures[2].result() == [f"ITEM-2-{j}" for j in range(10)]  # Each job gets its own rows' results
+    assert futures[-1].result() == 50  # A later mutation sees the committed rows
+    assert inserted == [50] and commits == [True]
+    assert writes.flush() and writes.pending() == 0
+
+
+def test_a_failing_job_does_not_fail_the_jobs_it_was_batched_with(tmp_path):
+    writes, connection, commits = make_queue(str(tmp_path / "writes.db"))
+    release = hold_writer(writes)
+    good = writes.submit_rows(insert_items, ["alpha", "beta"])
+    duplicate = writes.submit_rows(insert_items, ["gamma", "gamma"])
+    later = writes.submit_rows(insert_items, ["delta"])
+    release.set()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        duplicate.result()
+    assert good.result() == ["ALPHA", "BETA"] and later.result() == ["DELTA"]
+    names = {row[0] for row in connection().execute("SELECT name FROM items")}
+    assert names == {"alpha", "beta", "delta"}
+
+
+def test_writer_thread_retires_when_idle_and_restarts_on_the_next_write(tmp_path):
+    writes, connection, commits = make_queue(str(tmp_path / "writes.db"), idle_seconds=0.05)
+    assert writes.submit_rows(insert_items, ["first"]).result() == ["FIRST"]
+    writer = writes._thread
+    writer.join(timeout=5)
+    assert writes._thread is None
+    assert writes.submit_rows(insert_items, ["second"]).result() == ["SECOND"]
+    assert writes.flush(durable=True)
+    assert connection().execute("SELECT COUNT(*) FROM items").fetchone()[0] == 2
+
+
+def test_concurrent_scholarship_writers_go_through_one_writer(make_db_path):
+    cache = ScholarshipCache(db_file=make_db_path())
+    writer_threads = set()
+    cache.writes.run(lambda conn: writer_threads.add(threading.current_thread().name), publish=None)
+    results, errors = [], []
+
+    def writer(index):
+        try:
+            rows = [{'title': f"Pelican Grant {index}-{i}", 'source': f"https://pelican{index}.example.org/{i}",
+                     'description': "Queued write"} for i in range(20)]
+            results.append(cache.add_scholarships(rows, chunk_size=5))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    queued = cache.queue_scholarships([{'title': "Heron Fellowship", 'source': "https://heron.example.org"}])
+    for thread in threads:
+        thread.join()
+
+    assert not errors and all(counts['inserted'] == 20 for counts in results)
+    assert queued.result() == {'inserted': 1, 'updated': 0, 'unchanged': 0}
+    assert cache.flush_writes()
+    # Searchable once add_scholarships returns or the queued future resolves
+    assert cache.pool.connection().execute("SELECT COUNT(*) FROM scholarships WHERE title LIKE 'Pelican%'").fetchone()[0] == 120
+    assert len(cache.search_scholarships(keywords=['heron'])) == 1
+    assert writer_threads == {"write-behind-scholarships.db"}
+
+
+def test_released_database_flushes_its_writes_and_starts_afresh(make_db_path):
+    path = make_db_path()
+    cache = ScholarshipCache(db_file=path)
+    queued = cache.queue_scholarships([{'title': "Egret Bursary", 'source': "https://egret.example.org"}])
+    release_database(path)
+    assert queued.done()
+    reopened = ScholarshipCache(db_file=path)
+    assert reopened.pool is not cache.pool and reopened.writes is not cache.writes
+    assert reopened.query_cache is not cache.query_cache
+    assert len(reopened.search_scholarships(keywords=['egret'])) == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
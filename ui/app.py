@@ -5,13 +5,12 @@ import os
 # Add the parent directory to the path so we can import from core
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from core.db import DatabaseManager
-from core.api import APIManager
-from core.scraping import EnhancedScholarshipScraper
+from core.services import Services
+from core.near_duplicates import dedupe_scholarships
 from core.application import ApplicationGenerator
-from core.profile import CVExtractor
-from core.cv_templates import CVTemplateGenerator
 from core.country_config import COUNTRY_CONFIG, get_gpa_input_config, get_country_config, convert_gpa_to_standard
+from core.facets import FACETS, count_facets, drill_down, facet_total, result_labels
+from core.geography import INTERNATIONAL, canonical_place
 
 # Configure page for mobile with favicon
 st.set_page_config(
@@ -52,17 +51,35 @@ if 'user_goal' not in st.session_state:
     st.session_state.user_goal = 'student'
 if 'selected_country' not in st.session_state:
     st.session_state.selected_country = 'Uganda'  # Default to Uganda as requested
+if 'facets' not in st.session_state:
+    st.session_state.facets = None  # Facet counts of everything the last quick search matched
+
+FACET_TITLES = {'category': "🎯 Category", 'goal': "🧭 Goal", 'geography': "🌍 Geography",
+                'deadline_month': "⏰ Deadline month", 'amount_band': "💰 Amount", 'source': "🔗 Source"}
+
+
+def reset_facets(facets=None):
+    """New result set: its facet counts (None to count the loaded rows) and no drill-down selections"""
+    st.session_state.facets = facets
+    for facet in FACETS:
+        st.session_state.pop(f"facet_{facet}", None)
 
 # --- Initialize Core Components ---
-db_manager = DatabaseManager()
-api_manager = APIManager()
-scraper = EnhancedScholarshipScraper(db_manager)
-cv_extractor = CVExtractor()
-cv_generator = CVTemplateGenerator()
+@st.cache_resource
+def get_services():
+    """Databases and helpers built (and migrated/seeded) once per process, shared by every rerun"""
+    return Services()
+
+services = get_services()
+db_manager = services.db_manager
+api_manager = services.api_manager
+cv_extractor = services.cv_extractor
+cv_generator = services.cv_generator
+cache = services.cache
+if 'scraper' not in st.session_state:
+    st.session_state.scraper = services.new_scraper()
+scraper = st.session_state.scraper
 
-# Initialize scholarship cache and show stats
-from core.scholarship_cache import ScholarshipCache
-cache = ScholarshipCache()
 cache_count = cache.get_scholarship_count()
 
 # --- Sidebar: User Settings ---
@@ -89,6 +106,16 @@ st.sidebar.info(f"📊 GPA Scale: {gpa_config['help']}")
 goal_options = ['student', 'entrepreneur', 'researcher', 'nonprofit', 'artist']
 st.session_state.user_goal = st.sidebar.selectbox("Select your goal", goal_options, index=goal_options.index(st.session_state.user_goal))
 
+# Deadline filter: (open_only, closing_within_days) passed to the cached search
+deadline_filters = {
+    "Any deadline": (False, None),
+    "Open now": (True, None),
+    "Closing within 30 days": (False, 30),
+}
+open_only, closing_within_days = deadline_filters[st.sidebar.selectbox("⏰ Deadline", list(deadline_filters))]
+semantic_search = st.sidebar.checkbox("🧠 Match by meaning", value=True,
+                                      help="Also find scholarships that describe your keywords in other words")
+
 
 # --- Sidebar: CV Upload & Profile ---
 st.sidebar.subheader("📄 Profile Setup")
@@ -244,6 +271,7 @@ if st.sidebar.button("Add Website"):
                             if 'scraped_data' not in st.session_state:
                                 st.session_state.scraped_data = []
                             st.session_state.scraped_data.extend(new_scholarships)
+                            reset_facets()
                         else:
                             st.sidebar.info("🔍 No scholarships found on this site yet")
                     except Exception as e:
@@ -296,6 +324,20 @@ with st.container():
         search_clicked = st.button("⚡ Quick Search", use_container_width=True, help="Search cached results (instant)")
     with col3:
         aggressive_search = st.button("🚀 Live Scrape", use_container_width=True, help="Real-time scraping (slower but fresh)")
+    matches_clicked = st.button("🎯 Best matches for my profile", use_container_width=True,
+                                disabled=not st.session_state.user_profile,
+                                help="Cached scholarships that fit your saved profile (field, GPA, country)")
+
+if matches_clicked:
+    st.session_state.scraped_data = scraper.best_matches(
+        st.session_state.user_profile,
+        goal=st.session_state.user_goal,
+        country=st.session_state.selected_country
+    )
+    st.session_state.next_page = None
+    reset_facets()
+    if not st.session_state.scraped_data:
+        st.warning("⚠️ No scholarships match your profile yet. Add your major or field, or try a keyword search.")
 
 if search_clicked or aggressive_search:
     keywords_list = [k.strip() for k in keywords.split(',')] if keywords else None
@@ -307,14 +349,21 @@ if search_clicked or aggressive_search:
             st.info(f"🎯 Prioritizing {st.session_state.selected_country} + International opportunities")
             st.info("📚 Using intelligent caching for instant results")
             
-            opportunities = scraper.search_by_goal(
+            search_args = dict(
                 goal=st.session_state.user_goal,
                 keywords=keywords_list,
                 custom_sites=custom_urls,
                 user_id=st.session_state.user_id,
-                country=st.session_state.selected_country
+                country=st.session_state.selected_country,
+                open_only=open_only,
+                closing_within_days=closing_within_days,
+                semantic=semantic_search
             )
+            opportunities = scraper.search_by_goal(**search_args)
             st.session_state.scraped_data = opportunities
+            # Cursor of the next page, continued by "Load more"
+            st.session_state.next_page = (search_args, scraper.next_cursor) if scraper.next_cursor else None
+            reset_facets(scraper.facets)  # Counted over every cached match, not only this page
             
             if opportunities:
                 if len(opportunities) >= 5:
@@ -333,7 +382,10 @@ if search_clicked or aggressive_search:
                 keywords=keywords_list,
                 custom_sites=custom_urls,
                 user_id=st.session_state.user_id,
-                country=st.session_state.selected_country
+                country=st.session_state.selected_country,
+                open_only=open_only,
+                closing_within_days=closing_within_days,
+                semantic=semantic_search
             )
             
             # Then perform aggressive scraping
@@ -347,16 +399,12 @@ if search_clicked or aggressive_search:
             # Combine results (remove duplicates)
             all_opportunities = cached_opportunities + fresh_opportunities
             
-            # Remove duplicates based on title similarity
-            unique_opportunities = []
-            seen_titles = set()
-            for opp in all_opportunities:
-                title_key = opp['title'].lower()[:50]  # First 50 chars for similarity check
-                if title_key not in seen_titles:
-                    unique_opportunities.append(opp)
-                    seen_titles.add(title_key)
+            # Remove near-duplicates (same scholarship listed by several sites)
+            unique_opportunities = dedupe_scholarships(all_opportunities)
             
             st.session_state.scraped_data = unique_opportunities
+            st.session_state.next_page = None  # Merged with live results, so no single cursor continues it
+            reset_facets()
             
             if unique_opportunities:
                 cached_count = len(cached_opportunities)
@@ -367,32 +415,62 @@ if search_clicked or aggressive_search:
 if st.session_state.scraped_data:
     st.header("📋 Found Opportunities")
     
-    # Enhanced statistics display
-    total_opps = len(st.session_state.scraped_data)
-    country_specific = len([opp for opp in st.session_state.scraped_data if st.session_state.selected_country.lower() in opp.get('source', '').lower()])
+    # Facet counts: the search's own (every match) or, for matches and live
+    # results, the loaded rows' (one NumPy pass either way)
+    labels = result_labels(st.session_state.scraped_data)
+    facets = st.session_state.facets or count_facets(labels)
+    places = dict(facets['geography'])
+    total_opps = facet_total(facets)
+    country_specific = places.get(canonical_place(st.session_state.selected_country), 0)
+    international = places.get(INTERNATIONAL, 0)
     
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
         st.metric("🎯 Total Found", total_opps)
     with col2:
         st.metric(f"🌍 {st.session_state.selected_country}", country_specific)
     with col3:
-        st.metric("🌐 International", total_opps - country_specific)
+        st.metric("🗺️ Regional", total_opps - country_specific - international)
+    with col4:
+        st.metric("🌐 International", international)
+    
+    # Drill-down: filters the loaded rows in place, no query per facet
+    with st.expander("🔎 Refine results"):
+        selected = {}
+        for facet in FACETS:
+            counts = dict(facets[facet])
+            if len(counts) > 1:
+                selected[facet] = st.multiselect(
+                    FACET_TITLES[facet], options=list(counts), key=f"facet_{facet}",
+                    format_func=lambda label, counts=counts: f"{label} ({counts[label]})")
+    shown = drill_down(labels, selected)
+    if not shown.all():
+        st.caption(f"Showing {int(shown.sum())} of {len(shown)} loaded scholarships")
     
     # Mobile-optimized table display with enhanced columns
     import pandas as pd
-    df = pd.DataFrame(st.session_state.scraped_data)
+    df = pd.DataFrame(st.session_state.scraped_data)[shown]
+    shown_opps = [opp for opp, keep in zip(st.session_state.scraped_data, shown) if keep]  # The table's rows
     
     # Create a clean, mobile-friendly table with more info
     display_df = df[['title', 'deadline', 'amount', 'category']].copy()
     display_df.columns = ['📚 Title', '⏰ Deadline', '💰 Amount', '🎯 Category']
     
-    # Add priority indicators
-    display_df['🔥 Priority'] = df.apply(lambda row: 
-        '🔥🔥🔥' if st.session_state.selected_country.lower() in row.get('source', '').lower()
-        else '🔥🔥' if 'africa' in row.get('source', '').lower()
-        else '🔥', axis=1
-    )
+    # Add priority indicators: thirds of the best rank_score, or the source
+    # for results without one (fresh scraper finds)
+    import numpy as np
+    source = df['source'].fillna('').str.lower() if 'source' in df else pd.Series('', index=df.index)
+    by_source = np.select(
+        [source.str.contains(st.session_state.selected_country.lower(), regex=False),
+         source.str.contains('africa', regex=False)],
+        ['🔥🔥🔥', '🔥🔥'], '🔥')
+    if 'rank_score' in df:
+        scores = pd.to_numeric(df['rank_score'], errors='coerce')
+        share = scores / scores.max() if scores.max() > 0 else scores * 0
+        by_rank = np.select([share >= 2 / 3, share >= 1 / 3], ['🔥🔥🔥', '🔥🔥'], '🔥')
+        display_df['🔥 Priority'] = np.where(scores.isna(), by_source, by_rank)
+    else:
+        display_df['🔥 Priority'] = by_source
     
     # Display the enhanced table
     st.dataframe(
@@ -401,9 +479,18 @@ if st.session_state.scraped_data:
         hide_index=True
     )
     
+    # Next page of the same search, read from its cursor (no re-run or offset)
+    if st.session_state.get('next_page'):
+        if st.button("⬇️ Load more scholarships", use_container_width=True):
+            search_args, cursor = st.session_state.next_page
+            st.session_state.scraped_data = st.session_state.scraped_data + scraper.search_by_goal(
+                cursor=cursor, **search_args)
+            st.session_state.next_page = (search_args, scraper.next_cursor) if scraper.next_cursor else None
+            st.experimental_rerun()
+    
     # Row selection using selectbox (compatible with all Streamlit versions)
     st.write("**Select an opportunity for application generation:**")
-    opportunity_titles = [f"{i+1}. {opp['title']}" for i, opp in enumerate(st.session_state.scraped_data)]
+    opportunity_titles = [f"{i+1}. {opp['title']}" for i, opp in enumerate(shown_opps)]
     
     if opportunity_titles:
         selected_title = st.selectbox(
@@ -415,7 +502,7 @@ if st.session_state.scraped_data:
         if selected_title:
             # Extract index from selection
             selected_idx = int(selected_title.split('.')[0]) - 1
-            st.session_state.selected_opportunity = st.session_state.scraped_data[selected_idx]
+            st.session_state.selected_opportunity = shown_opps[selected_idx]
             st.success(f"✅ Selected: **{st.session_state.selected_opportunity['title']}**")
     
     # Detailed view for selected opportunity
@@ -438,8 +525,8 @@ if st.session_state.scraped_data:
         st.info(f"📝 Creating application for: **{selected_title}**")
     else:
         st.warning("👆 Please select an opportunity from the table above")
-        selected_title = st.selectbox("Or select manually:", [opp['title'] for opp in st.session_state.scraped_data])
-        selected_opp = next((opp for opp in st.session_state.scraped_data if opp['title'] == selected_title), None)
+        selected_title = st.selectbox("Or select manually:", [opp['title'] for opp in shown_opps])
+        selected_opp = next((opp for opp in shown_opps if opp['title'] == selected_title), None)
     # --- Application Letter Form ---
     letter = None
     mode = 'server'  # Always use developer/server mode for AI features